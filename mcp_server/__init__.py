@@ -4,6 +4,14 @@
 # Historical GARC soak target: 1.2.0-rc6.
 __version__ = "1.4.0"
 
+# Must run before any other mcp_server import so the profiler sees them all.
+import os as _os
+
+if _os.getenv("MCP_STARTUP_PROFILE", "").strip().lower() in {"1", "true", "yes", "on"}:
+    from .core.startup_profiler import install as _install_startup_profiler
+
+    _install_startup_profiler()
+
 # Public API exports
 __all__ = [
     "__version__",
@@ -34,6 +34,7 @@ from .mcp_comparison_benchmark import (
     MCPComparisonBenchmark,
     run_comparison_benchmarks,
 )
+from .synthetic_corpus import TIERS, CorpusSpec, SyntheticCorpus
 
 __all__ = [
     "BenchmarkSuite",
@@ -43,4 +44,7 @@ __all__ = [
     "MCPComparisonBenchmark",
     "ComparisonMetrics",
     "run_comparison_benchmarks",
+    "CorpusSpec",
+    "SyntheticCorpus",
+    "TIERS",
 ]
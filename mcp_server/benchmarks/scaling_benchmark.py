@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""Scaling benchmark: how indexing and query cost grow with repository size.
+
+For each tier (1k, 10k, 100k, 500k files) a deterministic synthetic corpus is
+written to disk and measured end to end through ``EnhancedDispatcher``:
+
+- cold ``index_directory`` time and throughput;
+- incremental reindex of a ~1% edit (modified, added and deleted files);
+- ``search``, ``lookup`` and fuzzy ``search`` latency percentiles;
+- the RSS each tier adds to the process (retained and peak) and on-disk
+  index size.
+
+Results are written as JSON.  :func:`compare_results` checks a run against a
+stored baseline, both per tier and through the *scaling exponent* of every
+metric -- the slope of ``log(metric)`` against ``log(files)`` across tiers.
+A slope near 0 is constant cost, near 1 is linear: a query that turns O(N) or
+an indexer that turns O(N^2) moves the exponent even on a machine whose
+absolute timings differ from the one that recorded the baseline.
+
+Usage:
+    python -m mcp_server.benchmarks.scaling_benchmark --tiers 1k,10k \\
+        --output benchmark_results/scaling.json --baseline benchmarks/scaling_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import psutil
+
+from ..core.path_resolver import PathResolver
+from ..core.repo_context import RepoContext
+from ..dispatcher.dispatcher_enhanced import EnhancedDispatcher
+from ..storage.sqlite_store import SQLiteStore
+from .synthetic_corpus import TIERS, CorpusSpec, SyntheticCorpus
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_EXPONENT_MARGIN = 0.15
+
+# Differences smaller than these are measurement noise, whatever the ratio.
+_NOISE_FLOORS: Dict[str, float] = {
+    "_ms": 1.0,
+    "_seconds": 0.05,
+    "_mb": 8.0,
+    "_bytes": 64.0,
+}
+
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms, dtype=float)
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+    }
+
+
+def _db_bytes(db_path: Path) -> int:
+    total = 0
+    for suffix in ("", "-wal", "-shm"):
+        candidate = Path(f"{db_path}{suffix}")
+        if candidate.exists():
+            total += candidate.stat().st_size
+    return total
+
+
+class _RssSampler:
+    """Tracks how much RSS one tier adds, sampling in a background thread.
+
+    ``ru_maxrss`` and a single end-of-tier reading are process-wide, so every
+    tier after the first would report the high-water mark of the ones before
+    it.  Both figures here are relative to the RSS when the tier started.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_bytes = 0
+        self.peak_bytes = 0
+
+    def _rss(self) -> int:
+        return self._process.memory_info().rss
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self._rss())
+
+    def start(self) -> None:
+        gc.collect()
+        self.start_bytes = self.peak_bytes = self._rss()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Dict[str, float]:
+        end_bytes = self._rss()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        peak_bytes = max(self.peak_bytes, end_bytes)
+        mb = 1024 * 1024
+        return {
+            "rss_mb": max(0, end_bytes - self.start_bytes) / mb,
+            "peak_rss_mb": (peak_bytes - self.start_bytes) / mb,
+            "process_rss_mb": end_bytes / mb,
+        }
+
+
+def _misspell(name: str) -> str:
+    """Drop one interior character, the way a half-remembered name is typed."""
+    if len(name) < 4:
+        return name
+    middle = len(name) // 2
+    return name[:middle] + name[middle + 1 :]
+
+
+class ScalingBenchmark:
+    """Runs one or more corpus tiers and collects comparable results."""
+
+    def __init__(
+        self,
+        work_dir: Optional[Path] = None,
+        *,
+        queries: int = 200,
+        warmup: int = 10,
+        incremental_fraction: float = 0.01,
+        keep_corpus: bool = False,
+        dispatcher_factory: Optional[Callable[[], EnhancedDispatcher]] = None,
+    ):
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix="scaling_"))
+        self.queries = queries
+        self.warmup = warmup
+        self.incremental_fraction = incremental_fraction
+        self.keep_corpus = keep_corpus
+        self.dispatcher_factory = dispatcher_factory or (
+            lambda: EnhancedDispatcher(semantic_search_enabled=False)
+        )
+
+    def run(self, specs: Mapping[str, CorpusSpec]) -> Dict[str, Any]:
+        tiers: Dict[str, Any] = {}
+        for name, spec in specs.items():
+            logger.info("Scaling benchmark tier %s (%d files)", name, spec.files)
+            tiers[name] = self.run_tier(name, spec)
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "tiers": tiers,
+            "scaling": scaling_exponents(tiers),
+        }
+
+    def run_tier(self, name: str, spec: CorpusSpec) -> Dict[str, Any]:
+        tier_dir = self.work_dir / name
+        if tier_dir.exists():
+            shutil.rmtree(tier_dir)
+        repo = tier_dir / "repo"
+        db_path = tier_dir / "code_index.db"
+        corpus = SyntheticCorpus(spec)
+
+        started = time.perf_counter()
+        corpus_stats = corpus.write(repo)
+        generate_seconds = time.perf_counter() - started
+
+        store = SQLiteStore(str(db_path), path_resolver=PathResolver(repo))
+        repo_id = store.create_repository(str(repo), f"synthetic-{name}")
+        ctx = RepoContext(
+            repo_id=str(repo_id),
+            sqlite_store=store,
+            workspace_root=repo,
+            tracked_branch="main",
+            registry_entry=SimpleNamespace(repository_id=repo_id, path=repo),
+        )
+        sampler = _RssSampler()
+        sampler.start()
+
+        try:
+            dispatcher = self.dispatcher_factory()
+            started = time.perf_counter()
+            index_stats = dispatcher.index_directory(ctx, repo)
+            cold_seconds = time.perf_counter() - started
+            db_after_cold = _db_bytes(db_path)
+
+            latency = self._measure_queries(dispatcher, ctx, corpus)
+            incremental = self._measure_incremental(dispatcher, ctx, corpus, repo)
+        finally:
+            memory = sampler.stop()
+            store.close()
+            if not self.keep_corpus:
+                shutil.rmtree(tier_dir, ignore_errors=True)
+
+        return {
+            "files": spec.files,
+            "spec": spec.to_dict(),
+            "corpus": {**corpus_stats.to_dict(), "generate_seconds": generate_seconds},
+            "cold_index": {
+                "elapsed_seconds": cold_seconds,
+                "files_per_second": spec.files / cold_seconds if cold_seconds else 0.0,
+                "indexed_files": index_stats.get("indexed_files", 0),
+                "failed_files": index_stats.get("failed_files", 0),
+            },
+            "incremental": incremental,
+            "latency": latency,
+            "memory": memory,
+            "db": {"size_bytes": db_after_cold, "per_file_bytes": db_after_cold / spec.files},
+        }
+
+    def _measure_queries(
+        self, dispatcher: EnhancedDispatcher, ctx: RepoContext, corpus: SyntheticCorpus
+    ) -> Dict[str, Any]:
+        sample = [name for name, _ in corpus.sample_symbols(self.queries + self.warmup)]
+        warm, names = sample[: self.warmup], sample[self.warmup :]
+        # Half exact identifiers, half the identifier's words as free text.
+        texts = [name if i % 2 else name.replace("_", " ") for i, name in enumerate(names)]
+
+        def run_search(query: str, **kwargs: Any) -> bool:
+            return any(True for _ in dispatcher.search(ctx, query, limit=20, **kwargs))
+
+        operations: Dict[str, Tuple[Callable[[str], bool], List[str]]] = {
+            "lookup": (lambda q: dispatcher.lookup(ctx, q) is not None, names),
+            "search": (run_search, texts),
+            "fuzzy": (lambda q: run_search(q, fuzzy=True), [_misspell(n) for n in names]),
+        }
+        for op, _ in operations.values():
+            for name in warm:
+                op(name)
+
+        results: Dict[str, Any] = {}
+        for label, (op, queries) in operations.items():
+            samples: List[float] = []
+            hits = 0
+            for query in queries:
+                started = time.perf_counter()
+                hits += bool(op(query))
+                samples.append((time.perf_counter() - started) * 1000)
+            results[label] = {
+                **latency_summary(samples),
+                "hit_rate": hits / len(queries) if queries else 0.0,
+            }
+        return results
+
+    def _measure_incremental(
+        self,
+        dispatcher: EnhancedDispatcher,
+        ctx: RepoContext,
+        corpus: SyntheticCorpus,
+        repo: Path,
+    ) -> Dict[str, Any]:
+        """Apply a ~1% edit and replay it through the dispatcher's per-file paths."""
+        changes = corpus.mutate(repo, self.incremental_fraction)
+        errors = 0
+        started = time.perf_counter()
+        for change in changes:
+            path = repo / change.path
+            try:
+                if change.change_type == "deleted":
+                    dispatcher.remove_file(ctx, path)
+                else:
+                    dispatcher.index_file(ctx, path)
+            except Exception as exc:
+                errors += 1
+                logger.warning("Incremental reindex of %s failed: %s", change.path, exc)
+        elapsed = time.perf_counter() - started
+        return {
+            "elapsed_seconds": elapsed,
+            "changed_files": len(changes),
+            "per_file_ms": elapsed * 1000 / len(changes) if changes else 0.0,
+            "errors": errors,
+        }
+
+
+# -- comparison ---------------------------------------------------------------
+
+
+def flatten_tier(tier: Mapping[str, Any]) -> Dict[str, float]:
+    """The comparable (lower-is-better) metrics of one tier."""
+    metrics: Dict[str, float] = {
+        "cold_index.elapsed_seconds": tier["cold_index"]["elapsed_seconds"],
+        "incremental.per_file_ms": tier["incremental"]["per_file_ms"],
+        "memory.rss_mb": tier["memory"]["rss_mb"],
+        "db.per_file_bytes": tier["db"]["per_file_bytes"],
+    }
+    for op, summary in tier["latency"].items():
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if key in summary:
+                metrics[f"latency.{op}.{key}"] = summary[key]
+    return metrics
+
+
+def scaling_exponents(tiers: Mapping[str, Mapping[str, Any]]) -> Dict[str, float]:
+    """Least-squares slope of log(metric) over log(files) for each metric.
+
+    Needs at least two tiers with distinct file counts; metrics that are not
+    positive in every tier are skipped.
+    """
+    ordered = sorted(tiers.values(), key=lambda tier: tier["files"])
+    if len({tier["files"] for tier in ordered}) < 2:
+        return {}
+    flat = [flatten_tier(tier) for tier in ordered]
+    xs = np.log([tier["files"] for tier in ordered])
+    exponents: Dict[str, float] = {}
+    for metric in flat[0]:
+        values = [f.get(metric) for f in flat]
+        if any(v is None or v <= 0 for v in values):
+            continue
+        slope = np.polyfit(xs, np.log(values), 1)[0]
+        exponents[metric] = float(slope)
+    return exponents
+
+
+def _noise_floor(metric: str) -> float:
+    for suffix, floor in _NOISE_FLOORS.items():
+        if metric.endswith(suffix):
+            return floor
+    return 0.0
+
+
+def compare_results(
+    current: Mapping[str, Any],
+    baseline: Mapping[str, Any],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    exponent_margin: float = DEFAULT_EXPONENT_MARGIN,
+) -> Dict[str, Any]:
+    """Compare a run against a baseline run.
+
+    A per-tier metric regresses when it is more than ``tolerance`` (relative)
+    *and* more than its noise floor above the baseline.  A scaling exponent
+    regresses when it exceeds the baseline's by more than ``exponent_margin``.
+    """
+    regressions: List[Dict[str, Any]] = []
+    improvements: List[Dict[str, Any]] = []
+
+    for tier_name, tier in current.get("tiers", {}).items():
+        base_tier = baseline.get("tiers", {}).get(tier_name)
+        if base_tier is None:
+            continue
+        now, before = flatten_tier(tier), flatten_tier(base_tier)
+        for metric, value in now.items():
+            previous = before.get(metric)
+            if previous is None or previous <= 0:
+                continue
+            delta = value - previous
+            change = delta / previous
+            entry = {
+                "tier": tier_name,
+                "metric": metric,
+                "baseline": previous,
+                "current": value,
+                "change_percent": change * 100,
+            }
+            if abs(delta) < _noise_floor(metric):
+                continue
+            if change > tolerance:
+                regressions.append(entry)
+            elif change < -tolerance:
+                improvements.append(entry)
+
+    base_exponents = baseline.get("scaling") or scaling_exponents(baseline.get("tiers", {}))
+    shared = {
+        name: tier
+        for name, tier in current.get("tiers", {}).items()
+        if name in baseline.get("tiers", {})
+    }
+    for metric, exponent in scaling_exponents(shared).items():
+        previous = base_exponents.get(metric)
+        if previous is not None and exponent > previous + exponent_margin:
+            regressions.append(
+                {
+                    "tier": "scaling",
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": exponent,
+                    "change_percent": None,
+                }
+            )
+
+    return {
+        "status": "regressed" if regressions else "ok",
+        "tolerance": tolerance,
+        "exponent_margin": exponent_margin,
+        "regressions": regressions,
+        "improvements": improvements,
+    }
+
+
+# -- command line -------------------------------------------------------------
+
+
+def _parse_tiers(value: str) -> List[str]:
+    tiers = [t.strip() for t in value.split(",") if t.strip()]
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown tier(s) {', '.join(unknown)}; choose from {', '.join(TIERS)}"
+        )
+    return tiers
+
+
+def _print_summary(results: Mapping[str, Any], comparison: Optional[Mapping[str, Any]]) -> None:
+    print(
+        f"{'Tier':<6} {'Cold idx (s)':>12} {'Incr (ms/f)':>12} {'search p95':>11} "
+        f"{'lookup p95':>11} {'fuzzy p95':>10} {'+RSS MB':>8} {'DB B/file':>10}"
+    )
+    for name, tier in results["tiers"].items():
+        lat = tier["latency"]
+        print(
+            f"{name:<6} {tier['cold_index']['elapsed_seconds']:>12.2f} "
+            f"{tier['incremental']['per_file_ms']:>12.2f} "
+            f"{lat['search'].get('p95_ms', 0):>11.2f} {lat['lookup'].get('p95_ms', 0):>11.2f} "
+            f"{lat['fuzzy'].get('p95_ms', 0):>10.2f} {tier['memory']['rss_mb']:>8.0f} "
+            f"{tier['db']['per_file_bytes']:>10.0f}"
+        )
+    if results.get("scaling"):
+        print("\nScaling exponents (0 = constant, 1 = linear):")
+        for metric, exponent in sorted(results["scaling"].items()):
+            print(f"  {metric:<32} {exponent:+.2f}")
+    if comparison:
+        print(f"\nBaseline comparison: {comparison['status']}")
+        for reg in comparison["regressions"]:
+            print(
+                f"  - [{reg['tier']}] {reg['metric']}: "
+                f"{reg['baseline']:.3f} -> {reg['current']:.3f}"
+            )
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Repository-size scaling benchmark")
+    parser.add_argument(
+        "--tiers",
+        type=_parse_tiers,
+        default=["1k", "10k"],
+        help=f"Comma-separated tiers ({', '.join(TIERS)})",
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results/scaling.json"))
+    parser.add_argument("--baseline", type=Path, help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", type=Path, help="Also write the results here")
+    parser.add_argument("--work-dir", type=Path, help="Where corpora and indexes are built")
+    parser.add_argument("--keep-corpus", action="store_true")
+    parser.add_argument(
+        "--generate-only", action="store_true", help="Write the corpora under --work-dir and exit"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--incremental-fraction", type=float, default=0.01)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--exponent-margin", type=float, default=DEFAULT_EXPONENT_MARGIN)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--symbol-density", type=float, default=4.0)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--median-lines", type=int, default=80)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    specs = {
+        tier: CorpusSpec.for_tier(
+            tier,
+            seed=args.seed,
+            symbol_density=args.symbol_density,
+            duplicate_ratio=args.duplicate_ratio,
+            median_lines=args.median_lines,
+        )
+        for tier in args.tiers
+    }
+
+    if args.generate_only:
+        work_dir = args.work_dir or Path("synthetic_corpora")
+        for tier, spec in specs.items():
+            stats = SyntheticCorpus(spec).write(work_dir / tier)
+            print(f"{tier}: {stats.files} files, {stats.bytes / 1e6:.1f} MB -> {work_dir / tier}")
+        return 0
+
+    benchmark = ScalingBenchmark(
+        args.work_dir,
+        queries=args.queries,
+        incremental_fraction=args.incremental_fraction,
+        keep_corpus=args.keep_corpus,
+    )
+    results = benchmark.run(specs)
+
+    comparison = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        comparison = compare_results(
+            results,
+            baseline,
+            tolerance=args.tolerance,
+            exponent_margin=args.exponent_margin,
+        )
+        results["comparison"] = comparison
+
+    for target in filter(None, (args.output, args.save_baseline)):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    _print_summary(results, comparison)
+    print(f"\nResults written to {args.output}")
+    return 1 if comparison and comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,430 @@
+"""Deterministic synthetic repositories for scaling benchmarks.
+
+A :class:`SyntheticCorpus` describes a multi-language repository of any size
+without holding it in memory: file ``i`` is rendered from a random generator
+seeded with ``(seed, i)``, so the same spec always produces byte-identical
+files, any single file can be regenerated (to sample query symbols or apply
+an edit) without rendering the others, and writing 500k files streams in
+constant memory.
+
+Knobs:
+
+- ``symbol_density``: functions/classes per 100 lines;
+- ``duplicate_ratio``: fraction of files that are verbatim copies of an
+  earlier file (vendored code, generated clients, copy-paste);
+- ``median_lines`` / ``size_sigma``: log-normal file length distribution,
+  clamped to ``[min_lines, max_lines]`` -- most files are small and a long
+  tail is large, as in real repositories.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ..indexing.change_detector import FileChange
+
+#: Named repository sizes used by the scaling benchmark.
+TIERS: Dict[str, int] = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "500k": 500_000,
+}
+
+DEFAULT_LANGUAGE_MIX: Dict[str, float] = {
+    "python": 0.35,
+    "javascript": 0.15,
+    "typescript": 0.10,
+    "go": 0.10,
+    "java": 0.10,
+    "rust": 0.05,
+    "c": 0.05,
+    "markdown": 0.10,
+}
+
+EXTENSIONS: Dict[str, str] = {
+    "python": ".py",
+    "javascript": ".js",
+    "typescript": ".ts",
+    "go": ".go",
+    "java": ".java",
+    "rust": ".rs",
+    "c": ".c",
+    "markdown": ".md",
+}
+
+_VERBS = (
+    "load", "parse", "build", "resolve", "fetch", "render", "update", "compute",
+    "validate", "encode", "decode", "merge", "index", "flush", "schedule", "apply",
+)  # fmt: skip
+_NOUNS = (
+    "config", "session", "token", "buffer", "request", "record", "schema", "cursor",
+    "handler", "policy", "segment", "manifest", "payload", "registry", "window", "ledger",
+)  # fmt: skip
+_FILLER = (
+    "value", "count", "result", "items", "offset", "limit", "state", "total",
+)  # fmt: skip
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """Shape of a synthetic repository."""
+
+    files: int
+    seed: int = 1
+    languages: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_LANGUAGE_MIX))
+    symbol_density: float = 4.0
+    duplicate_ratio: float = 0.05
+    median_lines: int = 80
+    size_sigma: float = 0.9
+    min_lines: int = 5
+    max_lines: int = 4_000
+    files_per_dir: int = 40
+
+    @classmethod
+    def for_tier(cls, tier: str, **overrides: Any) -> "CorpusSpec":
+        if tier not in TIERS:
+            raise ValueError(f"unknown tier {tier!r}; expected one of {sorted(TIERS)}")
+        return cls(files=TIERS[tier], **overrides)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["languages"] = dict(self.languages)
+        return data
+
+
+@dataclass
+class RenderedFile:
+    index: int
+    path: str
+    language: str
+    text: str
+    symbols: List[str]
+    duplicate_of: Optional[int] = None
+
+
+@dataclass
+class CorpusStats:
+    files: int = 0
+    bytes: int = 0
+    lines: int = 0
+    symbols: int = 0
+    duplicates: int = 0
+    by_language: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SyntheticCorpus:
+    """Renders, writes and mutates the repository described by a spec."""
+
+    def __init__(self, spec: CorpusSpec):
+        if spec.files < 1:
+            raise ValueError("a corpus needs at least one file")
+        if not 0 <= spec.duplicate_ratio < 1:
+            raise ValueError("duplicate_ratio must be in [0, 1)")
+        self.spec = spec
+        languages = [(lang, w) for lang, w in spec.languages.items() if w > 0]
+        unknown = [lang for lang, _ in languages if lang not in EXTENSIONS]
+        if not languages or unknown:
+            raise ValueError(f"unsupported or empty language mix: {unknown or spec.languages}")
+        total = sum(w for _, w in languages)
+        self._languages = [lang for lang, _ in languages]
+        self._cumulative: List[float] = []
+        acc = 0.0
+        for _, weight in languages:
+            acc += weight / total
+            self._cumulative.append(acc)
+        self._log_median = math.log(max(1, spec.median_lines))
+
+    # -- layout -----------------------------------------------------------
+
+    def _rng(self, index: int, salt: str = "") -> random.Random:
+        return random.Random(f"{self.spec.seed}:{index}:{salt}")
+
+    def _duplicate_of(self, index: int) -> Optional[int]:
+        """The original file ``index`` copies, following copies of copies."""
+        original = None
+        while 0 < index < self.spec.files:
+            rng = self._rng(index)
+            if rng.random() >= self.spec.duplicate_ratio:
+                break
+            index = original = rng.randrange(index)
+        return original
+
+    def language_for(self, index: int) -> str:
+        """Language of file ``index`` (a duplicate has its original's)."""
+        original = self._duplicate_of(index)
+        return self._own_language(index if original is None else original)
+
+    def _own_language(self, index: int) -> str:
+        point = self._rng(index, "lang").random()
+        for lang, bound in zip(self._languages, self._cumulative):
+            if point < bound:
+                return lang
+        return self._languages[-1]
+
+    def path_for(self, index: int) -> str:
+        per_dir = self.spec.files_per_dir
+        directory = index // per_dir
+        rng = self._rng(index, "name")
+        stem = f"{rng.choice(_NOUNS)}_{rng.choice(_VERBS)}_{index}"
+        return (
+            f"pkg_{directory // per_dir:04d}/mod_{directory % per_dir:03d}/"
+            f"{stem}{EXTENSIONS[self.language_for(index)]}"
+        )
+
+    def _line_budget(self, rng: random.Random) -> int:
+        lines = int(rng.lognormvariate(self._log_median, self.spec.size_sigma))
+        return max(self.spec.min_lines, min(self.spec.max_lines, lines))
+
+    # -- rendering --------------------------------------------------------
+
+    def render(self, index: int) -> RenderedFile:
+        """Render file ``index``; duplicates carry their original's content."""
+        original = self._duplicate_of(index)
+        if original is not None:
+            source = self._render_original(original)
+            return RenderedFile(
+                index=index,
+                path=self.path_for(index),
+                language=source.language,
+                text=source.text,
+                symbols=source.symbols,
+                duplicate_of=original,
+            )
+        return self._render_original(index)
+
+    def _render_original(self, index: int) -> RenderedFile:
+        rng = self._rng(index, "body")
+        language = self._own_language(index)
+        budget = self._line_budget(rng)
+        n_symbols = max(1, round(budget * self.spec.symbol_density / 100))
+        body_lines = max(1, budget // n_symbols - 3)
+        names: List[str] = []
+        blocks: List[str] = [_HEADERS[language](index)]
+        for k in range(n_symbols):
+            verb, noun = rng.choice(_VERBS), rng.choice(_NOUNS)
+            is_class = language != "markdown" and rng.random() < 0.2
+            name = _symbol_name(language, verb, noun, index, k, is_class)
+            names.append(name)
+            body = [_statement(language, rng, j) for j in range(body_lines)]
+            blocks.append(_DEFINITIONS[language](name, is_class, body))
+        return RenderedFile(
+            index=index,
+            path=self.path_for(index),
+            language=language,
+            text="\n".join(blocks) + "\n",
+            symbols=names,
+        )
+
+    # -- filesystem -------------------------------------------------------
+
+    def write(self, root: Path) -> CorpusStats:
+        """Write every file under ``root`` (created if missing)."""
+        root = Path(root)
+        stats = CorpusStats()
+        made: set = set()
+        for index in range(self.spec.files):
+            rendered = self.render(index)
+            target = root / rendered.path
+            if target.parent not in made:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                made.add(target.parent)
+            data = rendered.text.encode("utf-8")
+            target.write_bytes(data)
+            stats.files += 1
+            stats.bytes += len(data)
+            stats.lines += rendered.text.count("\n")
+            stats.symbols += len(rendered.symbols)
+            stats.duplicates += rendered.duplicate_of is not None
+            stats.by_language[rendered.language] = stats.by_language.get(rendered.language, 0) + 1
+        return stats
+
+    def sample_symbols(self, count: int, seed: int = 0) -> List[Tuple[str, str]]:
+        """``count`` ``(symbol, path)`` pairs spread across the corpus."""
+        rng = random.Random(f"{self.spec.seed}:sample:{seed}")
+        picked: List[Tuple[str, str]] = []
+        for index in rng.sample(range(self.spec.files), min(count, self.spec.files)):
+            rendered = self.render(index)
+            picked.append((rng.choice(rendered.symbols), rendered.path))
+        return picked
+
+    def mutate(self, root: Path, fraction: float = 0.01, generation: int = 1) -> List[FileChange]:
+        """Edit ``fraction`` of the corpus in place, like one busy commit.
+
+        Roughly 80% of the touched files are modified (a function is appended),
+        10% are deleted and 10% are new files past the end of the corpus.
+        Returns the changes in the form ``IncrementalIndexer`` consumes.
+        """
+        root = Path(root)
+        rng = random.Random(f"{self.spec.seed}:mutate:{generation}")
+        touched = max(1, int(self.spec.files * fraction))
+        n_deleted = touched // 10
+        n_added = touched // 10
+        n_modified = max(1, touched - n_deleted - n_added)
+        chosen = rng.sample(range(self.spec.files), min(self.spec.files, n_modified + n_deleted))
+        changes: List[FileChange] = []
+
+        for index in chosen[:n_modified]:
+            rel = self.path_for(index)
+            target = root / rel
+            if not target.exists():
+                continue
+            language = self.language_for(index)
+            name = _symbol_name(language, "patch", "revision", index, 1000 + generation, False)
+            body = [_statement(language, rng, j) for j in range(6)]
+            with open(target, "a", encoding="utf-8") as handle:
+                handle.write(_DEFINITIONS[language](name, False, body) + "\n")
+            changes.append(FileChange(path=rel, change_type="modified"))
+
+        for index in chosen[n_modified:]:
+            rel = self.path_for(index)
+            target = root / rel
+            if target.exists():
+                target.unlink()
+                changes.append(FileChange(path=rel, change_type="deleted"))
+
+        offset = self.spec.files + (generation - 1) * max(1, n_added)
+        for index in range(offset, offset + n_added):
+            rendered = self._render_original(index)
+            target = root / rendered.path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(rendered.text, encoding="utf-8")
+            changes.append(FileChange(path=rendered.path, change_type="added"))
+        return changes
+
+
+# -- per-language templates ---------------------------------------------------
+
+
+def _symbol_name(language: str, verb: str, noun: str, index: int, k: int, is_class: bool) -> str:
+    if is_class or language == "markdown":
+        return f"{noun.title()}{verb.title()}{index}x{k}"
+    if language in ("javascript", "typescript", "java"):
+        return f"{verb}{noun.title()}{index}x{k}"
+    if language == "go":
+        return f"{verb.title()}{noun.title()}{index}x{k}"
+    return f"{verb}_{noun}_{index}_{k}"
+
+
+def _statement(language: str, rng: random.Random, j: int) -> str:
+    a, b = rng.choice(_FILLER), rng.choice(_FILLER)
+    n = rng.randrange(1, 1000)
+    if language == "python":
+        return f"    {a}_{j} = {b} + {n}  # update {a}"
+    if language == "markdown":
+        return f"The {a} is combined with the {b} ({n}) before it is stored."
+    if language == "go":
+        return f"\t{a}{j} := {b} + {n}"
+    if language == "rust":
+        return f"    let {a}_{j} = {b} + {n};"
+    if language == "java":
+        return f"        int {a}{j} = {b} + {n};"
+    if language == "c":
+        return f"    int {a}_{j} = {b} + {n};"
+    return f"  const {a}{j} = {b} + {n};"
+
+
+_HEADERS = {
+    "python": lambda i: f'"""Generated module {i}."""\n\nvalue = count = result = 0\n'
+    "items = offset = limit = state = total = 0\n",
+    "javascript": lambda i: f"// Generated module {i}\n'use strict';\n",
+    "typescript": lambda i: f"// Generated module {i}\n",
+    "go": lambda i: f"// Package gen{i} is generated.\npackage gen{i}\n",
+    "java": lambda i: f"// Generated module {i}\npackage gen.m{i};\n",
+    "rust": lambda i: f"//! Generated module {i}\n",
+    "c": lambda i: f"/* Generated module {i} */\n#include <stddef.h>\n",
+    "markdown": lambda i: f"# Generated document {i}\n",
+}
+
+
+def _py(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        inner = "\n".join("    " + line for line in body)
+        return f"\nclass {name}:\n    def run(self, value):\n{inner}\n        return value\n"
+    return f"\ndef {name}(value):\n" + "\n".join(body) + "\n    return value\n"
+
+
+def _js(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        inner = "\n".join("  " + line for line in body)
+        return f"\nexport class {name} {{\n  run(value) {{\n{inner}\n    return value;\n  }}\n}}\n"
+    return f"\nexport function {name}(value) {{\n" + "\n".join(body) + "\n  return value;\n}\n"
+
+
+def _ts(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        inner = "\n".join("  " + line for line in body)
+        return (
+            f"\nexport class {name} {{\n  run(value: number): number {{\n{inner}\n"
+            "    return value;\n  }\n}\n"
+        )
+    return (
+        f"\nexport function {name}(value: number): number {{\n"
+        + "\n".join(body)
+        + "\n  return value;\n}\n"
+    )
+
+
+def _go(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        return f"\ntype {name} struct {{\n\tvalue int\n}}\n"
+    return f"\nfunc {name}(value int) int {{\n" + "\n".join(body) + "\n\treturn value\n}\n"
+
+
+def _java(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        return (
+            f"\nclass {name} {{\n    int run(int value) {{\n"
+            + "\n".join(body)
+            + "\n        return value;\n    }\n}\n"
+        )
+    return (
+        f"\nclass {name[0].upper()}{name[1:]}Holder {{\n    static int {name}(int value) {{\n"
+        + "\n".join(body)
+        + "\n        return value;\n    }\n}\n"
+    )
+
+
+def _rust(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        return f"\npub struct {name} {{\n    value: i64,\n}}\n"
+    return f"\npub fn {name}(value: i64) -> i64 {{\n" + "\n".join(body) + "\n    value\n}\n"
+
+
+def _c(name: str, is_class: bool, body: List[str]) -> str:
+    if is_class:
+        return f"\nstruct {name} {{\n    int value;\n}};\n"
+    return f"\nint {name}(int value) {{\n" + "\n".join(body) + "\n    return value;\n}\n"
+
+
+def _md(name: str, is_class: bool, body: List[str]) -> str:
+    return f"\n## {name}\n\n" + "\n".join(body) + "\n"
+
+
+_DEFINITIONS = {
+    "python": _py,
+    "javascript": _js,
+    "typescript": _ts,
+    "go": _go,
+    "java": _java,
+    "rust": _rust,
+    "c": _c,
+    "markdown": _md,
+}
+
+
+__all__ = [
+    "DEFAULT_LANGUAGE_MIX",
+    "TIERS",
+    "CorpusSpec",
+    "CorpusStats",
+    "RenderedFile",
+    "SyntheticCorpus",
+]
@@ -5,48 +5,51 @@ This package provides command-line tools for managing the MCP server,
 including index management, diagnostics, and maintenance operations.
 """
 
+import importlib
+
 import click
 
 from .. import __version__
 from .server_commands import serve, stdio
 
+# Commands with heavy import chains (the dispatcher, plugins, artifact stack),
+# imported only when invoked or listed so ``stdio`` starts without them.
+_LAZY_COMMANDS = {
+    "index": ("index_management", "index"),
+    "history": ("history_commands", "history"),
+    "artifact": ("artifact_commands", "artifact"),
+    "preflight": ("preflight_commands", "preflight"),
+    "repository": ("repository_commands", "repository"),
+    "setup": ("setup_commands", "setup"),
+}
+
+
+class _LazyGroup(click.Group):
+    """Click group that imports ``_LAZY_COMMANDS`` on first lookup."""
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(_LAZY_COMMANDS))
 
-@click.group()
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in _LAZY_COMMANDS:
+            module_name, attr = _LAZY_COMMANDS[cmd_name]
+            try:
+                module = importlib.import_module(f"{__name__}.{module_name}")
+            except ImportError:
+                return None
+            self.add_command(getattr(module, attr), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group(cls=_LazyGroup)
 @click.version_option(version=__version__, prog_name="code-index-mcp")
 def cli():
     """MCP Server CLI utilities."""
 
 
-# Lightweight commands registered eagerly
 cli.add_command(serve)
 cli.add_command(stdio)
 
 
-def _register_heavy_commands():
-    """Lazy-register commands with heavy import chains (avoids circular imports on module load)."""
-    from .artifact_commands import artifact
-    from .history_commands import history
-    from .index_management import index
-    from .preflight_commands import preflight
-    from .repository_commands import repository
-    from .setup_commands import setup
-
-    cli.add_command(index)
-    cli.add_command(history)
-    cli.add_command(artifact)
-    cli.add_command(preflight)
-    cli.add_command(repository)
-    cli.add_command(setup)
-
-
-# Register heavy commands immediately when this module is imported normally
-# (i.e., not via `python -m mcp_server.cli stdio` which only needs lightweight commands).
-# We call this here so existing `from mcp_server.cli import cli` callers still get all commands.
-try:
-    _register_heavy_commands()
-except ImportError:
-    pass
-
-
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,329 @@
+"""Per-tool admission control for the stdio MCP server.
+
+Tool calls are split into two lanes with their own bounded executors:
+``interactive`` (lookups, searches, status) and ``heavy`` (reindexing,
+summarization).  Each tool additionally has a concurrency cap and a bound on
+how many calls may wait for it; a call arriving at a full queue, or still
+queued when its deadline passes, is refused at once with a structured
+``server_busy`` payload instead of silently piling onto the executor.
+
+Admitted calls run under their tool's deadline (see ``mcp_server.core.deadline``)
+so dispatcher code can bound its own timeouts, and inside a ``tool.<name>``
+root span that the dispatcher's stage spans attach to.  Queue wait and
+execution time are reported separately as Prometheus histograms.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Mapping, Optional, TypeVar
+
+from mcp_server.config.env_vars import get_tool_heavy_workers, get_tool_interactive_workers
+from mcp_server.core.deadline import deadline_scope
+from mcp_server.core.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+HEAVY = "heavy"
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    lane: str = INTERACTIVE
+    max_concurrent: int = 4
+    max_queue: int = 16
+    deadline_seconds: Optional[float] = 10.0
+
+
+DEFAULT_TOOL_POLICY = ToolPolicy()
+
+DEFAULT_POLICIES: Dict[str, ToolPolicy] = {
+    "symbol_lookup": ToolPolicy(INTERACTIVE, max_concurrent=8, max_queue=32),
+    "search_code": ToolPolicy(INTERACTIVE, max_concurrent=8, max_queue=32),
+    "get_status": ToolPolicy(INTERACTIVE, max_concurrent=4, max_queue=16),
+    "list_plugins": ToolPolicy(INTERACTIVE, max_concurrent=4, max_queue=16),
+    "summarize_sample": ToolPolicy(HEAVY, max_concurrent=2, max_queue=4, deadline_seconds=None),
+    "reindex": ToolPolicy(HEAVY, max_concurrent=1, max_queue=2, deadline_seconds=None),
+    "write_summaries": ToolPolicy(HEAVY, max_concurrent=1, max_queue=2, deadline_seconds=None),
+}
+
+
+class AdmissionRejected(Exception):
+    """A tool call refused because its queue is full or its deadline passed while queued."""
+
+    def __init__(self, tool: str, lane: str, reason: str, *, active: int, queued: int):
+        super().__init__(f"{tool} rejected: {reason}")
+        self.tool = tool
+        self.lane = lane
+        self.reason = reason
+        self.active = active
+        self.queued = queued
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error": "Server busy",
+            "code": "server_busy",
+            "tool": self.tool,
+            "lane": self.lane,
+            "reason": self.reason,
+            "active": self.active,
+            "queued": self.queued,
+            "suggestion": "Retry shortly; heavy tools run one or two at a time.",
+        }
+
+
+@dataclass
+class AdmissionTicket:
+    tool: str
+    lane: str
+    admitted_at: float
+    queued_seconds: float
+    deadline: Optional[float]
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+
+_current_ticket: contextvars.ContextVar[Optional[AdmissionTicket]] = contextvars.ContextVar(
+    "mcp_admission_ticket", default=None
+)
+
+
+def current_ticket() -> Optional[AdmissionTicket]:
+    return _current_ticket.get()
+
+
+class _ToolState:
+    def __init__(self, policy: ToolPolicy):
+        self.semaphore = asyncio.Semaphore(policy.max_concurrent)
+        self.active = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+
+
+def _abandon(acquire: "asyncio.Future[Any]", semaphore: asyncio.Semaphore) -> None:
+    """Give up on a pending acquire, releasing the slot if it was granted anyway."""
+    if acquire.done():
+        if not acquire.cancelled() and acquire.exception() is None:
+            semaphore.release()
+        return
+    acquire.cancel()
+    acquire.add_done_callback(lambda done: _abandon(done, semaphore))
+
+
+async def _acquire(semaphore: asyncio.Semaphore, timeout: Optional[float]) -> bool:
+    if timeout is None:
+        await semaphore.acquire()
+        return True
+    acquire = asyncio.ensure_future(semaphore.acquire())
+    try:
+        await asyncio.wait({acquire}, timeout=timeout)
+    except BaseException:
+        _abandon(acquire, semaphore)
+        raise
+    if acquire.done() and not acquire.cancelled():
+        return True
+    _abandon(acquire, semaphore)
+    return False
+
+
+class AdmissionController:
+    """Lane executors plus per-tool concurrency caps and queue bounds."""
+
+    def __init__(
+        self,
+        policies: Optional[Mapping[str, ToolPolicy]] = None,
+        *,
+        interactive_workers: Optional[int] = None,
+        heavy_workers: Optional[int] = None,
+    ):
+        self.policies: Dict[str, ToolPolicy] = dict(
+            DEFAULT_POLICIES if policies is None else policies
+        )
+        self._workers = {
+            INTERACTIVE: max(
+                1,
+                (
+                    interactive_workers
+                    if interactive_workers is not None
+                    else get_tool_interactive_workers()
+                ),
+            ),
+            HEAVY: max(1, heavy_workers if heavy_workers is not None else get_tool_heavy_workers()),
+        }
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._executor_lock = threading.Lock()
+        self._states: Dict[str, _ToolState] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def policy(self, tool: str) -> ToolPolicy:
+        return self.policies.get(tool, DEFAULT_TOOL_POLICY)
+
+    def _state(self, tool: str) -> _ToolState:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores belong to one event loop.
+            self._states = {}
+            self._loop = loop
+        state = self._states.get(tool)
+        if state is None:
+            state = self._states[tool] = _ToolState(self.policy(tool))
+        return state
+
+    def executor(self, lane: str) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            executor = self._executors.get(lane)
+            if executor is None:
+                executor = self._executors[lane] = ThreadPoolExecutor(
+                    max_workers=self._workers.get(lane, 1), thread_name_prefix=f"mcp-{lane}"
+                )
+            return executor
+
+    def _reject(self, tool: str, policy: ToolPolicy, state: _ToolState, reason: str):
+        from mcp_server.metrics.prometheus_exporter import record_tool_rejection
+
+        state.rejected += 1
+        record_tool_rejection(tool, reason)
+        logger.warning(
+            "Rejected %s (%s): active=%d queued=%d", tool, reason, state.active, state.queued
+        )
+        return AdmissionRejected(
+            tool, policy.lane, reason, active=state.active, queued=state.queued
+        )
+
+    @asynccontextmanager
+    async def admit(self, tool: str) -> AsyncIterator[AdmissionTicket]:
+        """Hold one of ``tool``'s slots for the block, or raise ``AdmissionRejected``."""
+        policy = self.policy(tool)
+        state = self._state(tool)
+        if state.semaphore.locked() and state.queued >= policy.max_queue:
+            raise self._reject(tool, policy, state, "queue_full")
+
+        started = time.monotonic()
+        deadline = (
+            started + policy.deadline_seconds if policy.deadline_seconds is not None else None
+        )
+        state.queued += 1
+        try:
+            acquired = await _acquire(
+                state.semaphore, deadline - started if deadline is not None else None
+            )
+        finally:
+            state.queued -= 1
+        if not acquired:
+            raise self._reject(tool, policy, state, "deadline_exceeded")
+
+        admitted_at = time.monotonic()
+        ticket = AdmissionTicket(
+            tool=tool,
+            lane=policy.lane,
+            admitted_at=admitted_at,
+            queued_seconds=admitted_at - started,
+            deadline=deadline,
+        )
+        state.active += 1
+        state.admitted += 1
+        token = _current_ticket.set(ticket)
+        try:
+            with (
+                deadline_scope(deadline),
+                get_tracer().span(
+                    f"tool.{tool}",
+                    lane=policy.lane,
+                    queued_ms=round(ticket.queued_seconds * 1000, 3),
+                ),
+            ):
+                yield ticket
+        finally:
+            _current_ticket.reset(token)
+            state.active -= 1
+            state.semaphore.release()
+            from mcp_server.metrics.prometheus_exporter import record_tool_admission
+
+            record_tool_admission(
+                tool, policy.lane, ticket.queued_seconds, time.monotonic() - admitted_at
+            )
+
+    async def run(self, func: Callable[..., T], *args: Any, lane: Optional[str] = None) -> T:
+        """Run blocking ``func`` on a lane executor, in a copy of the caller's context.
+
+        The lane defaults to the current ticket's lane, else ``interactive``.
+        """
+        if lane is None:
+            ticket = _current_ticket.get()
+            lane = ticket.lane if ticket is not None else INTERACTIVE
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor(lane), call)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            tool: {
+                "lane": self.policy(tool).lane,
+                "active": state.active,
+                "queued": state.queued,
+                "admitted": state.admitted,
+                "rejected": state.rejected,
+            }
+            for tool, state in self._states.items()
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._executor_lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+def _reset_admission_controller() -> None:
+    global _controller
+    with _controller_lock:
+        if _controller is not None:
+            _controller.shutdown()
+        _controller = None
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, lane: Optional[str] = None) -> T:
+    """Run blocking ``func`` on the process-wide controller's lane executor."""
+    return await get_admission_controller().run(func, *args, lane=lane)
+
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+    "DEFAULT_POLICIES",
+    "HEAVY",
+    "INTERACTIVE",
+    "ToolPolicy",
+    "current_ticket",
+    "get_admission_controller",
+    "run_blocking",
+]
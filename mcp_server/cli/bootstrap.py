@@ -25,6 +25,7 @@ from mcp_server.storage.store_registry import StoreRegistry
 
 def initialize_stateless_services(
     registry_path: Optional[Path] = None,
+    semantic_search_enabled: Optional[bool] = None,
 ) -> Tuple[
     StoreRegistry, RepoResolver, DispatcherProtocol, RepositoryRegistry, GitAwareIndexManager
 ]:
@@ -33,6 +34,7 @@ def initialize_stateless_services(
     Returns (StoreRegistry, RepoResolver, dispatcher, RepositoryRegistry, GitAwareIndexManager).
     The dispatcher holds no per-repo state; every public method takes ``ctx: RepoContext``.
     ``registry_path`` overrides the default registry location (mainly for tests).
+    ``semantic_search_enabled`` overrides ``SEMANTIC_SEARCH_ENABLED``.
     """
     reset_process_singletons()
 
@@ -55,7 +57,11 @@ def initialize_stateless_services(
     else:
         _explicit = os.getenv("RERANKER_TYPE", "").strip().lower()
         reranker_type = _explicit if _explicit else "none"
-        semantic_enabled = os.getenv("SEMANTIC_SEARCH_ENABLED", "true").lower() == "true"
+        semantic_enabled = (
+            os.getenv("SEMANTIC_SEARCH_ENABLED", "true").lower() == "true"
+            if semantic_search_enabled is None
+            else semantic_search_enabled
+        )
         semantic_registry = SemanticIndexerRegistry(repo_registry) if semantic_enabled else None
         dispatcher = EnhancedDispatcher(
             enable_advanced_features=True,
@@ -181,49 +187,48 @@ def _path_within_allowed(target: Path, roots: list[Path]) -> bool:
 
 
 def validate_index(store, repo_path: Path) -> dict:
-    """Validate that the index is up-to-date and accessible."""
+    """Validate that the index is populated and its paths are reachable.
+
+    Counts come from ``SQLiteStore.get_index_counts`` (trigger-maintained
+    counters and the FTS5 averages record), so the check costs a handful of
+    page reads however large the index is.  Counts the store cannot answer
+    from stored counters fall back to ``COUNT(*)``.
+    """
     issues = []
     stats = {}
 
     try:
+        get_counts = getattr(store, "get_index_counts", None)
+        counts = get_counts() if callable(get_counts) else {}
         conn = sqlite3.connect(store.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM files")
-        total_files = cursor.fetchone()[0]
-        stats["total_files"] = total_files
-
-        cursor.execute("SELECT COUNT(*) FROM bm25_content")
-        bm25_count = cursor.fetchone()[0]
-        stats["bm25_documents"] = bm25_count
-
-        cursor.execute(
-            "SELECT COUNT(*) FROM bm25_content WHERE filepath LIKE ?",
-            (f"{repo_path}%",),
-        )
-        current_repo_files = cursor.fetchone()[0]
-        stats["current_repo_files"] = current_repo_files
-
-        cursor.execute(
-            "SELECT COUNT(*) FROM bm25_content WHERE filepath LIKE 'PathUtils.get_workspace_root() / %'"
-        )
-        docker_files = cursor.fetchone()[0]
-        stats["docker_files"] = docker_files
-
-        if total_files == 0:
-            issues.append("Index is empty - no files indexed")
-        if bm25_count == 0:
-            issues.append("No BM25 documents in index")
-        if current_repo_files == 0 and docker_files > 0:
-            issues.append(
-                f"Index contains {docker_files} Docker paths but no files from current repo"
-            )
+        try:
+            cursor = conn.cursor()
+
+            total_files = counts.get("total_files")
+            if total_files is None:
+                cursor.execute("SELECT COUNT(*) FROM files")
+                total_files = cursor.fetchone()[0]
+            stats["total_files"] = total_files
+
+            bm25_count = counts.get("bm25_documents")
+            if bm25_count is None:
+                cursor.execute("SELECT COUNT(*) FROM bm25_content")
+                bm25_count = cursor.fetchone()[0]
+            stats["bm25_documents"] = bm25_count
+
+            if total_files == 0:
+                issues.append("Index is empty - no files indexed")
+            if bm25_count == 0:
+                issues.append("No BM25 documents in index")
+
+            cursor.execute("SELECT filepath FROM bm25_content LIMIT 10")
+            sample_paths = cursor.fetchall()
+        finally:
+            conn.close()
 
-        cursor.execute("SELECT filepath FROM bm25_content LIMIT 10")
-        sample_paths = cursor.fetchall()
         inaccessible_count = 0
         for (path,) in sample_paths:
-            if not Path(path).exists():
+            if not (Path(repo_path) / path).exists():
                 inaccessible_count += 1
 
         if inaccessible_count > len(sample_paths) * 0.5:
@@ -231,8 +236,6 @@ def validate_index(store, repo_path: Path) -> dict:
                 f"{inaccessible_count}/{len(sample_paths)} sampled paths are inaccessible"
             )
 
-        conn.close()
-
     except Exception as e:
         issues.append(f"Database error: {str(e)}")
 
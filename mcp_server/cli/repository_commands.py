@@ -1166,7 +1166,12 @@ def sync(repo_id: Optional[str], force_full: bool, sync_all: bool):
 
 @repository.command()
 @click.option("--repo-id", help="Repository ID")
-def status(repo_id: Optional[str]):
+@click.option(
+    "--deep-check",
+    is_flag=True,
+    help="Run a full SQLite integrity_check on the index (reads every page)",
+)
+def status(repo_id: Optional[str], deep_check: bool):
     """Show detailed repository status."""
     try:
         registry = RepositoryRegistry()
@@ -1260,6 +1265,19 @@ def status(repo_id: Optional[str]):
         if status["index_exists"]:
             click.echo(f"  Index size: {status['index_size_mb']:.1f} MB")
             click.echo(f"  Last indexed: {status['last_indexed'] or 'Unknown'}")
+            if deep_check:
+                repo_entry = registry.get_repository(repo_id_str)
+                report = ReadinessClassifier.deep_check(
+                    Path(repo_entry.index_location) / "current.db"
+                )
+                if report.ok:
+                    click.echo(
+                        click.style(f"  Integrity: ok ({report.elapsed_ms:.0f} ms)", fg="green")
+                    )
+                else:
+                    click.echo(click.style("  Integrity: FAILED", fg="red"))
+                    for error in report.errors:
+                        click.echo(f"    {error}")
         else:
             click.echo(click.style("  No index found", fg="yellow"))
         if status.get("staleness_reason"):
@@ -0,0 +1,235 @@
+"""Cursor pagination and continuation cache for the ``search_code`` tool.
+
+A cursor is an opaque, URL-safe token that records which query it belongs to
+(a fingerprint of the normalized search options, excluding the page size),
+the index generation the first page was served from, and a watermark: the
+offset of the next result plus the identity of the last result returned.
+
+Result windows are kept in a small in-process LRU keyed by (fingerprint,
+generation) so later pages are sliced from the same snapshot instead of
+re-running the search.  When an entry expired or does not reach far enough,
+the search is re-run with a larger window and resumed after the watermark
+result; if the index changed in between, the cursor is rejected as stale.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+from mcp_server.client_types import ClientSearchMatch, ClientSearchOptions, ClientSearchResult
+
+CURSOR_VERSION = 1
+# Pages fetched per search run; later pages within the window come from cache.
+PREFETCH_PAGES = 4
+MAX_WINDOW = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another query."""
+
+
+class StaleCursorError(ValueError):
+    """Raised when the index changed since the cursor was issued."""
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    fingerprint: str
+    generation: str
+    offset: int
+    last_key: Optional[str] = None
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            {
+                "v": CURSOR_VERSION,
+                "fp": self.fingerprint,
+                "gen": self.generation,
+                "off": self.offset,
+                "last": self.last_key,
+            },
+            separators=(",", ":"),
+        ).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SearchCursor":
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if data.get("v") != CURSOR_VERSION:
+                raise InvalidCursorError("Unsupported cursor version")
+            offset = int(data["off"])
+            if offset < 0:
+                raise InvalidCursorError("Cursor offset must be >= 0")
+            return cls(
+                fingerprint=str(data["fp"]),
+                generation=str(data["gen"]),
+                offset=offset,
+                last_key=data.get("last"),
+            )
+        except InvalidCursorError:
+            raise
+        except (binascii.Error, ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise InvalidCursorError("Cursor is malformed") from exc
+
+
+def query_fingerprint(options: ClientSearchOptions) -> str:
+    """Hash every option that changes the result order, but not the page size."""
+    payload = {
+        "query": options.query,
+        "repository": options.repository,
+        "semantic": options.semantic,
+        "fuzzy": options.fuzzy,
+        "source_type": options.source_type.value if options.source_type else None,
+        "friction_categories": list(options.friction_categories),
+        "history_labels": list(options.history_labels),
+        "history_repos": list(options.history_repos),
+        "include_source_metadata": options.include_source_metadata,
+    }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    return digest[:32]
+
+
+def index_generation(db_path: str | Path | None) -> Optional[str]:
+    """Cheap identity of the index contents: database and WAL file stat()."""
+    if not db_path:
+        return None
+    parts = []
+    for suffix in ("", "-wal"):
+        try:
+            st = os.stat(f"{db_path}{suffix}")
+        except OSError:
+            parts.append("-")
+            continue
+        parts.append(f"{st.st_ino:x}.{st.st_mtime_ns:x}.{st.st_size:x}")
+    return ":".join(parts)
+
+
+def match_key(match: ClientSearchMatch) -> str:
+    return f"{match.file}:{match.line}:{match.symbol or ''}"
+
+
+def window_size(offset: int, page_size: int) -> int:
+    """Results to request so the page at ``offset`` and a few after it are covered."""
+    return max(offset + page_size, min(offset + page_size * PREFETCH_PAGES, MAX_WINDOW))
+
+
+@dataclass
+class _Window:
+    result: ClientSearchResult
+    requested: int
+    created_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def exhausted(self) -> bool:
+        return len(self.result.results) < self.requested
+
+
+class ContinuationCache:
+    """LRU of search result windows keyed by (fingerprint, generation)."""
+
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], _Window]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str, generation: str) -> Optional[_Window]:
+        key = (fingerprint, generation)
+        with self._lock:
+            window = self._entries.get(key)
+            if window is None or time.monotonic() - window.created_at > self.ttl_seconds:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return window
+
+    def put(
+        self, fingerprint: str, generation: str, result: ClientSearchResult, requested: int
+    ) -> None:
+        key = (fingerprint, generation)
+        with self._lock:
+            self._entries[key] = _Window(result=result, requested=requested)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass(frozen=True)
+class Page:
+    matches: Tuple[ClientSearchMatch, ...]
+    offset: int
+    next_cursor: Optional[str]
+
+
+def resume_offset(results: Tuple[ClientSearchMatch, ...], cursor: SearchCursor) -> int:
+    """Start after the watermark result if it moved, else at the cursor offset."""
+    if cursor.last_key is None:
+        return cursor.offset
+    expected = cursor.offset - 1
+    if 0 <= expected < len(results) and match_key(results[expected]) == cursor.last_key:
+        return cursor.offset
+    for idx, match in enumerate(results):
+        if match_key(match) == cursor.last_key:
+            return idx + 1
+    return cursor.offset
+
+
+def slice_page(
+    results: Tuple[ClientSearchMatch, ...],
+    *,
+    start: int,
+    page_size: int,
+    exhausted: bool,
+    fingerprint: str,
+    generation: str,
+) -> Page:
+    matches = results[start : start + page_size]
+    end = start + len(matches)
+    more = end < len(results) or not exhausted
+    next_cursor = None
+    if matches and more:
+        next_cursor = SearchCursor(
+            fingerprint=fingerprint,
+            generation=generation,
+            offset=end,
+            last_key=match_key(matches[-1]),
+        ).encode()
+    return Page(matches=matches, offset=start, next_cursor=next_cursor)
+
+
+_cache: Optional[ContinuationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_continuation_cache() -> ContinuationCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ContinuationCache()
+    return _cache
+
+
+def _reset_continuation_cache() -> None:
+    global _cache
+    _cache = None
@@ -8,6 +8,7 @@ scripts/cli/mcp_server_cli.py.
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
 import os
@@ -23,19 +24,24 @@ from mcp.server.stdio import stdio_server
 from mcp.shared.exceptions import McpError
 
 from mcp_server.cli import tool_handlers
+from mcp_server.cli.admission import AdmissionRejected, get_admission_controller
 from mcp_server.cli.bootstrap import initialize_stateless_services, timeout, validate_index
 from mcp_server.cli.handshake import HandshakeGate
+from mcp_server.config.env_vars import get_index_job_lease_seconds, get_index_job_workers
+from mcp_server.core.startup_profiler import finish_startup_profile, profile_span
 from mcp_server.dispatcher.dispatcher_enhanced import EnhancedDispatcher
 from mcp_server.dispatcher.simple_dispatcher import SimpleDispatcher
 from mcp_server.health.repository_readiness import ReadinessClassifier
 from mcp_server.metrics.prometheus_exporter import PrometheusExporter, record_tool_call
 from mcp_server.plugin_system import PluginManager
+from mcp_server.storage.connection_pool import ReadWriteConnections
+from mcp_server.storage.index_job_queue import IndexJobQueue, IndexWorkerPool
 from mcp_server.storage.mcp_task_registry import MCPTaskRegistry
 from mcp_server.storage.sqlite_store import SQLiteStore
 from mcp_server.utils.index_discovery import IndexDiscovery
 from mcp_server.watcher import FileWatcher
 from mcp_server.watcher.ref_poller import RefPoller
-from mcp_server.watcher_multi_repo import MultiRepositoryWatcher
+from mcp_server.watcher_multi_repo import MultiRepositoryWatcher, run_repository_sync_job
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +86,7 @@ _indexing_started_at: Optional[float] = None
 _repo_resolver: Any = None
 _store_registry: Any = None
 _git_index_manager: Any = None
+_index_job_queue: Optional[IndexJobQueue] = None
 _local_ctx: Any = None  # RepoContext for the local repo, built by initialize_services()
 _task_registry: MCPTaskRegistry | None = None
 
@@ -428,6 +435,15 @@ def _build_tool_list() -> list[types.Tool]:
                         "description": "Include source metadata on returned results",
                         "default": False,
                     },
+                    "paginate": {
+                        "type": "boolean",
+                        "description": "Return one page of `limit` results plus next_cursor when more are available",
+                        "default": False,
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "Opaque next_cursor from a previous page; repeat the same query and filters",
+                    },
                 },
                 required=("query",),
             ),
@@ -450,6 +466,8 @@ def _build_tool_list() -> list[types.Tool]:
                                 "enum": [
                                     "Search timeout",
                                     "Search failed",
+                                    "Invalid cursor",
+                                    "Stale cursor",
                                     "Invalid friction categories",
                                     "Invalid search source filters",
                                     "Invalid source type",
@@ -500,6 +518,9 @@ def _build_tool_list() -> list[types.Tool]:
                             "history_labels": {"type": "array"},
                             "history_repos": {"type": "array"},
                             "include_source_metadata": {"type": "boolean"},
+                            "next_cursor": {"type": ["string", "null"]},
+                            "offset": {"type": "integer"},
+                            "partial": {"type": "boolean"},
                         },
                         required=("results",),
                         additional_properties=True,
@@ -915,6 +936,9 @@ async def _graceful_shutdown(
         except Exception as exc:
             logger.warning("Dispatcher.shutdown error: %s", exc)
 
+    # Queued executor work is dropped; in-flight calls finish in their threads.
+    get_admission_controller().shutdown()
+
     if store_registry is not None:
         try:
             logger.info("Shutting down StoreRegistry...")
@@ -953,8 +977,9 @@ async def initialize_services() -> None:
         enable_multi_path = os.getenv("MCP_ENABLE_MULTI_PATH", "true").lower() == "true"
 
         logger.info("Searching for index using multi-path discovery...")
-        discovery = IndexDiscovery(current_dir, enable_multi_path=enable_multi_path)
-        index_info = discovery.get_index_info()
+        with profile_span("index discovery"):
+            discovery = IndexDiscovery(current_dir, enable_multi_path=enable_multi_path)
+            index_info = discovery.get_index_info()
 
         if not index_info["enabled"]:
             if os.getenv("MCP_INDEX_ENABLED", "").lower() == "false":
@@ -968,9 +993,13 @@ async def initialize_services() -> None:
 
         if index_path:
             logger.info(f"Found index at: {index_path}")
-            sqlite_store = SQLiteStore(str(index_path))
+            with profile_span("open SQLiteStore"):
+                sqlite_store = SQLiteStore(
+                    str(index_path), connections=ReadWriteConnections(str(index_path))
+                )
 
-            validation_result = validate_index(sqlite_store, current_dir)
+            with profile_span("validate_index"):
+                validation_result = validate_index(sqlite_store, current_dir)
             if not validation_result["valid"]:
                 for issue in validation_result["issues"]:
                     logger.warning(f"  - {issue}")
@@ -995,7 +1024,9 @@ async def initialize_services() -> None:
             index_dir.mkdir(exist_ok=True)
             index_path = index_dir / "code_index.db"
             logger.info(f"No index found — creating new index at {index_path}")
-            sqlite_store = SQLiteStore(str(index_path))
+            sqlite_store = SQLiteStore(
+                str(index_path), connections=ReadWriteConnections(str(index_path))
+            )
             _auto_index = True
 
             gitignore_path = current_dir / ".gitignore"
@@ -1028,7 +1059,7 @@ async def initialize_services() -> None:
 
             logger.info(f"Loading plugins (timeout: {PLUGIN_LOAD_TIMEOUT}s)...")
             try:
-                with timeout(PLUGIN_LOAD_TIMEOUT):
+                with timeout(PLUGIN_LOAD_TIMEOUT), profile_span("load plugins"):
                     load_result = plugin_manager.load_plugins_safe(
                         config_path if config_path.exists() else None
                     )
@@ -1054,17 +1085,18 @@ async def initialize_services() -> None:
                     semantic_registry = SemanticIndexerRegistry(_repo_resolver._registry)
             except Exception as _sem_reg_err:
                 logger.warning("Semantic registry unavailable: %s", _sem_reg_err)
-            dispatcher = EnhancedDispatcher(
-                plugins=plugin_instances,
-                enable_advanced_features=True,
-                use_plugin_factory=True,
-                lazy_load=True,
-                semantic_search_enabled=True,
-                memory_aware=True,
-                multi_repo_enabled=None,
-                reranker_type=reranker_type,
-                semantic_indexer_registry=semantic_registry,
-            )
+            with profile_span("create EnhancedDispatcher"):
+                dispatcher = EnhancedDispatcher(
+                    plugins=plugin_instances,
+                    enable_advanced_features=True,
+                    use_plugin_factory=True,
+                    lazy_load=True,
+                    semantic_search_enabled=True,
+                    memory_aware=True,
+                    multi_repo_enabled=None,
+                    reranker_type=reranker_type,
+                    semantic_indexer_registry=semantic_registry,
+                )
 
         _supported = dispatcher.supported_languages
         supported_languages = _supported() if callable(_supported) else _supported
@@ -1119,7 +1151,7 @@ async def initialize_services() -> None:
 
         if isinstance(dispatcher, EnhancedDispatcher) and not (
             getattr(dispatcher, "_semantic_registry", None)
-            or getattr(dispatcher, "_semantic_indexer_fallback", None)
+            or getattr(dispatcher, "has_semantic_fallback", False)
         ):
             logger.warning(
                 "Semantic search not available — running in BM25-only mode. "
@@ -1144,7 +1176,7 @@ async def initialize_services() -> None:
             _file_count = 0
             _is_excluded = build_walker_filter(current_dir)
             for _root, _dirs, _files in os.walk(current_dir, followlinks=False):
-                _dirs[:] = [d for d in _dirs if not _is_excluded(Path(_root) / d)]
+                _dirs[:] = [d for d in _dirs if not _is_excluded(Path(_root) / d, is_dir=True)]
                 _file_count += len(_files)
                 if _file_count > _max_files:
                     break
@@ -1245,6 +1277,22 @@ _lazy_summarizer: Optional[Any] = None
 _init_lock: Optional[asyncio.Lock] = None
 
 
+def _progress_reporter(request_context: Any) -> Optional[Any]:
+    """Return a progress callback when the client sent a progressToken."""
+    token = getattr(getattr(request_context, "meta", None), "progressToken", None)
+    if token is None:
+        return None
+    session = request_context.session
+    request_id = str(request_context.request_id)
+
+    async def report(progress: float, total: Optional[float], message: Optional[str]) -> None:
+        await session.send_progress_notification(
+            token, progress, total=total, message=message, related_request_id=request_id
+        )
+
+    return report
+
+
 async def call_tool(
     name: str, arguments: dict | None
 ) -> types.CallToolResult | types.CreateTaskResult:
@@ -1281,12 +1329,14 @@ async def call_tool(
     _current_session = None
     _client_name = None
     _request_experimental = None
+    _progress = None
     try:
         from mcp.server.lowlevel.server import request_ctx
 
         _ctx = request_ctx.get()
         _current_session = _ctx.session
         _request_experimental = _ctx.experimental
+        _progress = _progress_reporter(_ctx)
         _params = getattr(_current_session, "client_params", None)
         _client_name = getattr(getattr(_params, "clientInfo", None), "name", None)
     except Exception as _e:
@@ -1298,7 +1348,9 @@ async def call_tool(
             _init_lock = asyncio.Lock()
         async with _init_lock:
             if dispatcher is None and sqlite_store is None and initialization_error is None:
-                await initialize_services()
+                with profile_span("initialize_services"):
+                    await initialize_services()
+    finish_startup_profile()
 
     if initialization_error:
         return _to_call_tool_result(
@@ -1353,88 +1405,96 @@ async def call_tool(
 
     _tool_status = "success"
     try:
-        tool_def = next((tool for tool in _build_tool_list() if tool.name == name), None)
-        if _request_experimental is not None and tool_def is not None:
-            _request_experimental.validate_for_tool(tool_def)
-        if name == "symbol_lookup":
-            response = await tool_handlers.handle_symbol_lookup(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-            )
-        elif name == "search_code":
-            response = await tool_handlers.handle_search_code(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-                indexing_thread=_indexing_thread,
-                lazy_summarizer=_lazy_summarizer,
-            )
-        elif name == "get_status":
-            response = await tool_handlers.handle_get_status(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-                file_watcher=_file_watcher,
-                indexing_thread=_indexing_thread,
-                indexing_started_at=_indexing_started_at,
-                indexing_total_files=_indexing_total_files,
-                lazy_summarizer=_lazy_summarizer,
-                server_version=_SERVER_VERSION,
-                use_simple_dispatcher=USE_SIMPLE_DISPATCHER,
-                current_session=_current_session,
-                client_name=_client_name,
-            )
-        elif name == "list_plugins":
-            response = await tool_handlers.handle_list_plugins(
-                **common_kwargs,
-                plugin_manager=plugin_manager,
-            )
-        elif name == "reindex":
-            response = await tool_handlers.handle_reindex(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-                request_experimental=_request_experimental,
-                task_registry=_task_registry,
-                git_index_manager=_git_index_manager,
-            )
-        elif name == "write_summaries":
-            response = await tool_handlers.handle_write_summaries(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-                lazy_summarizer=_lazy_summarizer,
-                current_session=_current_session,
-                client_name=_client_name,
-                request_experimental=_request_experimental,
-                task_registry=_task_registry,
-            )
-        elif name == "summarize_sample":
-            response = await tool_handlers.handle_summarize_sample(
-                **common_kwargs,
-                sqlite_store=sqlite_store,
-                lazy_summarizer=_lazy_summarizer,
-                current_session=_current_session,
-                client_name=_client_name,
-            )
-        else:
-            response = [
-                types.TextContent(
-                    type="text",
-                    text=tool_handlers._ensure_response(
-                        {
-                            "error": "Unknown tool",
-                            "tool": name,
-                            "available_tools": [
-                                "symbol_lookup",
-                                "search_code",
-                                "get_status",
-                                "list_plugins",
-                                "reindex",
-                                "write_summaries",
-                                "summarize_sample",
-                                "handshake",
-                            ],
-                        }
-                    ),
+        async with get_admission_controller().admit(name):
+            tool_def = next((tool for tool in _build_tool_list() if tool.name == name), None)
+            if _request_experimental is not None and tool_def is not None:
+                _request_experimental.validate_for_tool(tool_def)
+            if name == "symbol_lookup":
+                response = await tool_handlers.handle_symbol_lookup(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
                 )
-            ]
+            elif name == "search_code":
+                response = await tool_handlers.handle_search_code(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
+                    indexing_thread=_indexing_thread,
+                    lazy_summarizer=_lazy_summarizer,
+                    progress=_progress,
+                )
+            elif name == "get_status":
+                response = await tool_handlers.handle_get_status(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
+                    file_watcher=_file_watcher,
+                    indexing_thread=_indexing_thread,
+                    indexing_started_at=_indexing_started_at,
+                    indexing_total_files=_indexing_total_files,
+                    lazy_summarizer=_lazy_summarizer,
+                    server_version=_SERVER_VERSION,
+                    use_simple_dispatcher=USE_SIMPLE_DISPATCHER,
+                    current_session=_current_session,
+                    client_name=_client_name,
+                )
+            elif name == "list_plugins":
+                response = await tool_handlers.handle_list_plugins(
+                    **common_kwargs,
+                    plugin_manager=plugin_manager,
+                )
+            elif name == "reindex":
+                response = await tool_handlers.handle_reindex(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
+                    request_experimental=_request_experimental,
+                    task_registry=_task_registry,
+                    git_index_manager=_git_index_manager,
+                    index_job_queue=_index_job_queue,
+                )
+            elif name == "write_summaries":
+                response = await tool_handlers.handle_write_summaries(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
+                    lazy_summarizer=_lazy_summarizer,
+                    current_session=_current_session,
+                    client_name=_client_name,
+                    request_experimental=_request_experimental,
+                    task_registry=_task_registry,
+                )
+            elif name == "summarize_sample":
+                response = await tool_handlers.handle_summarize_sample(
+                    **common_kwargs,
+                    sqlite_store=sqlite_store,
+                    lazy_summarizer=_lazy_summarizer,
+                    current_session=_current_session,
+                    client_name=_client_name,
+                )
+            else:
+                response = [
+                    types.TextContent(
+                        type="text",
+                        text=tool_handlers._ensure_response(
+                            {
+                                "error": "Unknown tool",
+                                "tool": name,
+                                "available_tools": [
+                                    "symbol_lookup",
+                                    "search_code",
+                                    "get_status",
+                                    "list_plugins",
+                                    "reindex",
+                                    "write_summaries",
+                                    "summarize_sample",
+                                    "handshake",
+                                ],
+                            }
+                        ),
+                    )
+                ]
+    except AdmissionRejected as busy:
+        _tool_status = "busy"
+        response = [
+            types.TextContent(type="text", text=tool_handlers._ensure_response(busy.to_dict()))
+        ]
     except Exception as e:
         _tool_status = "error"
         if isinstance(e, McpError):
@@ -1486,7 +1546,7 @@ async def call_tool(
 async def _serve(registry_path=None) -> None:
     """Set up and run the MCP stdio server."""
     global _shutdown_called, _gate, _repo_resolver, _store_registry, _task_registry
-    global _git_index_manager, dispatcher
+    global _git_index_manager, _index_job_queue, dispatcher
 
     _shutdown_called = False
 
@@ -1512,17 +1572,19 @@ async def _serve(registry_path=None) -> None:
     warn_if_gh_attestation_missing()
 
     # Process-wide service pool — stateless, no cwd capture
-    store_registry, repo_resolver, _disp, repo_registry, git_index_manager = (
-        initialize_stateless_services(registry_path=registry_path)
-    )
+    with profile_span("initialize_stateless_services"):
+        store_registry, repo_resolver, _disp, repo_registry, git_index_manager = (
+            initialize_stateless_services(registry_path=registry_path)
+        )
     _repo_resolver = repo_resolver
     _store_registry = store_registry
     _git_index_manager = git_index_manager
     dispatcher = _disp
 
     # Start Prometheus metrics exporter
-    exporter = PrometheusExporter()
-    exporter.start(int(os.getenv("MCP_METRICS_PORT", "9090")))
+    with profile_span("start metrics exporter"):
+        exporter = PrometheusExporter()
+        exporter.start(int(os.getenv("MCP_METRICS_PORT", "9090")))
 
     # Start multi-repo watcher + ref poller eagerly, after registries are ready
     multi_watcher: Optional[MultiRepositoryWatcher] = None
@@ -1531,11 +1593,23 @@ async def _serve(registry_path=None) -> None:
         from mcp_server.dispatcher.dispatcher_enhanced import EnhancedDispatcher as _ED
 
         if isinstance(_disp, _ED):
+            job_pool = None
+            if get_index_job_workers() > 0:
+                job_pool = IndexWorkerPool(
+                    IndexJobQueue.for_registry(repo_registry.registry_path),
+                    functools.partial(
+                        run_repository_sync_job, registry_path=str(repo_registry.registry_path)
+                    ),
+                    workers=get_index_job_workers(),
+                    lease_seconds=get_index_job_lease_seconds(),
+                )
+                _index_job_queue = job_pool.queue
             multi_watcher = MultiRepositoryWatcher(
                 registry=repo_registry,
                 dispatcher=_disp,
                 index_manager=git_index_manager,
                 repo_resolver=repo_resolver,
+                job_pool=job_pool,
             )
             ref_poller = RefPoller(
                 registry=repo_registry,
@@ -1543,8 +1617,9 @@ async def _serve(registry_path=None) -> None:
                 dispatcher=_disp,
                 repo_resolver=repo_resolver,
             )
-            multi_watcher.start_watching_all()
-            ref_poller.start()
+            with profile_span("start watchers"):
+                multi_watcher.start_watching_all()
+                ref_poller.start()
             logger.info("MultiRepositoryWatcher and RefPoller started")
     except Exception as _watcher_err:
         logger.warning(f"MultiRepositoryWatcher failed to start: {_watcher_err}")
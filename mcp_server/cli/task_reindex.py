@@ -12,9 +12,11 @@ import anyio
 import mcp.types as types
 from mcp.server.experimental.task_context import ServerTaskContext
 
+from mcp_server.cli.admission import HEAVY, run_blocking
 from mcp_server.indexing.checkpoint import ReindexCheckpoint
 from mcp_server.indexing.checkpoint import clear as clear_checkpoint
 from mcp_server.indexing.checkpoint import save
+from mcp_server.storage.index_job_queue import CANCELLED, DONE, IndexJob, IndexJobQueue
 from mcp_server.storage.mcp_task_registry import MCPTaskRegistry
 
 
@@ -101,6 +103,80 @@ def _save_checkpoint(
     )
 
 
+async def follow_index_job(
+    *,
+    task_id: str,
+    registry: MCPTaskRegistry,
+    queue: IndexJobQueue,
+    job_id: int,
+    poll_seconds: float = 0.25,
+) -> IndexJob:
+    """Mirror a queued index job's progress into ``task_id`` until it finishes.
+
+    Cancelling the task cancels the job (a leased job stops at its next
+    progress report).
+    """
+    last_progress: dict[str, Any] | None = None
+    cancel_sent = False
+    while True:
+        job = await asyncio.to_thread(queue.get, job_id)
+        if job is None:
+            raise ValueError(f"Index job {job_id} not found")
+        if job.progress and job.progress != last_progress:
+            last_progress = job.progress
+            await registry.record_progress(
+                task_id,
+                status_message=f"Index job {job.state}: {job.progress.get('stage', 'working')}",
+                progress={**job.progress, "job_id": job.id, "attempts": job.attempts},
+            )
+        if job.finished:
+            return job
+        if not cancel_sent and await registry.is_cancellation_requested(task_id):
+            cancel_sent = await asyncio.to_thread(queue.cancel, job_id)
+        await anyio.sleep(poll_seconds)
+
+
+async def run_queued_reindex_task(
+    *,
+    task: ServerTaskContext,
+    registry: MCPTaskRegistry,
+    queue: IndexJobQueue,
+    ctx: Any,
+) -> types.CallToolResult:
+    """Run a whole-repository reindex as a ``full`` job on the index worker queue."""
+    await registry.bind_task(
+        task.task_id,
+        tool_name="reindex",
+        repository=str(ctx.workspace_root),
+    )
+    job_id = await asyncio.to_thread(
+        queue.enqueue, ctx.repo_id, kind="full", priority=1, task_id=task.task_id
+    )
+    job = await follow_index_job(
+        task_id=task.task_id, registry=registry, queue=queue, job_id=job_id
+    )
+    payload = {
+        "path": str(ctx.workspace_root),
+        "mode": "queued_full",
+        "job_id": job.id,
+        "job_state": job.state,
+        "mutation_performed": job.state == DONE,
+        **job.result,
+    }
+    if job.state == DONE:
+        return _call_tool_result(payload)
+
+    payload["error"] = job.error or f"Index job {job.state}"
+    result = _call_tool_result(payload, is_error=job.state != CANCELLED)
+    await registry.store_result(task.task_id, result)
+    await registry.update_task(
+        task.task_id,
+        status="cancelled" if job.state == CANCELLED else "failed",
+        status_message=f"Index job {job.id} {job.state}.",
+    )
+    return result
+
+
 async def run_reindex_task(
     *,
     task: ServerTaskContext,
@@ -209,7 +285,7 @@ async def run_reindex_task(
     try:
         async with anyio.create_task_group() as tg:
             tg.start_soon(cancel_observer)
-            outcome = await asyncio.to_thread(do_work)
+            outcome = await run_blocking(do_work, lane=HEAVY)
             tg.cancel_scope.cancel()
     except Exception:
         if ctx is not None:
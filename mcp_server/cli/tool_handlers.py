@@ -7,21 +7,35 @@ argument or the MCP_WORKSPACE_ROOT default, then delegates to the dispatcher.
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import json
 import logging
 import os
+import threading
 import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Sequence
 
 import mcp.types as types
 
+from mcp_server.cli.admission import HEAVY, run_blocking
 from mcp_server.cli.bootstrap import _allowed_roots, _path_within_allowed, validate_index
-from mcp_server.cli.task_reindex import run_reindex_task
-from mcp_server.cli.task_write_summaries import run_write_summaries_task
+from mcp_server.cli.search_pagination import (
+    InvalidCursorError,
+    SearchCursor,
+    get_continuation_cache,
+    query_fingerprint,
+    resume_offset,
+    slice_page,
+    window_size,
+)
+from mcp_server.cli.task_reindex import run_queued_reindex_task, run_reindex_task
 from mcp_server.client import ClientValidationError, build_search_options, execute_search_service
+from mcp_server.client_types import ClientSearchMatch, ClientSearchOptions, ClientSearchResult
+from mcp_server.core.deadline import bounded_timeout, deadline_exceeded
 from mcp_server.core.repo_context import RepoContext
 from mcp_server.core.repo_resolver import RepoResolver
+from mcp_server.core.tracing import get_tracer
 from mcp_server.dispatcher.dispatcher_enhanced import SemanticSearchFailure
 from mcp_server.dispatcher.protocol import DispatcherProtocol
 from mcp_server.health.repository_readiness import (
@@ -33,6 +47,7 @@ from mcp_server.indexing.source_metadata import normalize_friction_category
 
 if TYPE_CHECKING:
     from mcp_server.storage.git_index_manager import GitAwareIndexManager
+    from mcp_server.storage.index_job_queue import IndexJobQueue
 
 logger = logging.getLogger(__name__)
 
@@ -406,14 +421,16 @@ async def handle_symbol_lookup(
     if ctx is None and isinstance(repo_resolver, RepoResolver):
         return _resolution_transition_response("symbol_lookup")
 
-    try:
-        if ctx is not None:
-            result = dispatcher.lookup(ctx, symbol)
-        else:
+    def _lookup() -> Any:
+        try:
+            if ctx is not None:
+                return dispatcher.lookup(ctx, symbol)
             # Fallback: call without ctx for pre-SL-1 compatibility
-            result = dispatcher.lookup(symbol)  # type: ignore[call-arg]
-    except TypeError:
-        result = dispatcher.lookup(symbol)  # type: ignore[call-arg]
+            return dispatcher.lookup(symbol)  # type: ignore[call-arg]
+        except TypeError:
+            return dispatcher.lookup(symbol)  # type: ignore[call-arg]
+
+    result = await run_blocking(_lookup)
 
     if result:
         defined_in = (
@@ -471,6 +488,124 @@ async def handle_symbol_lookup(
         return [types.TextContent(type="text", text=_ensure_response(response_data))]
 
 
+ProgressReporter = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+
+def _search_result_item(item: ClientSearchMatch, semantic: bool) -> dict[str, Any]:
+    file_path = _translate_path(item.file)
+    line = item.line
+    result_item = {
+        "file": file_path,
+        "line": line,
+        "line_end": item.line_end,
+        "symbol": item.symbol,
+        "snippet": item.snippet,
+        "last_indexed": item.last_indexed,
+    }
+    if item.source_metadata is not None:
+        result_item["source_metadata"] = item.source_metadata
+    if semantic:
+        result_item["semantic_source"] = item.semantic_source
+        result_item["semantic_profile_id"] = item.semantic_profile_id
+        result_item["semantic_collection_name"] = item.semantic_collection_name
+    if line and file_path:
+        offset = line - 1
+        result_item["_usage_hint"] = (
+            f"For more context: Read(file_path='{file_path}', offset={offset}, limit=30)"
+        )
+    return result_item
+
+
+async def _stream_partial_results(
+    queue: "asyncio.Queue[ClientSearchMatch]",
+    progress: ProgressReporter,
+    total: int,
+    semantic: bool,
+) -> None:
+    """Forward matches to the client as progress notifications, batching bursts."""
+    sent = 0
+    while True:
+        batch = [await queue.get()]
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        sent += len(batch)
+        message = json.dumps(
+            {"partial_results": [_search_result_item(item, semantic) for item in batch]}
+        )
+        try:
+            await progress(float(sent), float(total), message)
+        except Exception as exc:
+            logger.debug("Dropping search progress notification: %s", exc)
+
+
+async def _run_search_with_deadline(
+    *,
+    dispatcher: DispatcherProtocol,
+    repo_resolver: RepoResolver,
+    options: ClientSearchOptions,
+    progress: Optional[ProgressReporter],
+    timeout: float,
+) -> tuple[ClientSearchResult, bool]:
+    """Run ``execute_search_service`` off-loop, streaming matches and keeping hits.
+
+    Returns ``(result, timed_out)``.  When the deadline passes after some
+    matches were produced, those matches are returned as a partial result
+    instead of an error; with none, ``asyncio.TimeoutError`` propagates.
+    """
+    loop = asyncio.get_event_loop()
+    stop = threading.Event()
+    seen: list[ClientSearchMatch] = []
+    queue: "asyncio.Queue[ClientSearchMatch]" = asyncio.Queue()
+
+    def on_match(match: ClientSearchMatch) -> None:
+        seen.append(match)
+        if progress is not None:
+            loop.call_soon_threadsafe(queue.put_nowait, match)
+
+    streamer = (
+        asyncio.ensure_future(
+            _stream_partial_results(queue, progress, options.limit, options.semantic)
+        )
+        if progress is not None
+        else None
+    )
+    try:
+        result = await asyncio.wait_for(
+            run_blocking(
+                lambda: execute_search_service(
+                    dispatcher=dispatcher,
+                    repo_resolver=repo_resolver,
+                    options=options,
+                    on_match=on_match,
+                    should_stop=lambda: stop.is_set() or deadline_exceeded(),
+                )
+            ),
+            timeout=bounded_timeout(timeout),
+        )
+        return result, False
+    except asyncio.TimeoutError:
+        stop.set()
+        if not seen:
+            raise
+        partial = ClientSearchResult(
+            query=options.query,
+            results=tuple(seen),
+            semantic_requested=options.semantic,
+            semantic_source="semantic" if options.semantic else None,
+            semantic_fallback_status="not_attempted" if options.semantic else None,
+            source_type=options.source_type,
+            friction_categories=options.friction_categories,
+            history_labels=options.history_labels,
+            history_repos=options.history_repos,
+            include_source_metadata=options.include_source_metadata,
+            partial=True,
+        )
+        return partial, True
+    finally:
+        if streamer is not None:
+            streamer.cancel()
+
+
 async def handle_search_code(
     *,
     arguments: dict,
@@ -479,6 +614,7 @@ async def handle_search_code(
     sqlite_store: Any = None,
     indexing_thread: Any = None,
     lazy_summarizer: Any = None,
+    progress: ProgressReporter | None = None,
 ) -> Sequence[types.TextContent]:
     query = (arguments or {}).get("query")
     if not query:
@@ -534,46 +670,109 @@ async def handle_search_code(
     except ValueError as exc:
         return _json_text_response({"error": "Invalid search source filters", "details": str(exc)})
 
-    try:
-        result = await asyncio.wait_for(
-            asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: execute_search_service(
-                    dispatcher=dispatcher,
-                    repo_resolver=repo_resolver,
-                    options=options,
-                ),
-            ),
-            timeout=10.0,
-        )
-    except asyncio.TimeoutError:
-        return [
-            types.TextContent(
-                type="text",
-                text=_ensure_response(
-                    {
-                        "error": "Search timeout",
-                        "details": "Search operation exceeded 10 second timeout",
-                        "query": query,
-                        "suggestion": "Try a simpler query or check index status with get_status",
-                    }
-                ),
+    cursor_token = (arguments or {}).get("cursor")
+    paginate = bool((arguments or {}).get("paginate", False)) or bool(cursor_token)
+    fingerprint = query_fingerprint(options) if paginate else None
+    cursor: Optional[SearchCursor] = None
+    if cursor_token:
+        try:
+            cursor = SearchCursor.decode(str(cursor_token))
+            if cursor.fingerprint != fingerprint:
+                raise InvalidCursorError("Cursor was issued for a different query or filters")
+        except InvalidCursorError as exc:
+            return _json_text_response(
+                {"error": "Invalid cursor", "code": "invalid_cursor", "details": str(exc)}
             )
-        ]
-    except Exception as e:
-        logger.error(f"Search failed: {e}")
-        return [
-            types.TextContent(
-                type="text",
-                text=_ensure_response(
-                    {
-                        "error": "Search failed",
-                        "details": str(e),
-                        "query": query,
-                    }
-                ),
+
+    page_size = options.limit
+    offset = cursor.offset if cursor is not None else 0
+    cache = get_continuation_cache()
+    result: Optional[ClientSearchResult] = None
+    requested = page_size
+    if cursor is not None:
+        window = cache.get(cursor.fingerprint, cursor.generation)
+        if window is not None and (
+            window.exhausted or offset + page_size <= len(window.result.results)
+        ):
+            result, requested = window.result, window.requested
+
+    timed_out = False
+    if result is None:
+        run_options = options
+        if paginate:
+            requested = window_size(offset, page_size)
+            run_options = dataclasses.replace(options, limit=requested)
+        try:
+            result, timed_out = await _run_search_with_deadline(
+                dispatcher=dispatcher,
+                repo_resolver=repo_resolver,
+                options=run_options,
+                progress=progress,
+                timeout=10.0,
             )
-        ]
+        except asyncio.TimeoutError:
+            return [
+                types.TextContent(
+                    type="text",
+                    text=_ensure_response(
+                        {
+                            "error": "Search timeout",
+                            "details": "Search operation exceeded 10 second timeout",
+                            "query": query,
+                            "suggestion": "Try a simpler query or check index status with get_status",
+                        }
+                    ),
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Search failed: {e}")
+            return [
+                types.TextContent(
+                    type="text",
+                    text=_ensure_response(
+                        {
+                            "error": "Search failed",
+                            "details": str(e),
+                            "query": query,
+                        }
+                    ),
+                )
+            ]
+        if (
+            cursor is not None
+            and result.code is None
+            and not result.partial
+            and (result.index_generation or "unknown") != cursor.generation
+        ):
+            return _json_text_response(
+                {
+                    "error": "Stale cursor",
+                    "code": "cursor_stale",
+                    "details": "The index changed since this cursor was issued",
+                    "query": query,
+                    "suggestion": "Repeat the search without a cursor to start from page 1",
+                }
+            )
+        if paginate and not result.partial and result.code is None:
+            cache.put(fingerprint, result.index_generation or "unknown", result, requested)
+
+    pagination: Optional[dict[str, Any]] = None
+    if paginate:
+        generation = result.index_generation or "unknown"
+        start = resume_offset(result.results, cursor) if cursor is not None else 0
+        page = slice_page(
+            result.results,
+            start=start,
+            page_size=page_size,
+            exhausted=len(result.results) < requested,
+            fingerprint=fingerprint,
+            generation=generation,
+        )
+        result = dataclasses.replace(result, results=page.matches)
+        pagination = {
+            "offset": page.offset,
+            "next_cursor": None if result.partial else page.next_cursor,
+        }
 
     logger.info(f"Search completed with {len(result.results)} results")
 
@@ -645,30 +844,7 @@ async def handle_search_code(
         )
 
     if result.results:
-        results_data = []
-        for item in result.results:
-            file_path = _translate_path(item.file)
-            line = item.line
-            result_item = {
-                "file": file_path,
-                "line": line,
-                "line_end": item.line_end,
-                "symbol": item.symbol,
-                "snippet": item.snippet,
-                "last_indexed": item.last_indexed,
-            }
-            if item.source_metadata is not None:
-                result_item["source_metadata"] = item.source_metadata
-            if semantic:
-                result_item["semantic_source"] = item.semantic_source
-                result_item["semantic_profile_id"] = item.semantic_profile_id
-                result_item["semantic_collection_name"] = item.semantic_collection_name
-            if line and file_path:
-                offset = line - 1
-                result_item["_usage_hint"] = (
-                    f"For more context: Read(file_path='{file_path}', offset={offset}, limit=30)"
-                )
-            results_data.append(result_item)
+        results_data = [_search_result_item(item, semantic) for item in result.results]
 
         # Lazy summarization enqueue
         if lazy_summarizer and lazy_summarizer.can_summarize() and sqlite_store:
@@ -702,7 +878,7 @@ async def handle_search_code(
             or include_source_metadata
         )
         search_response: dict[str, Any] | list[dict[str, Any]]
-        if semantic or filtered_or_enriched:
+        if semantic or filtered_or_enriched or pagination is not None or timed_out:
             search_response = {
                 "results": results_data,
                 "query": query,
@@ -723,6 +899,13 @@ async def handle_search_code(
                 search_response["history_repos"] = history_repos
             if include_source_metadata:
                 search_response["include_source_metadata"] = True
+            if pagination is not None:
+                search_response.update(pagination)
+            if timed_out:
+                search_response["partial"] = True
+                search_response["message"] = (
+                    "Search exceeded 10 second timeout; returning results found so far"
+                )
             if _indexing_active:
                 search_response["indexing_in_progress"] = True
                 search_response["note"] = (
@@ -763,6 +946,8 @@ async def handle_search_code(
             response_data["history_repos"] = history_repos
         if include_source_metadata:
             response_data["include_source_metadata"] = True
+        if pagination is not None:
+            response_data.update(pagination)
         if readiness is not None:
             response_data["readiness"] = (
                 readiness if isinstance(readiness, dict) else readiness.to_dict()
@@ -931,6 +1116,7 @@ async def handle_get_status(
             "session_available": current_session is not None,
         },
         "repositories": _build_repositories(repo_resolver, dispatcher),
+        "tracing": {**get_tracer().stats(), "slow_traces": get_tracer().slow_traces(limit=5)},
     }
     availability_rows = PluginFactory.get_plugin_availability()
     counts: dict[str, int] = {}
@@ -1011,6 +1197,7 @@ async def handle_reindex(
     request_experimental: Any = None,
     task_registry: Any = None,
     git_index_manager: Optional["GitAwareIndexManager"] = None,
+    index_job_queue: Optional["IndexJobQueue"] = None,
 ) -> Sequence[types.TextContent] | types.CreateTaskResult:
     path = (arguments or {}).get("path")
     repository = (arguments or {}).get("repository")
@@ -1175,6 +1362,18 @@ async def handle_reindex(
         and target_path.resolve(strict=False) == ctx.workspace_root.resolve(strict=False)
         and not target_path.is_file()
     )
+    if (
+        index_job_queue is not None
+        and whole_repository
+        and request_experimental is not None
+        and request_experimental.is_task
+    ):
+        return await request_experimental.run_task(
+            lambda task: run_queued_reindex_task(
+                task=task, registry=task_registry, queue=index_job_queue, ctx=ctx
+            ),
+            model_immediate_response="Reindex job queued; poll tasks/get or tasks/result for progress.",
+        )
     if git_index_manager is not None and whole_repository and ctx is not None:
         sync_result = git_index_manager.rebuild_repository_index(ctx.repo_id)
         if sync_result.action != "full_index":
@@ -1215,9 +1414,9 @@ async def handle_reindex(
             )
         try:
             if ctx is not None:
-                dispatcher.index_file(ctx, target_path)  # type: ignore[call-arg]
+                await run_blocking(dispatcher.index_file, ctx, target_path, lane=HEAVY)
             else:
-                dispatcher.index_file(target_path)  # type: ignore[call-arg]
+                await run_blocking(dispatcher.index_file, target_path, lane=HEAVY)
             durable_files = (
                 _record_reindexed_files(active_store, ctx.workspace_root, target_path)
                 if ctx is not None and active_store is not None
@@ -1234,7 +1433,7 @@ async def handle_reindex(
                 }
             )
         except TypeError:
-            dispatcher.index_file(target_path)  # type: ignore[call-arg]
+            await run_blocking(dispatcher.index_file, target_path, lane=HEAVY)
             durable_files = (
                 _record_reindexed_files(active_store, ctx.workspace_root, target_path)
                 if ctx is not None and active_store is not None
@@ -1277,11 +1476,20 @@ async def handle_reindex(
             )
         try:
             if ctx is not None:
-                stats = dispatcher.index_directory(ctx, target_path, recursive=True)  # type: ignore[call-arg]
+                stats = await run_blocking(
+                    lambda: dispatcher.index_directory(ctx, target_path, recursive=True),
+                    lane=HEAVY,
+                )
             else:
-                stats = dispatcher.index_directory(target_path, recursive=True)  # type: ignore[call-arg]
+                stats = await run_blocking(
+                    lambda: dispatcher.index_directory(target_path, recursive=True),  # type: ignore[call-arg]
+                    lane=HEAVY,
+                )
         except TypeError:
-            stats = dispatcher.index_directory(target_path, recursive=True)  # type: ignore[call-arg]
+            stats = await run_blocking(
+                lambda: dispatcher.index_directory(target_path, recursive=True),  # type: ignore[call-arg]
+                lane=HEAVY,
+            )
 
         durable_files = (
             _record_reindexed_files(active_store, ctx.workspace_root, target_path)
@@ -1397,6 +1605,8 @@ async def handle_write_summaries(
     model_used = lazy_summarizer._get_model_name()
 
     if request_experimental is not None and request_experimental.is_task:
+        from mcp_server.cli.task_write_summaries import run_write_summaries_task
+
         return await request_experimental.run_task(
             lambda task: run_write_summaries_task(
                 task=task,
@@ -1456,6 +1666,7 @@ async def handle_summarize_sample(
     import sqlite3 as _sqlite3
 
     from mcp_server.indexing.summarization import FileBatchSummarizer
+    from mcp_server.storage.chunk_bodies import chunk_content_sql
     from mcp_server.storage.sqlite_store import assert_chunk_scheme_readable
 
     repository = (arguments or {}).get("repository")
@@ -1609,8 +1820,8 @@ async def handle_summarize_sample(
             # read code_chunks rows across an incompatible/rebuilding scheme.
             assert_chunk_scheme_readable(_conn)
             chunk_rows = _conn.execute(
-                """SELECT c.chunk_id, c.line_start, c.line_end,
-                          c.content, c.node_type, c.parent_chunk_id,
+                f"""SELECT c.chunk_id, c.line_start, c.line_end,
+                          {chunk_content_sql(_conn)}, c.node_type, c.parent_chunk_id,
                           c.language, c.symbol_id, s.name AS symbol
                    FROM code_chunks c
                    LEFT JOIN symbols s ON c.symbol_id = s.id
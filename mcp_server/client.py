@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Sequence
+from typing import Any, Callable, Sequence
 
 from mcp_server.cli.bootstrap import initialize_stateless_services
+from mcp_server.cli.search_pagination import index_generation
 from mcp_server.core.repo_context import RepoContext
 from mcp_server.core.repo_resolver import RepoResolver
 from mcp_server.dispatcher.protocol import DispatcherProtocol
 from mcp_server.health.repository_readiness import ReadinessClassifier
+from mcp_server.storage.index_maintenance import get_index_maintenance_scheduler
 
 from .client_types import (
     ClientReindexResult,
@@ -196,7 +198,16 @@ def execute_search_service(
     options: ClientSearchOptions,
     workspace_root: Path | None = None,
     ctx: RepoContext | None = None,
+    on_match: Callable[[ClientSearchMatch], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
 ) -> ClientSearchResult:
+    """Run a search against the resolved repository.
+
+    ``on_match`` is called from the calling thread with each match as the
+    dispatcher yields it, so callers can stream partial results.  When
+    ``should_stop`` returns true the search is abandoned and the matches seen
+    so far are returned with ``partial=True``.
+    """
     readiness = (
         _resolve_readiness(repo_resolver, options.repository, workspace_root=workspace_root)
         if repo_resolver is not None
@@ -249,8 +260,26 @@ def execute_search_service(
     if ctx is None:
         raise RuntimeError("Repository context could not be resolved")
 
+    generation = index_generation(getattr(getattr(ctx, "sqlite_store", None), "db_path", None))
+    matches: list[ClientSearchMatch] = []
+    partial = False
     try:
-        raw_results = list(dispatcher.search(ctx, options.query, **_search_kwargs(options)))
+        # Background index maintenance pauses while searches are in flight.
+        with get_index_maintenance_scheduler().searching():
+            search_iter = iter(dispatcher.search(ctx, options.query, **_search_kwargs(options)))
+            try:
+                for raw in search_iter:
+                    match = _search_match_from_raw(raw)
+                    matches.append(match)
+                    if on_match is not None:
+                        on_match(match)
+                    if should_stop is not None and should_stop():
+                        partial = True
+                        break
+            finally:
+                close = getattr(search_iter, "close", None)
+                if close is not None:
+                    close()
     except Exception:
         if options.semantic:
             return ClientSearchResult(
@@ -276,8 +305,8 @@ def execute_search_service(
 
     return ClientSearchResult(
         query=options.query,
-        results=tuple(_search_match_from_raw(item) for item in raw_results),
-        message=None if raw_results else "No results found in index",
+        results=tuple(matches),
+        message=None if matches else "No results found in index",
         readiness=readiness.to_dict() if readiness is not None else None,
         semantic_requested=options.semantic,
         semantic_source="semantic" if options.semantic else None,
@@ -292,6 +321,8 @@ def execute_search_service(
         history_labels=options.history_labels,
         history_repos=options.history_repos,
         include_source_metadata=options.include_source_metadata,
+        partial=partial,
+        index_generation=generation,
     )
 
 
@@ -100,6 +100,8 @@ class ClientSearchResult:
     history_labels: tuple[str, ...] = field(default_factory=tuple)
     history_repos: tuple[str, ...] = field(default_factory=tuple)
     include_source_metadata: bool = False
+    partial: bool = False
+    index_generation: str | None = None
 
 
 @dataclass(frozen=True)
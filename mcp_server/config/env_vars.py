@@ -24,3 +24,184 @@ def get_publish_rollback_enabled() -> bool:
     if raw is None:
         return True
     return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_sqlite_mmap_size_bytes() -> int:
+    return int(os.getenv("MCP_SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))
+
+
+def get_sqlite_cache_size_kib() -> int:
+    return int(os.getenv("MCP_SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))
+
+
+def get_sqlite_statement_cache_size() -> int:
+    return int(os.getenv("MCP_SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+
+def get_sqlite_reader_pool_size() -> int:
+    return int(os.getenv("MCP_SQLITE_READER_POOL_SIZE", "4"))
+
+
+def get_watcher_storm_threshold() -> int:
+    return int(os.getenv("MCP_WATCHER_STORM_THRESHOLD", "500"))
+
+
+def get_watcher_storm_quiet_ms() -> int:
+    return int(os.getenv("MCP_WATCHER_STORM_QUIET_MS", "1000"))
+
+
+def get_watcher_storm_batch_size() -> int:
+    return int(os.getenv("MCP_WATCHER_STORM_BATCH_SIZE", "2000"))
+
+
+def get_watcher_storm_defer_semantic() -> bool:
+    raw = os.getenv("MCP_WATCHER_STORM_DEFER_SEMANTIC")
+    if raw is None:
+        return True
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_integrity_verify_pages_per_tick() -> int:
+    return int(os.getenv("MCP_INTEGRITY_VERIFY_PAGES_PER_TICK", "2000"))
+
+
+def get_integrity_verify_interval_seconds() -> float:
+    return float(os.getenv("MCP_INTEGRITY_VERIFY_INTERVAL_SECONDS", "5"))
+
+
+def get_chunk_body_compress_min_bytes() -> int:
+    return int(os.getenv("MCP_CHUNK_BODY_COMPRESS_MIN_BYTES", "256"))
+
+
+def get_index_maintenance_interval_seconds() -> float:
+    return float(os.getenv("MCP_INDEX_MAINTENANCE_INTERVAL_SECONDS", "30"))
+
+
+def get_index_maintenance_budget_ms() -> int:
+    return int(os.getenv("MCP_INDEX_MAINTENANCE_BUDGET_MS", "200"))
+
+
+def get_index_maintenance_idle_seconds() -> float:
+    return float(os.getenv("MCP_INDEX_MAINTENANCE_IDLE_SECONDS", "2"))
+
+
+def get_federated_search_enabled() -> bool:
+    raw = os.getenv("MCP_FEDERATED_SEARCH")
+    if raw is None:
+        return True
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_index_job_workers() -> int:
+    return int(os.getenv("MCP_INDEX_JOB_WORKERS", "0"))
+
+
+def get_index_job_lease_seconds() -> float:
+    return float(os.getenv("MCP_INDEX_JOB_LEASE_SECONDS", "60"))
+
+
+def get_tool_interactive_workers() -> int:
+    return int(os.getenv("MCP_TOOL_INTERACTIVE_WORKERS", "8"))
+
+
+def get_tool_heavy_workers() -> int:
+    return int(os.getenv("MCP_TOOL_HEAVY_WORKERS", "2"))
+
+
+def get_tracing_enabled() -> bool:
+    raw = os.getenv("MCP_TRACING")
+    if raw is None:
+        return True
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def get_trace_slow_ms() -> float:
+    return float(os.getenv("MCP_TRACE_SLOW_MS", "250"))
+
+
+def get_trace_buffer_size() -> int:
+    return int(os.getenv("MCP_TRACE_BUFFER_SIZE", "50"))
+
+
+def get_trace_otlp_file() -> str:
+    return os.getenv("MCP_TRACE_OTLP_FILE", "")
+
+
+def get_tokenizer_vocab() -> str:
+    return os.getenv("MCP_TOKENIZER_VOCAB", "")
+
+
+def get_tokenizer_encoding() -> str:
+    return os.getenv("MCP_TOKENIZER_ENCODING", "")
+
+
+def get_tokenizer_models() -> str:
+    return os.getenv("MCP_TOKENIZER_MODELS", "")
+
+
+def get_token_count_cache_size() -> int:
+    return int(os.getenv("MCP_TOKEN_COUNT_CACHE_SIZE", "65536"))
+
+
+def get_parse_cache_size() -> int:
+    return int(os.getenv("MCP_PARSE_CACHE_SIZE", "32"))
+
+
+def get_parse_cache_max_bytes() -> int:
+    return int(os.getenv("MCP_PARSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def get_context_cache_memory_bytes() -> int:
+    return int(os.getenv("MCP_CONTEXT_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+
+
+def get_context_cache_disk_bytes() -> int:
+    return int(os.getenv("MCP_CONTEXT_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+
+
+def get_context_cache_write_batch() -> int:
+    return int(os.getenv("MCP_CONTEXT_CACHE_WRITE_BATCH", "256"))
+
+
+def get_plugin_snapshot_dir() -> str:
+    return os.getenv("MCP_PLUGIN_SNAPSHOT_DIR", os.path.expanduser("~/.cache/mcp_server/plugins"))
+
+
+def get_plugin_snapshot_max_bytes() -> int:
+    return int(os.getenv("MCP_PLUGIN_SNAPSHOT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def get_plugin_gc_full_interval() -> int:
+    return int(os.getenv("MCP_PLUGIN_GC_FULL_INTERVAL", "8"))
+
+
+def get_local_embedding_model_dir() -> str:
+    return os.getenv("MCP_LOCAL_EMBEDDING_MODEL_DIR", "")
+
+
+def get_local_embedding_threads() -> int:
+    return int(os.getenv("MCP_LOCAL_EMBEDDING_THREADS", "0"))
+
+
+def get_local_embedding_batch_size() -> int:
+    return int(os.getenv("MCP_LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+
+
+def get_embedding_max_in_flight() -> int:
+    return int(os.getenv("MCP_EMBEDDING_MAX_IN_FLIGHT", "4"))
+
+
+def get_embedding_requests_per_minute() -> int:
+    return int(os.getenv("MCP_EMBEDDING_RPM", "0"))
+
+
+def get_embedding_tokens_per_minute() -> int:
+    return int(os.getenv("MCP_EMBEDDING_TPM", "0"))
+
+
+def get_embedding_max_retries() -> int:
+    return int(os.getenv("MCP_EMBEDDING_MAX_RETRIES", "5"))
+
+
+def get_embedding_http_timeout() -> float:
+    return float(os.getenv("MCP_EMBEDDING_HTTP_TIMEOUT", "60"))
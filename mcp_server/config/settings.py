@@ -723,6 +723,7 @@ class Settings(BaseModel):
                         "enrichment_api_base": enrichment_base,
                         "enrichment_model_name": enrichment_model,
                         "enrichment_api_key_env": enrichment_api_key_env,
+                        "local_model_path": _expand_env_vars(str(model.get("path") or "")),
                         "collection_name": str(
                             vector_store.get("collection", self.semantic_collection_name)
                         ),
@@ -0,0 +1,70 @@
+"""Request deadlines carried through context variables.
+
+The stdio server sets a deadline when it admits a tool call; blocking work it
+hands to executor threads runs in a copy of the caller's context, so code deep
+in the dispatcher can bound its own timeouts by the time the caller has left.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_request_deadline: ContextVar[Optional[float]] = ContextVar("mcp_request_deadline", default=None)
+
+
+def current_deadline() -> Optional[float]:
+    """Monotonic deadline of the current request, or None when unbounded."""
+    return _request_deadline.get()
+
+
+def remaining_seconds() -> Optional[float]:
+    """Seconds left before the current request's deadline (never negative)."""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def deadline_exceeded() -> bool:
+    remaining = remaining_seconds()
+    return remaining is not None and remaining <= 0.0
+
+
+def bounded_timeout(timeout: float) -> float:
+    """``timeout`` (seconds) clamped to the time left on the request deadline."""
+    remaining = remaining_seconds()
+    return timeout if remaining is None else min(timeout, remaining)
+
+
+def bounded_timeout_ms(timeout_ms: int) -> int:
+    """``timeout_ms`` clamped to the request deadline, in whole milliseconds."""
+    remaining = remaining_seconds()
+    return timeout_ms if remaining is None else min(timeout_ms, int(remaining * 1000))
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Run the block under ``deadline``; an enclosing earlier deadline wins."""
+    outer = _request_deadline.get()
+    if deadline is None or (outer is not None and outer <= deadline):
+        effective = outer
+    else:
+        effective = deadline
+    token = _request_deadline.set(effective)
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+__all__ = [
+    "bounded_timeout",
+    "bounded_timeout_ms",
+    "current_deadline",
+    "deadline_exceeded",
+    "deadline_scope",
+    "remaining_seconds",
+]
@@ -1,16 +1,28 @@
 """
 Utility module for handling ignore patterns from .gitignore and .mcp-index-ignore files.
+
+Patterns follow gitignore semantics: ``!`` re-includes, a trailing ``/`` matches
+directories only, a pattern containing ``/`` is anchored to the directory of the
+file that declares it (otherwise it matches a basename at any depth), ``**``
+spans directories, the last matching pattern wins, and nothing below an ignored
+directory can be re-included.  Each ignore file is compiled once into combined
+regexes, and directory verdicts are kept in an LRU so walkers can prune whole
+subtrees with one lookup.
 """
 
-import fnmatch
 import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Union of _EXCLUDED_DIR_PARTS from watcher.py and _INDEX_EXCLUDED_DIRS from dispatcher_enhanced.py.
-# Nested .gitignore traversal is intentionally out of scope for P1 — future work.
+# These are pruned unconditionally; nested .gitignore files are handled by IgnorePatternManager.
 EXCLUDED_DIR_PARTS: frozenset[str] = frozenset(
     {
         # From watcher.py _EXCLUDED_DIR_PARTS
@@ -45,42 +57,199 @@ EXCLUDED_DIR_PARTS: frozenset[str] = frozenset(
 )
 
 
-def build_walker_filter(root: Path) -> Callable[[Path], bool]:
+def build_walker_filter(root: Path) -> Callable[..., bool]:
     """Return a filter function that returns True when a path should be skipped during walking.
 
     Checks EXCLUDED_DIR_PARTS membership on path parts and delegates to IgnorePatternManager
-    for .gitignore / .mcp-index-ignore patterns. Only root-level .gitignore is read; nested
-    .gitignore traversal is future work.
+    for .gitignore / .mcp-index-ignore patterns.  Walkers should pass ``is_dir=True`` for
+    directories so an ignored subtree is pruned before it is descended into.
     """
     ignore_mgr = IgnorePatternManager(root)
 
-    def filter_fn(path: Path) -> bool:
+    def filter_fn(path: Path, is_dir: Optional[bool] = None) -> bool:
         if any(part in EXCLUDED_DIR_PARTS for part in path.parts):
             return True
-        return ignore_mgr.should_ignore(path)
+        return ignore_mgr.should_ignore(path, is_dir=is_dir)
 
     return filter_fn
 
 
+_DIR_CACHE_SIZE = 8192
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One ignore-file line translated to a regex body."""
+
+    pattern: str
+    regex: str
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _translate_glob(glob: str) -> str:
+    """Translate a gitignore glob (without leading/trailing ``/``) to a regex body."""
+    out: List[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                at_start = i == 0 or glob[i - 1] == "/"
+                j = i + 2
+                if at_start and j < n and glob[j] == "/":
+                    out.append("(?:.*/)?")  # "**/" — zero or more directories
+                    i = j + 1
+                    continue
+                if at_start and j == n:
+                    out.append(".*")  # trailing "/**" — everything inside
+                    i = j
+                    continue
+                while j < n and glob[j] == "*":
+                    j += 1
+                out.append("[^/]*")  # other runs of "*" are plain stars
+                i = j
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and glob[j] in "!^":
+                j += 1
+            if j < n and glob[j] == "]":
+                j += 1
+            while j < n and glob[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1 : j]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def compile_ignore_rule(line: str) -> Optional[IgnoreRule]:
+    """Parse one ignore-file line; returns None for blanks and comments."""
+    pattern = line.strip()
+    if not pattern or pattern.startswith("#"):
+        return None
+    body = pattern
+    negate = body.startswith("!")
+    if negate:
+        body = body[1:]
+    elif body.startswith("\\"):
+        body = body[1:]
+    dir_only = body.endswith("/")
+    body = body.rstrip("/")
+    anchored = "/" in body
+    body = body.lstrip("/")
+    if not body:
+        return None
+    if body.startswith("**/") and "/" not in body[3:]:
+        # "**/name" behaves like a bare basename pattern.
+        body, anchored = body[3:], False
+    return IgnoreRule(pattern, _translate_glob(body), negate, dir_only, anchored)
+
+
+class _CombinedRegex:
+    """Alternation of rule regexes that reports the highest-index matching rule."""
+
+    __slots__ = ("_regex", "_index")
+
+    def __init__(self, indexed: Sequence[Tuple[int, IgnoreRule]]):
+        self._index: Dict[str, int] = {}
+        alternatives = []
+        # Reversed so the first alternative to match is the last rule in file order.
+        for index, rule in reversed(indexed):
+            group = f"r{index}"
+            self._index[group] = index
+            alternatives.append(f"(?P<{group}>{rule.regex})")
+        self._regex = re.compile("|".join(alternatives)) if alternatives else None
+
+    def last_match(self, text: str) -> int:
+        if self._regex is None:
+            return -1
+        match = self._regex.fullmatch(text)
+        return -1 if match is None else self._index[match.lastgroup]
+
+
+class IgnoreRuleSet:
+    """Rules from one ignore file, compiled into anchored and basename regexes.
+
+    ``base`` is the declaring directory relative to the manager root (``""``
+    for the root).  Directory-only rules are compiled into a separate pair so
+    file checks never consider them.
+    """
+
+    def __init__(self, base: str, rules: Sequence[IgnoreRule]):
+        self.base = base
+        self.rules: Tuple[IgnoreRule, ...] = tuple(rules)
+        indexed = list(enumerate(self.rules))
+        anchored = [(i, r) for i, r in indexed if r.anchored]
+        basename = [(i, r) for i, r in indexed if not r.anchored]
+        self._anchored_any = _CombinedRegex(anchored)
+        self._basename_any = _CombinedRegex(basename)
+        self._anchored_files = _CombinedRegex([(i, r) for i, r in anchored if not r.dir_only])
+        self._basename_files = _CombinedRegex([(i, r) for i, r in basename if not r.dir_only])
+
+    @classmethod
+    def from_lines(cls, base: str, lines: Sequence[str]) -> "IgnoreRuleSet":
+        rules = [rule for rule in map(compile_ignore_rule, lines) if rule is not None]
+        return cls(base, rules)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def match(self, rel: str, name: str, is_dir: bool) -> Optional[IgnoreRule]:
+        """Return the last rule matching ``rel`` (relative to the manager root)."""
+        if self.base:
+            rel = rel[len(self.base) + 1 :]
+        if is_dir:
+            index = max(self._anchored_any.last_match(rel), self._basename_any.last_match(name))
+        else:
+            index = max(self._anchored_files.last_match(rel), self._basename_files.last_match(name))
+        return self.rules[index] if index >= 0 else None
+
+
 class IgnorePatternManager:
-    """Manages ignore patterns from .gitignore and .mcp-index-ignore at the repo root.
+    """Manages ignore patterns from .gitignore and .mcp-index-ignore files.
 
-    Only the root-level .gitignore is read. Nested .gitignore files are not traversed —
-    this is a deliberate P1 scope limitation. Support for nested .gitignore requires
-    adding a pathspec dependency and is tracked as future work.
+    The root ``.gitignore`` and ``.mcp-index-ignore`` form the root rule set;
+    a ``.gitignore`` in any subdirectory is loaded the first time a path below
+    it is checked and takes precedence over its ancestors' rules.
     """
 
-    def __init__(self, root_path: Path = None):
+    def __init__(self, root_path: Path = None, dir_cache_size: int = _DIR_CACHE_SIZE):
         """
         Initialize the ignore pattern manager.
 
         Args:
             root_path: Root directory to look for ignore files. Defaults to current directory.
+            dir_cache_size: Number of per-directory decisions kept in the LRU.
         """
         self.root_path = root_path or Path.cwd()
+        self._root_prefix = str(self.root_path).rstrip(os.sep) + os.sep
+        self._dir_cache_size = dir_cache_size
+        self._lock = threading.Lock()
+        self._dir_cache: "OrderedDict[str, bool]" = OrderedDict()
+        self._ruleset_cache: "OrderedDict[str, Tuple[IgnoreRuleSet, ...]]" = OrderedDict()
+        self.dir_cache_hits = 0
+        self.dir_cache_misses = 0
         self._patterns: List[str] = []
         self._gitignore_patterns: List[str] = []
         self._mcp_ignore_patterns: List[str] = []
+        self._root_rules = IgnoreRuleSet("", [])
         self._load_patterns()
 
     def _load_patterns(self):
@@ -93,27 +262,29 @@ class IgnorePatternManager:
 
         # Combine all patterns
         self._patterns = self._gitignore_patterns + self._mcp_ignore_patterns
+        self._root_rules = IgnoreRuleSet.from_lines("", self._patterns)
+        with self._lock:
+            self._dir_cache.clear()
+            self._ruleset_cache.clear()
 
         logger.info(f"Loaded {len(self._patterns)} ignore patterns total")
 
-    def _load_gitignore_patterns(self) -> List[str]:
-        """Load patterns from .gitignore file."""
+    def _load_gitignore_patterns(self, directory: Optional[Path] = None) -> List[str]:
+        """Load patterns from the .gitignore file in ``directory`` (default: root)."""
         patterns = []
-        gitignore_path = self.root_path / ".gitignore"
+        gitignore_path = (directory or self.root_path) / ".gitignore"
 
-        if gitignore_path.exists():
+        if gitignore_path.is_file():
             try:
                 with open(gitignore_path, "r") as f:
                     for line in f:
                         line = line.strip()
                         # Skip comments and empty lines
                         if line and not line.startswith("#"):
-                            # Skip negation patterns for now
-                            if not line.startswith("!"):
-                                patterns.append(line)
-                logger.debug(f"Loaded {len(patterns)} patterns from .gitignore")
+                            patterns.append(line)
+                logger.debug(f"Loaded {len(patterns)} patterns from {gitignore_path}")
             except Exception as e:
-                logger.error(f"Error reading .gitignore: {e}")
+                logger.error(f"Error reading {gitignore_path}: {e}")
 
         return patterns
 
@@ -174,48 +345,112 @@ class IgnorePatternManager:
 
         return patterns
 
-    def should_ignore(self, file_path: Path) -> bool:
+    def should_ignore(self, file_path: Path, is_dir: Optional[bool] = None) -> bool:
         """
         Check if a file should be ignored based on all patterns.
 
         Args:
             file_path: Path to check (can be absolute or relative)
+            is_dir: Whether the path is a directory; looked up on disk only when
+                a directory-only pattern decides the outcome and this is None.
 
         Returns:
             True if file should be ignored, False otherwise
         """
-        # Convert to relative path for pattern matching
-        try:
-            if file_path.is_absolute():
-                rel_path = file_path.relative_to(self.root_path)
-            else:
-                rel_path = file_path
-        except ValueError:
-            # Path is outside root, use as-is
-            rel_path = file_path
-
-        # Convert to string for pattern matching
-        path_str = str(rel_path).replace("\\", "/")
-
-        for pattern in self._patterns:
-            # Handle directory patterns
-            if pattern.endswith("/"):
-                # Check if any parent directory matches
-                for parent in rel_path.parents:
-                    if fnmatch.fnmatch(parent.name, pattern[:-1]):
-                        return True
-                # Check if the path itself is a directory matching the pattern
-                if rel_path.name == pattern[:-1]:
-                    return True
-            else:
-                # Check file patterns
-                if fnmatch.fnmatch(path_str, pattern):
-                    return True
-                # Also check just the filename
-                if fnmatch.fnmatch(rel_path.name, pattern):
-                    return True
-
-        return False
+        rel = self._relative_posix(file_path)
+        if not rel:
+            return False
+        parent, _, name = rel.rpartition("/")
+        if parent and self._is_dir_ignored(parent):
+            return True
+        if is_dir:
+            return self._is_dir_ignored(rel)
+        return self._decide(parent, rel, name, is_dir)
+
+    def is_dir_ignored(self, dir_path: Path) -> bool:
+        """Return True if ``dir_path`` or any of its ancestors is ignored.
+
+        Answers come from the per-directory LRU, so walkers can call this for
+        every directory they visit and prune ignored subtrees.
+        """
+        rel = self._relative_posix(dir_path)
+        return bool(rel) and self._is_dir_ignored(rel)
+
+    def _relative_posix(self, file_path: Path) -> str:
+        path_str = str(file_path)
+        if path_str.startswith(self._root_prefix):
+            rel = path_str[len(self._root_prefix) :]
+        elif os.path.isabs(path_str):
+            try:
+                rel = str(Path(path_str).relative_to(self.root_path))
+            except ValueError:
+                # Path is outside root, use as-is
+                rel = path_str.lstrip(os.sep)
+        else:
+            rel = path_str
+        if os.sep != "/":
+            rel = rel.replace(os.sep, "/")
+        return "" if rel == "." else rel.strip("/")
+
+    def _is_dir_ignored(self, rel_dir: str) -> bool:
+        with self._lock:
+            cached = self._dir_cache.get(rel_dir)
+            if cached is not None:
+                self._dir_cache.move_to_end(rel_dir)
+                self.dir_cache_hits += 1
+                return cached
+            self.dir_cache_misses += 1
+
+        parent, _, name = rel_dir.rpartition("/")
+        # Nothing below an ignored directory can be re-included.
+        ignored = bool(parent) and self._is_dir_ignored(parent)
+        if not ignored:
+            ignored = self._decide(parent, rel_dir, name, True)
+
+        with self._lock:
+            self._dir_cache[rel_dir] = ignored
+            while len(self._dir_cache) > self._dir_cache_size:
+                self._dir_cache.popitem(last=False)
+        return ignored
+
+    def _decide(self, parent: str, rel: str, name: str, is_dir: Optional[bool]) -> bool:
+        rule = self._last_match(parent, rel, name, is_dir is not False)
+        if rule is not None and rule.dir_only and is_dir is None:
+            if not (self.root_path / rel).is_dir():
+                rule = self._last_match(parent, rel, name, False)
+        return rule is not None and not rule.negate
+
+    def _last_match(self, parent: str, rel: str, name: str, is_dir: bool) -> Optional[IgnoreRule]:
+        winner = None
+        # Rule sets run root first, so a deeper .gitignore overrides its ancestors.
+        for ruleset in self._rulesets_for(parent):
+            rule = ruleset.match(rel, name, is_dir)
+            if rule is not None:
+                winner = rule
+        return winner
+
+    def _rulesets_for(self, rel_dir: str) -> Tuple[IgnoreRuleSet, ...]:
+        """Return the rule sets that apply to entries directly inside ``rel_dir``."""
+        with self._lock:
+            cached = self._ruleset_cache.get(rel_dir)
+            if cached is not None:
+                self._ruleset_cache.move_to_end(rel_dir)
+                return cached
+
+        if rel_dir:
+            inherited = self._rulesets_for(rel_dir.rpartition("/")[0])
+            nested = IgnoreRuleSet.from_lines(
+                rel_dir, self._load_gitignore_patterns(self.root_path / rel_dir)
+            )
+            rulesets = inherited + (nested,) if nested else inherited
+        else:
+            rulesets = (self._root_rules,) if self._root_rules else ()
+
+        with self._lock:
+            self._ruleset_cache[rel_dir] = rulesets
+            while len(self._ruleset_cache) > self._dir_cache_size:
+                self._ruleset_cache.popitem(last=False)
+        return rulesets
 
     def get_patterns(self) -> List[str]:
         """Get all loaded patterns."""
@@ -0,0 +1,201 @@
+"""Import and initialization timing tree for MCP server startup.
+
+Enabled by ``MCP_STARTUP_PROFILE=1``: ``mcp_server/__init__.py`` installs the
+profiler as the first thing the package does, so every later first-time module
+import is recorded (like ``python -X importtime``, but nested under the named
+initialization spans that triggered it).  The tree is written to stderr once,
+when the first tool call reaches its handler or at interpreter exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import importlib.abc
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import IO, ContextManager, Iterator, List, Optional
+
+ENV_FLAG = "MCP_STARTUP_PROFILE"
+
+_DEFAULT_MIN_MS = 1.0
+
+
+@dataclass
+class ProfileNode:
+    """One timed import or span; ``elapsed`` is inclusive of its children."""
+
+    name: str
+    kind: str
+    start: float
+    elapsed: float = 0.0
+    children: List["ProfileNode"] = field(default_factory=list)
+
+
+class _TimingLoader(importlib.abc.Loader):
+    """Wraps a module's real loader to time ``exec_module``."""
+
+    def __init__(self, loader, profiler: "StartupProfiler", fullname: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._fullname = fullname
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        # Hand the module its real loader so resource readers etc. keep working.
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.span(self._fullname, kind="import"):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta-path hook that resolves specs through the other finders."""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path=None, target=None):
+        spec = None
+        for finder in list(sys.meta_path):
+            find_spec = getattr(finder, "find_spec", None)
+            if finder is self or find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        if spec is None or spec.origin is None:
+            return spec
+        loader = spec.loader
+        if loader is None or isinstance(loader, _TimingLoader):
+            return spec
+        if not hasattr(loader, "exec_module"):
+            return spec
+        spec.loader = _TimingLoader(loader, self._profiler, fullname)
+        return spec
+
+
+class StartupProfiler:
+    """Collects a timing tree of imports and named spans across threads.
+
+    Each thread nests its spans on its own stack; spans opened on a thread
+    with nothing open attach to the root.
+    """
+
+    def __init__(self, min_ms: float = _DEFAULT_MIN_MS):
+        self.min_ms = min_ms
+        self.root = ProfileNode("startup", "root", time.perf_counter())
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finder: Optional[_TimingFinder] = None
+        self._finished = False
+
+    def _stack(self) -> List[ProfileNode]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = [self.root]
+        return stack
+
+    @contextmanager
+    def span(self, name: str, kind: str = "span") -> Iterator[ProfileNode]:
+        stack = self._stack()
+        node = ProfileNode(name, kind, time.perf_counter())
+        with self._lock:
+            stack[-1].children.append(node)
+        stack.append(node)
+        try:
+            yield node
+        finally:
+            node.elapsed = time.perf_counter() - node.start
+            # Coroutines interleave on one thread, so close by identity.
+            stack.remove(node)
+
+    def install_import_hook(self) -> None:
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall_import_hook(self) -> None:
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+
+    def render(self) -> str:
+        """Return the tree as text, folding siblings shorter than ``min_ms``."""
+        if not self._finished:
+            self.root.elapsed = time.perf_counter() - self.root.start
+        lines: List[str] = []
+        with self._lock:
+            self._render(self.root, 0, lines)
+        return "\n".join(lines)
+
+    def _render(self, node: ProfileNode, depth: int, lines: List[str]) -> None:
+        label = f"import {node.name}" if node.kind == "import" else node.name
+        lines.append(f"{node.elapsed * 1000:10.1f} ms  {'  ' * depth}{label}")
+        folded, folded_seconds = 0, 0.0
+        for child in node.children:
+            if child.elapsed * 1000 < self.min_ms:
+                folded += 1
+                folded_seconds += child.elapsed
+                continue
+            self._render(child, depth + 1, lines)
+        if folded:
+            lines.append(
+                f"{folded_seconds * 1000:10.1f} ms  {'  ' * (depth + 1)}"
+                f"({folded} more under {self.min_ms:g} ms)"
+            )
+
+    def finish(self, stream: Optional[IO[str]] = None) -> None:
+        """Stop recording imports and write the tree once."""
+        if self._finished:
+            return
+        self.uninstall_import_hook()
+        self.root.elapsed = time.perf_counter() - self.root.start
+        self._finished = True
+        out = stream if stream is not None else sys.stderr
+        try:
+            out.write(f"--- {ENV_FLAG} timing tree ---\n{self.render()}\n")
+            out.flush()
+        except (OSError, ValueError):
+            pass
+
+
+_active: Optional[StartupProfiler] = None
+
+
+def install() -> StartupProfiler:
+    """Start the process-wide profiler (idempotent) and dump it at exit."""
+    global _active
+    if _active is None:
+        _active = StartupProfiler()
+        _active.install_import_hook()
+        atexit.register(_active.finish)
+    return _active
+
+
+def active_profiler() -> Optional[StartupProfiler]:
+    return _active
+
+
+def profile_span(name: str) -> ContextManager:
+    """Time ``name`` under the active profiler; a no-op when profiling is off."""
+    if _active is None:
+        return nullcontext()
+    return _active.span(name)
+
+
+def finish_startup_profile() -> None:
+    """Write the startup tree if profiling is on; later calls do nothing."""
+    if _active is not None:
+        _active.finish()
@@ -0,0 +1,379 @@
+"""Lightweight in-process tracing for search and indexing hot paths.
+
+A span times one stage (a BM25 query, a reranker call, an embedding request)
+and nests under whichever span is current.  The current span lives in a
+context variable, so it follows work handed to executors that run in a copy
+of the caller's context (``AdmissionController.run``, ``propagate``).  A span
+opened with nothing current starts a new trace.
+
+Every finished span feeds the ``mcp_trace_stage_seconds`` histogram.  When a
+trace's root finishes it is kept in a ring buffer if it was slower than
+``MCP_TRACE_SLOW_MS`` and, if ``MCP_TRACE_OTLP_FILE`` is set, appended to
+that file as one OTLP/JSON ``TracesData`` document per line, which
+OpenTelemetry collectors can ingest without any network exporter.
+
+Spans must not stay open across a ``yield``: a generator shares its
+consumer's context, so a span left current between items would adopt the
+consumer's unrelated work.  Generators time their stages in separate blocks,
+or run under ``Tracer.span_iter``, which makes the span current only while
+the generator computes its next item.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from mcp_server.config.env_vars import (
+    get_trace_buffer_size,
+    get_trace_otlp_file,
+    get_trace_slow_ms,
+    get_tracing_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SERVICE_NAME = "code-index-mcp"
+
+
+@dataclass
+class Span:
+    name: str
+    trace: "Trace"
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    start_ns: int
+    duration: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start - self.trace.root.start) * 1000, 3),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+        }
+        if self.attributes:
+            data["attributes"] = dict(self.attributes)
+        if self.error:
+            data["error"] = self.error
+        return data
+
+    def to_otlp(self) -> Dict[str, Any]:
+        end_ns = self.start_ns + int((self.duration or 0.0) * 1e9)
+        span: Dict[str, Any] = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": 2, "message": self.error}  # STATUS_CODE_ERROR
+        return span
+
+
+class Trace:
+    """The spans of one request, rooted at the first span opened for it."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.root: Span
+        self.spans: List[Span] = []
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration or 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda span: span.start)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "started_at": self.root.start_ns / 1e9,
+            "duration_ms": round(self.duration * 1000, 3),
+            "spans": [span.to_dict() for span in spans],
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "mcp_server.core.tracing"},
+                            "spans": [span.to_otlp() for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        encoded: Dict[str, Any] = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "mcp_current_span", default=None
+)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    """Creates spans, exports stage timings and keeps the slowest traces."""
+
+    def __init__(
+        self,
+        *,
+        enabled: Optional[bool] = None,
+        slow_threshold_ms: Optional[float] = None,
+        buffer_size: Optional[int] = None,
+        otlp_path: Optional[str] = None,
+    ):
+        self.enabled = get_tracing_enabled() if enabled is None else enabled
+        self.slow_threshold = (
+            get_trace_slow_ms() if slow_threshold_ms is None else slow_threshold_ms
+        ) / 1000.0
+        size = get_trace_buffer_size() if buffer_size is None else buffer_size
+        self.otlp_path = get_trace_otlp_file() if otlp_path is None else otlp_path
+        self._slow: Deque[Trace] = deque(maxlen=max(1, size))
+        self._lock = threading.Lock()
+        self.traces_finished = 0
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time the block as ``name``; yields the span, or None when tracing is off."""
+        if not self.enabled:
+            yield None
+            return
+        span = self._open(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Closed from a different context (e.g. an abandoned generator).
+                pass
+            self._finish(span)
+
+    def span_iter(self, name: str, items: Iterable[T], **attributes: Any) -> Iterator[T]:
+        """Time the iteration of ``items`` as ``name``, current only while pulling.
+
+        The span opens on the first pull, under whichever span is current then,
+        and finishes when ``items`` is exhausted, raises or is closed.
+        """
+        if not self.enabled:
+            yield from items
+            return
+        iterator = iter(items)
+        span = self._open(name, attributes)
+        try:
+            while True:
+                token = _current_span.set(span)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    _current_span.reset(token)
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self._finish(span)
+
+    def record(self, name: str, started: float, **attributes: Any) -> None:
+        """Record an already-measured stage that began at ``started`` (perf_counter)."""
+        if not self.enabled:
+            return
+        span = self._open(name, attributes)
+        span.start_ns -= int((span.start - started) * 1e9)
+        span.start = started
+        self._finish(span)
+
+    def _open(self, name: str, attributes: Dict[str, Any]) -> Span:
+        parent = _current_span.get()
+        if parent is not None:
+            trace = parent.trace
+        else:
+            trace = Trace(os.urandom(16).hex())
+        span = Span(
+            name=name,
+            trace=trace,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.perf_counter(),
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        if parent is None:
+            trace.root = span
+        return span
+
+    def _finish(self, span: Span) -> None:
+        span.duration = time.perf_counter() - span.start
+        span.trace.spans.append(span)
+        try:
+            from mcp_server.metrics.prometheus_exporter import record_trace_stage
+
+            record_trace_stage(span.name, span.duration)
+        except Exception:  # pragma: no cover - metrics must never break tracing
+            logger.debug("Failed to record stage timing for %s", span.name, exc_info=True)
+        if span.parent_id is None:
+            self._finish_trace(span.trace)
+
+    def _finish_trace(self, trace: Trace) -> None:
+        with self._lock:
+            self.traces_finished += 1
+            if trace.duration >= self.slow_threshold:
+                self._slow.append(trace)
+        if self.otlp_path:
+            self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_otlp(), separators=(",", ":"))
+        try:
+            with self._lock, open(self.otlp_path, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+        except OSError as exc:
+            logger.warning("Could not append trace to %s: %s", self.otlp_path, exc)
+
+    def slow_traces(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recent slow traces, newest first."""
+        with self._lock:
+            traces = list(self._slow)
+        traces.reverse()
+        if limit is not None:
+            traces = traces[:limit]
+        return [trace.to_dict() for trace in traces]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slow_threshold_ms": self.slow_threshold * 1000,
+                "traces_finished": self.traces_finished,
+                "slow_traces_buffered": len(self._slow),
+                "otlp_file": self.otlp_path,
+            }
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def _reset_tracer() -> None:
+    global _tracer
+    with _tracer_lock:
+        _tracer = None
+
+
+def span(name: str, **attributes: Any):
+    """``get_tracer().span(...)``."""
+    return get_tracer().span(name, **attributes)
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator running each call of the function inside ``span(name)``.
+
+    Generator functions are timed with ``span_iter`` instead, so the span
+    covers the whole iteration without staying current across a ``yield``.
+    """
+
+    def decorate(func: Callable[..., T]) -> Callable[..., T]:
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def iterate(*args: Any, **kwargs: Any) -> Any:
+                yield from get_tracer().span_iter(name, func(*args, **kwargs))
+
+            return iterate
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            with get_tracer().span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def propagate(func: Callable[..., T]) -> Callable[..., T]:
+    """Bind ``func`` to the current context, for threads and executors.
+
+    Each call runs in its own copy, so the result may be submitted many times.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def run(*args: Any, **kwargs: Any) -> T:
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+__all__ = [
+    "Span",
+    "Trace",
+    "Tracer",
+    "current_span",
+    "get_tracer",
+    "propagate",
+    "span",
+    "traced",
+]
@@ -19,6 +19,7 @@ from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from mcp_server.core.errors import record_handled_error
+from mcp_server.core.tracing import propagate
 from mcp_server.dependency_graph.aggregator import DependencyGraphAnalyzer
 from mcp_server.health.repository_readiness import ReadinessClassifier
 from mcp_server.indexer.reranker import IReranker as Reranker
@@ -981,7 +982,7 @@ class CrossRepositorySearchCoordinator:
         as_completed_fn = globals()["as_completed"]
         results: List[CrossRepoSearchResult] = []
         with executor_cls(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(worker, repo) for repo in repos]
+            futures = [executor.submit(propagate(worker), repo) for repo in repos]
             for fut in as_completed_fn(futures):
                 try:
                     results.append(fut.result())
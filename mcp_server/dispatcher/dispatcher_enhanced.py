@@ -10,28 +10,25 @@ import re
 import sqlite3
 import threading
 import time
+from contextlib import nullcontext
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 from ..artifacts.semantic_profiles import SemanticProfileRegistry
 from ..config.env_vars import get_max_file_size_bytes
 from ..config.settings import reload_settings
+from ..core.deadline import bounded_timeout_ms
 from ..core.errors import IndexingError, TransientArtifactError, record_handled_error
 from ..core.ignore_patterns import EXCLUDED_DIR_PARTS as _INDEX_EXCLUDED_DIRS
 from ..core.ignore_patterns import (
     build_walker_filter,
 )
 from ..core.repo_context import RepoContext
-from ..graph import (
-    CHUNKER_AVAILABLE,
-    ContextSelector,
-    GraphAnalyzer,
-    GraphCutResult,
-    GraphNode,
-    XRefAdapter,
-)
+from ..core.tracing import propagate
+from ..core.tracing import span as trace_span
+from ..core.tracing import traced
 from ..indexing.source_metadata import extract_matching_source_metadata
 from ..plugin_base import IPlugin, SearchResult, SymbolDef
 from ..plugins.generic_treesitter_plugin import GenericTreeSitterPlugin
@@ -40,13 +37,14 @@ from ..plugins.plugin_factory import PluginFactory, PluginUnavailableError
 from ..plugins.plugin_set_registry import PluginSetRegistry
 from ..storage.multi_repo_manager import MultiRepositoryManager
 from ..storage.sqlite_store import (
+    _CHUNK_UPSERT_COLUMNS,
     SQLiteStore,
     _merge_chunk_source_metadata,
     assert_chunk_scheme_readable,
     classify_sqlite_storage_failure,
 )
 from ..storage.two_phase import TwoPhaseCommitError, two_phase_commit
-from ..utils.semantic_indexer import SemanticIndexer
+from ..utils.incremental_parse import get_incremental_chunker
 from ..utils.semantic_indexer_registry import SemanticIndexerRegistry
 from .cross_repo_coordinator import (
     CrossRepositorySearchCoordinator,
@@ -62,6 +60,12 @@ from .result_aggregator import (
     ResultAggregator,
 )
 
+if TYPE_CHECKING:
+    # Semantic (qdrant-client) and graph (chunker) stacks are imported on first
+    # use so that processes which never touch them do not pay their import cost.
+    from ..graph import ContextSelector, GraphAnalyzer, GraphCutResult, GraphNode, XRefAdapter
+    from ..utils.semantic_indexer import SemanticIndexer
+
 logger = logging.getLogger(__name__)
 
 
@@ -80,6 +84,10 @@ class SemanticSearchFailure(RuntimeError):
         self.collection_name = collection_name
 
 
+class _BulkChangeFailed(Exception):
+    """Unwinds a failed ``index_changes`` operation so its writes roll back."""
+
+
 class IndexResultStatus(str, Enum):
     INDEXED = "indexed"
     DELETED = "deleted"
@@ -102,9 +110,9 @@ class IndexResult:
 
 @dataclass
 class _GraphState:
-    analyzer: Optional[GraphAnalyzer] = None
-    selector: Optional[ContextSelector] = None
-    nodes: List[GraphNode] = None  # type: ignore[assignment]
+    analyzer: Optional["GraphAnalyzer"] = None
+    selector: Optional["ContextSelector"] = None
+    nodes: List["GraphNode"] = None  # type: ignore[assignment]
     edges: List[Any] = None  # type: ignore[assignment]
 
     def __post_init__(self) -> None:
@@ -189,6 +197,9 @@ _EXACT_BOUNDED_SHELL_PATHS = {
 }
 
 _REPO_SCOPE_SUMMARY_PASS_BUDGET = 8
+# Watcher bulk changes commit every N file operations so one event storm
+# neither holds the writer for its whole duration nor commits per file.
+_BULK_CHANGE_COMMIT_SIZE = 256
 
 
 def _get_profile_collection_name(profile: Any, fallback: str) -> str:
@@ -334,7 +345,7 @@ def _run_coro_blocking(coro: Any) -> Any:
         except BaseException as exc:  # pragma: no cover - propagated to caller
             error["value"] = exc
 
-    thread = threading.Thread(target=_runner, daemon=True)
+    thread = threading.Thread(target=propagate(_runner), daemon=True)
     thread.start()
     thread.join()
     if "value" in error:
@@ -353,7 +364,7 @@ def _run_blocking_with_timeout(func: Any, *, timeout_seconds: float) -> Any:
         except BaseException as exc:  # pragma: no cover - propagated to caller
             error["value"] = exc
 
-    thread = threading.Thread(target=_runner, daemon=True)
+    thread = threading.Thread(target=propagate(_runner), daemon=True)
     thread.start()
     thread.join(timeout_seconds)
     if thread.is_alive():
@@ -591,47 +602,19 @@ class EnhancedDispatcher:
 
         # Per-repo semantic indexer registry (P3)
         self._semantic_registry: Optional[SemanticIndexerRegistry] = semantic_indexer_registry
-        # Fallback process-global semantic indexer for repos not tracked by the registry.
-        self._semantic_indexer_fallback: Optional[SemanticIndexer] = None
-        self._registered_semantic_indexers: Dict[str, SemanticIndexer] = {}
+        # Fallback process-global semantic indexer for repos not tracked by the
+        # registry.  Only the qdrant location is captured here; the indexer (and
+        # with it qdrant-client) is built on first use, see _semantic_indexer_fallback.
+        self._registered_semantic_indexers: Dict[str, "SemanticIndexer"] = {}
         self._registered_semantic_indexer_lock = threading.RLock()
+        self._semantic_fallback_value: Optional["SemanticIndexer"] = None
+        self._semantic_fallback_path: Optional[Path] = None
         if self._semantic_enabled and semantic_indexer_registry is None:
-            try:
-                settings = reload_settings()
-                profile_registry = SemanticProfileRegistry.from_raw(
-                    settings.get_semantic_profiles_config(),
-                    settings.get_semantic_default_profile(),
-                    tool_version=settings.app_version,
-                )
-                semantic_profile_id = settings.get_semantic_default_profile()
-                semantic_profile = profile_registry.get(semantic_profile_id)
-                if semantic_profile is None:
-                    raise RuntimeError(
-                        f"Semantic default profile '{semantic_profile_id}' is not available"
-                    )
-
-                qdrant_path = os.getenv("QDRANT_PATH", "vector_index.qdrant")
-                collection_name = _get_profile_collection_name(
-                    semantic_profile, settings.semantic_collection_name
-                )
-
-                if Path(qdrant_path).exists():
-                    self._semantic_indexer_fallback = SemanticIndexer(
-                        qdrant_path=qdrant_path,
-                        collection=collection_name,
-                        profile_registry=profile_registry,
-                        semantic_profile=semantic_profile_id,
-                    )
-                    logger.info(
-                        "Semantic search initialized: %s at %s (profile=%s)",
-                        collection_name,
-                        qdrant_path,
-                        semantic_profile_id,
-                    )
-                else:
-                    logger.warning(f"Qdrant path not found: {qdrant_path}")
-            except Exception as e:
-                logger.warning(f"Failed to initialize semantic search: {e}")
+            qdrant_path = Path(os.getenv("QDRANT_PATH", "vector_index.qdrant"))
+            if qdrant_path.exists():
+                self._semantic_fallback_path = qdrant_path.absolute()
+            else:
+                logger.warning(f"Qdrant path not found: {qdrant_path}")
 
         # Initialize reranker
         self._reranker = None  # type: Optional[Any]
@@ -676,7 +659,7 @@ class EnhancedDispatcher:
         ]
 
         # Graph analysis components (lazy initialized)
-        self._graph_builder: Optional[XRefAdapter] = None
+        self._graph_builder: Optional["XRefAdapter"] = None
         self._graph_state: Dict[str, _GraphState] = {}
 
         # Bounded fallback timeout (IF-0-P11-2)
@@ -1076,6 +1059,7 @@ class EnhancedDispatcher:
             return matching_plugins
         return self._plugin_set_registry.plugins_for_file(ctx, path)
 
+    @traced("dispatcher.lookup")
     def lookup(self, ctx: RepoContext, symbol: str, limit: int = 20) -> Optional[SymbolDef]:
         """Look up symbol definition within ctx.repo_id."""
         _hp_t0 = time.perf_counter()
@@ -1210,7 +1194,7 @@ class EnhancedDispatcher:
                 plugins=repo_plugins,
                 symbol=symbol,
                 source_ext=source_ext,
-                timeout_ms=self._fallback_timeout_ms,
+                timeout_ms=bounded_timeout_ms(self._fallback_timeout_ms),
                 histogram=self._fallback_histogram,
             )
 
@@ -1223,11 +1207,17 @@ class EnhancedDispatcher:
             return None
         finally:
             try:
+                from mcp_server.metrics.metrics_collector import get_metrics_collector
                 from mcp_server.metrics.prometheus_exporter import get_prometheus_exporter
 
+                _elapsed = time.perf_counter() - _hp_t0
                 _hist = get_prometheus_exporter().dispatcher_lookup_histogram
                 if _hist is not None:
-                    _hist.observe(time.perf_counter() - _hp_t0)
+                    _hist.observe(_elapsed)
+                # Sharded and sketch-backed: p50/p95/p99 via get_quantiles().
+                get_metrics_collector().observe_histogram(
+                    "dispatcher_lookup_duration_seconds", _elapsed
+                )
             except Exception as exc:
                 record_handled_error(__name__, exc)
                 pass
@@ -1541,6 +1531,7 @@ class EnhancedDispatcher:
         self._last_rerank_diagnostics = diagnostics
         logger.info("rerank outcome: %s", diagnostics.to_dict())
 
+    @traced("search.rerank")
     def _apply_reranker(
         self,
         sqlite_store: Optional[SQLiteStore],
@@ -1679,7 +1670,65 @@ class EnhancedDispatcher:
             return False
         return isinstance(getattr(entry, "path", None), (str, Path))
 
-    def _get_semantic_indexer(self, ctx: RepoContext) -> Optional[SemanticIndexer]:
+    @property
+    def _semantic_indexer_fallback(self) -> Optional["SemanticIndexer"]:
+        """Process-global semantic indexer, built on first access."""
+        if self._semantic_fallback_path is not None:
+            with self._registered_semantic_indexer_lock:
+                qdrant_path = self._semantic_fallback_path
+                self._semantic_fallback_path = None
+                if qdrant_path is not None:
+                    self._semantic_fallback_value = self._build_semantic_fallback(qdrant_path)
+        return self._semantic_fallback_value
+
+    @_semantic_indexer_fallback.setter
+    def _semantic_indexer_fallback(self, indexer: Optional["SemanticIndexer"]) -> None:
+        self._semantic_fallback_path = None
+        self._semantic_fallback_value = indexer
+
+    @property
+    def has_semantic_fallback(self) -> bool:
+        """True when a fallback indexer exists or will be built on first use."""
+        return self._semantic_fallback_value is not None or self._semantic_fallback_path is not None
+
+    def _build_semantic_fallback(self, qdrant_path: Path) -> Optional["SemanticIndexer"]:
+        from ..utils.semantic_indexer import SemanticIndexer
+
+        try:
+            settings = reload_settings()
+            profile_registry = SemanticProfileRegistry.from_raw(
+                settings.get_semantic_profiles_config(),
+                settings.get_semantic_default_profile(),
+                tool_version=settings.app_version,
+            )
+            semantic_profile_id = settings.get_semantic_default_profile()
+            semantic_profile = profile_registry.get(semantic_profile_id)
+            if semantic_profile is None:
+                raise RuntimeError(
+                    f"Semantic default profile '{semantic_profile_id}' is not available"
+                )
+
+            collection_name = _get_profile_collection_name(
+                semantic_profile, settings.semantic_collection_name
+            )
+            indexer = SemanticIndexer(
+                qdrant_path=str(qdrant_path),
+                collection=collection_name,
+                profile_registry=profile_registry,
+                semantic_profile=semantic_profile_id,
+            )
+            logger.info(
+                "Semantic search initialized: %s at %s (profile=%s)",
+                collection_name,
+                qdrant_path,
+                semantic_profile_id,
+            )
+            return indexer
+        except Exception as e:
+            logger.warning(f"Failed to initialize semantic search: {e}")
+            return None
+
+    def _get_semantic_indexer(self, ctx: RepoContext) -> Optional["SemanticIndexer"]:
         """Return the SemanticIndexer for ctx.repo_id, or local fallback for legacy contexts."""
         if not getattr(self, "_semantic_enabled", True):
             return None
@@ -1694,7 +1743,7 @@ class EnhancedDispatcher:
 
     def _get_or_build_registered_semantic_indexer(
         self, ctx: RepoContext
-    ) -> Optional[SemanticIndexer]:
+    ) -> Optional["SemanticIndexer"]:
         """Lazily build a repo-scoped semantic indexer for registered contexts.
 
         Some CLI paths construct ``EnhancedDispatcher`` without injecting a
@@ -1737,6 +1786,8 @@ class EnhancedDispatcher:
                 semantic_profile,
                 settings.semantic_collection_name,
             )
+            from ..utils.semantic_indexer import SemanticIndexer
+
             indexer = SemanticIndexer(
                 qdrant_path=str(qdrant_path),
                 profile_registry=profile_registry,
@@ -1838,6 +1889,7 @@ class EnhancedDispatcher:
                 logger.warning("Semantic eviction failed for %s: %s", repo_id, exc)
         return evicted
 
+    @traced("dispatcher.search")
     def search(
         self,
         ctx: RepoContext,
@@ -1887,8 +1939,9 @@ class EnhancedDispatcher:
             if fuzzy and sqlite_store:
                 logger.info("Using fuzzy trigram search (query_chars=%d)", len(query or ""))
                 try:
-                    sym_results = sqlite_store.search_symbols_fuzzy(query, limit)
-                    file_results = sqlite_store.search_files_fuzzy(query, limit)
+                    with trace_span("search.fuzzy"):
+                        sym_results = sqlite_store.search_symbols_fuzzy(query, limit)
+                        file_results = sqlite_store.search_files_fuzzy(query, limit)
 
                     # Merge by file_path, keeping best score
                     merged: Dict[str, Dict] = {}
@@ -1930,7 +1983,8 @@ class EnhancedDispatcher:
                 # Symbol routing: bypass BM25 for explicit symbol-pattern queries.
                 intent, sym_name, kind_hint = classify_query_intent(query)
                 if intent == QueryIntent.SYMBOL:
-                    sym_results = self._symbol_route(sqlite_store, sym_name, kind_hint, limit)
+                    with trace_span("search.symbol_route"):
+                        sym_results = self._symbol_route(sqlite_store, sym_name, kind_hint, limit)
                     if sym_results:
                         logger.info(
                             "Symbol route hit (query_chars=%d, symbol=%r, results=%d)",
@@ -1952,17 +2006,19 @@ class EnhancedDispatcher:
                             # Fetch an oversampled set so path-based penalties can
                             # surface results that BM25 ranked below the cutoff.
                             fetch_limit = max(limit * 8, 50)
-                            results = sqlite_store.search_bm25(
-                                query, table=table, limit=fetch_limit
-                            )
+                            with trace_span("search.bm25", table=table):
+                                results = sqlite_store.search_bm25(
+                                    query, table=table, limit=fetch_limit
+                                )
                             if len(results) < fetch_limit:
                                 or_query = " OR ".join(
                                     t for t in query.split() if re.match(r"[a-zA-Z0-9_]", t)
                                 )
                                 if or_query != query:
-                                    or_results = sqlite_store.search_bm25(
-                                        or_query, table=table, limit=fetch_limit
-                                    )
+                                    with trace_span("search.bm25_or_fallback", table=table):
+                                        or_results = sqlite_store.search_bm25(
+                                            or_query, table=table, limit=fetch_limit
+                                        )
                                     and_paths = {
                                         r.get("filepath") or r.get("file_path", "") for r in results
                                     }
@@ -1990,32 +2046,33 @@ class EnhancedDispatcher:
                                     scored.append((adjusted, file_path, result))
                                 scored.sort(key=lambda t: t[0])
                                 bm25_candidates = []
-                                for adjusted, file_path, result in scored[:limit]:
-                                    chunk = None
-                                    file_id = result.get("file_id")
-                                    if file_id is not None:
-                                        try:
-                                            chunk = sqlite_store.find_best_chunk_for_file(
-                                                int(file_id), query.split()
-                                            )
-                                        except Exception as exc:
-                                            record_handled_error(__name__, exc)
-                                            chunk = None
-                                    bm25_candidates.append(
-                                        {
-                                            "file": file_path,
-                                            "line": (
-                                                chunk["line_start"]
-                                                if chunk
-                                                else result.get("line", 1)
-                                            ),
-                                            "line_end": chunk["line_end"] if chunk else None,
-                                            "symbol": chunk["symbol"] if chunk else None,
-                                            "snippet": result.get("snippet", ""),
-                                            "score": adjusted,
-                                            "language": result.get("language", "unknown"),
-                                        }
-                                    )
+                                with trace_span("search.best_chunk"):
+                                    for adjusted, file_path, result in scored[:limit]:
+                                        chunk = None
+                                        file_id = result.get("file_id")
+                                        if file_id is not None:
+                                            try:
+                                                chunk = sqlite_store.find_best_chunk_for_file(
+                                                    int(file_id), query.split()
+                                                )
+                                            except Exception as exc:
+                                                record_handled_error(__name__, exc)
+                                                chunk = None
+                                        bm25_candidates.append(
+                                            {
+                                                "file": file_path,
+                                                "line": (
+                                                    chunk["line_start"]
+                                                    if chunk
+                                                    else result.get("line", 1)
+                                                ),
+                                                "line_end": chunk["line_end"] if chunk else None,
+                                                "symbol": chunk["symbol"] if chunk else None,
+                                                "snippet": result.get("snippet", ""),
+                                                "score": adjusted,
+                                                "language": result.get("language", "unknown"),
+                                            }
+                                        )
                                 bm25_candidates = self._apply_reranker(
                                     sqlite_store, query, bm25_candidates, limit
                                 )
@@ -2055,7 +2112,8 @@ class EnhancedDispatcher:
                     limit,
                 )
                 try:
-                    semantic_results = _semantic_indexer.search(query=query, limit=limit)
+                    with trace_span("search.semantic"):
+                        semantic_results = _semantic_indexer.search(query=query, limit=limit)
                     candidates = []
                     for result in semantic_results:
                         snippet = result.get("snippet", "")
@@ -2116,7 +2174,8 @@ class EnhancedDispatcher:
                 if semantic and _semantic_indexer:
                     logger.info("No plugins loaded, using semantic search")
                     try:
-                        semantic_results = _semantic_indexer.search(query=query, limit=limit)
+                        with trace_span("search.semantic"):
+                            semantic_results = _semantic_indexer.search(query=query, limit=limit)
                         for result in semantic_results:
                             snippet = result.get("snippet", "")
                             if not snippet and "code" in result:
@@ -2231,7 +2290,8 @@ class EnhancedDispatcher:
                 for search_query in queries:
                     for plugin in repo_plugins:
                         try:
-                            results = list(plugin.search(search_query, opts))
+                            with trace_span("search.plugin", plugin=getattr(plugin, "lang", "")):
+                                results = list(plugin.search(search_query, opts))
                             if results:
                                 if plugin not in all_results_by_plugin:
                                     all_results_by_plugin[plugin] = []
@@ -2379,7 +2439,7 @@ class EnhancedDispatcher:
                     plugins=repo_plugins,
                     symbol=query,
                     source_ext=_search_source_ext,
-                    timeout_ms=self._fallback_timeout_ms,
+                    timeout_ms=bounded_timeout_ms(self._fallback_timeout_ms),
                     histogram=self._fallback_histogram,
                 )
                 if _sym_def is not None:
@@ -2446,11 +2506,17 @@ class EnhancedDispatcher:
             )
         finally:
             try:
+                from mcp_server.metrics.metrics_collector import get_metrics_collector
                 from mcp_server.metrics.prometheus_exporter import get_prometheus_exporter
 
+                _elapsed = time.perf_counter() - _hp_t0
                 _hist = get_prometheus_exporter().dispatcher_search_histogram
                 if _hist is not None:
-                    _hist.observe(time.perf_counter() - _hp_t0)
+                    _hist.observe(_elapsed)
+                # Sharded and sketch-backed: p50/p95/p99 via get_quantiles().
+                get_metrics_collector().observe_histogram(
+                    "dispatcher_search_duration_seconds", _elapsed
+                )
             except Exception as exc:
                 record_handled_error(__name__, exc)
                 pass
@@ -3283,6 +3349,7 @@ class EnhancedDispatcher:
             ).fetchone()
         return int(row[0]) if row else 0
 
+    @traced("index.persist_shard")
     def _persist_index_shard(
         self,
         ctx: RepoContext,
@@ -3327,8 +3394,8 @@ class EnhancedDispatcher:
             # check before any delete/insert. Stamps an empty index; raises
             # ChunkSchemeMismatchError (refusing the write) on a scheme mismatch.
             sqlite_store._assert_chunk_scheme_writable(conn, chunk_type="code")
-            self._clear_file_index_rows(sqlite_store, file_id, conn=conn)
 
+            symbol_rows: List[Tuple[Any, ...]] = []
             for symbol in shard.get("symbols", []) if isinstance(shard, dict) else []:
                 if not isinstance(symbol, dict):
                     continue
@@ -3344,13 +3411,8 @@ class EnhancedDispatcher:
                     line_end = span[1]
                 line_start = int(line_start or 1)
                 line_end = int(line_end or line_start)
-                cursor = conn.execute(
-                    """INSERT INTO symbols
-                       (file_id, name, kind, line_start, line_end, column_start,
-                        column_end, signature, documentation, metadata, token_count, token_model)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                symbol_rows.append(
                     (
-                        file_id,
                         str(name),
                         str(symbol.get("kind") or "symbol"),
                         line_start,
@@ -3360,22 +3422,24 @@ class EnhancedDispatcher:
                         symbol.get("signature"),
                         symbol.get("documentation") or symbol.get("doc"),
                         json.dumps(symbol.get("metadata") or symbol),
-                        None,
-                        None,
-                    ),
+                    )
                 )
-                sqlite_store._store_trigrams(conn, cursor.lastrowid, str(name))
+            self._sync_symbol_rows(sqlite_store, conn, file_id, symbol_rows)
 
             shard_chunks = shard.get("chunks") if isinstance(shard, dict) else None
             if shard_chunks is None:
                 try:
-                    from chunker import chunk_text
-
-                    shard_chunks = [chunk.__dict__ for chunk in chunk_text(content, language)]
+                    shard_chunks = [
+                        chunk.__dict__
+                        for chunk in get_incremental_chunker().chunk(
+                            content, language, path=str(path)
+                        )
+                    ]
                 except Exception as exc:
                     logger.debug("Host chunk derivation failed for %s: %s", path, exc)
                     shard_chunks = []
 
+            chunk_rows: Dict[str, Tuple[Any, ...]] = {}
             for index, chunk in enumerate(shard_chunks):
                 if not isinstance(chunk, dict):
                     continue
@@ -3394,89 +3458,123 @@ class EnhancedDispatcher:
                         f"{relative_path}:{index}:{start}:{end}".encode("utf-8")
                     ).hexdigest()
                 )
-                conn.execute(
-                    """INSERT INTO code_chunks
-                       (file_id, symbol_id, content, content_start, content_end,
-                        line_start, line_end, chunk_id, node_id, treesitter_file_id,
-                        symbol_hash, definition_id, token_count, token_model,
-                        chunk_type, language, node_type, parent_chunk_id, depth,
-                        chunk_index, metadata)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                       ON CONFLICT(file_id, chunk_id) DO UPDATE SET
-                       symbol_id=excluded.symbol_id,
-                       content=excluded.content,
-                       content_start=excluded.content_start,
-                       content_end=excluded.content_end,
-                       line_start=excluded.line_start,
-                       line_end=excluded.line_end,
-                       node_id=excluded.node_id,
-                       treesitter_file_id=excluded.treesitter_file_id,
-                       symbol_hash=excluded.symbol_hash,
-                       definition_id=excluded.definition_id,
-                       token_count=excluded.token_count,
-                       token_model=excluded.token_model,
-                       chunk_type=excluded.chunk_type,
-                       language=excluded.language,
-                       node_type=excluded.node_type,
-                       parent_chunk_id=excluded.parent_chunk_id,
-                       depth=excluded.depth,
-                       chunk_index=excluded.chunk_index,
-                       metadata=excluded.metadata,
-                       updated_at=CURRENT_TIMESTAMP""",
-                    (
-                        file_id,
-                        None,
-                        chunk_content,
-                        start,
-                        end,
-                        line_start,
-                        line_end,
-                        chunk_id,
-                        str(chunk.get("node_id") or chunk_id),
-                        str(chunk.get("file_id") or relative_path),
-                        chunk.get("symbol_hash"),
-                        chunk.get("definition_id"),
-                        chunk.get("token_count"),
-                        chunk.get("token_model"),
-                        chunk.get("chunk_type") or "code",
-                        language,
-                        chunk.get("node_type"),
-                        chunk.get("parent_chunk_id"),
-                        int(chunk.get("depth") or 0),
-                        int(chunk.get("chunk_index") or index),
-                        json.dumps(
-                            _merge_chunk_source_metadata(
-                                chunk.get("metadata"),
-                                chunk_content,
-                                line_start,
-                            )
-                        ),
+                chunk_rows[chunk_id] = (
+                    file_id,
+                    None,
+                    chunk_content,
+                    start,
+                    end,
+                    line_start,
+                    line_end,
+                    chunk_id,
+                    str(chunk.get("node_id") or chunk_id),
+                    str(chunk.get("file_id") or relative_path),
+                    chunk.get("symbol_hash"),
+                    chunk.get("definition_id"),
+                    chunk.get("token_count"),
+                    chunk.get("token_model"),
+                    chunk.get("chunk_type") or "code",
+                    language,
+                    chunk.get("node_type"),
+                    chunk.get("parent_chunk_id"),
+                    int(chunk.get("depth") or 0),
+                    int(chunk.get("chunk_index") or index),
+                    json.dumps(
+                        _merge_chunk_source_metadata(
+                            chunk.get("metadata"),
+                            chunk_content,
+                            line_start,
+                        )
                     ),
                 )
+            self._sync_chunk_rows(sqlite_store, conn, file_id, chunk_rows)
 
+            sqlite_store._collect_chunk_bodies(conn)
             conn.execute("DELETE FROM fts_code WHERE file_id = ?", (str(file_id),))
             conn.execute(
                 "INSERT INTO fts_code (content, file_id) VALUES (?, ?)", (content, file_id)
             )
 
-    def _clear_file_index_rows(
+    # Columns compared to decide whether a stored row is still current; the
+    # token columns are left out so counts filled in later survive a re-save.
+    _SYNCED_CHUNK_COLUMNS = tuple(
+        column
+        for column in _CHUNK_UPSERT_COLUMNS
+        if column not in {"file_id", "content", "token_count", "token_model"}
+    )
+
+    def _sync_symbol_rows(
         self,
         sqlite_store: SQLiteStore,
+        conn: sqlite3.Connection,
         file_id: int,
-        conn: Optional[sqlite3.Connection] = None,
+        rows: List[Tuple[Any, ...]],
     ) -> None:
-        if conn is None:
-            with sqlite_store._get_connection() as owned_conn:
-                self._clear_file_index_rows(sqlite_store, file_id, conn=owned_conn)
-                return
-        conn.execute(
-            "DELETE FROM symbol_trigrams WHERE symbol_id IN "
-            "(SELECT id FROM symbols WHERE file_id = ?)",
+        """Make the file's symbol rows equal ``rows``, touching only the difference.
+
+        An edit to one function leaves every other symbol row, and its
+        trigrams, in place.
+        """
+        existing: Dict[Tuple[Any, ...], List[int]] = {}
+        for row in conn.execute(
+            "SELECT id, name, kind, line_start, line_end, column_start, column_end, "
+            "signature, documentation, metadata FROM symbols WHERE file_id = ?",
             (file_id,),
-        )
-        conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
-        conn.execute("DELETE FROM code_chunks WHERE file_id = ?", (file_id,))
-        conn.execute("DELETE FROM fts_code WHERE file_id = ?", (str(file_id),))
+        ):
+            values = tuple(row)
+            existing.setdefault(values[1:], []).append(values[0])
+
+        inserts = []
+        for values in rows:
+            ids = existing.get(values)
+            if ids:
+                ids.pop()
+            else:
+                inserts.append(values)
+        stale = [(symbol_id,) for ids in existing.values() for symbol_id in ids]
+        if stale:
+            conn.executemany("DELETE FROM symbol_trigrams WHERE symbol_id = ?", stale)
+            conn.executemany("DELETE FROM symbols WHERE id = ?", stale)
+        for values in inserts:
+            cursor = conn.execute(
+                """INSERT INTO symbols
+                   (file_id, name, kind, line_start, line_end, column_start,
+                    column_end, signature, documentation, metadata, token_count, token_model)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (file_id, *values, None, None),
+            )
+            sqlite_store._store_trigrams(conn, cursor.lastrowid, str(values[0]))
+
+    def _sync_chunk_rows(
+        self,
+        sqlite_store: SQLiteStore,
+        conn: sqlite3.Connection,
+        file_id: int,
+        rows: Dict[str, Tuple[Any, ...]],
+    ) -> None:
+        """Make the file's chunk rows equal ``rows`` (keyed by chunk id).
+
+        Rows whose content and position are unchanged are not rewritten, so a
+        save re-persists only the chunks the edit actually touched.
+        """
+        columns = self._SYNCED_CHUNK_COLUMNS
+        positions = [_CHUNK_UPSERT_COLUMNS.index(column) for column in columns]
+        content_sql = sqlite_store._chunk_content_sql("")
+        stored: Dict[str, Tuple[Any, ...]] = {}
+        for row in conn.execute(
+            f"SELECT {content_sql}, {', '.join(columns)} FROM code_chunks WHERE file_id = ?",
+            (file_id,),
+        ):
+            values = tuple(row)
+            stored[values[1 + columns.index("chunk_id")]] = values
+
+        stale = [(file_id, chunk_id) for chunk_id in stored if chunk_id not in rows]
+        if stale:
+            conn.executemany("DELETE FROM code_chunks WHERE file_id = ? AND chunk_id = ?", stale)
+        for chunk_id, values in rows.items():
+            current = (values[2], *(values[position] for position in positions))
+            if stored.get(chunk_id) != current:
+                sqlite_store._upsert_chunk_row(conn, values)
 
     def get_statistics(self, ctx: RepoContext) -> Dict[str, Any]:
         """Get statistics about indexed files and languages."""
@@ -3617,7 +3715,7 @@ class EnhancedDispatcher:
                         dirname
                         for dirname in dirnames
                         if dirname not in _INDEX_EXCLUDED_DIRS
-                        and not is_excluded(root_path / dirname)
+                        and not is_excluded(root_path / dirname, is_dir=True)
                     ]
                     for filename in filenames:
                         yield root_path / filename
@@ -3659,7 +3757,7 @@ class EnhancedDispatcher:
                 stats["ignored_files"] += 1
                 continue
 
-            if is_excluded(path):
+            if is_excluded(path, is_dir=False):
                 stats["ignored_files"] += 1
                 continue
 
@@ -4158,11 +4256,15 @@ class EnhancedDispatcher:
         old_path: Union[Path, str],
         new_path: Union[Path, str],
         content_hash: Optional[str] = None,
+        do_semantic: bool = True,
     ) -> IndexResult:
         """Relocate a file in the per-repo index.
 
-        SQLite path-update is the primary op; semantic re-embed is the shadow op, both
-        wrapped in two_phase_commit so a semantic-indexer failure rolls SQLite back.
+        SQLite path-update is the primary op; moving the file's vectors is the shadow
+        op, both wrapped in two_phase_commit so a semantic-indexer failure rolls SQLite
+        back.  Vectors are moved with a payload-only update, never re-embedded; only
+        the path-keyed file-summary point is dropped.  ``do_semantic=False`` skips
+        the semantic move and just deletes the stale artifacts.
 
         Lock re-entry: callers inside the watcher loop already hold
         lock_registry.acquire(repo_id); the reentrant RLock makes any re-acquire here
@@ -4225,8 +4327,14 @@ class EnhancedDispatcher:
                 raise FileNotFoundError(old_relative)
             return old_relative, new_relative
 
+        semantic_stats: Dict[str, Any] = {}
+
         def _semantic_shadow(_result: Tuple[str, str]) -> None:
-            if _sem is not None:
+            if _sem is not None and do_semantic:
+                semantic_stats["move"] = _sem.move_semantic_artifacts(
+                    old_path, new_path, invalidation=invalidation, sqlite_store=store
+                )
+            elif _sem is not None:
                 _sem.cleanup_stale_semantic_artifacts(
                     profile_id=_sem.semantic_profile.profile_id,
                     invalidation=invalidation,
@@ -4251,16 +4359,13 @@ class EnhancedDispatcher:
                 shadow_op=_semantic_shadow,
                 rollback=_sqlite_rollback,
             )
-            semantic_stats = None
-            if _sem is not None:
-                semantic_stats = self.rebuild_semantic_for_paths(ctx, [new_path])
             self._operation_stats["moves"] = self._operation_stats.get("moves", 0) + 1
             return IndexResult(
                 status=IndexResultStatus.MOVED,
                 path=new_path,
                 observed_hash=None,
                 actual_hash=None,
-                semantic=semantic_stats,
+                semantic=semantic_stats.get("move"),
             )
         except FileNotFoundError:
             return IndexResult(
@@ -4284,6 +4389,124 @@ class EnhancedDispatcher:
                 error=str(e),
             )
 
+    def index_changes(
+        self,
+        ctx: RepoContext,
+        indexed: Iterable[Union[Path, str]] = (),
+        removed: Iterable[Union[Path, str]] = (),
+        moved: Iterable[Tuple[Union[Path, str], Union[Path, str], Optional[str]]] = (),
+        do_semantic: bool = True,
+    ) -> Dict[str, Any]:
+        """Apply a deduplicated batch of file changes (the watcher's bulk path).
+
+        Moves are applied first, then deletions, then lexical (re)indexing, in
+        write batches of ``_BULK_CHANGE_COMMIT_SIZE`` operations so the store
+        commits once per batch instead of once per file; each operation runs
+        under a savepoint, so a failed one leaves no partial writes behind.
+        Moves carry their vectors
+        over payload-only; semantic re-embedding runs once for every indexed path
+        at the end; with
+        ``do_semantic=False`` it is skipped and left to the caller, whose
+        ``rebuild_semantic_for_paths`` call can then cover several batches.
+
+        ``moved`` holds ``(old_path, new_path, content_hash)`` triples.
+        """
+        stats: Dict[str, Any] = {
+            "moved": 0,
+            "removed": 0,
+            "indexed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "semantic_paths": [],
+            "semantic": None,
+        }
+        operations: List[Tuple[str, Path, Any]] = []
+        operations.extend(("move", Path(old), (Path(new), h)) for old, new, h in moved)
+        operations.extend(("remove", Path(p), None) for p in removed)
+        operations.extend(("index", Path(p), None) for p in indexed)
+        if not operations:
+            return stats
+
+        store = ctx.sqlite_store
+        batched = isinstance(store, SQLiteStore)
+        semantic_paths: List[Path] = []
+        for start in range(0, len(operations), _BULK_CHANGE_COMMIT_SIZE):
+            batch = operations[start : start + _BULK_CHANGE_COMMIT_SIZE]
+            scope = store.write_batch() if batched else nullcontext()
+            with scope:
+                for kind, path, extra in batch:
+                    try:
+                        # A failed operation's partial writes roll back; the batch still commits.
+                        with store.batch_operation() if batched else nullcontext():
+                            outcome = self._apply_bulk_change(ctx, kind, path, extra)
+                            if outcome is None:
+                                raise _BulkChangeFailed(f"{kind} did not complete")
+                    except _BulkChangeFailed:
+                        stats["failed"] += 1
+                        continue
+                    except Exception as e:
+                        logger.error(f"Bulk {kind} failed for {path}: {e}", exc_info=True)
+                        stats["failed"] += 1
+                        continue
+                    stat, indexed_path = outcome
+                    stats[stat] += 1
+                    if indexed_path is not None:
+                        semantic_paths.append(indexed_path)
+
+        stats["semantic_paths"] = semantic_paths
+        if do_semantic and semantic_paths and self._get_semantic_indexer(ctx) is not None:
+            try:
+                stats["semantic"] = self.rebuild_semantic_for_paths(ctx, semantic_paths)
+            except Exception as e:
+                logger.warning(f"Bulk semantic indexing failed: {e}")
+        return stats
+
+    def _apply_bulk_change(
+        self, ctx: RepoContext, kind: str, path: Path, extra: Any
+    ) -> Optional[Tuple[str, Optional[Path]]]:
+        """Apply one ``index_changes`` operation.
+
+        Returns the stats counter to bump and the path to re-embed, or None
+        when the operation failed.
+        """
+        if kind == "move":
+            new_path, content_hash = extra
+            result = self.move_file(ctx, path, new_path, content_hash)
+            return ("moved", None) if result.status == IndexResultStatus.MOVED else None
+        if kind == "remove":
+            result = self.remove_file(ctx, path)
+            return None if result.status == IndexResultStatus.ERROR else ("removed", None)
+        result = self.index_file(ctx, path, do_semantic=False)
+        if result.status == IndexResultStatus.INDEXED:
+            return "indexed", result.path
+        if result.status == IndexResultStatus.SKIPPED_UNCHANGED:
+            return "skipped", None
+        return None
+
+    def apply_semantic_changes(
+        self,
+        ctx: RepoContext,
+        indexed: Iterable[Union[Path, str]] = (),
+        removed: Iterable[Union[Path, str]] = (),
+        moved: Iterable[Tuple[Union[Path, str], Union[Path, str]]] = (),
+    ) -> Dict[str, Any]:
+        """Bring the vectors in line with lexical changes made without them.
+
+        Index worker processes sync with semantic indexing disabled, so the
+        process that owns the Qdrant store replays their changes here: moves
+        are payload-only, removals delete by path and indexed paths are
+        re-embedded.
+        """
+        _sem = self._get_semantic_indexer(ctx)
+        if _sem is None:
+            return {"semantic_stage": "skipped"}
+        moved = list(moved)
+        if moved:
+            _sem.move_files(moved)
+        for path in removed:
+            _sem.remove_file(path)
+        return self.rebuild_semantic_for_paths(ctx, [Path(path) for path in indexed])
+
     async def cross_repo_symbol_search(
         self,
         contexts: List[RepoContext],
@@ -4413,6 +4636,8 @@ class EnhancedDispatcher:
         Returns:
             True if graph is initialized, False otherwise
         """
+        from ..graph import CHUNKER_AVAILABLE, ContextSelector, GraphAnalyzer, XRefAdapter
+
         if not CHUNKER_AVAILABLE:
             logger.warning("Graph features not available: TreeSitter Chunker not installed")
             return False
@@ -4503,7 +4728,7 @@ class EnhancedDispatcher:
         radius: int = 2,
         budget: int = 200,
         weights: Optional[Dict[str, float]] = None,
-    ) -> Optional[GraphCutResult]:
+    ) -> Optional["GraphCutResult"]:
         """Budgeted graph-cut over the symbols' neighborhood within ctx.repo_id.
 
         Args:
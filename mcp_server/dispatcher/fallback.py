@@ -6,6 +6,7 @@ from concurrent.futures import TimeoutError as FuturesTimeout
 from typing import Any, Iterable, Optional
 
 from mcp_server.core.errors import record_handled_error
+from mcp_server.core.tracing import propagate
 from mcp_server.plugin_base import IPlugin, SymbolDef
 from mcp_server.plugin_system.plugin_registry import PluginRegistry
 
@@ -48,7 +49,7 @@ def run_gated_fallback(
         t_start = time.monotonic()
         ex = ThreadPoolExecutor(max_workers=1)
         try:
-            future = ex.submit(plugin.getDefinition, symbol)
+            future = ex.submit(propagate(plugin.getDefinition), symbol)
             try:
                 result = future.result(timeout=timeout_s)
             except FuturesTimeout:
@@ -19,12 +19,25 @@ Consumers should import ``DispatcherProtocol`` from ``mcp_server.dispatcher``.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Protocol, Tuple, Union, runtime_checkable
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    Union,
+    runtime_checkable,
+)
 
 from mcp_server.core.repo_context import RepoContext
-from mcp_server.graph import GraphCutResult
 from mcp_server.plugin_base import IPlugin, SearchResult, SymbolDef
 
+if TYPE_CHECKING:
+    from mcp_server.graph import GraphCutResult
+
 
 @runtime_checkable
 class DispatcherProtocol(Protocol):
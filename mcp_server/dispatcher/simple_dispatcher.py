@@ -2,13 +2,15 @@
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from ..core.errors import record_handled_error
 from ..core.repo_context import RepoContext
-from ..graph import GraphCutResult
 from ..plugin_base import IPlugin, SearchResult, SymbolDef
 
+if TYPE_CHECKING:
+    from ..graph import GraphCutResult
+
 logger = logging.getLogger(__name__)
 
 
@@ -156,7 +158,7 @@ class SimpleDispatcher:
         radius: int = 2,
         budget: int = 200,
         weights: Optional[Dict[str, float]] = None,
-    ) -> Optional[GraphCutResult]:
+    ) -> Optional["GraphCutResult"]:
         raise NotImplementedError("SimpleDispatcher does not support get_context_for_symbols")
 
     def find_symbol_dependencies(
@@ -37,6 +37,7 @@ from .document_interfaces import (
     Section,
 )
 from .metadata_extractor import MetadataExtractor
+from .section_cache import DocumentSection, SectionChunkCache, section_digest
 from .semantic_chunker import (
     ChunkingContext,
     ContextWindow,
@@ -91,4 +92,7 @@ __all__ = [
     "PromptTemplateRegistry",
     "ContextCache",
     "create_contextual_embedding_service",
+    "DocumentSection",
+    "SectionChunkCache",
+    "section_digest",
 ]
@@ -14,6 +14,7 @@ from mcp_server.plugins.specialized_plugin_base import SpecializedPluginBase
 from mcp_server.storage.sqlite_store import SQLiteStore
 
 from . import document_interfaces as document_contracts
+from .section_cache import DocumentSection, SectionChunkCache, section_digest
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,8 @@ class BaseDocumentPlugin(SpecializedPluginBase):
         # Document-specific caches
         self._structure_cache: Dict[str, DocumentStructure] = {}
         self._chunk_cache: Dict[str, List[DocumentChunk]] = {}
+        # Per-section chunk memos, so edits only rebuild the sections they touch
+        self._section_chunks = SectionChunkCache()
 
         # Supported document types
         self.supported_extensions = self._get_supported_extensions()
@@ -195,10 +198,7 @@ class BaseDocumentPlugin(SpecializedPluginBase):
 
     def chunk_document(self, content: str, file_path: Path) -> List[DocumentChunk]:
         """Chunk document into overlapping segments optimized for embeddings."""
-        # Check cache first
         cache_key = str(file_path)
-        if cache_key in self._chunk_cache:
-            return self._chunk_cache[cache_key]
 
         # Extract structure first
         structure = self.extract_structure(content, file_path)
@@ -206,42 +206,73 @@ class BaseDocumentPlugin(SpecializedPluginBase):
         # Parse to plain text
         plain_text = self.parse_content(content, file_path)
 
-        # Perform intelligent chunking
-        chunks = self._intelligent_chunk(plain_text, structure)
+        # Perform intelligent chunking; unchanged sections are reused
+        chunks = self._intelligent_chunk(plain_text, structure, cache_key)
 
         # Cache results
         self._chunk_cache[cache_key] = chunks
 
         return chunks
 
-    def _intelligent_chunk(self, text: str, structure: DocumentStructure) -> List[DocumentChunk]:
-        """Perform structure-aware chunking."""
-        chunks = []
-        chunk_index = 0
+    def _intelligent_chunk(
+        self, text: str, structure: DocumentStructure, document: str = ""
+    ) -> List[DocumentChunk]:
+        """Perform structure-aware chunking.
+
+        Each section is chunked on its own and memoised under ``document``, so
+        a later call only re-chunks the sections whose text changed.
+        """
+        sizing = (self.chunk_size, self.chunk_overlap)
 
         # Use sections as natural boundaries if available
         if structure.sections:
+            units = []
             for section in structure.sections:
                 section_text = text[section["start_pos"] : section["end_pos"]]
-                section_chunks = self._chunk_text(
-                    section_text,
-                    start_offset=section["start_pos"],
-                    chunk_index_start=chunk_index,
+                title = section.get("title", "")
+                level = section.get("level", 0)
+                digest = section_digest(section_text, title, level, sizing)
+                units.append(
+                    DocumentSection(
+                        digest, start_pos=section["start_pos"], payload=(section_text, title, level)
+                    )
                 )
-
-                # Add section metadata to chunks
-                for chunk in section_chunks:
-                    chunk.metadata["section"] = section.get("title", "")
-                    chunk.metadata["section_level"] = section.get("level", 0)
-
-                chunks.extend(section_chunks)
-                chunk_index += len(section_chunks)
         else:
             # Fall back to simple chunking
-            chunks = self._chunk_text(text, chunk_index_start=0)
-
+            units = [DocumentSection(section_digest(text, None, None, sizing))]
+
+        def build(unit: DocumentSection) -> List[DocumentChunk]:
+            if unit.payload is None:
+                return self._chunk_text(text, chunk_index_start=0)
+            section_text, title, level = unit.payload
+            section_chunks = self._chunk_text(section_text, start_offset=unit.start_pos)
+            # Add section metadata to chunks
+            for chunk in section_chunks:
+                chunk.metadata["section"] = title
+                chunk.metadata["section_level"] = level
+            return section_chunks
+
+        chunks = self._section_chunks.rechunk(
+            document,
+            units,
+            build=build,
+            relocate=self._relocate_chunk,
+            assign_id=self._assign_chunk_id,
+        )
+        for index, chunk in enumerate(chunks):
+            chunk.chunk_index = index
         return chunks
 
+    @staticmethod
+    def _relocate_chunk(chunk: DocumentChunk, _line_delta: int, pos_delta: int) -> None:
+        """Move a reused chunk to its section's new offset."""
+        chunk.start_pos += pos_delta
+        chunk.end_pos += pos_delta
+
+    @staticmethod
+    def _assign_chunk_id(chunk: DocumentChunk, chunk_id: str) -> None:
+        chunk.metadata["chunk_id"] = chunk_id
+
     def _chunk_text(
         self, text: str, start_offset: int = 0, chunk_index_start: int = 0
     ) -> List[DocumentChunk]:
@@ -429,15 +460,38 @@ class BaseDocumentPlugin(SpecializedPluginBase):
         }
 
     def _index_chunks_semantically(
-        self, file_path: str, chunks: List[DocumentChunk], metadata: DocumentMetadata
+        self, file_path: str, chunks: List[Any], metadata: DocumentMetadata
     ):
-        """Index document chunks for semantic search with contextual embeddings."""
+        """Index document chunks for semantic search with contextual embeddings.
+
+        Accepts this module's chunks and the ``document_interfaces`` chunks the
+        Markdown plugin produces. Only chunks whose contextual text changed since
+        the document was last indexed are re-embedded; vectors of changed or
+        removed chunks are dropped, and reused chunks that moved get their
+        ``line``/``span`` payload updated in place.
+        """
         # Extract document structure for context
         structure = self._structure_cache.get(file_path)
+        pending = []
 
         for i, chunk in enumerate(chunks):
-            # Create a unique identifier for the chunk
-            chunk_id = f"{file_path}:chunk:{chunk.chunk_index}"
+            contract_chunk = isinstance(chunk, document_contracts.DocumentChunk)
+            if contract_chunk:
+                # Markdown chunks carry a content-derived id and their section path
+                stable_id = chunk.id
+                chunk_index = chunk.metadata.chunk_index
+                section = (chunk.metadata.section_hierarchy or [""])[-1]
+                line = chunk.metadata.line_start
+                span = (chunk.metadata.line_start, chunk.metadata.line_end)
+            else:
+                # Section chunking gives a content-derived id that survives edits
+                # elsewhere in the document; older chunks fall back to position
+                stable_id = chunk.metadata.get("chunk_id")
+                chunk_index = chunk.chunk_index
+                section = chunk.metadata.get("section") or ""
+                line = chunk.chunk_index
+                span = (chunk.start_pos, chunk.end_pos)
+            chunk_id = f"{file_path}:chunk:{stable_id or chunk_index}"
 
             # Build contextual embedding text
             contextual_parts = []
@@ -454,16 +508,18 @@ class BaseDocumentPlugin(SpecializedPluginBase):
 
             # 2. Section hierarchy context
             section_context = []
-            if chunk.metadata.get("section"):
-                section_context.append(chunk.metadata["section"])
+            if contract_chunk:
+                section_context = list(chunk.metadata.section_hierarchy)
+            elif section:
+                section_context.append(section)
 
                 # Find parent sections if structure is available
                 if structure:
-                    for section in structure.sections:
-                        if section.get("title") == chunk.metadata["section"]:
+                    for entry in structure.sections:
+                        if entry.get("title") == section:
                             # Build hierarchy path
-                            parent = section.get("parent")
-                            hierarchy = [chunk.metadata["section"]]
+                            parent = entry.get("parent")
+                            hierarchy = [section]
                             while parent:
                                 hierarchy.insert(0, parent)
                                 # Find parent's parent
@@ -498,47 +554,111 @@ class BaseDocumentPlugin(SpecializedPluginBase):
                     contextual_parts.append(f"Following context: {context_after}...")
 
             # 4. Chunk content (optimized for embedding)
-            chunk_content = chunk.embedding_text or chunk.content
+            chunk_content = getattr(chunk, "embedding_text", None) or chunk.content
             contextual_parts.append(f"Content: {chunk_content}")
 
             # Combine all contextual information
             contextual_text = "\n\n".join(contextual_parts)
 
-            # Store contextual information in chunk metadata
-            chunk.metadata["contextual_text"] = contextual_text
-            chunk.metadata["context_before"] = context_before
-            chunk.metadata["context_after"] = context_after
-            chunk.metadata["section_hierarchy"] = section_context
-            chunk.metadata["document_title"] = metadata.title
-            chunk.metadata["document_type"] = metadata.document_type
-            chunk.metadata["document_tags"] = metadata.tags
+            if contract_chunk:
+                chunk_metadata = chunk.to_dict()["metadata"]
+            else:
+                # Store contextual information in chunk metadata
+                chunk.metadata["contextual_text"] = contextual_text
+                chunk.metadata["context_before"] = context_before
+                chunk.metadata["context_after"] = context_after
+                chunk.metadata["section_hierarchy"] = section_context
+                chunk.metadata["document_title"] = metadata.title
+                chunk.metadata["document_type"] = metadata.document_type
+                chunk.metadata["document_tags"] = metadata.tags
+                chunk_metadata = chunk.metadata
+            pending.append(
+                {
+                    "chunk_id": chunk_id,
+                    "chunk": chunk,
+                    "chunk_index": chunk_index,
+                    "section": section,
+                    "section_context": section_context,
+                    "line": line,
+                    "span": span,
+                    "contextual_text": contextual_text,
+                    "context_before": context_before,
+                    "context_after": context_after,
+                    "chunk_metadata": chunk_metadata,
+                }
+            )
+
+        texts = {entry["chunk_id"]: entry["contextual_text"] for entry in pending}
+        positions = {entry["chunk_id"]: (entry["line"], list(entry["span"])) for entry in pending}
+        if not self._section_chunks.has_embeddings(file_path):
+            # Chunk ids are content-derived, so without a record of which ids this
+            # file's vectors carry (first pass, restart, eviction) the old ones can
+            # only be found by path. Clear them; every chunk is re-embedded below.
+            self.semantic_indexer.remove_file(file_path)
+        to_embed, stale = self._section_chunks.embedding_delta(file_path, texts)
+        if stale:
+            self._drop_stale_chunk_vectors(stale)
+
+        to_embed = set(to_embed)
+        moved = set(self._section_chunks.moved_chunks(file_path, positions)) - to_embed
+        for entry in pending:
+            if entry["chunk_id"] not in to_embed:
+                continue
+            chunk = entry["chunk"]
 
             # Index the chunk with contextual embedding
             self.semantic_indexer.index_symbol(
                 file=file_path,
-                name=chunk_id,
+                name=entry["chunk_id"],
                 kind="chunk",
-                signature=f"Chunk {chunk.chunk_index} of {metadata.title or Path(file_path).name}",
-                line=chunk.chunk_index,
-                span=(chunk.start_pos, chunk.end_pos),
+                signature=(
+                    f"Chunk {entry['chunk_index']} of " f"{metadata.title or Path(file_path).name}"
+                ),
+                line=entry["line"],
+                span=entry["span"],
                 doc=chunk.content[:200],  # First 200 chars as doc
-                content=contextual_text,  # Use contextual text for embedding
+                content=entry["contextual_text"],  # Use contextual text for embedding
                 metadata={
-                    "chunk_id": chunk_id,
-                    "contextual_text": contextual_text,
+                    "chunk_id": entry["chunk_id"],
+                    "contextual_text": entry["contextual_text"],
                     "original_content": chunk.content,
-                    "section": chunk.metadata.get("section", ""),
-                    "section_hierarchy": section_context,
+                    "section": entry["section"],
+                    "section_hierarchy": entry["section_context"],
                     "document_title": metadata.title,
                     "document_type": metadata.document_type,
                     "document_tags": metadata.tags,
-                    "context_before": context_before,
-                    "context_after": context_after,
-                    "chunk_metadata": chunk.metadata,
+                    "context_before": entry["context_before"],
+                    "context_after": entry["context_after"],
+                    "chunk_metadata": entry["chunk_metadata"],
                 },
                 sqlite_store=self._sqlite_store,
             )
 
+        if moved:
+            # Same text, new place: rewrite the position payload, keep the vector.
+            self.semantic_indexer.update_chunk_payloads(
+                {
+                    entry["chunk_id"]: {
+                        "line": entry["line"],
+                        "span": list(entry["span"]),
+                        "chunk_metadata": entry["chunk_metadata"],
+                    }
+                    for entry in pending
+                    if entry["chunk_id"] in moved
+                }
+            )
+
+        self._section_chunks.record_embeddings(file_path, texts, positions)
+
+    def _drop_stale_chunk_vectors(self, chunk_ids: List[str]) -> None:
+        """Delete vectors of chunks that changed or disappeared since the last index."""
+        profile = getattr(self.semantic_indexer, "semantic_profile", None)
+        if self._sqlite_store is None or profile is None:
+            return
+        self.semantic_indexer.delete_stale_vectors(
+            profile.profile_id, chunk_ids, sqlite_store=self._sqlite_store
+        )
+
     def getDefinition(self, symbol: str) -> Optional[SymbolDef]:
         """Get definition for a document symbol."""
         # For documents, symbols are document titles or section names
@@ -678,6 +798,7 @@ class BaseDocumentPlugin(SpecializedPluginBase):
         # Clear document-specific caches
         self._structure_cache.pop(file_path, None)
         self._chunk_cache.pop(file_path, None)
+        self._section_chunks.invalidate(file_path)
 
     # Helper methods for subclasses
 
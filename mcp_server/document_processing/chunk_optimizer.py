@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import List, Optional, Tuple
 
+from ..utils.tokenizer import get_tokenizer
 from .document_interfaces import (
     ChunkMetadata,
     ChunkType,
@@ -42,7 +43,7 @@ class ChunkingConfig:
 
 
 class TokenEstimator:
-    """Estimates token count for text without requiring actual tokenizer."""
+    """Counts tokens exactly when a BPE vocabulary is configured, otherwise estimates."""
 
     def __init__(self, estimation_factor: float = 0.75):
         self.estimation_factor = estimation_factor
@@ -59,6 +60,10 @@ class TokenEstimator:
         if not text or text.isspace():
             return 0
 
+        tokenizer = get_tokenizer()
+        if tokenizer.exact:
+            return tokenizer.count(text)
+
         # Basic estimation: characters * factor
         base_estimate = len(text) * self.estimation_factor
 
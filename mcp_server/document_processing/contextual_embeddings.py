@@ -1,15 +1,19 @@
 """Contextual embeddings service using Claude for enhanced semantic understanding."""
 
 import asyncio
+import atexit
 import hashlib
 import json
 import logging
+import sqlite3
+import threading
 import time
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 try:
     from anthropic import AsyncAnthropic
@@ -19,6 +23,11 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
     AsyncAnthropic = None
 
+from ..config.env_vars import (
+    get_context_cache_disk_bytes,
+    get_context_cache_memory_bytes,
+    get_context_cache_write_batch,
+)
 from .document_interfaces import ChunkType, DocumentChunk
 
 logger = logging.getLogger(__name__)
@@ -180,66 +189,297 @@ Focus on: main topic, key points, relationships, and relevant search terms.""",
         return self.templates.get(category, self.templates[DocumentCategory.GENERAL])
 
 
+_CONTEXT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contexts (
+    key TEXT PRIMARY KEY,
+    context TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_contexts_last_used ON contexts(last_used);
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_PREFETCH_BATCH = 500
+
+
 class ContextCache:
-    """Cache for generated contexts to avoid redundant API calls."""
+    """Cache for generated contexts to avoid redundant API calls.
 
-    def __init__(self, cache_dir: Optional[Path] = None):
+    Contexts are keyed by a hash of every input to the prompt (template
+    category, chunk content and type, section hierarchy and the document
+    context) except the document path, so a moved or renamed document still
+    hits. A byte-bounded in-memory LRU sits in front of a single SQLite file
+    (``contexts.db`` in ``cache_dir``) that is itself kept under a size bound
+    by evicting least recently used rows. Writes and recency updates are
+    buffered and flushed in one transaction per ``write_batch`` entries, on
+    :meth:`flush` and at exit.
+    """
+
+    DB_NAME = "contexts.db"
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        *,
+        max_memory_bytes: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None,
+        write_batch: Optional[int] = None,
+    ):
         self.cache_dir = cache_dir or Path.home() / ".cache" / "mcp_server" / "contexts"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.memory_cache: Dict[str, str] = {}
+        self.db_path = self.cache_dir / self.DB_NAME
+        self.max_memory_bytes = (
+            get_context_cache_memory_bytes() if max_memory_bytes is None else max_memory_bytes
+        )
+        self.max_disk_bytes = (
+            get_context_cache_disk_bytes() if max_disk_bytes is None else max_disk_bytes
+        )
+        self.write_batch = max(
+            1, get_context_cache_write_batch() if write_batch is None else write_batch
+        )
 
-    def _get_cache_key(self, chunk: DocumentChunk, template_category: DocumentCategory) -> str:
-        """Generate cache key for a chunk."""
-        content_hash = hashlib.sha256(
-            f"{chunk.content}{chunk.metadata.document_path}{template_category.value}".encode()
-        ).hexdigest()
+        self.memory_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pending: Dict[str, str] = {}
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "flushes": 0, "evicted": 0}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = sqlite3.connect(
+                self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_CONTEXT_SCHEMA)
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"Context cache {self.db_path} unavailable, using memory only: {e}")
+
+        _open_caches.add(self)
+
+    def _get_cache_key(
+        self,
+        chunk: DocumentChunk,
+        template_category: DocumentCategory,
+        document_context: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Generate cache key for a chunk from its prompt inputs, not its location."""
+        parts = (
+            template_category.value,
+            chunk.type.value,
+            " > ".join(chunk.metadata.section_hierarchy),
+            json.dumps(document_context or {}, sort_keys=True, default=str),
+            chunk.content,
+        )
+        content_hash = hashlib.sha256("\0".join(parts).encode("utf-8", "surrogatepass")).hexdigest()
         return content_hash[:16]
 
-    def get(self, chunk: DocumentChunk, template_category: DocumentCategory) -> Optional[str]:
+    def get(
+        self,
+        chunk: DocumentChunk,
+        template_category: DocumentCategory,
+        document_context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[str]:
         """Get cached context if available."""
-        cache_key = self._get_cache_key(chunk, template_category)
+        cache_key = self._get_cache_key(chunk, template_category, document_context)
+
+        with self._lock:
+            # Check memory cache first
+            context = self.memory_cache.get(cache_key)
+            if context is not None:
+                self.memory_cache.move_to_end(cache_key)
+                self._touched[cache_key] = time.time()
+                self._stats["memory_hits"] += 1
+                return context
+
+            # Check disk cache
+            context = self._load([cache_key]).get(cache_key)
+            if context is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(cache_key, context)
+            self._touched[cache_key] = time.time()
+            return context
+
+    def set(
+        self,
+        chunk: DocumentChunk,
+        template_category: DocumentCategory,
+        context: str,
+        document_context: Optional[Dict[str, Any]] = None,
+    ):
+        """Cache generated context."""
+        cache_key = self._get_cache_key(chunk, template_category, document_context)
+
+        with self._lock:
+            # Update memory cache
+            self._remember(cache_key, context)
 
-        # Check memory cache first
-        if cache_key in self.memory_cache:
-            return self.memory_cache[cache_key]
+            # Buffer the disk write
+            self._pending[cache_key] = context
+            self._touched.pop(cache_key, None)
+            if len(self._pending) >= self.write_batch:
+                self.flush()
 
-        # Check disk cache
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        if cache_file.exists():
+    def prefetch(
+        self,
+        items: Iterable[Tuple[DocumentChunk, DocumentCategory]],
+        document_context: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Load the cached contexts of many chunks with a few bulk reads.
+
+        Returns how many of ``items`` now have a context in memory.
+        """
+        keys = list(
+            dict.fromkeys(self._get_cache_key(chunk, cat, document_context) for chunk, cat in items)
+        )
+        with self._lock:
+            missing = [key for key in keys if key not in self.memory_cache]
+            for key, context in self._load(missing).items():
+                self._remember(key, context)
+            return sum(1 for key in keys if key in self.memory_cache)
+
+    def flush(self) -> None:
+        """Write buffered contexts and recency updates in one transaction."""
+        with self._lock:
+            if self._conn is None or not (self._pending or self._touched):
+                self._pending.clear()
+                self._touched.clear()
+                return
+            now = time.time()
+            pending, touched = self._pending, self._touched
+            self._pending, self._touched = {}, {}
             try:
-                with cache_file.open("r") as f:
-                    data = json.load(f)
-                    context = data.get("context")
-                    self.memory_cache[cache_key] = context
-                    return context
-            except Exception as e:
-                logger.warning(f"Failed to load cache file {cache_file}: {e}")
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO contexts(key, context, size, last_used) "
+                        "VALUES (?, ?, ?, ?)",
+                        [
+                            (key, context, _context_size(context), now)
+                            for key, context in pending.items()
+                        ],
+                    )
+                    self._conn.executemany(
+                        "UPDATE contexts SET last_used = ? WHERE key = ?",
+                        [(used, key) for key, used in touched.items()],
+                    )
+                    self._evict_disk()
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+                self._stats["flushes"] += 1
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write context cache {self.db_path}: {e}")
+
+    def clear(self) -> None:
+        """Drop every cached context from memory and disk."""
+        with self._lock:
+            self.memory_cache.clear()
+            self._memory_bytes = 0
+            self._pending.clear()
+            self._touched.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM contexts")
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to clear context cache {self.db_path}: {e}")
+        # Files written by the earlier one-JSON-file-per-context layout
+        for cache_file in self.cache_dir.glob("*.json"):
+            cache_file.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Flush buffered writes and close the database."""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        _open_caches.discard(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and tier sizes."""
+        with self._lock:
+            disk_entries = disk_bytes = 0
+            if self._conn is not None:
+                try:
+                    disk_entries, disk_bytes = self._conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM contexts"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+            return {
+                **self._stats,
+                "memory_entries": len(self.memory_cache),
+                "memory_bytes": self._memory_bytes,
+                "pending_writes": len(self._pending),
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_bytes,
+            }
+
+    def _remember(self, key: str, context: str) -> None:
+        previous = self.memory_cache.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= _context_size(previous)
+        self.memory_cache[key] = context
+        self._memory_bytes += _context_size(context)
+        while self._memory_bytes > self.max_memory_bytes and len(self.memory_cache) > 1:
+            _, evicted = self.memory_cache.popitem(last=False)
+            self._memory_bytes -= _context_size(evicted)
+
+    def _load(self, keys: List[str]) -> Dict[str, str]:
+        found = {key: self._pending[key] for key in keys if key in self._pending}
+        remaining = [key for key in keys if key not in found]
+        if self._conn is None or not remaining:
+            return found
+        try:
+            for start in range(0, len(remaining), _PREFETCH_BATCH):
+                batch = remaining[start : start + _PREFETCH_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    self._conn.execute(
+                        f"SELECT key, context FROM contexts WHERE key IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read context cache {self.db_path}: {e}")
+        return found
 
-        return None
+    def _evict_disk(self) -> None:
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM contexts").fetchone()
+        excess = total - self.max_disk_bytes
+        if excess <= 0:
+            return
+        # Evict down to 90% of the bound so eviction is not repeated every flush.
+        excess += self.max_disk_bytes // 10
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM contexts ORDER BY last_used"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM contexts WHERE key = ?", victims)
+        self._stats["evicted"] += len(victims)
 
-    def set(self, chunk: DocumentChunk, template_category: DocumentCategory, context: str):
-        """Cache generated context."""
-        cache_key = self._get_cache_key(chunk, template_category)
 
-        # Update memory cache
-        self.memory_cache[cache_key] = context
+def _context_size(context: str) -> int:
+    return len(context.encode("utf-8", "surrogatepass"))
+
+
+# Caches still open, flushed by one exit hook instead of one hook per instance.
+_open_caches: "weakref.WeakSet[ContextCache]" = weakref.WeakSet()
 
-        # Save to disk
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        try:
-            with cache_file.open("w") as f:
-                json.dump(
-                    {
-                        "context": context,
-                        "chunk_id": chunk.id,
-                        "document_path": chunk.metadata.document_path,
-                        "timestamp": datetime.now().isoformat(),
-                    },
-                    f,
-                    indent=2,
-                )
-        except Exception as e:
-            logger.warning(f"Failed to save cache file {cache_file}: {e}")
+
+@atexit.register
+def _flush_context_caches() -> None:
+    for cache in list(_open_caches):
+        cache.close()
 
 
 class ContextualEmbeddingService:
@@ -331,7 +571,7 @@ class ContextualEmbeddingService:
             category = self.detect_document_category(chunk, chunk.metadata.document_path)
 
         # Check cache first
-        cached_context = self.cache.get(chunk, category)
+        cached_context = self.cache.get(chunk, category, document_context)
         if cached_context:
             return cached_context, True
 
@@ -346,7 +586,7 @@ class ContextualEmbeddingService:
         if not self.client:
             # Return a mock context if no client
             mock_context = f"Content from {chunk.metadata.document_path} ({category.value}): {chunk.content[:100]}..."
-            self.cache.set(chunk, category, mock_context)
+            self.cache.set(chunk, category, mock_context, document_context)
             return mock_context, False
 
         # Generate context using Claude
@@ -385,7 +625,7 @@ class ContextualEmbeddingService:
                     )
 
                 # Cache the result
-                self.cache.set(chunk, category, context)
+                self.cache.set(chunk, category, context, document_context)
 
                 return context, False
 
@@ -421,6 +661,15 @@ class ContextualEmbeddingService:
         contexts = {}
         tasks = []
 
+        # One bulk read instead of a cache lookup per chunk
+        self.cache.prefetch(
+            [
+                (chunk, self.detect_document_category(chunk, chunk.metadata.document_path))
+                for chunk in chunks
+            ],
+            document_context,
+        )
+
         for chunk in chunks:
             task = self._process_chunk_with_progress(
                 chunk, document_context, contexts, progress_callback
@@ -429,6 +678,7 @@ class ContextualEmbeddingService:
 
         # Process all chunks
         await asyncio.gather(*tasks)
+        self.cache.flush()
 
         self.current_metrics.processing_time = time.time() - start_time
 
@@ -460,10 +710,7 @@ class ContextualEmbeddingService:
 
     def clear_cache(self):
         """Clear the context cache."""
-        self.cache.memory_cache.clear()
-        if self.cache.cache_dir.exists():
-            for cache_file in self.cache.cache_dir.glob("*.json"):
-                cache_file.unlink()
+        self.cache.clear()
 
 
 async def create_contextual_embedding_service(
@@ -0,0 +1,259 @@
+"""Section-level memoisation for incremental document re-chunking.
+
+Document plugins split a file into heading-delimited sections and chunk each
+one independently. :class:`SectionChunkCache` remembers, per document, the
+chunks produced for every section under a digest of everything that chunking
+depended on. On the next pass only sections whose digest changed are rebuilt;
+unchanged sections are copied and relocated to their new offsets.
+
+Chunk ids derive from the section digest rather than the chunk's position, so
+they survive edits elsewhere in the document, and context windows are only
+recomputed for chunks whose neighbours changed. The cache also remembers which
+text was last embedded for each chunk id, and where the chunk was, so callers
+re-embed only the chunks whose embedding input actually changed and merely
+update the stored position of chunks that moved. That record lives only in
+memory: when :meth:`SectionChunkCache.has_embeddings` is False (first pass,
+restart or eviction) callers must clear the document's vectors by path.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_Neighbours = Tuple[Optional[str], Optional[str]]
+
+
+def section_digest(*parts: Any) -> str:
+    """Digest the inputs a section's chunks depend on."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(repr(part).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def stable_chunk_id(document: str, digest: str, occurrence: int, ordinal: int) -> str:
+    """Chunk id that depends on section content, not on the chunk's position."""
+    raw = f"{document}:{digest}:{occurrence}:{ordinal}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+@dataclass
+class DocumentSection:
+    """A heading-delimited slice of a document.
+
+    ``digest`` must cover everything the section's chunks depend on except
+    their absolute position; ``start_line``/``start_pos`` locate the section so
+    reused chunks can be shifted. ``payload`` is handed back to the builder.
+    """
+
+    digest: str
+    start_line: int = 0
+    start_pos: int = 0
+    payload: Any = None
+
+
+@dataclass
+class _SectionMemo:
+    start_line: int
+    start_pos: int
+    chunks: List[Any]
+
+
+@dataclass
+class _DocumentMemo:
+    sections: Dict[Tuple[str, int], _SectionMemo] = field(default_factory=dict)
+    neighbours: Dict[str, _Neighbours] = field(default_factory=dict)
+    embedded: Optional[Dict[str, str]] = None
+    positions: Dict[str, Any] = field(default_factory=dict)
+
+
+class SectionChunkCache:
+    """Bounded LRU of per-document section chunk memos."""
+
+    def __init__(self, max_documents: int = 256):
+        self.max_documents = max(1, int(max_documents))
+        self._documents: "OrderedDict[str, _DocumentMemo]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"sections_built": 0, "sections_reused": 0, "windows_recomputed": 0}
+
+    def rechunk(
+        self,
+        document: str,
+        sections: Sequence[DocumentSection],
+        *,
+        build: Callable[[DocumentSection], List[T]],
+        relocate: Callable[[T, int, int], None],
+        assign_id: Callable[[T, str], None],
+        rewindow: Optional[Callable[[List[T], List[int]], None]] = None,
+    ) -> List[T]:
+        """Chunk ``sections`` in order, rebuilding only those that changed.
+
+        ``build`` chunks one section from scratch. ``relocate(chunk, lines,
+        chars)`` shifts a reused chunk by the distance its section moved and
+        ``assign_id`` stamps the stable chunk id. ``rewindow(chunks, indices)``
+        recomputes context windows for new chunks and for reused chunks whose
+        neighbours changed; every other chunk keeps the windows it had.
+        The returned chunks are owned by the caller.
+        """
+        with self._lock:
+            previous = self._documents.get(document) or _DocumentMemo()
+
+        chunks: List[T] = []
+        ids: List[str] = []
+        reused: List[bool] = []
+        spans: List[Tuple[Tuple[str, int], DocumentSection, Optional[_SectionMemo], int]] = []
+        occurrences: Dict[str, int] = {}
+        built = kept = 0
+
+        for section in sections:
+            occurrence = occurrences.get(section.digest, 0)
+            occurrences[section.digest] = occurrence + 1
+            key = (section.digest, occurrence)
+            memo = previous.sections.get(key)
+            if memo is not None:
+                produced = [copy.deepcopy(chunk) for chunk in memo.chunks]
+                line_delta = section.start_line - memo.start_line
+                pos_delta = section.start_pos - memo.start_pos
+                if line_delta or pos_delta:
+                    for chunk in produced:
+                        relocate(chunk, line_delta, pos_delta)
+                kept += 1
+            else:
+                produced = list(build(section))
+                built += 1
+
+            spans.append((key, section, memo, len(chunks)))
+            for ordinal, chunk in enumerate(produced):
+                chunk_id = stable_chunk_id(document, section.digest, occurrence, ordinal)
+                assign_id(chunk, chunk_id)
+                chunks.append(chunk)
+                ids.append(chunk_id)
+                reused.append(memo is not None)
+
+        neighbours = {
+            chunk_id: (
+                ids[index - 1] if index else None,
+                ids[index + 1] if index + 1 < len(ids) else None,
+            )
+            for index, chunk_id in enumerate(ids)
+        }
+        stale = [
+            index
+            for index, chunk_id in enumerate(ids)
+            if not reused[index] or previous.neighbours.get(chunk_id) != neighbours[chunk_id]
+        ]
+        if stale and rewindow is not None:
+            rewindow(chunks, stale)
+
+        stale_set = set(stale)
+        memo_sections: Dict[Tuple[str, int], _SectionMemo] = {}
+        for position, (key, section, memo, start) in enumerate(spans):
+            end = spans[position + 1][3] if position + 1 < len(spans) else len(chunks)
+            if memo is not None and not stale_set.intersection(range(start, end)):
+                # Nothing about these chunks changed but their offset.
+                memo_sections[key] = memo
+            else:
+                memo_sections[key] = _SectionMemo(
+                    section.start_line,
+                    section.start_pos,
+                    [copy.deepcopy(chunk) for chunk in chunks[start:end]],
+                )
+
+        with self._lock:
+            current = self._documents.get(document)
+            self._documents[document] = _DocumentMemo(
+                sections=memo_sections,
+                neighbours=neighbours,
+                embedded=current.embedded if current is not None else None,
+                positions=current.positions if current is not None else {},
+            )
+            self._documents.move_to_end(document)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+            self._stats["sections_built"] += built
+            self._stats["sections_reused"] += kept
+            self._stats["windows_recomputed"] += len(stale) if rewindow is not None else 0
+        return chunks
+
+    def embedding_delta(
+        self, document: str, texts: Mapping[str, str]
+    ) -> Tuple[List[str], List[str]]:
+        """Compare ``{chunk_id: embedding text}`` with what was last embedded.
+
+        Returns ``(to_embed, stale)``: ids whose text is new or changed, and
+        previously embedded ids whose vectors no longer match (changed or gone).
+        """
+        with self._lock:
+            memo = self._documents.get(document)
+            embedded = dict(memo.embedded or {}) if memo is not None else {}
+        current = {chunk_id: _fingerprint(text) for chunk_id, text in texts.items()}
+        to_embed = [chunk_id for chunk_id, fp in current.items() if embedded.get(chunk_id) != fp]
+        stale = [chunk_id for chunk_id, fp in embedded.items() if current.get(chunk_id) != fp]
+        return to_embed, stale
+
+    def has_embeddings(self, document: str) -> bool:
+        """True when the embedded state of ``document`` was recorded in this cache."""
+        with self._lock:
+            memo = self._documents.get(document)
+            return memo is not None and memo.embedded is not None
+
+    def moved_chunks(self, document: str, positions: Mapping[str, Any]) -> List[str]:
+        """Previously embedded ids whose recorded position differs from ``positions``."""
+        with self._lock:
+            memo = self._documents.get(document)
+            recorded = dict(memo.positions) if memo is not None else {}
+        return [
+            chunk_id
+            for chunk_id, position in positions.items()
+            if chunk_id in recorded and recorded[chunk_id] != position
+        ]
+
+    def record_embeddings(
+        self,
+        document: str,
+        texts: Mapping[str, str],
+        positions: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        """Remember ``texts`` (and where each chunk was) as the embedded state of ``document``."""
+        fingerprints = {chunk_id: _fingerprint(text) for chunk_id, text in texts.items()}
+        with self._lock:
+            memo = self._documents.get(document)
+            if memo is None:
+                memo = self._documents[document] = _DocumentMemo()
+            memo.embedded = fingerprints
+            memo.positions = dict(positions or {})
+            self._documents.move_to_end(document)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def invalidate(self, document: str) -> None:
+        """Forget everything remembered about ``document``."""
+        with self._lock:
+            self._documents.pop(document, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"documents": len(self._documents), **self._stats}
+
+
+__all__ = ["DocumentSection", "SectionChunkCache", "section_digest", "stable_chunk_id"]
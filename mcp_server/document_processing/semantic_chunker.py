@@ -21,6 +21,7 @@ from .document_interfaces import (
     ProcessedDocument,
     Section,
 )
+from .section_cache import DocumentSection, SectionChunkCache, section_digest
 
 
 class DocumentType(Enum):
@@ -260,23 +261,44 @@ class HierarchicalChunker:
         """Create chunks following document hierarchy."""
         chunks = []
 
+        for text, hierarchy, section in self.plan_units(structure):
+            chunks.extend(self.chunk_unit(text, hierarchy, section, len(chunks)))
+
+        return chunks
+
+    def plan_units(self, structure: DocumentStructure) -> List[Tuple[str, List[str], Section]]:
+        """Decide which text each group of chunks covers, without building them.
+
+        Each unit is ``(text, hierarchy, section)``; :meth:`chunk_unit` turns one
+        unit into chunks independently of every other unit.
+        """
+        units: List[Tuple[str, List[str], Section]] = []
+
         if structure.outline:
-            self._process_section_tree(structure.outline, chunks, [], content)
+            self._plan_section_tree(structure.outline, units, [])
         else:
             # Process flat sections
             for section in structure.sections:
-                self._process_section(section, chunks, [], content)
+                if section.content.strip():
+                    units.append((section.content, [section.heading], section))
 
-        return chunks
+        return units
+
+    def chunk_unit(
+        self, text: str, hierarchy: List[str], section: Section, index: int = 0
+    ) -> List[DocumentChunk]:
+        """Chunk one planned unit, splitting it when it exceeds the size limit."""
+        if self.token_estimator.estimate_tokens(text) > self.max_chunk_size:
+            return self._split_section_content(text, hierarchy, section)
+        return [self._create_section_chunk(text, hierarchy, index, section)]
 
-    def _process_section_tree(
+    def _plan_section_tree(
         self,
         section: Section,
-        chunks: List[DocumentChunk],
+        units: List[Tuple[str, List[str], Section]],
         parent_hierarchy: List[str],
-        full_content: str,
     ):
-        """Process a section and its children recursively."""
+        """Plan a section and its children recursively."""
         hierarchy = parent_hierarchy + [section.heading]
 
         # Check if section is small enough to be a single chunk
@@ -288,28 +310,16 @@ class HierarchicalChunker:
             full_tokens = self.token_estimator.estimate_tokens(full_section_content)
 
             if full_tokens <= self.max_chunk_size:
-                # Create single chunk for entire section
-                chunk = self._create_section_chunk(
-                    full_section_content, hierarchy, len(chunks), section
-                )
-                chunks.append(chunk)
+                units.append((full_section_content, hierarchy, section))
                 return
 
         # Section is too large, process content and children separately
         if section.content.strip():
-            # Chunk the section's direct content
-            if section_tokens > self.max_chunk_size:
-                # Split large section content
-                sub_chunks = self._split_section_content(section.content, hierarchy, section)
-                chunks.extend(sub_chunks)
-            else:
-                # Create chunk for section content
-                chunk = self._create_section_chunk(section.content, hierarchy, len(chunks), section)
-                chunks.append(chunk)
+            units.append((section.content, hierarchy, section))
 
         # Process child sections
         for child in section.children:
-            self._process_section_tree(child, chunks, hierarchy, full_content)
+            self._plan_section_tree(child, units, hierarchy)
 
     def _process_section(
         self,
@@ -495,6 +505,7 @@ class SemanticChunker:
 
         # Initialize components
         self.optimizer = ChunkOptimizer(self.config)
+        self.section_cache = SectionChunkCache()
         self.context_window = ContextWindow()
         self.type_detector = DocumentTypeDetector()
         self.boundary_detector = SemanticBoundaryDetector()
@@ -525,6 +536,7 @@ class SemanticChunker:
         context = ChunkingContext(document_type=doc_type)
 
         # Choose chunking approach based on document type
+        windowed = False
         if doc_type == DocumentType.API:
             chunks = self._chunk_api_documentation(content, structure, context)
         elif doc_type == DocumentType.TUTORIAL:
@@ -532,14 +544,19 @@ class SemanticChunker:
         elif doc_type == DocumentType.README:
             chunks = self._chunk_readme(content, structure, context)
         elif structure and structure.sections:
-            # Use hierarchical chunking for structured documents
-            chunks = self.hierarchical_chunker.chunk_hierarchically(structure, content)
+            # Use hierarchical chunking for structured documents; only sections
+            # that changed since the last call for this path are re-chunked
+            chunks = self._chunk_sections_incremental(
+                structure, content, doc_metadata.get("path", "")
+            )
+            windowed = True
         else:
             # Fall back to optimizer strategy
             chunks = self.strategy.chunk(content, structure)
 
-        # Add context and overlap
-        chunks = self._add_context_windows(chunks, content)
+        # Add context and overlap (incremental chunks already carry theirs)
+        if not windowed:
+            chunks = self._add_context_windows(chunks, content)
 
         # Preserve metadata
         chunks = self.metadata_preserver.propagate_metadata(chunks, doc_metadata)
@@ -669,11 +686,62 @@ class SemanticChunker:
 
         return chunks
 
+    def _chunk_sections_incremental(
+        self, structure: DocumentStructure, content: str, document: str
+    ) -> List[DocumentChunk]:
+        """Hierarchically chunk ``structure``, reusing units unchanged since the last call.
+
+        Reused chunks keep their ids, embeddings and context windows; windows
+        are recomputed only for new chunks and for chunks whose neighbours
+        changed.
+        """
+        chunker = self.hierarchical_chunker
+        units = [
+            DocumentSection(
+                section_digest(
+                    text,
+                    hierarchy,
+                    section.level,
+                    section.end_line - section.start_line,
+                    chunker.max_chunk_size,
+                ),
+                start_line=section.start_line,
+                payload=(text, hierarchy, section),
+            )
+            for text, hierarchy, section in chunker.plan_units(structure)
+        ]
+
+        def relocate(chunk: DocumentChunk, line_delta: int, _pos_delta: int) -> None:
+            chunk.metadata.line_start += line_delta
+            chunk.metadata.line_end += line_delta
+
+        def assign_id(chunk: DocumentChunk, chunk_id: str) -> None:
+            chunk.id = chunk_id
+
+        def rewindow(chunks: List[DocumentChunk], indices: List[int]) -> None:
+            for index in indices:
+                chunks[index].context_before = None
+                chunks[index].context_after = None
+            self._add_context_windows(chunks, content, indices)
+
+        return self.section_cache.rechunk(
+            document,
+            units,
+            build=lambda unit: chunker.chunk_unit(*unit.payload),
+            relocate=relocate,
+            assign_id=assign_id,
+            rewindow=rewindow,
+        )
+
     def _add_context_windows(
-        self, chunks: List[DocumentChunk], full_content: str
+        self,
+        chunks: List[DocumentChunk],
+        full_content: str,
+        indices: Optional[List[int]] = None,
     ) -> List[DocumentChunk]:
-        """Add context windows to chunks for better continuity."""
-        for i, chunk in enumerate(chunks):
+        """Add context windows to chunks (only at ``indices`` when given)."""
+        for i in range(len(chunks)) if indices is None else indices:
+            chunk = chunks[i]
             # Add context before
             if i > 0:
                 prev_chunk = chunks[i - 1]
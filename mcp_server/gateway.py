@@ -33,6 +33,7 @@ from .config.validation import (
 )
 from .core import RepoContext, RepoResolver
 from .core.logging import setup_logging
+from .core.tracing import get_tracer
 from .dispatcher.dispatcher_enhanced import EnhancedDispatcher
 from .health.repository_readiness import RepositoryReadiness, RepositoryReadinessState
 from .indexer.bm25_indexer import BM25Indexer
@@ -65,6 +66,7 @@ from .security.security_middleware import SecretRedactionResponseMiddleware
 from .security.token_validator import TokenValidator
 from .setup.qdrant_autostart import ensure_qdrant_running
 from .setup.semantic_preflight import run_semantic_preflight
+from .storage.connection_pool import ReadWriteConnections
 from .storage.sqlite_store import SQLiteStore
 from .storage.store_registry import StoreRegistry
 from .utils.fuzzy_indexer import FuzzyIndexer
@@ -724,7 +726,9 @@ async def startup_event():
 
             if index_path:
                 logger.info(f"Using portable index: {index_path}")
-                sqlite_store = SQLiteStore(str(index_path))
+                sqlite_store = SQLiteStore(
+                    str(index_path), connections=ReadWriteConnections(str(index_path))
+                )
 
                 # Log index info
                 info = discovery.get_index_info()
@@ -734,11 +738,15 @@ async def startup_event():
                     logger.info(f"Index commit: {meta.get('commit', 'unknown')[:8]}")
             else:
                 logger.info("No portable index found, using default")
-                sqlite_store = SQLiteStore("code_index.db")
+                sqlite_store = SQLiteStore(
+                    "code_index.db", connections=ReadWriteConnections("code_index.db")
+                )
         else:
             # Initialize SQLite store with default
             logger.info("Initializing SQLite store with default path...")
-            sqlite_store = SQLiteStore("code_index.db")
+            sqlite_store = SQLiteStore(
+                "code_index.db", connections=ReadWriteConnections("code_index.db")
+            )
 
         # Initialize RepoResolver for per-request repo context resolution.
         _local_repo_registry = None
@@ -1471,6 +1479,13 @@ def get_metrics_json(
         raise HTTPException(500, f"Failed to get metrics: {str(e)}")
 
 
+@app.get("/traces/slow", dependencies=[Depends(require_auth("metrics"))])
+def get_slow_traces(limit: int = 20) -> Dict[str, Any]:
+    """Recent slow request traces with per-stage timings, newest first."""
+    tracer = get_tracer()
+    return {"tracing": tracer.stats(), "traces": tracer.slow_traces(limit=max(0, limit))}
+
+
 @app.get("/symbol", response_model=SymbolDef | None)
 async def symbol(
     request: Request, symbol: str, current_user: User = Depends(require_permission(Permission.READ))
@@ -4,6 +4,7 @@ import logging
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
+from ..utils.incremental_parse import get_incremental_chunker
 from .interfaces import EdgeType, GraphEdge, GraphNode, IGraphBuilder
 
 logger = logging.getLogger(__name__)
@@ -11,7 +12,6 @@ logger = logging.getLogger(__name__)
 # Check if TreeSitter Chunker is available
 CHUNKER_AVAILABLE = False
 try:
-    from chunker import chunk_file
     from chunker.graph.xref import build_xref
 
     CHUNKER_AVAILABLE = True
@@ -77,8 +77,14 @@ class XRefAdapter(IGraphBuilder):
                     }
                     language = _EXT.get(ext, "text")
 
-                    # Chunk the file
-                    chunks = chunk_file(str(path), language)
+                    # Chunk the file; repeat builds only re-chunk what changed
+                    try:
+                        text = path.read_text(encoding="utf-8")
+                    except UnicodeDecodeError:
+                        text = path.read_bytes().decode("utf-8", errors="replace")
+                    chunks = get_incremental_chunker().chunk(
+                        text, language, path=str(path), file_path=str(path)
+                    )
                     all_chunks.extend(chunks)
 
                     logger.debug(f"Chunked {file_path}: {len(chunks)} chunks")
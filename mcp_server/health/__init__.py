@@ -1,3 +1,3 @@
 """Health surface utilities for Code-Index-MCP (SL-4)."""
 
-__all__ = ["repo_status", "probes"]
+__all__ = ["repo_status", "probes", "index_integrity"]
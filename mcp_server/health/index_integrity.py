@@ -0,0 +1,644 @@
+"""Tiered SQLite index integrity checks for readiness probes.
+
+Readiness probes run on every query and status call, so they must not scan
+the database.  Integrity checking is split into three tiers:
+
+- ``read_sqlite_header`` – O(1): validates the 100-byte database header
+  (magic string, page size, journal mode) without opening a connection.
+- ``IntegrityVerifier`` – background and incremental, in page windows: each
+  tick reads the next ``pages_per_tick`` pages of the file from a page cursor
+  and checks every b-tree page it finds on its own (header, cell pointers,
+  cell and freeblock overlap, fragment count, child and overflow page
+  numbers) and that each table's and index's root page is a b-tree page.
+  No tick walks a whole b-tree, so its cost is bounded by the window.  The
+  cursor is saved beside the index, so a pass resumes after a restart.
+  Cross-page structure (key order, page reachability, the freelist) is left
+  to the deep check.  Ticks are rate-limited and deferred while the WAL is
+  being written.  Corruption it finds is reported to the readiness hot path.
+- ``deep_check_index`` – explicit, operator-invoked full ``PRAGMA
+  integrity_check``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_server.config.env_vars import (
+    get_integrity_verify_interval_seconds,
+    get_integrity_verify_pages_per_tick,
+)
+from mcp_server.storage.index_maintenance import _read_varint
+
+logger = logging.getLogger(__name__)
+
+SQLITE_MAGIC = b"SQLite format 3\x00"
+_HEADER_SIZE = 100
+_DEEP_CHECK_MAX_ERRORS = 100
+# Consecutive ticks a busy WAL may defer verification before it runs anyway.
+_MAX_WAL_DEFERRALS = 3
+_INTERIOR_INDEX, _INTERIOR_TABLE, _LEAF_INDEX, _LEAF_TABLE = 2, 5, 10, 13
+_BTREE_PAGE_TYPES = frozenset({_INTERIOR_INDEX, _INTERIOR_TABLE, _LEAF_INDEX, _LEAF_TABLE})
+
+
+class CorruptHeaderError(Exception):
+    """The file exists but does not carry a valid SQLite database header."""
+
+
+@dataclass(frozen=True)
+class SQLiteHeader:
+    """Fields of the SQLite database header used by readiness probes."""
+
+    page_size: int
+    write_version: int
+    read_version: int
+    change_counter: int
+    page_count: int
+    schema_cookie: int
+
+    @property
+    def wal_mode(self) -> bool:
+        return self.write_version == 2 and self.read_version == 2
+
+
+def read_sqlite_header(path: Path) -> Optional[SQLiteHeader]:
+    """Parse the database header of ``path``.
+
+    Returns None for an empty file (SQLite treats it as an empty database).
+    Raises ``CorruptHeaderError`` when the header is not a SQLite header and
+    ``OSError`` when the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER_SIZE)
+    if not raw:
+        return None
+    if len(raw) < _HEADER_SIZE or not raw.startswith(SQLITE_MAGIC):
+        raise CorruptHeaderError(f"{path} is not a SQLite database")
+    (page_size,) = struct.unpack_from(">H", raw, 16)
+    if page_size == 1:
+        page_size = 65536
+    if page_size < 512 or page_size & (page_size - 1):
+        raise CorruptHeaderError(f"{path} has invalid page size {page_size}")
+    write_version, read_version = raw[18], raw[19]
+    if write_version not in (1, 2) or read_version not in (1, 2):
+        raise CorruptHeaderError(f"{path} has unknown file format {write_version}/{read_version}")
+    change_counter, page_count = struct.unpack_from(">II", raw, 24)
+    (schema_cookie,) = struct.unpack_from(">I", raw, 40)
+    return SQLiteHeader(
+        page_size=page_size,
+        write_version=write_version,
+        read_version=read_version,
+        change_counter=change_counter,
+        page_count=page_count,
+        schema_cookie=schema_cookie,
+    )
+
+
+def _file_identity(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+def _wal_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = Path(f"{path}-wal").stat()
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _cursor_path(index_path: str) -> Path:
+    return Path(f"{index_path}.integrity.json")
+
+
+def _cell_extent(
+    page: bytes, pc: int, kind: int, usable: int
+) -> Tuple[int, Optional[int], Optional[int]]:
+    """Size of the cell at ``pc`` with its left child and first overflow page."""
+    pos = pc
+    child = None
+    if kind in (_INTERIOR_INDEX, _INTERIOR_TABLE):
+        (child,) = struct.unpack_from(">I", page, pos)
+        pos += 4
+    if kind == _INTERIOR_TABLE:
+        _, pos = _read_varint(page, pos)
+        return pos - pc, child, None
+    payload, pos = _read_varint(page, pos)
+    if kind == _LEAF_TABLE:
+        _, pos = _read_varint(page, pos)
+        max_local = usable - 35
+    else:
+        max_local = (usable - 12) * 64 // 255 - 23
+    if payload <= max_local:
+        return max(4, pos - pc + payload), child, None
+    min_local = (usable - 12) * 32 // 255 - 23
+    local = min_local + (payload - min_local) % (usable - 4)
+    if local > max_local:
+        local = min_local
+    (overflow,) = struct.unpack_from(">I", page, pos + local)
+    return pos - pc + local + 4, child, overflow
+
+
+def _check_btree_page(
+    page: bytes, pgno: int, usable: int, page_count: int, *, require_btree: bool = False
+) -> Optional[str]:
+    """Check one page in isolation; returns a description of the damage or None.
+
+    Pages that do not carry a b-tree page type are overflow, freelist or
+    pointer-map pages, whose content cannot be checked without walking the
+    file, and pass unless ``require_btree`` (a known root page) is set.
+    """
+    header = 100 if pgno == 1 else 0
+    kind = page[header]
+    if kind not in _BTREE_PAGE_TYPES:
+        return f"invalid b-tree page type {kind:#04x}" if require_btree else None
+    leaf = kind in (_LEAF_INDEX, _LEAF_TABLE)
+    first_free, cells, content, fragmented = struct.unpack_from(">HHHB", page, header + 1)
+    content = content or 65536
+    pointers = header + (8 if leaf else 12)
+    if pointers + 2 * cells > content or content > usable:
+        return f"cell content area starts at {content} with {cells} cells"
+    if fragmented > 60:
+        return f"{fragmented} fragmented bytes"
+    linked: List[int] = [] if leaf else list(struct.unpack_from(">I", page, header + 8))
+    spans: List[Tuple[int, int]] = []
+    for cell in range(cells):
+        (pc,) = struct.unpack_from(">H", page, pointers + 2 * cell)
+        if not content <= pc < usable:
+            return f"cell {cell} offset {pc} is outside the cell content area"
+        try:
+            size, child, overflow = _cell_extent(page, pc, kind, usable)
+        except (IndexError, struct.error):
+            size, child, overflow = usable, None, None
+        if pc + size > usable:
+            return f"cell {cell} extends past the end of the page"
+        spans.append((pc, pc + size))
+        linked.extend(page_no for page_no in (child, overflow) if page_no is not None)
+    pc = first_free
+    while pc:
+        if not content <= pc <= usable - 4:
+            return f"freeblock offset {pc} is outside the cell content area"
+        following, size = struct.unpack_from(">HH", page, pc)
+        if size < 4 or pc + size > usable:
+            return f"freeblock at {pc} has size {size}"
+        if following and following <= pc:
+            return f"freeblock list is not ascending at {pc}"
+        spans.append((pc, pc + size))
+        pc = following
+    position, gaps = content, 0
+    for begin, end in sorted(spans):
+        if begin < position:
+            return f"multiple uses for byte {begin}"
+        gaps += begin - position
+        position = end
+    gaps += usable - position
+    if gaps != fragmented:
+        return f"fragmentation of {gaps} bytes reported as {fragmented}"
+    for page_no in linked:
+        if not 1 <= page_no <= page_count:
+            return f"child or overflow page {page_no} is out of range"
+    return None
+
+
+class _PageReader:
+    """Reads raw pages through ``sqlite_dbpage`` when compiled in, else from the file.
+
+    ``sqlite_dbpage`` reads through the connection's snapshot, WAL included.
+    The file fallback sees pages as of the last checkpoint; a page being
+    checkpointed while it is read can come back torn, so callers re-read a
+    page before reporting it.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, path: Path, page_size: int):
+        self.conn = conn
+        self.path = path
+        self.page_size = page_size
+        self.db_pages = int(conn.execute("PRAGMA page_count").fetchone()[0])
+        try:
+            conn.execute("SELECT pgno FROM sqlite_dbpage WHERE pgno = 1").fetchone()
+            self.snapshot = True
+            self.page_count = self.db_pages
+        except sqlite3.OperationalError:
+            self.snapshot = False
+            self.page_count = min(self.db_pages, path.stat().st_size // page_size)
+
+    def read(self, first: int, last: int) -> List[bytes]:
+        if self.snapshot:
+            return [
+                bytes(
+                    self.conn.execute(
+                        "SELECT data FROM sqlite_dbpage WHERE pgno = ?", (pgno,)
+                    ).fetchone()[0]
+                )
+                for pgno in range(first, last + 1)
+            ]
+        size = self.page_size
+        with open(self.path, "rb") as f:
+            f.seek((first - 1) * size)
+            raw = f.read((last - first + 1) * size)
+        return [raw[i : i + size] for i in range(0, len(raw) - size + 1, size)]
+
+
+@dataclass
+class IntegrityProgress:
+    """Resumable position and outcome of background verification for one index."""
+
+    index_path: str
+    identity: Optional[Tuple[int, int]] = None
+    schema_version: Optional[int] = None
+    roots: Dict[int, str] = field(default_factory=dict)
+    page_count: int = 0
+    next_page: int = 1
+    pages_checked: int = 0
+    passes_completed: int = 0
+    last_pass_completed_at: Optional[float] = None
+    last_tick_at: Optional[float] = None
+    wal_signature: Optional[Tuple[int, int]] = None
+    wal_deferrals: int = 0
+    failure: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "index_path": self.index_path,
+            "pages_total": self.page_count,
+            "next_page": self.next_page,
+            "pages_checked": self.pages_checked,
+            "passes_completed": self.passes_completed,
+            "last_pass_completed_at": self.last_pass_completed_at,
+            "failure": self.failure,
+        }
+
+    def cursor(self) -> Dict[str, Any]:
+        """The part of the progress that survives a restart."""
+        return {
+            "identity": list(self.identity) if self.identity else None,
+            "next_page": self.next_page,
+            "pages_checked": self.pages_checked,
+            "passes_completed": self.passes_completed,
+            "last_pass_completed_at": self.last_pass_completed_at,
+        }
+
+
+@dataclass(frozen=True)
+class IntegrityReport:
+    """Result of an explicit deep integrity check."""
+
+    index_path: str
+    ok: bool
+    errors: Tuple[str, ...]
+    elapsed_ms: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "index_path": self.index_path,
+            "ok": self.ok,
+            "errors": list(self.errors),
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+class IntegrityVerifier:
+    """Rate-limited, resumable background page checks over watched indexes."""
+
+    def __init__(
+        self,
+        pages_per_tick: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+    ):
+        self.pages_per_tick = (
+            get_integrity_verify_pages_per_tick() if pages_per_tick is None else pages_per_tick
+        )
+        self.interval_seconds = (
+            get_integrity_verify_interval_seconds()
+            if interval_seconds is None
+            else interval_seconds
+        )
+        self._progress: Dict[str, IntegrityProgress] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.pages_per_tick > 0
+
+    def watch(self, index_path: str) -> None:
+        """Add ``index_path`` to background verification and start the thread."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._progress_for(index_path)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="index-integrity-verifier", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+
+    def progress(self, index_path: str) -> Optional[IntegrityProgress]:
+        with self._lock:
+            return self._progress.get(index_path)
+
+    def failure(self, index_path: str) -> Optional[str]:
+        """Return the corruption found in the current file at ``index_path``, if any.
+
+        This is a dict lookup and a stat; a failure recorded against a file
+        that has since been replaced is discarded.
+        """
+        with self._lock:
+            progress = self._progress.get(index_path)
+            if progress is None or progress.failure is None:
+                return None
+        if _file_identity(Path(index_path)) != progress.identity:
+            with self._lock:
+                self._reset(progress)
+            return None
+        return progress.failure
+
+    def record_deep_check(self, report: IntegrityReport) -> None:
+        with self._lock:
+            progress = self._progress_for(report.index_path)
+            self._reset(progress)
+            progress.identity = _file_identity(Path(report.index_path))
+            if not report.ok:
+                progress.failure = "; ".join(report.errors) or "integrity_check failed"
+
+    def _progress_for(self, index_path: str) -> IntegrityProgress:
+        """Progress for ``index_path``, resumed from its saved cursor (lock held)."""
+        progress = self._progress.get(index_path)
+        if progress is not None:
+            return progress
+        progress = self._progress[index_path] = IntegrityProgress(index_path)
+        try:
+            saved = json.loads(_cursor_path(index_path).read_text(encoding="utf-8"))
+            identity = tuple(saved["identity"]) if saved.get("identity") else None
+            if identity is not None and identity == _file_identity(Path(index_path)):
+                progress.identity = (int(identity[0]), int(identity[1]))
+                progress.next_page = max(1, int(saved["next_page"]))
+                progress.pages_checked = int(saved.get("pages_checked", 0))
+                progress.passes_completed = int(saved.get("passes_completed", 0))
+                progress.last_pass_completed_at = saved.get("last_pass_completed_at")
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return progress
+
+    def _save_cursor(self, progress: IntegrityProgress) -> None:
+        path = _cursor_path(progress.index_path)
+        with self._lock:
+            cursor = progress.cursor()
+        try:
+            tmp = path.with_name(f"{path.name}.tmp")
+            tmp.write_text(json.dumps(cursor), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.debug("Could not save integrity cursor for %s: %s", progress.index_path, exc)
+
+    @staticmethod
+    def _reset(progress: IntegrityProgress) -> None:
+        progress.identity = None
+        progress.schema_version = None
+        progress.roots = {}
+        progress.next_page = 1
+        progress.failure = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            with self._lock:
+                paths = list(self._progress)
+            for index_path in paths:
+                if self._stop.is_set():
+                    return
+                try:
+                    self.tick(index_path)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.debug("Integrity tick failed for %s: %s", index_path, exc)
+
+    def tick(self, index_path: str, now: Optional[float] = None) -> int:
+        """Verify the next window of pages of ``index_path``; returns pages checked.
+
+        Returns 0 without touching the database when called again within
+        ``interval_seconds``, while the WAL is being written (for a bounded
+        number of consecutive ticks), or after corruption has been recorded.
+        """
+        now = time.monotonic() if now is None else now
+        path = Path(index_path)
+        with self._lock:
+            progress = self._progress_for(index_path)
+            if progress.failure is not None:
+                return 0
+            if (
+                progress.last_tick_at is not None
+                and now - progress.last_tick_at < self.interval_seconds
+            ):
+                return 0
+            wal = _wal_signature(path)
+            if (
+                wal is not None
+                and wal != progress.wal_signature
+                and progress.wal_deferrals < _MAX_WAL_DEFERRALS
+            ):
+                progress.wal_signature = wal
+                progress.wal_deferrals += 1
+                return 0
+            progress.wal_signature = wal
+            progress.wal_deferrals = 0
+            progress.last_tick_at = now
+
+        identity = _file_identity(path)
+        if identity is None:
+            return 0
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=1.0)
+        except sqlite3.Error:
+            return 0
+        try:
+            checked = self._verify_next_pages(conn, path, progress, identity)
+        except (OSError, sqlite3.DatabaseError) as exc:
+            message = str(exc)
+            if isinstance(exc, OSError) or (
+                isinstance(exc, sqlite3.OperationalError)
+                and ("locked" in message.lower() or "busy" in message.lower())
+            ):
+                return 0
+            self._record_failure(progress, identity, message)
+            return 0
+        finally:
+            conn.close()
+        if checked:
+            self._save_cursor(progress)
+        return checked
+
+    def _verify_next_pages(
+        self,
+        conn: sqlite3.Connection,
+        path: Path,
+        progress: IntegrityProgress,
+        identity: Tuple[int, int],
+    ) -> int:
+        """Check the pages from the cursor up to the page budget and advance it."""
+        conn.execute("BEGIN")
+        schema_version = int(conn.execute("PRAGMA schema_version").fetchone()[0])
+        if progress.identity != identity or progress.schema_version != schema_version:
+            roots = {
+                int(row[0]): str(row[1])
+                for row in conn.execute(
+                    "SELECT rootpage, name FROM sqlite_master WHERE rootpage > 0"
+                )
+            }
+            roots[1] = "sqlite_master"
+            with self._lock:
+                if progress.identity != identity:
+                    progress.identity = identity
+                    progress.next_page = 1
+                progress.schema_version = schema_version
+                progress.roots = roots
+
+        page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+        reader = _PageReader(conn, path, page_size)
+        if reader.page_count < 1:
+            return 0
+        first_page = reader.read(1, 1)[0]
+        usable = page_size - first_page[20]
+        auto_vacuum = struct.unpack_from(">I", first_page, 52)[0] != 0
+        # Without a snapshot, root pages written since the last checkpoint are
+        # stale in the file and may not be b-tree pages there yet.
+        wal = _wal_signature(path)
+        check_roots = reader.snapshot or wal is None or wal[0] <= 32
+        lock_page = 1073741824 // page_size + 1
+
+        first = progress.next_page if progress.next_page <= reader.page_count else 1
+        last = min(reader.page_count, first + max(1, self.pages_per_tick) - 1)
+        for pgno, page in enumerate(reader.read(first, last), start=first):
+            if pgno == lock_page or (auto_vacuum and _is_ptrmap_page(pgno, usable, lock_page)):
+                continue
+            detail = self._check_page(reader, page, pgno, usable, progress, check_roots)
+            if detail is not None:
+                name = progress.roots.get(pgno)
+                where = f"{name} (root page {pgno})" if name else f"page {pgno}"
+                self._record_failure(progress, identity, f"{where}: {detail}")
+                return pgno - first + 1
+
+        checked = last - first + 1
+        with self._lock:
+            progress.page_count = reader.page_count
+            progress.pages_checked += checked
+            progress.next_page = last + 1
+            if last >= reader.page_count:
+                progress.next_page = 1
+                progress.passes_completed += 1
+                progress.last_pass_completed_at = time.time()
+        return checked
+
+    @staticmethod
+    def _check_page(
+        reader: _PageReader,
+        page: bytes,
+        pgno: int,
+        usable: int,
+        progress: IntegrityProgress,
+        check_roots: bool,
+    ) -> Optional[str]:
+        require_btree = check_roots and pgno in progress.roots
+        page_count = max(reader.db_pages, reader.page_count)
+        detail = _check_btree_page(page, pgno, usable, page_count, require_btree=require_btree)
+        if detail is None or reader.snapshot:
+            return detail
+        # Confirm against a second read so a page torn by a checkpoint is not reported.
+        if reader.read(pgno, pgno) != [page]:
+            return None
+        return detail
+
+    def _record_failure(
+        self, progress: IntegrityProgress, identity: Tuple[int, int], detail: str
+    ) -> None:
+        logger.error("Integrity verification failed for %s: %s", progress.index_path, detail)
+        with self._lock:
+            progress.identity = identity
+            progress.failure = detail
+
+
+def _is_ptrmap_page(pgno: int, usable: int, lock_page: int) -> bool:
+    """True for an auto-vacuum pointer-map page (mirrors SQLite's ``ptrmapPageno``)."""
+    if pgno < 2:
+        return False
+    per_map = usable // 5 + 1
+    map_page = (pgno - 2) // per_map * per_map + 2
+    if map_page == lock_page:
+        map_page += 1
+    return map_page == pgno
+
+
+def deep_check_index(index_path: Path, max_errors: int = _DEEP_CHECK_MAX_ERRORS) -> IntegrityReport:
+    """Run a full ``PRAGMA integrity_check`` (operator-invoked; scans every page)."""
+    path = Path(index_path).resolve(strict=False)
+    started = time.perf_counter()
+    errors: List[str] = []
+    try:
+        read_sqlite_header(path)
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(f"PRAGMA integrity_check({int(max_errors)})").fetchall()
+        finally:
+            conn.close()
+        errors = [str(row[0]) for row in rows if row and row[0] != "ok"]
+    except (CorruptHeaderError, OSError, sqlite3.Error) as exc:
+        errors = [str(exc)]
+    report = IntegrityReport(
+        index_path=str(path),
+        ok=not errors,
+        errors=tuple(errors),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+    get_integrity_verifier().record_deep_check(report)
+    return report
+
+
+_verifier: Optional[IntegrityVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_integrity_verifier() -> IntegrityVerifier:
+    """Return the process-wide background verifier (created on first use)."""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = IntegrityVerifier()
+        return _verifier
+
+
+def _reset_integrity_verifier() -> None:
+    global _verifier
+    with _verifier_lock:
+        if _verifier is not None:
+            _verifier.stop()
+        _verifier = None
+
+
+__all__ = [
+    "CorruptHeaderError",
+    "IntegrityProgress",
+    "IntegrityReport",
+    "IntegrityVerifier",
+    "SQLiteHeader",
+    "deep_check_index",
+    "get_integrity_verifier",
+    "read_sqlite_header",
+]
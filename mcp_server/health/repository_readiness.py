@@ -13,6 +13,14 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Optional
 
+from mcp_server.health.index_integrity import (
+    CorruptHeaderError,
+    IntegrityReport,
+    deep_check_index,
+    get_integrity_verifier,
+    read_sqlite_header,
+)
+from mcp_server.storage.index_maintenance import get_index_maintenance_scheduler
 from mcp_server.storage.repo_identity import compute_repo_id
 from mcp_server.storage.sqlite_store import evaluate_chunk_scheme
 from mcp_server.utils.subprocess_env import get_full_env
@@ -155,23 +163,52 @@ _healthy_index_cache: OrderedDict[tuple[str, _IndexSignature], None] = OrderedDi
 _healthy_index_cache_lock = threading.Lock()
 
 
+_REQUIRED_TABLES = frozenset({"schema_version", "repositories", "files", "symbols", "code_chunks"})
+_schema_stamp_cache: OrderedDict[tuple[str, int, int, int], bool] = OrderedDict()
+
+
+def _schema_is_complete(conn: sqlite3.Connection, index_path: Path) -> bool:
+    """Check the required tables once per (file, schema cookie) stamp."""
+    schema_version = int(conn.execute("PRAGMA schema_version").fetchone()[0])
+    stat = index_path.stat()
+    key = (str(index_path), stat.st_dev, stat.st_ino, schema_version)
+    with _healthy_index_cache_lock:
+        cached = _schema_stamp_cache.get(key)
+        if cached is not None:
+            _schema_stamp_cache.move_to_end(key)
+            return cached
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')").fetchall()
+    complete = _REQUIRED_TABLES.issubset(str(row[0]) for row in rows)
+    with _healthy_index_cache_lock:
+        _schema_stamp_cache[key] = complete
+        while len(_schema_stamp_cache) > _HEALTHY_INDEX_CACHE_SIZE:
+            _schema_stamp_cache.popitem(last=False)
+    return complete
+
+
 def _inspect_index_uncached(index_path: Path) -> Optional[RepositoryReadinessState]:
-    required_tables = {"schema_version", "repositories", "files", "symbols", "code_chunks"}
+    """Structural readiness checks that cost O(1) regardless of index size.
+
+    Page-level integrity is not scanned here: ``IntegrityVerifier`` checks it
+    incrementally in the background and ``deep_check_index`` runs a full
+    ``integrity_check`` on demand; corruption either one finds is reported by
+    ``_inspect_index_snapshot``.
+    """
+    try:
+        if read_sqlite_header(index_path) is None:
+            return RepositoryReadinessState.MISSING_SCHEMA
+    except FileNotFoundError:
+        return RepositoryReadinessState.MISSING_SCHEMA
+    except (CorruptHeaderError, OSError):
+        return RepositoryReadinessState.CORRUPT_SQLITE
     try:
         with sqlite3.connect(str(index_path)) as conn:
-            integrity = conn.execute("PRAGMA quick_check").fetchone()
-            if not integrity or integrity[0] != "ok":
-                return RepositoryReadinessState.CORRUPT_SQLITE
-            rows = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
-            ).fetchall()
-            tables = {str(row[0]) for row in rows}
-            if not required_tables.issubset(tables):
+            if not _schema_is_complete(conn, index_path):
                 return RepositoryReadinessState.MISSING_SCHEMA
-            count = conn.execute(
-                "SELECT COUNT(*) FROM files WHERE is_deleted = 0 OR is_deleted IS NULL"
+            live_file = conn.execute(
+                "SELECT 1 FROM files WHERE is_deleted = 0 OR is_deleted IS NULL LIMIT 1"
             ).fetchone()
-            if not count or int(count[0]) == 0:
+            if live_file is None:
                 return RepositoryReadinessState.INDEX_EMPTY
             # CHUNKERSAFE Lane A: a half-rebuilt or mixed-scheme code_chunks table
             # passes the table-presence check but is not query-safe. Report a
@@ -202,6 +239,10 @@ def _inspect_index_snapshot(
     index_path: str,
     signature: _IndexSignature,
 ) -> Optional[RepositoryReadinessState]:
+    verifier = get_integrity_verifier()
+    if verifier.failure(index_path) is not None:
+        return RepositoryReadinessState.CORRUPT_SQLITE
+
     key = (index_path, signature)
     with _healthy_index_cache_lock:
         if key in _healthy_index_cache:
@@ -211,6 +252,8 @@ def _inspect_index_snapshot(
     result = _inspect_index_uncached(Path(index_path))
     if result is not None:
         return result
+    verifier.watch(index_path)
+    get_index_maintenance_scheduler().watch(index_path)
 
     with _healthy_index_cache_lock:
         stale_keys = [
@@ -227,6 +270,7 @@ def _inspect_index_snapshot(
 def _clear_index_inspection_cache() -> None:
     with _healthy_index_cache_lock:
         _healthy_index_cache.clear()
+        _schema_stamp_cache.clear()
 
 
 class ReadinessClassifier:
@@ -606,6 +650,13 @@ class ReadinessClassifier:
     def clear_index_inspection_cache() -> None:
         _clear_index_inspection_cache()
 
+    @staticmethod
+    def deep_check(index_path: Path) -> IntegrityReport:
+        """Run a full integrity check (operator use) and drop cached verdicts."""
+        report = deep_check_index(index_path)
+        _clear_index_inspection_cache()
+        return report
+
 
 def _worktree_remediation() -> str:
     return "Use the registered path or unregister it before registering another worktree."
@@ -5,16 +5,6 @@ This package provides the core indexing engine and related components
 for efficiently indexing and searching code repositories.
 """
 
-from .index_engine import (
-    BatchIndexResult,
-    IndexEngine,
-    IndexOptions,
-    IndexProgress,
-    IndexResult,
-    IndexTask,
-)
-from .query_optimizer import Query, QueryType
-
 __all__ = [
     # Index Engine
     "IndexEngine",
@@ -27,3 +17,27 @@ __all__ = [
     "Query",
     "QueryType",
 ]
+
+
+_INDEX_ENGINE_EXPORTS = {
+    "IndexEngine",
+    "IndexResult",
+    "BatchIndexResult",
+    "IndexOptions",
+    "IndexProgress",
+    "IndexTask",
+}
+
+
+# Lazy so importing a submodule (e.g. ``mcp_server.indexer.reranker``) does not
+# pull in the index engine and its storage stack.
+def __getattr__(name):
+    if name in _INDEX_ENGINE_EXPORTS:
+        from . import index_engine
+
+        return getattr(index_engine, name)
+    if name in {"Query", "QueryType"}:
+        from . import query_optimizer
+
+        return getattr(query_optimizer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -22,12 +22,6 @@ from ..plugin_system.interfaces import IPluginManager
 from ..storage.sqlite_store import SQLiteStore
 from ..utils.fuzzy_indexer import FuzzyIndexer
 
-# Optional import for semantic indexing
-try:
-    from ..utils.semantic_indexer import SemanticIndexer
-except ImportError:
-    SemanticIndexer = None
-
 logger = logging.getLogger(__name__)
 
 
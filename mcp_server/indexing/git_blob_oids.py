@@ -0,0 +1,169 @@
+"""Git-native change detection via blob object ids.
+
+Git already knows the content identity of every tracked file: the index
+records a blob OID per path, and ``git status`` reports which work-tree files
+no longer match it.  This module reads that state so incremental indexing can
+decide "changed or not" by comparing OIDs instead of re-reading and hashing
+every candidate file.  Only dirty or untracked files are hashed, using the
+same ``blob <size>\\0`` framing git uses so the two sources are comparable.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Set
+
+from ..utils.subprocess_env import get_full_env
+
+logger = logging.getLogger(__name__)
+
+_OID_LENGTH_TO_FORMAT = {40: "sha1", 64: "sha256"}
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_blob_oid(file_path: Path, object_format: str = "sha1") -> str:
+    """Return the git blob OID for a work-tree file (``git hash-object`` equivalent).
+
+    Clean/smudge filters and EOL conversion are not applied; a file whose
+    filtered form differs merely reports as changed, which costs one extra
+    reindex rather than a missed update.
+    """
+    digest = hashlib.new(object_format)
+    size = file_path.stat().st_size
+    digest.update(f"blob {size}\0".encode("ascii"))
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _run_git(repo_path: Path, *args: str) -> Optional[bytes]:
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=repo_path,
+            capture_output=True,
+            check=True,
+            env=get_full_env(),
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.debug("git %s failed in %s: %s", args[0] if args else "", repo_path, e)
+        return None
+    return result.stdout
+
+
+def _git_prefix(repo_path: Path) -> Optional[str]:
+    """Return repo_path's prefix inside its work tree ("" at the top level)."""
+    output = _run_git(repo_path, "rev-parse", "--show-prefix")
+    if output is None:
+        return None
+    return output.decode("utf-8", "surrogateescape").strip()
+
+
+def _strip_prefix(path: str, prefix: str) -> Optional[str]:
+    if not prefix:
+        return path
+    if path.startswith(prefix):
+        return path[len(prefix) :]
+    return None
+
+
+def read_index_blob_oids(repo_path: Path, prefix: str = "") -> Dict[str, str]:
+    """Map tracked paths (relative to *repo_path*) to their stage-0 blob OIDs.
+
+    Uses ``git ls-files -s -z``.  Unmerged paths (stages 1-3) are omitted so
+    they fall back to work-tree hashing.
+    """
+    output = _run_git(repo_path, "ls-files", "-s", "-z", "--full-name")
+    if output is None:
+        return {}
+    oids: Dict[str, str] = {}
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, _, raw_path = entry.partition(b"\t")
+        fields = meta.split()
+        if len(fields) != 3 or fields[2] != b"0":
+            continue
+        mode, oid = fields[0], fields[1]
+        if mode == b"160000":  # gitlink (submodule), not a blob
+            continue
+        path = _strip_prefix(raw_path.decode("utf-8", "surrogateescape"), prefix)
+        if path is not None:
+            oids[path] = oid.decode("ascii")
+    return oids
+
+
+def read_dirty_paths(repo_path: Path, prefix: str = "") -> Set[str]:
+    """Return tracked paths whose work-tree content differs from the index.
+
+    Parses ``git status --porcelain -z --untracked-files=no``; only the
+    work-tree column (Y) matters because OIDs are read from the index, so
+    staged-but-clean files keep using their index OID.  Unmerged entries are
+    always reported dirty.
+    """
+    output = _run_git(repo_path, "status", "--porcelain", "-z", "--untracked-files=no")
+    if output is None:
+        return set()
+    dirty: Set[str] = set()
+    entries = output.split(b"\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+        x, y = chr(entry[0]), chr(entry[1])
+        path = _strip_prefix(entry[3:].decode("utf-8", "surrogateescape"), prefix)
+        if x in "RC":
+            i += 1  # rename/copy source follows as its own NUL-terminated field
+        if path is None:
+            continue
+        if y != " " or x == "U":
+            dirty.add(path)
+    return dirty
+
+
+@dataclass(frozen=True)
+class GitBlobSnapshot:
+    """Index OIDs plus the set of dirty paths, captured once per update run."""
+
+    oids: Dict[str, str] = field(default_factory=dict)
+    dirty: FrozenSet[str] = frozenset()
+    object_format: str = "sha1"
+
+    @classmethod
+    def load(cls, repo_path: Path) -> Optional["GitBlobSnapshot"]:
+        """Capture the snapshot, or return None when *repo_path* is not in a git work tree."""
+        prefix = _git_prefix(repo_path)
+        if prefix is None:
+            return None
+        oids = read_index_blob_oids(repo_path, prefix)
+        object_format = "sha1"
+        if oids:
+            sample = next(iter(oids.values()))
+            object_format = _OID_LENGTH_TO_FORMAT.get(len(sample), "sha1")
+        return cls(
+            oids=oids,
+            dirty=frozenset(read_dirty_paths(repo_path, prefix)),
+            object_format=object_format,
+        )
+
+    def current_oid(self, relative_path: str, full_path: Path) -> Optional[str]:
+        """Return the blob OID for a file's current content.
+
+        Clean tracked files answer from the index; dirty or untracked files
+        are hashed from the work tree.  Returns None if the file is unreadable.
+        """
+        oid = self.oids.get(relative_path)
+        if oid is not None and relative_path not in self.dirty:
+            return oid
+        try:
+            return hash_blob_oid(full_path, self.object_format)
+        except OSError as e:
+            logger.debug("Could not hash %s: %s", full_path, e)
+            return None
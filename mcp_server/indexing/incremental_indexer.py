@@ -28,6 +28,7 @@ from .checkpoint import (
 from .checkpoint import clear as _clear_ckpt
 from .checkpoint import load as _load_ckpt
 from .checkpoint import save as _save_ckpt
+from .git_blob_oids import GitBlobSnapshot
 from .lock_registry import lock_registry
 
 logger = logging.getLogger(__name__)
@@ -66,6 +67,7 @@ class IncrementalIndexer:
         repo_path: Optional[Path] = None,
         semantic_indexer: Optional[Any] = None,
         ctx: Optional[RepoContext] = None,
+        use_git_blob_oids: bool = True,
     ):
         self.store = store
         self.dispatcher = dispatcher
@@ -73,6 +75,12 @@ class IncrementalIndexer:
         self.repo_path = repo_path or Path.cwd()
         self.path_resolver = PathResolver(self.repo_path)
         self.semantic_indexer = semantic_indexer
+        self.use_git_blob_oids = use_git_blob_oids
+        # Per-run git state: index OIDs + dirty paths, and OIDs observed for
+        # files during this run that should be persisted once it finishes.
+        self._git_snapshot: Optional[GitBlobSnapshot] = None
+        self._observed_blob_oids: Dict[str, str] = {}
+        self._pending_blob_oids: Dict[str, Optional[str]] = {}
 
     def _dispatcher_ctx(self) -> RepoContext:
         if self.ctx is None:
@@ -194,6 +202,17 @@ class IncrementalIndexer:
             expected_prompt_fingerprint=contract.get("prompt_fingerprint"),
         )
 
+    def _move_semantic_invalidation(
+        self, old_path: Path, new_path: Path, invalidation: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if self.semantic_indexer is None or not hasattr(
+            self.semantic_indexer, "move_semantic_artifacts"
+        ):
+            return self._cleanup_semantic_invalidation(invalidation)
+        return self.semantic_indexer.move_semantic_artifacts(
+            old_path, new_path, invalidation=invalidation, sqlite_store=self.store
+        )
+
     def _cleanup_semantic_invalidation(self, invalidation: Dict[str, Any]) -> Dict[str, Any]:
         if self.semantic_indexer is None:
             return {
@@ -257,27 +276,30 @@ class IncrementalIndexer:
             IncrementalStats with operation results
         """
         stats = IncrementalStats(start_time=datetime.now())
+        self._begin_git_blob_run()
+        try:
+            # Group changes by type for efficient processing
+            changes_by_type = self._group_changes_by_type(changes)
 
-        # Group changes by type for efficient processing
-        changes_by_type = self._group_changes_by_type(changes)
-
-        # Process deletions first (to free up space)
-        for change in changes_by_type.get("deleted", []):
-            if self._remove_file(change.path):
-                stats.files_removed += 1
-            else:
-                stats.errors += 1
+            # Process deletions first (to free up space)
+            for change in changes_by_type.get("deleted", []):
+                if self._remove_file(change.path):
+                    stats.files_removed += 1
+                else:
+                    stats.errors += 1
 
-        # Process renames
-        for change in changes_by_type.get("renamed", []):
-            if self._move_file(change.old_path, change.path):
-                stats.files_moved += 1
-            else:
-                stats.errors += 1
+            # Process renames
+            for change in changes_by_type.get("renamed", []):
+                if self._move_file(change.old_path, change.path):
+                    stats.files_moved += 1
+                else:
+                    stats.errors += 1
 
-        # Process additions and modifications with checkpoint-resume
-        add_mod_changes = changes_by_type.get("added", []) + changes_by_type.get("modified", [])
-        self._index_files_with_checkpoint(add_mod_changes, stats)
+            # Process additions and modifications with checkpoint-resume
+            add_mod_changes = changes_by_type.get("added", []) + changes_by_type.get("modified", [])
+            self._index_files_with_checkpoint(add_mod_changes, stats)
+        finally:
+            self._end_git_blob_run()
 
         stats.end_time = datetime.now()
 
@@ -424,9 +446,11 @@ class IncrementalIndexer:
     def _move_file(self, old_path: str, new_path: str) -> bool:
         """Move a file in the index (handle rename).
 
-        Uses two_phase_commit: primary = SQLite move_file (durable, rollback via reverse
-        move), shadow = Qdrant delete_stale_vectors for old_path vectors. Chunk IDs are
-        captured before the primary op because SQLite no longer has the old row after move.
+        With a dispatcher, its ``move_file`` does the whole move.  Otherwise uses
+        two_phase_commit: primary = SQLite move_file (durable, rollback via reverse
+        move), shadow = payload-only move of the file's vectors (no re-embed). Chunk IDs
+        are captured before the primary op because SQLite no longer has the old row
+        after move.
         """
         try:
             new_full_path = self.repo_path / new_path
@@ -435,32 +459,18 @@ class IncrementalIndexer:
                 return self._remove_file(old_path)
 
             content_hash = self._compute_file_hash(new_full_path)
-            invalidation = self._plan_semantic_invalidation(
-                old_path,
-                new_path=new_path,
-                preserve_matching_summaries=True,
-            )
 
             if self.dispatcher:
                 old_full_path = self.repo_path / old_path
-                ctx = self._dispatcher_ctx()
-
-                def primary_op():
-                    self.dispatcher.move_file(ctx, old_full_path, new_full_path, content_hash)
-                    return invalidation
-
-                def shadow_op(captured_invalidation):
-                    self._cleanup_semantic_invalidation(captured_invalidation)
-
-                def rollback(captured_invalidation):
-                    try:
-                        self.dispatcher.move_file(ctx, new_full_path, old_full_path, content_hash)
-                    except Exception as rb_exc:
-                        logger.warning(f"Rollback of dispatcher move {old_path} failed: {rb_exc}")
-
-                two_phase_commit(primary_op, shadow_op, rollback)
-                self.dispatcher.rebuild_semantic_for_paths(ctx, [new_full_path])
+                self.dispatcher.move_file(
+                    self._dispatcher_ctx(), old_full_path, new_full_path, content_hash
+                )
             else:
+                invalidation = self._plan_semantic_invalidation(
+                    old_path,
+                    new_path=new_path,
+                    preserve_matching_summaries=True,
+                )
                 old_relative = self.path_resolver.normalize_path(self.repo_path / old_path)
                 new_relative = self.path_resolver.normalize_path(new_full_path)
                 repo_id = self._get_repository_id()
@@ -470,7 +480,9 @@ class IncrementalIndexer:
                     return invalidation
 
                 def shadow_op(captured_invalidation):
-                    self._cleanup_semantic_invalidation(captured_invalidation)
+                    self._move_semantic_invalidation(
+                        self.repo_path / old_path, new_full_path, captured_invalidation
+                    )
 
                 def rollback(captured_invalidation):
                     try:
@@ -524,6 +536,9 @@ class IncrementalIndexer:
                 # Use dispatcher if available
                 ctx = self._dispatcher_ctx()
                 self.dispatcher.index_file(ctx, full_path)
+                observed_oid = self._observed_blob_oids.get(relative_path)
+                if observed_oid is not None:
+                    self._pending_blob_oids[relative_path] = observed_oid
             else:
                 # Direct indexing would go here
                 logger.warning(f"No dispatcher available to index {path}")
@@ -539,6 +554,12 @@ class IncrementalIndexer:
     def _needs_reindex(self, file_path: Path, stored_file: Optional[Dict] = None) -> bool:
         """Check if a file needs to be reindexed.
 
+        Inside a git work tree the file's current blob OID (from the git
+        index, or hashed only when ``git status`` reports it dirty) is
+        compared with the OID stored on its ``files`` row.  Content hashing
+        is the fallback for non-git repositories and for rows indexed before
+        OIDs were recorded.
+
         Args:
             file_path: Absolute file path
             stored_file: Optional cached file record
@@ -547,26 +568,35 @@ class IncrementalIndexer:
             True if file needs reindexing
         """
         try:
-            # Compute current file hash
-            current_hash = self._compute_file_hash(file_path)
-
-            # Get stored hash from database
             relative_path = self.path_resolver.normalize_path(file_path)
             repo_id = self._get_repository_id()
 
+            current_oid = self._current_blob_oid(relative_path, file_path)
             stored_file = stored_file or self.store.get_file_by_path(relative_path, repo_id)
             if not stored_file:
                 # File not in index
                 return True
 
-            stored_hash = stored_file.get("content_hash") or stored_file.get("hash")
-            if not stored_hash:
-                # No hash stored, reindex
-                return True
-
-            # Compare hashes
-            if current_hash != stored_hash:
-                return True
+            stored_oid = stored_file.get("git_blob_oid")
+            if current_oid is not None and stored_oid:
+                if current_oid != stored_oid:
+                    return True
+            else:
+                # Compute current file hash
+                current_hash = self._compute_file_hash(file_path)
+                stored_hash = stored_file.get("content_hash") or stored_file.get("hash")
+                if not stored_hash:
+                    # No hash stored, reindex
+                    return True
+
+                # Compare hashes
+                if current_hash != stored_hash:
+                    return True
+
+                if current_oid is not None:
+                    # Content verified unchanged: backfill the OID so the next
+                    # run can skip hashing this file.
+                    self._pending_blob_oids[relative_path] = current_oid
 
             if self.semantic_indexer is None:
                 return False
@@ -589,6 +619,40 @@ class IncrementalIndexer:
             # On error, assume it needs reindexing
             return True
 
+    def _begin_git_blob_run(self) -> None:
+        """Capture git index OIDs and dirty paths once for this run."""
+        self._observed_blob_oids = {}
+        self._pending_blob_oids = {}
+        self._git_snapshot = None
+        if not self.use_git_blob_oids:
+            return
+        try:
+            self._git_snapshot = GitBlobSnapshot.load(self.repo_path)
+        except Exception as e:
+            logger.debug(f"Git blob OID snapshot unavailable for {self.repo_path}: {e}")
+
+    def _end_git_blob_run(self) -> None:
+        """Persist OIDs observed during the run and drop the snapshot."""
+        pending = self._pending_blob_oids
+        self._git_snapshot = None
+        self._observed_blob_oids = {}
+        self._pending_blob_oids = {}
+        if not pending:
+            return
+        try:
+            self.store.set_file_git_blob_oids(self._get_repository_id(), pending)
+        except Exception as e:
+            logger.warning(f"Failed to record git blob OIDs: {e}")
+
+    def _current_blob_oid(self, relative_path: str, file_path: Path) -> Optional[str]:
+        """Return the file's current git blob OID, or None outside a git run."""
+        if self._git_snapshot is None:
+            return None
+        oid = self._git_snapshot.current_oid(relative_path, file_path)
+        if oid is not None:
+            self._observed_blob_oids[relative_path] = oid
+        return oid
+
     def _compute_file_hash(self, file_path: Path) -> str:
         """Compute SHA-256 hash of file content.
 
@@ -656,18 +720,22 @@ class IncrementalIndexer:
         indexed_files = self.store.get_all_files(repo_id)
         stats["total_indexed"] = len(indexed_files)
 
-        for file_info in indexed_files:
-            relative_path = file_info.get("path")
-            if not relative_path:
-                continue
+        self._begin_git_blob_run()
+        try:
+            for file_info in indexed_files:
+                relative_path = file_info.get("path")
+                if not relative_path:
+                    continue
 
-            full_path = self.repo_path / relative_path
+                full_path = self.repo_path / relative_path
 
-            if not full_path.exists():
-                stats["files_missing"] += 1
-            elif self._needs_reindex(full_path, stored_file=file_info):
-                stats["files_changed"] += 1
-            else:
-                stats["files_ok"] += 1
+                if not full_path.exists():
+                    stats["files_missing"] += 1
+                elif self._needs_reindex(full_path, stored_file=file_info):
+                    stats["files_changed"] += 1
+                else:
+                    stats["files_ok"] += 1
+        finally:
+            self._end_git_blob_run()
 
         return stats
@@ -13,7 +13,9 @@ from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, cast
 import mcp.types as types
 
 from ..setup.semantic_preflight import EnrichmentModelResolution, resolve_enrichment_model
+from ..storage.chunk_bodies import chunk_content_sql
 from ..storage.sqlite_store import SQLiteStore, assert_chunk_scheme_readable
+from ..utils.tokenizer import CHARS_PER_TOKEN, get_tokenizer
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,12 @@ _SUMMARY_CALL_CANCEL_SETTLE_SECONDS = 1.0
 # Files larger than this (in characters) skip the single-batch API call and fall back
 # to the topological per-chunk path.
 _BATCH_FILE_SIZE_THRESHOLD = 400_000
+
+# Token equivalents of the character budgets above, applied instead of them
+# when a BPE vocabulary gives exact counts (MCP_TOKENIZER_VOCAB).
+_MAX_FILE_CONTEXT_TOKENS = _MAX_FILE_CONTEXT_CHARS // CHARS_PER_TOKEN
+_DOC_FILE_CONTEXT_TOKENS = _DOC_FILE_CONTEXT_CHARS // CHARS_PER_TOKEN
+_BATCH_FILE_TOKEN_THRESHOLD = _BATCH_FILE_SIZE_THRESHOLD // CHARS_PER_TOKEN
 _PROFILE_BATCH_CHUNK_COUNT = 64
 
 
@@ -441,15 +449,20 @@ class ChunkWriter:
     ) -> str:
         if not file_content:
             return ""
-        normalized_language = (language or "").lower()
-        max_chars = _MAX_FILE_CONTEXT_CHARS
-        if normalized_language in _DOC_CONTEXT_LANGUAGES:
-            max_chars = _DOC_FILE_CONTEXT_CHARS
-        if len(chunk_content) > max_chars // 2:
-            return ""
+        is_doc = (language or "").lower() in _DOC_CONTEXT_LANGUAGES
+        tokenizer = get_tokenizer()
+        if tokenizer.exact:
+            max_tokens = _DOC_FILE_CONTEXT_TOKENS if is_doc else _MAX_FILE_CONTEXT_TOKENS
+            if tokenizer.count(chunk_content) > max_tokens // 2:
+                return ""
+            trimmed = tokenizer.truncate(file_content, max_tokens)
+        else:
+            max_chars = _DOC_FILE_CONTEXT_CHARS if is_doc else _MAX_FILE_CONTEXT_CHARS
+            if len(chunk_content) > max_chars // 2:
+                return ""
+            trimmed = file_content[:max_chars]
 
-        trimmed = file_content[:max_chars]
-        if len(file_content) > max_chars:
+        if len(trimmed) < len(file_content):
             trimmed += "\n... [file truncated for context window]"
         return (
             f"Full source file ({language}):\n```{language}\n{trimmed}\n```\n\n"
@@ -611,7 +624,8 @@ class ChunkWriter:
 class FileBatchSummarizer(ChunkWriter):
     """Summarizes all chunks of a file in a single BAML API call.
 
-    For files that exceed ``_BATCH_FILE_SIZE_THRESHOLD`` characters the batch
+    For files that exceed ``_BATCH_FILE_SIZE_THRESHOLD`` characters (or
+    ``_BATCH_FILE_TOKEN_THRESHOLD`` tokens when counts are exact) the batch
     call first falls back to bounded profile-backed chunk windows when that
     recovery path is configured, and only then to the topological per-chunk
     path (same Kahn's-sort logic as ``ComprehensiveChunkWriter``, but
@@ -825,7 +839,15 @@ class FileBatchSummarizer(ChunkWriter):
         Raises ``FileTooLargeError`` when *file_content* exceeds the threshold
         so callers can switch to the per-chunk fallback.
         """
-        if len(file_content) > _BATCH_FILE_SIZE_THRESHOLD:
+        tokenizer = get_tokenizer()
+        if tokenizer.exact:
+            file_tokens = tokenizer.count(file_content)
+            if file_tokens > _BATCH_FILE_TOKEN_THRESHOLD:
+                raise FileTooLargeError(
+                    f"{file_path} ({file_tokens:,} tokens) exceeds batch threshold "
+                    f"({_BATCH_FILE_TOKEN_THRESHOLD:,} tokens)"
+                )
+        elif len(file_content) > _BATCH_FILE_SIZE_THRESHOLD:
             raise FileTooLargeError(
                 f"{file_path} ({len(file_content):,} chars) exceeds batch threshold "
                 f"({_BATCH_FILE_SIZE_THRESHOLD:,} chars)"
@@ -1088,7 +1110,7 @@ class ComprehensiveChunkWriter(FileBatchSummarizer):
             params.append(limit)
             cursor = conn.execute(
                 f"""SELECT c.chunk_id, c.file_id, c.line_start, c.line_end,
-                           c.content, c.node_type, c.parent_chunk_id,
+                           {chunk_content_sql(conn)} AS content, c.node_type, c.parent_chunk_id,
                            c.language, s.name AS symbol, f.path AS file_path,
                            c.symbol_id
                     FROM code_chunks c
@@ -181,6 +181,7 @@ from .metrics_collector import (  # noqa: E402
     get_metrics_collector,
     set_metrics_collector,
 )
+from .quantile_sketch import QuantileSketch  # noqa: E402
 
 
 def get_health_checker() -> IHealthCheck:
@@ -197,6 +198,7 @@ __all__ = [
     "MetricType",
     "MetricPoint",
     "PrometheusMetricsCollector",
+    "QuantileSketch",
     "ComponentHealthChecker",
     "get_metrics_collector",
     "set_metrics_collector",
@@ -3,12 +3,15 @@
 import logging
 import threading
 import time
-from collections import defaultdict, deque
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Deque, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from . import IMetricsCollector
+from .quantile_sketch import QuantileSketch
 
 logger = logging.getLogger(__name__)
 
@@ -49,57 +52,102 @@ class GaugeMetric:
         self.value -= value
 
 
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
 @dataclass
 class HistogramMetric:
-    """Histogram metric for observing distributions."""
+    """Histogram metric for observing distributions.
+
+    ``bucket_counts`` is cumulative (Prometheus ``le`` semantics) and
+    ``sketch`` answers quantile queries without keeping raw observations.
+    """
 
     name: str
-    buckets: List[float] = field(
-        default_factory=lambda: [
-            0.005,
-            0.01,
-            0.025,
-            0.05,
-            0.1,
-            0.25,
-            0.5,
-            1.0,
-            2.5,
-            5.0,
-            10.0,
-        ]
-    )
+    buckets: List[float] = field(default_factory=lambda: list(DEFAULT_BUCKETS))
     labels: Dict[str, str] = field(default_factory=dict)
-    observations: Deque[float] = field(default_factory=deque)
     bucket_counts: Dict[float, int] = field(default_factory=dict)
     total_count: int = 0
     total_sum: float = 0.0
+    sketch: QuantileSketch = field(default_factory=QuantileSketch)
 
     def __post_init__(self):
         """Initialize bucket counts."""
+        self.buckets = sorted(self.buckets)
         for bucket in self.buckets:
             self.bucket_counts[bucket] = 0
         self.bucket_counts[float("inf")] = 0  # +Inf bucket
 
     def observe(self, value: float) -> None:
         """Observe a value in the histogram."""
-        self.observations.append(value)
         self.total_count += 1
         self.total_sum += value
-
-        # Update bucket counts
-        for bucket in self.buckets:
-            if value <= bucket:
-                self.bucket_counts[bucket] += 1
+        for bucket in self.buckets[bisect_left(self.buckets, value) :]:
+            self.bucket_counts[bucket] += 1
         self.bucket_counts[float("inf")] += 1  # +Inf bucket always gets incremented
+        self.sketch.add(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated ``q``-quantile of everything observed, or None when empty."""
+        return self.sketch.quantile(q)
+
+
+class _HistogramCell:
+    """One thread's share of a histogram: per-bucket (non-cumulative) counts."""
+
+    __slots__ = ("counts", "count", "sum", "sketch")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.sketch = QuantileSketch()
+
+
+class _Shard:
+    """Counter and histogram state written by a single thread."""
+
+    __slots__ = ("lock", "counters", "histograms", "owner")
+
+    def __init__(self, owner: Optional[threading.Thread]):
+        # Only contended while a scrape reads this shard.
+        self.lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _HistogramCell] = {}
+        self.owner = weakref.ref(owner) if owner is not None else None
 
-        # Keep only recent observations for memory efficiency
-        if len(self.observations) > 10000:
-            self.observations.popleft()
+    def is_live(self) -> bool:
+        thread = self.owner() if self.owner is not None else None
+        return thread is not None and thread.is_alive()
+
+    def absorb(self, other: "_Shard") -> None:
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0.0) + value
+        for key, cell in other.histograms.items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                mine = self.histograms[key] = _HistogramCell(len(cell.counts) - 1)
+            for index, count in enumerate(cell.counts):
+                mine.counts[index] += count
+            mine.count += cell.count
+            mine.sum += cell.sum
+            mine.sketch.merge(cell.sketch)
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
 
 
 class PrometheusMetricsCollector(IMetricsCollector):
-    """Prometheus-compatible metrics collector."""
+    """Prometheus-compatible metrics collector.
+
+    Counter increments and histogram observations go to a per-thread shard
+    guarded by its own lock, so recording never contends with other threads;
+    shards are merged, and the text exposition rendered, only when metrics
+    are read.  Histograms keep a mergeable quantile sketch instead of raw
+    observations, so p50/p95/p99 are available from ``get_quantiles``.
+    """
 
     def __init__(self, namespace: str = "mcp_server"):
         """Initialize the metrics collector.
@@ -108,10 +156,18 @@ class PrometheusMetricsCollector(IMetricsCollector):
             namespace: Namespace prefix for all metrics
         """
         self.namespace = namespace
+        # Guards metric registration, the shard list and scrapes; not taken
+        # when recording into an existing metric.
         self._lock = threading.RLock()
         self._counters: Dict[str, CounterMetric] = {}
         self._gauges: Dict[str, GaugeMetric] = {}
         self._histograms: Dict[str, HistogramMetric] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Totals folded in from threads that have exited.
+        self._retired = _Shard(None)
+        self._dirty = True
+        self._exposition: Optional[str] = None
 
         # Initialize default metrics
         self._initialize_default_metrics()
@@ -146,6 +202,15 @@ class PrometheusMetricsCollector(IMetricsCollector):
             return f"{name}#{label_str}"
         return name
 
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
     def increment_counter(
         self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None
     ) -> None:
@@ -156,20 +221,28 @@ class PrometheusMetricsCollector(IMetricsCollector):
         full_name = f"{self.namespace}_{name}"
         key = self._get_metric_key(full_name, labels)
 
-        with self._lock:
-            if key not in self._counters:
-                self._counters[key] = CounterMetric(full_name, 0.0, labels or {})
-            self._counters[key].increment(value)
+        if key not in self._counters:
+            with self._lock:
+                if key not in self._counters:
+                    self._counters[key] = CounterMetric(full_name, 0.0, dict(labels or {}))
+        shard = self._shard()
+        with shard.lock:
+            shard.counters[key] = shard.counters.get(key, 0.0) + value
+        self._dirty = True
 
     def set_gauge(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
         """Set a gauge metric value."""
         full_name = f"{self.namespace}_{name}"
         key = self._get_metric_key(full_name, labels)
 
-        with self._lock:
-            if key not in self._gauges:
-                self._gauges[key] = GaugeMetric(full_name, 0.0, labels or {})
-            self._gauges[key].set(value)
+        gauge = self._gauges.get(key)
+        if gauge is None:
+            with self._lock:
+                gauge = self._gauges.setdefault(
+                    key, GaugeMetric(full_name, 0.0, dict(labels or {}))
+                )
+        gauge.set(value)
+        self._dirty = True
 
     def observe_histogram(
         self, name: str, value: float, labels: Optional[Dict[str, str]] = None
@@ -178,82 +251,141 @@ class PrometheusMetricsCollector(IMetricsCollector):
         full_name = f"{self.namespace}_{name}"
         key = self._get_metric_key(full_name, labels)
 
-        with self._lock:
-            if key not in self._histograms:
-                self._histograms[key] = HistogramMetric(full_name, labels=labels or {})
-            self._histograms[key].observe(value)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    key, HistogramMetric(full_name, labels=dict(labels or {}))
+                )
+        buckets = histogram.buckets
+        shard = self._shard()
+        with shard.lock:
+            cell = shard.histograms.get(key)
+            if cell is None:
+                cell = shard.histograms[key] = _HistogramCell(len(buckets))
+            cell.counts[bisect_left(buckets, value)] += 1
+            cell.count += 1
+            cell.sum += value
+            cell.sketch.add(value)
+        self._dirty = True
 
     @contextmanager
     def time_function(self, name: str, labels: Optional[Dict[str, str]] = None):
         """Context manager for timing function execution."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             yield
         finally:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             self.observe_histogram(f"{name}_duration_seconds", duration, labels)
 
+    def _merge_shards(self) -> None:
+        """Fold every shard into the registered metrics (caller holds ``_lock``)."""
+        live: List[_Shard] = []
+        merged = _Shard(None)
+        merged.absorb(self._retired)
+        for shard in self._shards:
+            with shard.lock:
+                if shard.is_live():
+                    live.append(shard)
+                    merged.absorb(shard)
+                else:
+                    self._retired.absorb(shard)
+                    merged.absorb(shard)
+        self._shards = live
+
+        for key, counter in self._counters.items():
+            counter.value = merged.counters.get(key, 0.0)
+        for key, histogram in self._histograms.items():
+            cell = merged.histograms.get(key)
+            running = 0
+            for index, bucket in enumerate(histogram.buckets):
+                running += cell.counts[index] if cell is not None else 0
+                histogram.bucket_counts[bucket] = running
+            histogram.bucket_counts[float("inf")] = cell.count if cell is not None else 0
+            histogram.total_count = cell.count if cell is not None else 0
+            histogram.total_sum = cell.sum if cell is not None else 0.0
+            histogram.sketch = cell.sketch if cell is not None else QuantileSketch()
+
     def get_metrics(self) -> str:
-        """Get all metrics in Prometheus format."""
-        lines = []
+        """Get all metrics in Prometheus format.
 
+        The text is rendered on demand and reused until something is recorded.
+        """
         with self._lock:
-            # Export counters
-            for counter in self._counters.values():
-                help_line = f"# HELP {counter.name} Counter metric"
-                type_line = f"# TYPE {counter.name} counter"
-                lines.extend([help_line, type_line])
-
-                if counter.labels:
-                    label_str = ",".join(f'{k}="{v}"' for k, v in counter.labels.items())
-                    metric_line = f"{counter.name}{{{label_str}}} {counter.value}"
-                else:
-                    metric_line = f"{counter.name} {counter.value}"
-                lines.append(metric_line)
-                lines.append("")  # Empty line between metrics
-
-            # Export gauges
-            for gauge in self._gauges.values():
-                help_line = f"# HELP {gauge.name} Gauge metric"
-                type_line = f"# TYPE {gauge.name} gauge"
-                lines.extend([help_line, type_line])
+            if not self._dirty and self._exposition is not None:
+                return self._exposition
+            # Cleared before reading so concurrent writes mark the next scrape.
+            self._dirty = False
+            self._merge_shards()
+            self._exposition = self._render()
+            return self._exposition
+
+    def _render(self) -> str:
+        lines = []
 
-                if gauge.labels:
-                    label_str = ",".join(f'{k}="{v}"' for k, v in gauge.labels.items())
-                    metric_line = f"{gauge.name}{{{label_str}}} {gauge.value}"
-                else:
-                    metric_line = f"{gauge.name} {gauge.value}"
-                lines.append(metric_line)
+        # Export counters
+        for counter in self._counters.values():
+            help_line = f"# HELP {counter.name} Counter metric"
+            type_line = f"# TYPE {counter.name} counter"
+            lines.extend([help_line, type_line])
+
+            if counter.labels:
+                label_str = ",".join(f'{k}="{v}"' for k, v in counter.labels.items())
+                metric_line = f"{counter.name}{{{label_str}}} {counter.value}"
+            else:
+                metric_line = f"{counter.name} {counter.value}"
+            lines.append(metric_line)
+            lines.append("")  # Empty line between metrics
+
+        # Export gauges
+        for gauge in self._gauges.values():
+            help_line = f"# HELP {gauge.name} Gauge metric"
+            type_line = f"# TYPE {gauge.name} gauge"
+            lines.extend([help_line, type_line])
+
+            if gauge.labels:
+                label_str = ",".join(f'{k}="{v}"' for k, v in gauge.labels.items())
+                metric_line = f"{gauge.name}{{{label_str}}} {gauge.value}"
+            else:
+                metric_line = f"{gauge.name} {gauge.value}"
+            lines.append(metric_line)
+            lines.append("")
+
+        # Export histograms
+        for histogram in self._histograms.values():
+            help_line = f"# HELP {histogram.name} Histogram metric"
+            type_line = f"# TYPE {histogram.name} histogram"
+            lines.extend([help_line, type_line])
+            label_str = ",".join(f'{k}="{v}"' for k, v in histogram.labels.items())
+            prefix = f"{label_str}," if label_str else ""
+
+            # Export buckets
+            for bucket in histogram.buckets + [float("inf")]:
+                bucket_count = histogram.bucket_counts.get(bucket, 0)
+                lines.append(f'{histogram.name}_bucket{{{prefix}le="{bucket}"}} {bucket_count}')
+
+            # Export count and sum
+            if label_str:
+                count_line = f"{histogram.name}_count{{{label_str}}} {histogram.total_count}"
+                sum_line = f"{histogram.name}_sum{{{label_str}}} {histogram.total_sum}"
+            else:
+                count_line = f"{histogram.name}_count {histogram.total_count}"
+                sum_line = f"{histogram.name}_sum {histogram.total_sum}"
+            lines.extend([count_line, sum_line, ""])
+
+            # Quantile estimates go in a separate gauge family; Prometheus
+            # histograms cannot carry quantile samples.
+            if histogram.total_count:
+                quantile_name = f"{histogram.name}_quantile"
+                lines.append(f"# HELP {quantile_name} Estimated quantiles of {histogram.name}")
+                lines.append(f"# TYPE {quantile_name} gauge")
+                for q in DEFAULT_QUANTILES:
+                    lines.append(
+                        f'{quantile_name}{{{prefix}quantile="{q}"}} {histogram.quantile(q)}'
+                    )
                 lines.append("")
 
-            # Export histograms
-            for histogram in self._histograms.values():
-                help_line = f"# HELP {histogram.name} Histogram metric"
-                type_line = f"# TYPE {histogram.name} histogram"
-                lines.extend([help_line, type_line])
-
-                # Export buckets
-                for bucket in sorted(histogram.buckets) + [float("inf")]:
-                    bucket_count = histogram.bucket_counts.get(bucket, 0)
-                    if histogram.labels:
-                        label_str = ",".join(f'{k}="{v}"' for k, v in histogram.labels.items())
-                        bucket_line = (
-                            f'{histogram.name}_bucket{{le="{bucket}",{label_str}}} {bucket_count}'
-                        )
-                    else:
-                        bucket_line = f'{histogram.name}_bucket{{le="{bucket}"}} {bucket_count}'
-                    lines.append(bucket_line)
-
-                # Export count and sum
-                if histogram.labels:
-                    label_str = ",".join(f'{k}="{v}"' for k, v in histogram.labels.items())
-                    count_line = f"{histogram.name}_count{{{label_str}}} {histogram.total_count}"
-                    sum_line = f"{histogram.name}_sum{{{label_str}}} {histogram.total_sum}"
-                else:
-                    count_line = f"{histogram.name}_count {histogram.total_count}"
-                    sum_line = f"{histogram.name}_sum {histogram.total_sum}"
-                lines.extend([count_line, sum_line, ""])
-
         return "\n".join(lines)
 
     def get_metric_families(self) -> List[Dict[str, Any]]:
@@ -261,6 +393,8 @@ class PrometheusMetricsCollector(IMetricsCollector):
         families = []
 
         with self._lock:
+            self._merge_shards()
+
             # Group metrics by name
             metric_groups = defaultdict(list)
 
@@ -285,9 +419,10 @@ class PrometheusMetricsCollector(IMetricsCollector):
                 metric_groups[histogram.name].append(
                     {
                         "type": "histogram",
-                        "buckets": histogram.bucket_counts,
+                        "buckets": dict(histogram.bucket_counts),
                         "count": histogram.total_count,
                         "sum": histogram.total_sum,
+                        "quantiles": histogram.sketch.quantiles(DEFAULT_QUANTILES),
                         "labels": histogram.labels,
                     }
                 )
@@ -320,19 +455,42 @@ class PrometheusMetricsCollector(IMetricsCollector):
         key = self._get_metric_key(full_name, labels)
 
         with self._lock:
+            # Gauges are written in place
+            if key in self._gauges:
+                return self._gauges[key].value
+
+            if key not in self._counters and key not in self._histograms:
+                return None
+            self._merge_shards()
+
             # Check counters
             if key in self._counters:
                 return self._counters[key].value
 
-            # Check gauges
-            if key in self._gauges:
-                return self._gauges[key].value
-
             # For histograms, return the count
-            if key in self._histograms:
-                return float(self._histograms[key].total_count)
+            return float(self._histograms[key].total_count)
+
+    def get_quantiles(
+        self,
+        name: str,
+        labels: Optional[Dict[str, str]] = None,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Optional[Dict[float, Optional[float]]]:
+        """Estimated quantiles of a histogram metric, or None if it does not exist.
+
+        Args:
+            name: Metric name (without namespace prefix)
+            labels: Optional labels to match
+            quantiles: Quantiles to estimate, each in [0, 1]
+        """
+        full_name = f"{self.namespace}_{name}"
+        key = self._get_metric_key(full_name, labels)
 
-        return None
+        with self._lock:
+            if key not in self._histograms:
+                return None
+            self._merge_shards()
+            return self._histograms[key].sketch.quantiles(quantiles)
 
     def reset_metrics(self) -> None:
         """Reset all metrics (useful for testing)."""
@@ -340,6 +498,11 @@ class PrometheusMetricsCollector(IMetricsCollector):
             self._counters.clear()
             self._gauges.clear()
             self._histograms.clear()
+            for shard in self._shards:
+                with shard.lock:
+                    shard.clear()
+            self._retired.clear()
+            self._dirty = True
             self._initialize_default_metrics()
 
     def get_stats(self) -> Dict[str, int]:
@@ -354,6 +517,7 @@ class PrometheusMetricsCollector(IMetricsCollector):
                 "gauges": len(self._gauges),
                 "histograms": len(self._histograms),
                 "total": len(self._counters) + len(self._gauges) + len(self._histograms),
+                "shards": len(self._shards),
             }
 
 
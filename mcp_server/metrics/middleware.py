@@ -8,6 +8,7 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from ..core.tracing import get_tracer
 from ..metrics import get_metrics_collector
 
 logger = logging.getLogger(__name__)
@@ -52,8 +53,9 @@ class MetricsMiddleware(BaseHTTPMiddleware):
         )
 
         try:
-            # Process request
-            response = await call_next(request)
+            # Process request; the span roots the request's trace
+            with get_tracer().span(f"http {method} {normalized_path}"):
+                response = await call_next(request)
 
             # Calculate request duration
             duration = time.time() - start_time
@@ -101,6 +101,59 @@ mcp_artifact_errors_by_class_total = Counter(
 )
 
 
+mcp_index_maintenance_operations_total = Counter(
+    "mcp_index_maintenance_operations_total",
+    "Background index maintenance operations (merge steps, optimize, analyze, "
+    "checkpoint, vacuum) and ticks skipped because searches were in flight.",
+    ["operation"],
+    registry=_EXPORTER_REGISTRY,
+)
+
+
+mcp_index_maintenance_seconds_total = Counter(
+    "mcp_index_maintenance_seconds_total",
+    "Seconds spent in background index maintenance, by operation.",
+    ["operation"],
+    registry=_EXPORTER_REGISTRY,
+)
+
+
+mcp_tool_queue_wait_seconds = Histogram(
+    "mcp_tool_queue_wait_seconds",
+    "Time a tool call waited for admission before executing.",
+    ["tool", "lane"],
+    buckets=_DISPATCHER_FALLBACK_BUCKETS,
+    registry=_EXPORTER_REGISTRY,
+)
+
+
+mcp_tool_execution_seconds = Histogram(
+    "mcp_tool_execution_seconds",
+    "Time a tool call spent executing after admission.",
+    ["tool", "lane"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+    registry=_EXPORTER_REGISTRY,
+)
+
+
+mcp_tool_rejections_total = Counter(
+    "mcp_tool_rejections_total",
+    "Tool calls refused by admission control, by tool and reason.",
+    ["tool", "reason"],
+    registry=_EXPORTER_REGISTRY,
+)
+
+
+mcp_trace_stage_seconds = Histogram(
+    "mcp_trace_stage_seconds",
+    "Duration of traced stages (search branches, store queries, rerankers, "
+    "embedding and vector queries, index persistence).",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    registry=_EXPORTER_REGISTRY,
+)
+
+
 def record_tool_call(tool: str, status: str) -> None:
     """Increment mcp_tool_calls_total for the given tool/status label pair."""
     if not PROMETHEUS_AVAILABLE:
@@ -112,6 +165,31 @@ def record_tool_call(tool: str, status: str) -> None:
         logger.warning("record_tool_call failed: %s", exc)
 
 
+def record_tool_admission(tool: str, lane: str, waited: float, executed: float) -> None:
+    """Observe queue wait and execution time for one admitted tool call."""
+    try:
+        mcp_tool_queue_wait_seconds.labels(tool=tool, lane=lane).observe(waited)
+        mcp_tool_execution_seconds.labels(tool=tool, lane=lane).observe(executed)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("record_tool_admission failed: %s", exc)
+
+
+def record_tool_rejection(tool: str, reason: str) -> None:
+    """Increment mcp_tool_rejections_total for a refused tool call."""
+    try:
+        mcp_tool_rejections_total.labels(tool=tool, reason=reason).inc()
+    except Exception as exc:  # pragma: no cover
+        logger.warning("record_tool_rejection failed: %s", exc)
+
+
+def record_trace_stage(stage: str, seconds: float) -> None:
+    """Observe one traced stage in mcp_trace_stage_seconds."""
+    try:
+        mcp_trace_stage_seconds.labels(stage=stage).observe(seconds)
+    except Exception as exc:  # pragma: no cover
+        logger.warning("record_trace_stage failed: %s", exc)
+
+
 class PrometheusExporter:
     """Exports MCP Server metrics in Prometheus format."""
 
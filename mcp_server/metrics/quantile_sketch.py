@@ -0,0 +1,116 @@
+"""Mergeable streaming quantile sketch (DDSketch).
+
+Values are counted in logarithmic bins whose width is a fixed fraction of
+their magnitude, so every quantile estimate is within ``relative_accuracy``
+of the true value.  Memory depends on the dynamic range of the data, not on
+how many values were observed, and two sketches merge by adding bin counts,
+which is what lets per-thread shards be combined at scrape time.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+
+
+class QuantileSketch:
+    """DDSketch over non-negative values (latencies, sizes)."""
+
+    __slots__ = (
+        "relative_accuracy",
+        "max_bins",
+        "_gamma",
+        "_log_gamma",
+        "bins",
+        "zero_count",
+        "count",
+        "min",
+        "max",
+    )
+
+    # Values at or below this are counted as zero.
+    MIN_VALUE = 1e-9
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_bins: int = DEFAULT_MAX_BINS,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        bins = self.bins
+        bins[key] = bins.get(key, 0) + 1
+        if len(bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """Fold the lowest bins together; accuracy is kept for the upper quantiles."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins + 1
+        target = keys[excess]
+        folded = sum(self.bins.pop(key) for key in keys[:excess])
+        self.bins[target] += folded
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other._gamma != self._gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def copy(self) -> "QuantileSketch":
+        clone = QuantileSketch(self.relative_accuracy, self.max_bins)
+        clone.merge(self)
+        return clone
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated ``q``-quantile (0 <= q <= 1), or None when empty."""
+        if self.count == 0:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be in [0, 1]")
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(0.0, self.min)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                estimate = 2 * self._gamma**key / (self._gamma + 1)
+                # Clamp to the observed range so q=0/1 report exact extremes.
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, Optional[float]]:
+        return {q: self.quantile(q) for q in qs}
+
+
+__all__ = ["QuantileSketch"]
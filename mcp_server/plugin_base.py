@@ -1,6 +1,9 @@
+import os
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
 from typing_extensions import NotRequired, TypedDict
 
@@ -8,6 +11,30 @@ if TYPE_CHECKING:
     from mcp_server.core.repo_context import RepoContext
 
 
+_preindex_suppressed: ContextVar[bool] = ContextVar("preindex_suppressed", default=False)
+
+
+def preindex_enabled() -> bool:
+    """Whether a plugin constructor should pre-index the workspace.
+
+    False under ``MCP_SKIP_PLUGIN_PREINDEX=true`` and inside
+    :func:`suppress_preindex`.
+    """
+    if _preindex_suppressed.get():
+        return False
+    return os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true"
+
+
+@contextmanager
+def suppress_preindex() -> Iterator[None]:
+    """Construct plugins without pre-indexing, e.g. when warm state is restored."""
+    token = _preindex_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _preindex_suppressed.reset(token)
+
+
 class IndexShard(TypedDict):
     file: str
     symbols: list[dict]
@@ -106,6 +133,24 @@ class IPlugin(ABC):
         """
         return None
 
+    def snapshot_state(self) -> dict[str, Any] | None:
+        """Return JSON-serialisable warm state worth keeping across an eviction.
+
+        The default captures the in-memory fuzzy index plugins keep in
+        ``self._indexer``. ``None`` means there is nothing worth restoring.
+        """
+        export_state = getattr(getattr(self, "_indexer", None), "export_state", None)
+        if not callable(export_state):
+            return None
+        return {"fuzzy_index": export_state()}
+
+    def restore_state(self, state: dict[str, Any]) -> bool:
+        """Restore state from :meth:`snapshot_state`; False if it does not apply."""
+        restore = getattr(getattr(self, "_indexer", None), "restore_state", None)
+        if not callable(restore) or "fuzzy_index" not in state:
+            return False
+        return bool(restore(state["fuzzy_index"]))
+
     @abstractmethod
     def supports(self, path: str | Path) -> bool: ...
 
@@ -15,7 +15,6 @@ from .plugin_base import (
     SearchOpts,
     SearchResult,
 )
-from .utils.semantic_indexer import SemanticIndexer
 
 if TYPE_CHECKING:
     from mcp_server.core.repo_context import RepoContext
@@ -65,6 +64,8 @@ class PluginWithSemanticSearch(IPlugin):
                 else:
                     qdrant_path = f"http://{qdrant_host}:{qdrant_port}"
 
+                from .utils.semantic_indexer import SemanticIndexer
+
                 self._semantic_indexer = SemanticIndexer(
                     collection=f"{collection_name}-{self.lang}", qdrant_path=qdrant_path
                 )
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import os
 from pathlib import Path
 from typing import Iterable, Optional
 
@@ -15,6 +14,7 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...storage.sqlite_store import SQLiteStore
 from ...utils.fuzzy_indexer import FuzzyIndexer
@@ -45,7 +45,7 @@ class Plugin(IPlugin):
                 str(Path.cwd()), Path.cwd().name, {"language": "c"}
             )
 
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     _EXCLUDED_DIRS = {
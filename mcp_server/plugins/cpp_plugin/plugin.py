@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import os
 import re
 from datetime import datetime
 from pathlib import Path
@@ -28,6 +27,7 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...storage.sqlite_store import SQLiteStore
 from ...utils.fuzzy_indexer import FuzzyIndexer
@@ -75,7 +75,7 @@ class Plugin(IPlugin, ICppPlugin, ILanguageAnalyzer):
             )
 
         # Pre-index existing files
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def _preindex(self) -> None:
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import os
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
@@ -13,6 +12,7 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...plugin_base_enhanced import PluginWithSemanticSearch
 from ...storage.sqlite_store import SQLiteStore
@@ -46,7 +46,7 @@ class DartPluginSemantic(PluginWithSemanticSearch):
                 logger.warning(f"Failed to create repository: {e}")
                 self._repository_id = None
 
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def _preindex(self) -> None:
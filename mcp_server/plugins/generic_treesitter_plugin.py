@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import os
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
@@ -21,11 +20,13 @@ from ..plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ..plugin_base_enhanced import PluginWithSemanticSearch
 from ..storage.sqlite_store import SQLiteStore
 from ..utils.chunker_adapter import get_adapter
 from ..utils.fuzzy_indexer import FuzzyIndexer
+from ..utils.incremental_parse import get_incremental_chunker
 
 logger = logging.getLogger(__name__)
 
@@ -119,7 +120,7 @@ class GenericTreeSitterPlugin(PluginWithSemanticSearch):
                 self._repository_id = None
 
         # Pre-index existing files unless startup is in lightweight mode.
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     _EXCLUDED_DIRS = {
@@ -209,7 +210,9 @@ class GenericTreeSitterPlugin(PluginWithSemanticSearch):
         chunks = []
         symbols = []
         try:
-            chunks = chunk_text(content, self.lang)
+            chunks = get_incremental_chunker().chunk(
+                content, self.lang, path=str(path), chunk_fn=chunk_text
+            )
             symbols = [self._adapter.chunk_to_symbol_dict(chunk) for chunk in chunks]
             logger.debug(f"Chunked {path}: extracted {len(symbols)} symbols")
         except Exception as e:
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import os
 import subprocess
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
@@ -14,6 +13,7 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...plugin_base_enhanced import PluginWithSemanticSearch
 from ...storage.sqlite_store import SQLiteStore
@@ -69,7 +69,7 @@ class Plugin(PluginWithSemanticSearch):
                 self._repository_id = None
 
         # Pre-index existing files
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def _init_treesitter(self):
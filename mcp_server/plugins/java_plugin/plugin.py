@@ -15,6 +15,7 @@ from mcp_server.plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from mcp_server.plugins.specialized_plugin_base import (
     CrossFileReference,
@@ -238,7 +239,8 @@ class Plugin(SpecializedPluginBase):
         super().__init__(language_config, sqlite_store, enable_semantic)
 
         # Pre-index Java files
-        self._preindex()
+        if preindex_enabled():
+            self._preindex()
 
     def _create_import_resolver(self) -> IImportResolver:
         """Create Java import resolver."""
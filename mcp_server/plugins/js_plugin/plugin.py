@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import logging
-import os
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
 
@@ -15,6 +14,7 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...utils.fuzzy_indexer import FuzzyIndexer
 
@@ -61,7 +61,7 @@ class Plugin(IPlugin):
         self._symbol_cache: Dict[str, List[SymbolDef]] = {}
 
         # Pre-index existing files
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def bind(self, ctx: "RepoContext") -> None:
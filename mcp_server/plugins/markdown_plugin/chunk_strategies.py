@@ -6,7 +6,7 @@ import hashlib
 import logging
 import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp_server.document_processing import (
     ChunkMetadata,
@@ -14,6 +14,11 @@ from mcp_server.document_processing import (
     DocumentChunk,
 )
 from mcp_server.document_processing.chunk_optimizer import TokenEstimator
+from mcp_server.document_processing.section_cache import (
+    DocumentSection,
+    SectionChunkCache,
+    section_digest,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +77,96 @@ class MarkdownChunkStrategy:
         else:
             return self._create_sliding_window_chunks(content, file_path)
 
+    def create_chunks_incremental(
+        self,
+        content: str,
+        ast: Dict[str, Any],
+        sections: List[Dict[str, Any]],
+        file_path: str,
+        cache: SectionChunkCache,
+    ) -> List[DocumentChunk]:
+        """Create search-optimized chunks, rebuilding only sections that changed.
+
+        Produces what :meth:`create_chunks` followed by
+        :meth:`optimize_chunks_for_search` would, except that chunk ids are
+        derived from section content and each section is chunked on its own
+        body only, up to its first subsection, so that an edit never rebuilds
+        the sections enclosing it. Sections whose heading, body and sizing are
+        unchanged since the last call for ``file_path`` reuse their chunks
+        (including any embedding already attached), and context windows are
+        only recomputed next to chunks that changed.
+        """
+
+        if self.adaptive_sizing:
+            self._adjust_chunk_size_for_document(content)
+
+        if not self.prefer_semantic_boundaries:
+            chunks = self._create_sliding_window_chunks(content, file_path)
+            return self.optimize_chunks_for_search(chunks)
+
+        content_lines = content.split("\n")
+        sizing = (
+            self.max_chunk_tokens,
+            self.min_chunk_tokens,
+            self.overlap_tokens,
+            self.max_chunk_size,
+            self.min_chunk_size,
+            self.overlap_size,
+        )
+
+        units = []
+        for section in self._flatten_sections(sections):
+            own = self._own_body(section, content_lines)
+            start_line = own["start_line"]
+            digest = section_digest(
+                "section",
+                own["title"],
+                own["level"],
+                own.get("parent"),
+                own["content"],
+                own["metadata"]["code_blocks"],
+                own["end_line"] - start_line,
+                sizing,
+            )
+            units.append(DocumentSection(digest, start_line, payload=own))
+
+        # Orphan content is keyed by its absolute lines, so it never needs moving.
+        orphan_lines = self._orphan_lines(content_lines, sections)
+        units.append(DocumentSection(section_digest("orphan", orphan_lines, sizing)))
+
+        def build(unit: DocumentSection) -> List[DocumentChunk]:
+            if unit.payload is None:
+                return self._chunk_orphan_content(ast, content_lines, sections, file_path, 0)
+            return self._chunk_section(unit.payload, content_lines, ast, file_path, 0)
+
+        def relocate(chunk: DocumentChunk, line_delta: int, _pos_delta: int) -> None:
+            chunk.metadata.line_start += line_delta
+            chunk.metadata.line_end += line_delta
+
+        def assign_id(chunk: DocumentChunk, chunk_id: str) -> None:
+            chunk.id = chunk_id
+
+        def rewindow(chunks: List[DocumentChunk], indices: List[int]) -> None:
+            for index in indices:
+                chunks[index].context_before = None
+                chunks[index].context_after = None
+            if self.overlap_size > 0:
+                self._add_chunk_overlap(chunks, indices)
+            self.optimize_chunks_for_search([chunks[index] for index in indices])
+
+        chunks = cache.rechunk(
+            file_path,
+            units,
+            build=build,
+            relocate=relocate,
+            assign_id=assign_id,
+            rewindow=rewindow,
+        )
+        for index, chunk in enumerate(chunks):
+            chunk.metadata.chunk_index = index
+            chunk.metadata.total_chunks = len(chunks)
+        return chunks
+
     def _adjust_chunk_size_for_document(self, content: str):
         """Adjust chunk size based on document characteristics."""
         total_tokens = self.token_estimator.estimate_tokens(content)
@@ -404,23 +499,17 @@ class MarkdownChunkStrategy:
         """Create chunks for content not in any section."""
         chunks = []
 
-        # Find lines not covered by sections
-        section_lines = set()
-        for section in self._flatten_sections(sections):
-            start = section["start_line"]
-            end = section.get("end_line", len(content_lines))
-            section_lines.update(range(start, end))
-
         # Group orphan content
         orphan_groups = []
         current_group = []
+        previous = None
 
-        for i, line in enumerate(content_lines):
-            if i not in section_lines:
-                current_group.append((i, line))
-            elif current_group:
+        for i, line in self._orphan_lines(content_lines, sections):
+            if current_group and i != previous + 1:
                 orphan_groups.append(current_group)
                 current_group = []
+            current_group.append((i, line))
+            previous = i
 
         if current_group:
             orphan_groups.append(current_group)
@@ -461,6 +550,36 @@ class MarkdownChunkStrategy:
 
         return chunks
 
+    def _own_body(self, section: Dict[str, Any], content_lines: List[str]) -> Dict[str, Any]:
+        """Copy of ``section`` cut off at its first subsection's heading.
+
+        A section's ``content`` runs to the next heading of the same or higher
+        level, so it includes every subsection; keyed and chunked on that, one
+        top-level heading makes each edit rebuild the whole document.
+        """
+        subsections = section.get("subsections") or []
+        if not subsections:
+            return section
+        start = section["start_line"]
+        end = subsections[0]["start_line"]
+        body = content_lines[start + 1 : end]
+        while body and not body[0].strip():
+            body.pop(0)
+        while body and not body[-1].strip():
+            body.pop()
+        return {**section, "content": "\n".join(body), "end_line": end}
+
+    def _orphan_lines(
+        self, content_lines: List[str], sections: List[Dict[str, Any]]
+    ) -> List[Tuple[int, str]]:
+        """Return ``(index, line)`` for every line not covered by a section."""
+        section_lines = set()
+        for section in self._flatten_sections(sections):
+            start = section["start_line"]
+            end = section.get("end_line", len(content_lines))
+            section_lines.update(range(start, end))
+        return [(i, line) for i, line in enumerate(content_lines) if i not in section_lines]
+
     def _create_sliding_window_chunks(self, content: str, file_path: str) -> List[DocumentChunk]:
         """Create chunks using a sliding window approach."""
         chunks = []
@@ -536,12 +655,15 @@ class MarkdownChunkStrategy:
 
         return chunks
 
-    def _add_chunk_overlap(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
-        """Add overlap between adjacent chunks."""
+    def _add_chunk_overlap(
+        self, chunks: List[DocumentChunk], indices: Optional[List[int]] = None
+    ) -> List[DocumentChunk]:
+        """Add overlap between adjacent chunks (only at ``indices`` when given)."""
         if len(chunks) <= 1:
             return chunks
 
-        for i, chunk in enumerate(chunks):
+        for i in range(len(chunks)) if indices is None else indices:
+            chunk = chunks[i]
             # Add overlap from previous chunk
             if i > 0:
                 prev_chunk = chunks[i - 1]
@@ -6,7 +6,7 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp_server.document_processing import (
     BaseDocumentPlugin,
@@ -86,6 +86,16 @@ class MarkdownPlugin(BaseDocumentPlugin):
         self.section_extractor = SectionExtractor()
         self.frontmatter_parser = FrontmatterParser()
         self.chunk_strategy = MarkdownChunkStrategy()
+        self._last_parse: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    def _parse_markdown(self, content: str) -> Dict[str, Any]:
+        """Parse Markdown, reusing the AST when the same text was just parsed."""
+        last = self._last_parse
+        if last is not None and last[0] == content:
+            return last[1]
+        ast = self.parser.parse(content)
+        self._last_parse = (content, ast)
+        return ast
 
     def _get_supported_extensions(self) -> List[str]:
         """Get list of supported file extensions."""
@@ -235,19 +245,16 @@ class MarkdownPlugin(BaseDocumentPlugin):
         frontmatter, content_without_frontmatter = self.frontmatter_parser.parse(content)
 
         # Parse Markdown AST
-        ast = self.parser.parse(content_without_frontmatter)
+        ast = self._parse_markdown(content_without_frontmatter)
 
         # Extract sections
         sections_data = self.section_extractor.extract(ast, content_without_frontmatter)
 
-        # Create chunks using our strategy
-        chunks = self.chunk_strategy.create_chunks(
-            content_without_frontmatter, ast, sections_data, str(file_path)
+        # Create search-optimized chunks, rebuilding only sections that changed
+        chunks = self.chunk_strategy.create_chunks_incremental(
+            content_without_frontmatter, ast, sections_data, str(file_path), self._section_chunks
         )
 
-        # Optimize for search
-        chunks = self.chunk_strategy.optimize_chunks_for_search(chunks)
-
         # Cache the chunks
         self._chunk_cache[str(file_path)] = chunks
 
@@ -275,7 +282,7 @@ class MarkdownPlugin(BaseDocumentPlugin):
 
         # Extract symbols from AST
         _, content_without_frontmatter = self.frontmatter_parser.parse(content)
-        ast = self.parser.parse(content_without_frontmatter)
+        ast = self._parse_markdown(content_without_frontmatter)
         symbols = self._extract_symbols(ast, str(path))
 
         # Add document as a symbol
@@ -326,7 +333,7 @@ class MarkdownPlugin(BaseDocumentPlugin):
         frontmatter, content_without_frontmatter = self.frontmatter_parser.parse(content)
 
         # Parse Markdown AST
-        ast = self.parser.parse(content_without_frontmatter)
+        ast = self._parse_markdown(content_without_frontmatter)
 
         # Extract sections hierarchically
         sections_data = self.section_extractor.extract(ast, content_without_frontmatter)
@@ -394,7 +401,7 @@ class MarkdownPlugin(BaseDocumentPlugin):
         _, content_without_frontmatter = self.frontmatter_parser.parse(content)
 
         # Parse AST
-        ast = self.parser.parse(content_without_frontmatter)
+        ast = self._parse_markdown(content_without_frontmatter)
 
         # Convert to plain text
         plain_text = self._ast_to_plain_text(ast)
@@ -49,6 +49,7 @@ class SectionExtractor:
                 while current_section_stack and current_section_stack[-1]["level"] >= level:
                     # Close previous sections at same or higher level
                     closed_section = current_section_stack.pop()
+                    closed_section["end_line"] = start_line
                     self._finalize_section(closed_section, content_lines)
 
                     if current_section_stack:
@@ -248,8 +249,9 @@ class SectionExtractor:
         """Finalize a section by extracting its content."""
         start_line = section["start_line"]
 
-        # Find the end line (start of next section at same or higher level)
-        end_line = len(content_lines)
+        # Find the end line (start of next section at same or higher level);
+        # sections still open at the end of the document run to its last line
+        end_line = section.setdefault("end_line", len(content_lines))
 
         # Extract content lines (excluding the heading itself)
         if start_line + 1 < end_line:
@@ -3,9 +3,12 @@ Memory-Aware Plugin Management System
 
 This module implements intelligent memory management for language plugins,
 including LRU caching, configurable memory limits, and transparent reloading.
+Evicted plugins leave a snapshot of their warm state behind so a reload for
+the same index state skips the cold pre-index scan.
 """
 
 import gc
+import hashlib
 import logging
 import os
 import threading
@@ -14,7 +17,7 @@ import weakref
 from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
 if TYPE_CHECKING:
     from mcp_server.core.repo_context import RepoContext
@@ -24,8 +27,16 @@ try:
 except ImportError:
     psutil = None
 
+from mcp_server.config.env_vars import (
+    get_plugin_gc_full_interval,
+    get_plugin_snapshot_dir,
+    get_plugin_snapshot_max_bytes,
+)
+from mcp_server.plugin_base import suppress_preindex
+
 # from mcp_server.plugin_system.models import LoadedPlugin
 from mcp_server.plugins.plugin_factory import PluginFactory, PluginUnavailableError
+from mcp_server.plugins.plugin_snapshots import PluginSnapshotStore
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +95,9 @@ class MemoryAwarePluginManager:
     - High-priority plugin protection
     - Transparent plugin reloading
     - Per-repo plugin isolation (cache keyed by (repo_id, language))
+    - Warm-state snapshots on eviction, restored on reload
+    - RSS-driven eviction ordered by reload cost against memory freed
+    - Garbage collection deferred off the request path
     """
 
     def __init__(
@@ -94,6 +108,9 @@ class MemoryAwarePluginManager:
         max_workers: int = 16,
         idle_timeout_seconds: float = 900.0,
         sample_interval_seconds: float = 1.0,
+        snapshot_store: Optional[PluginSnapshotStore] = None,
+        gc_delay_seconds: float = 0.5,
+        gc_full_interval: int = 8,
     ):
         """
         Initialize the memory-aware plugin manager.
@@ -101,6 +118,9 @@ class MemoryAwarePluginManager:
         Args:
             max_memory_mb: Maximum memory limit in MB (default 1024)
             high_priority_langs: Languages to keep in memory (e.g., ['python', 'javascript'])
+            snapshot_store: Where evicted plugins leave their warm state (None disables)
+            gc_delay_seconds: Delay before the coalesced post-eviction collection
+            gc_full_interval: Evictions between full (generation 2) collections
 
         Raises:
             RuntimeError: If psutil is not installed.
@@ -143,6 +163,18 @@ class MemoryAwarePluginManager:
         self._base_memory = self._get_current_memory()
         self._last_snapshot: Optional[PluginResourceSnapshot] = None
 
+        # Warm-state snapshots and deferred collection
+        self._snapshots = snapshot_store
+        self._restore_stats = {"restored": 0, "restore_failed": 0}
+        # Only keys this process snapshotted on eviction are restored.
+        self._snapshotted: Set[Tuple[Optional[str], str]] = set()
+        self.gc_delay_seconds = max(0.0, gc_delay_seconds)
+        self.gc_full_interval = max(1, gc_full_interval)
+        self._gc_timer: Optional[threading.Timer] = None
+        self._gc_generation = -1
+        self._evictions_since_full_gc = 0
+        self._gc_stats = {"scheduled": 0, "young": 0, "full": 0}
+
         logger.info(f"Memory-aware plugin manager initialized with {max_memory_mb}MB limit")
 
     def get_plugin(self, language: str, ctx: Optional["RepoContext"] = None) -> Optional[Any]:
@@ -168,18 +200,67 @@ class MemoryAwarePluginManager:
                 self._plugins.move_to_end(cache_key)
                 self._update_usage(cache_key)
                 return self._plugins[cache_key].instance
+            restorable = self._snapshots is not None and cache_key in self._snapshotted
 
-            return self._load_plugin(language, repo_id=repo_id)
+        # Only a key this process snapshotted can be restored; its generation is
+        # read outside the lock.
+        generation = self._index_generation(ctx) if restorable else ""
 
-    def _load_plugin(self, language: str, repo_id: Optional[str] = None) -> Optional[Any]:
+        with self._lock:
+            if cache_key in self._plugins:
+                self._plugins.move_to_end(cache_key)
+                self._update_usage(cache_key)
+                return self._plugins[cache_key].instance
+            return self._load_plugin(language, repo_id=repo_id, generation=generation, ctx=ctx)
+
+    @staticmethod
+    def _index_generation(ctx: Optional["RepoContext"]) -> str:
+        """Identify the index state a snapshot belongs to.
+
+        Combines the last indexed commit, the workspace root and the size and
+        mtime of the repository's SQLite index (and its WAL), so any index
+        write or a different checkout never matches. Costs a couple of
+        ``stat`` calls. Empty when any part is unknown; an empty generation is
+        never snapshotted or restored.
+        """
+        entry = getattr(ctx, "registry_entry", None)
+        commit = getattr(entry, "last_indexed_commit", None)
+        workspace_root = getattr(ctx, "workspace_root", None)
+        db_path = getattr(getattr(ctx, "sqlite_store", None), "db_path", None)
+        if not isinstance(commit, str) or not commit or not workspace_root or not db_path:
+            return ""
+        state = []
+        for path in (str(db_path), f"{db_path}-wal"):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                state.append("-")
+                continue
+            except OSError:
+                return ""
+            state.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        if state[0] == "-":
+            return ""
+        digest = hashlib.sha256("\x00".join([str(workspace_root), *state]).encode("utf-8"))
+        return f"{commit}:{digest.hexdigest()[:16]}"
+
+    def _load_plugin(
+        self,
+        language: str,
+        repo_id: Optional[str] = None,
+        generation: str = "",
+        ctx: Optional["RepoContext"] = None,
+    ) -> Optional[Any]:
         """Load a plugin with memory management."""
         cache_key = (repo_id, language)
-        start_time = time.time()
 
         self._ensure_capacity_for_spawn()
+        start_time = time.time()
 
         try:
-            plugin = self._factory.get_plugin(language)
+            plugin, restored = self._restore_plugin(language, repo_id, generation)
+            if not plugin:
+                plugin = self._factory.get_plugin(language)
             if not plugin:
                 return None
 
@@ -192,6 +273,8 @@ class MemoryAwarePluginManager:
                     "language": language,
                     "repo_id": repo_id,
                     "loaded_at": datetime.now().isoformat(),
+                    "ctx": ctx,
+                    "restored": restored,
                 },
             )
 
@@ -220,7 +303,7 @@ class MemoryAwarePluginManager:
             self._weak_refs[cache_key] = weakref.ref(plugin, on_plugin_deleted)
 
             logger.info(
-                f"Loaded {language} plugin (repo={repo_id}) in "
+                f"{'Restored' if restored else 'Loaded'} {language} plugin (repo={repo_id}) in "
                 f"{self._plugin_info[cache_key].load_time:.2f}s, "
                 f"using {memory_used / 1024 / 1024:.1f}MB"
             )
@@ -240,6 +323,55 @@ class MemoryAwarePluginManager:
             logger.error(f"Failed to load {language} plugin: {e}")
             return None
 
+    def _restore_plugin(
+        self, language: str, repo_id: Optional[str], generation: str
+    ) -> Tuple[Optional[Any], bool]:
+        """Build a plugin from its snapshot, skipping the cold pre-index scan."""
+        if (
+            self._snapshots is None
+            or repo_id is None
+            or not generation
+            or (repo_id, language) not in self._snapshotted
+        ):
+            return None, False
+        state = self._snapshots.get(repo_id, language, generation)
+        if state is None:
+            return None, False
+
+        with suppress_preindex():
+            plugin = self._factory.get_plugin(language)
+        restore = getattr(plugin, "restore_state", None)
+        try:
+            if callable(restore) and restore(state):
+                self._restore_stats["restored"] += 1
+                return plugin, True
+        except Exception as exc:
+            logger.debug("Restoring %s plugin snapshot failed: %s", language, exc)
+
+        # The instance skipped pre-indexing; rebuild it cold.
+        self._restore_stats["restore_failed"] += 1
+        self._snapshots.discard(repo_id, language)
+        self._close_instance((repo_id, language), plugin)
+        return None, False
+
+    def _save_snapshot(self, cache_key: Tuple[Optional[str], str], loaded: LoadedPlugin) -> None:
+        """Hand the plugin's warm state to the snapshot store before it is closed."""
+        snapshot_state = getattr(loaded.instance, "snapshot_state", None)
+        if self._snapshots is None or cache_key[0] is None or not callable(snapshot_state):
+            return
+        generation = self._index_generation(loaded.metadata.get("ctx"))
+        if not generation:
+            return
+        try:
+            state = snapshot_state()
+        except Exception as exc:
+            logger.debug("Snapshot of %s failed: %s", cache_key, exc)
+            return
+        if isinstance(state, dict) and state:
+            repo_id, language = cache_key
+            self._snapshots.put(repo_id, language, generation, state)
+            self._snapshotted.add(cache_key)
+
     def _should_evict(self) -> bool:
         """Return True if real process RSS exceeds the configured limit."""
         return self._get_current_memory() >= self.max_memory_bytes
@@ -258,7 +390,7 @@ class MemoryAwarePluginManager:
         if not self._should_evict():
             return True
 
-        candidates = self._get_eviction_candidates()
+        candidates = self._get_cost_ordered_candidates()
         target_memory = self.max_memory_bytes * 0.9
 
         for cache_key in candidates:
@@ -269,7 +401,11 @@ class MemoryAwarePluginManager:
         return self._get_current_memory() < self.max_memory_bytes
 
     def _ensure_capacity_for_spawn(self) -> None:
-        """Evict LRU entries until one worker slot and RSS budget are available."""
+        """Evict until one worker slot and RSS budget are available.
+
+        Worker slots are reclaimed in LRU order; RSS pressure evicts the
+        plugins that are cheapest to bring back per byte freed.
+        """
         snapshot = self.resource_snapshot(force=True)
         if not snapshot.measurement_ok:
             raise PluginBackpressureError("resource_measurement_failed", snapshot)
@@ -278,7 +414,10 @@ class MemoryAwarePluginManager:
             snapshot.reserved_workers >= self.max_workers
             or snapshot.child_rss_bytes >= self.max_memory_bytes
         ):
-            candidates = self._get_eviction_candidates(include_high_priority=True)
+            if snapshot.reserved_workers >= self.max_workers:
+                candidates = self._get_eviction_candidates(include_high_priority=True)
+            else:
+                candidates = self._get_cost_ordered_candidates(include_high_priority=True)
             if not candidates:
                 reason = (
                     "worker_limit" if snapshot.reserved_workers >= self.max_workers else "rss_limit"
@@ -303,10 +442,83 @@ class MemoryAwarePluginManager:
 
         return [key for _, key in candidates]
 
-    def _evict_plugin(self, cache_key: Tuple[Optional[str], str]) -> int:
+    def _get_cost_ordered_candidates(
+        self, include_high_priority: bool = False
+    ) -> List[Tuple[Optional[str], str]]:
+        """Eviction candidates ordered by what it costs to lose them, cheapest first.
+
+        A plugin is expensive to evict when it took long to load, is used
+        often and was used recently; it is cheap when evicting it frees a lot
+        of memory. Ties fall back to LRU order.
+        """
+        now = time.monotonic()
+        ordered = self._get_eviction_candidates(include_high_priority)
+        rank = {key: position for position, key in enumerate(ordered)}
+        return sorted(ordered, key=lambda key: (self._eviction_cost(key, now), rank[key]))
+
+    def _eviction_cost(self, cache_key: Tuple[Optional[str], str], now: float) -> float:
+        info = self._plugin_info[cache_key]
+        idle_seconds = max(0.0, now - info.last_used_monotonic)
+        freed_mib = max(self._reclaimable_bytes(cache_key) / (1024 * 1024), 1.0)
+        reload_cost = info.load_time + 0.001
+        return reload_cost * max(info.usage_count, 1) / ((1.0 + idle_seconds) * freed_mib)
+
+    def _reclaimable_bytes(self, cache_key: Tuple[Optional[str], str]) -> int:
+        """Memory an eviction is expected to free: tracked attribution or worker RSS."""
+        info = self._plugin_info.get(cache_key)
+        tracked = info.memory_bytes if info else 0
+        loaded = self._plugins.get(cache_key)
+        if loaded is None:
+            return tracked
+        try:
+            _, worker_rss = self._worker_state(loaded.instance)
+        except Exception:
+            worker_rss = 0
+        return max(tracked, worker_rss)
+
+    def _close_instance(self, cache_key: Tuple[Optional[str], str], instance: Any) -> None:
+        close = getattr(instance, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as exc:
+                logger.warning("Plugin close failed for %s: %s", cache_key, exc)
+
+    def _schedule_gc(self) -> None:
+        """Collect after an eviction without blocking the caller.
+
+        Evictions in quick succession share one collection on a timer thread.
+        It only covers the young generations except every
+        ``gc_full_interval`` evictions, when a full collection runs.
+        """
+        self._evictions_since_full_gc += 1
+        generation = 1
+        if self._evictions_since_full_gc >= self.gc_full_interval:
+            self._evictions_since_full_gc = 0
+            generation = 2
+        self._gc_generation = max(self._gc_generation, generation)
+        if self._gc_timer is None:
+            self._gc_stats["scheduled"] += 1
+            self._gc_timer = threading.Timer(self.gc_delay_seconds, self._run_deferred_gc)
+            self._gc_timer.daemon = True
+            self._gc_timer.start()
+
+    def _run_deferred_gc(self) -> None:
+        with self._lock:
+            generation, self._gc_generation = self._gc_generation, -1
+            self._gc_timer = None
+            if generation < 0:
+                return
+            self._gc_stats["full" if generation == 2 else "young"] += 1
+        gc.collect(generation)
+
+    def _evict_plugin(self, cache_key: Tuple[Optional[str], str], snapshot: bool = True) -> int:
         """
         Evict a plugin from memory.
 
+        The plugin's warm state is snapshotted first unless ``snapshot`` is
+        False, and garbage collection is deferred to :meth:`_schedule_gc`.
+
         Returns:
             Memory freed in bytes (from tracked attribution; may be 0 for new loads)
         """
@@ -321,14 +533,11 @@ class MemoryAwarePluginManager:
         self._weak_refs.pop(cache_key, None)
 
         if loaded is not None:
-            close = getattr(loaded.instance, "close", None)
-            if callable(close):
-                try:
-                    close()
-                except Exception as exc:
-                    logger.warning("Plugin close failed for %s: %s", cache_key, exc)
+            if snapshot:
+                self._save_snapshot(cache_key, loaded)
+            self._close_instance(cache_key, loaded.instance)
         del loaded
-        gc.collect()
+        self._schedule_gc()
         self._last_snapshot = None
 
         language = cache_key[1]
@@ -446,7 +655,7 @@ class MemoryAwarePluginManager:
             while snapshot.child_rss_bytes > self.max_memory_bytes:
                 candidates = [
                     key
-                    for key in self._get_eviction_candidates(include_high_priority=True)
+                    for key in self._get_cost_ordered_candidates(include_high_priority=True)
                     if key != cache_key
                 ]
                 if not candidates:
@@ -464,14 +673,23 @@ class MemoryAwarePluginManager:
         with self._lock:
             keys = [key for key in self._plugins if key[0] == repo_id]
             for cache_key in keys:
-                self._evict_plugin(cache_key)
+                self._evict_plugin(cache_key, snapshot=False)
+                self._snapshotted.discard(cache_key)
+                if self._snapshots is not None:
+                    self._snapshots.discard(*cache_key)
             return len(keys)
 
     def shutdown(self) -> None:
         """Idempotently close every managed plugin adapter."""
         with self._lock:
             for cache_key in list(self._plugins):
-                self._evict_plugin(cache_key)
+                self._evict_plugin(cache_key, snapshot=False)
+            if self._gc_timer is not None:
+                self._gc_timer.cancel()
+                self._gc_timer = None
+                self._gc_generation = -1
+        if self._snapshots is not None:
+            self._snapshots.flush()
 
     def _on_plugin_deleted(self, cache_key: Tuple[Optional[str], str]):
         """Callback when a plugin is garbage collected."""
@@ -491,6 +709,11 @@ class MemoryAwarePluginManager:
                 "loaded_plugins": len(self._plugins),
                 "resources": self.resource_snapshot().__dict__,
                 "high_priority_plugins": list(self.high_priority_langs),
+                "snapshots": {
+                    **(self._snapshots.stats() if self._snapshots is not None else {}),
+                    **self._restore_stats,
+                },
+                "deferred_gc": dict(self._gc_stats),
                 "plugin_details": [
                     {
                         "language": info.plugin_name,
@@ -555,6 +778,20 @@ class MemoryAwarePluginManager:
             }
 
 
+def _snapshot_store_from_env() -> Optional[PluginSnapshotStore]:
+    # Sandboxed plugins keep their warm state in the worker process, out of reach.
+    if PluginFactory._sandbox_enabled():
+        return None
+    max_bytes = get_plugin_snapshot_max_bytes()
+    if max_bytes <= 0:
+        return None
+    try:
+        return PluginSnapshotStore(get_plugin_snapshot_dir(), max_bytes)
+    except OSError as exc:
+        logger.warning("Plugin snapshots disabled: %s", exc)
+        return None
+
+
 # Singleton instance
 _manager_instance: Optional[MemoryAwarePluginManager] = None
 _manager_lock = threading.Lock()
@@ -596,6 +833,8 @@ def get_memory_aware_manager(
                     os.environ.get("MCP_PLUGIN_IDLE_TIMEOUT_SECONDS", "900")
                 ),
                 sample_interval_seconds=float(os.environ.get("MCP_PLUGIN_RSS_SAMPLE_SECONDS", "1")),
+                snapshot_store=_snapshot_store_from_env(),
+                gc_full_interval=get_plugin_gc_full_interval(),
             )
 
             # Preload high-priority plugins if configured
@@ -3,7 +3,7 @@
 import logging
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp_server.document_processing.base_document_plugin import (
     BaseDocumentPlugin,
@@ -11,6 +11,7 @@ from mcp_server.document_processing.base_document_plugin import (
     DocumentMetadata,
     DocumentStructure,
 )
+from mcp_server.document_processing.section_cache import DocumentSection, section_digest
 from mcp_server.plugin_base import SearchResult
 from mcp_server.storage.sqlite_store import SQLiteStore
 
@@ -186,10 +187,15 @@ class PlainTextPlugin(BaseDocumentPlugin):
 
         return content.strip()
 
-    def _intelligent_chunk(self, text: str, structure: DocumentStructure) -> List[DocumentChunk]:
-        """Perform NLP-aware intelligent chunking."""
-        chunks = []
+    def _intelligent_chunk(
+        self, text: str, structure: DocumentStructure, document: str = ""
+    ) -> List[DocumentChunk]:
+        """Perform NLP-aware intelligent chunking.
 
+        Text is split at explicit headings and each section is chunked on its
+        own, so re-chunking an edited document only re-runs the sections whose
+        text changed. Chunk metadata is refreshed for every chunk.
+        """
         # Get text analysis from cache or perform new analysis
         analysis = None
         for cached_path, cached_analysis in self._analysis_cache.items():
@@ -200,20 +206,26 @@ class PlainTextPlugin(BaseDocumentPlugin):
         if not analysis:
             analysis = self.nlp_processor.analyze_text(text)
 
-        # Use NLP processor for semantic chunking
-        semantic_chunks = self.nlp_processor.extract_semantic_chunks(
-            text, target_size=self.chunk_size * self.CHARS_PER_TOKEN
-        )
+        target_size = self.chunk_size * self.CHARS_PER_TOKEN
+        units = [
+            DocumentSection(
+                section_digest(section_text, target_size), start_pos=start, payload=section_text
+            )
+            for start, section_text in self._split_at_headings(text)
+        ]
 
-        # Convert to DocumentChunk objects
-        current_pos = 0
-        for i, chunk_text in enumerate(semantic_chunks):
-            # Find chunk position in original text
-            chunk_start = text.find(chunk_text, current_pos)
-            if chunk_start == -1:
-                chunk_start = current_pos
+        chunks = self._section_chunks.rechunk(
+            document,
+            units,
+            build=lambda unit: self._chunk_section_text(unit.payload, unit.start_pos, target_size),
+            relocate=self._relocate_chunk,
+            assign_id=self._assign_chunk_id,
+        )
 
-            chunk_end = chunk_start + len(chunk_text)
+        for i, chunk in enumerate(chunks):
+            chunk_text = chunk.content
+            chunk_start = chunk.start_pos
+            chunk_end = chunk.end_pos
 
             # Extract relevant metadata
             chunk_metadata = {
@@ -230,22 +242,58 @@ class PlainTextPlugin(BaseDocumentPlugin):
                     chunk_metadata["section_level"] = section.get("level", 0)
                     break
 
+            chunk_metadata["chunk_id"] = chunk.metadata["chunk_id"]
+            chunk.chunk_index = i
+            chunk.metadata = chunk_metadata
+
             # Create optimized embedding text
-            embedding_text = self._create_embedding_text(chunk_text, chunk_metadata, analysis)
+            chunk.embedding_text = self._create_embedding_text(chunk_text, chunk_metadata, analysis)
 
+        return chunks
+
+    def _split_at_headings(self, text: str) -> List[Tuple[int, str]]:
+        """Split text into ``(offset, text)`` sections at explicit headings."""
+        line_offsets = [0]
+        for line in text.split("\n"):
+            line_offsets.append(line_offsets[-1] + len(line) + 1)
+
+        starts = [0]
+        for para in self.paragraph_detector.detect_paragraphs(text):
+            if para.start_line > 0 and self._is_section_heading(para):
+                starts.append(line_offsets[para.start_line])
+        starts.append(len(text))
+        return [(start, text[start:end]) for start, end in zip(starts, starts[1:]) if end > start]
+
+    def _is_section_heading(self, para: Paragraph) -> bool:
+        """Whether a paragraph opens a new section (a Markdown or all-caps heading)."""
+        text = para.text.strip()
+        if "\n" in text or para.is_code_block:
+            return False
+        return text.startswith("#") or (text.isupper() and len(text.split()) <= 10)
+
+    def _chunk_section_text(
+        self, section_text: str, offset: int, target_size: int
+    ) -> List[DocumentChunk]:
+        """Semantically chunk one section; positions are absolute."""
+        chunks = []
+        current_pos = 0
+        for chunk_text in self.nlp_processor.extract_semantic_chunks(
+            section_text, target_size=target_size
+        ):
+            # Find chunk position in original text
+            chunk_start = section_text.find(chunk_text, current_pos)
+            if chunk_start == -1:
+                chunk_start = current_pos
+            chunk_end = chunk_start + len(chunk_text)
             chunks.append(
                 DocumentChunk(
                     content=chunk_text,
-                    start_pos=chunk_start,
-                    end_pos=chunk_end,
-                    chunk_index=i,
-                    metadata=chunk_metadata,
-                    embedding_text=embedding_text,
+                    start_pos=offset + chunk_start,
+                    end_pos=offset + chunk_end,
+                    chunk_index=len(chunks),
                 )
             )
-
             current_pos = chunk_end
-
         return chunks
 
     def search(self, query: str, opts: Optional[Dict] = None) -> List[SearchResult]:
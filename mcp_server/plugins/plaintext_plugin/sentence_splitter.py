@@ -67,6 +67,7 @@ class SentenceSplitter:
         self.ellipsis_pattern = re.compile(r"\.{3,}")
         self.url_pattern = re.compile(r"https?://[^\s]+|www\.[^\s]+")
         self.email_pattern = re.compile(r"\S+@\S+\.\S+")
+        self.placeholder_pattern = re.compile(r"<<(?:URL|EMAIL|DECIMAL|ELLIPSIS)_(\d+)>>")
 
     def split_sentences(self, text: str) -> List[str]:
         """Split text into sentences with intelligent boundary detection."""
@@ -126,11 +127,7 @@ class SentenceSplitter:
                 sentence = " ".join(current_sentence)
 
                 # Restore preserved items
-                for j, item in enumerate(preserved_items):
-                    sentence = sentence.replace(f"<<URL_{j}>>", item)
-                    sentence = sentence.replace(f"<<EMAIL_{j}>>", item)
-                    sentence = sentence.replace(f"<<DECIMAL_{j}>>", item)
-                    sentence = sentence.replace(f"<<ELLIPSIS_{j}>>", item)
+                sentence = self._restore(sentence, preserved_items)
 
                 sentences.append(sentence.strip())
                 current_sentence = []
@@ -140,16 +137,25 @@ class SentenceSplitter:
             sentence = " ".join(current_sentence)
 
             # Restore preserved items
-            for j, item in enumerate(preserved_items):
-                sentence = sentence.replace(f"<<URL_{j}>>", item)
-                sentence = sentence.replace(f"<<EMAIL_{j}>>", item)
-                sentence = sentence.replace(f"<<DECIMAL_{j}>>", item)
-                sentence = sentence.replace(f"<<ELLIPSIS_{j}>>", item)
+            sentence = self._restore(sentence, preserved_items)
 
             sentences.append(sentence.strip())
 
         return [s for s in sentences if s]
 
+    def _restore(self, sentence: str, preserved_items: List[str]) -> str:
+        """Put preserved items back in place of their placeholders."""
+        if "<<" not in sentence:
+            return sentence
+        return self.placeholder_pattern.sub(
+            lambda match: (
+                preserved_items[int(match.group(1))]
+                if int(match.group(1)) < len(preserved_items)
+                else match.group(0)
+            ),
+            sentence,
+        )
+
     def get_sentence_boundaries(self, text: str) -> List[Tuple[int, int]]:
         """Get character offsets for sentence boundaries."""
         sentences = self.split_sentences(text)
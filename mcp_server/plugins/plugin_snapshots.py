@@ -0,0 +1,201 @@
+"""On-disk snapshots of plugin warm state.
+
+When the memory-aware manager evicts a plugin it asks the instance for its
+warm state (see :meth:`IPlugin.snapshot_state`) and hands it to
+:class:`PluginSnapshotStore`. Reloading the same ``(repo, language)`` for the
+same index generation restores that state instead of re-scanning the
+workspace; a snapshot from any other generation is never returned.
+
+Snapshots are zlib-compressed JSON, one file per ``(repo, language)``, written
+atomically by a single background thread so eviction never blocks on
+encoding or disk I/O. The directory is bounded in bytes; the oldest snapshots
+are removed first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MCPSNAP1"
+_SUFFIX = ".snap"
+
+_SnapshotKey = Tuple[str, str]
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class PluginSnapshotStore:
+    """Bounded directory of compressed plugin state snapshots."""
+
+    def __init__(self, root: str | Path, max_bytes: int = 256 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending: Dict[_SnapshotKey, Tuple[str, Dict[str, Any]]] = {}
+        self._futures: Dict[_SnapshotKey, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {"saved": 0, "loaded": 0, "misses": 0, "corrupt": 0, "evicted": 0}
+
+    def _key(self, repo_id: Optional[str], language: str) -> _SnapshotKey:
+        return (repo_id or "", language)
+
+    def _prefix(self, key: _SnapshotKey) -> str:
+        return _digest(*key)
+
+    def _path(self, key: _SnapshotKey, generation: str) -> Path:
+        return self.root / f"{self._prefix(key)}-{_digest(generation)}{_SUFFIX}"
+
+    def put(
+        self, repo_id: Optional[str], language: str, generation: str, state: Dict[str, Any]
+    ) -> None:
+        """Queue ``state`` to be written; it is readable through :meth:`get` immediately."""
+        key = self._key(repo_id, language)
+        with self._lock:
+            self._pending[key] = (generation, state)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="plugin-snapshot"
+                )
+            self._futures[key] = self._executor.submit(self._write, key, generation, state)
+
+    def get(
+        self, repo_id: Optional[str], language: str, generation: str
+    ) -> Optional[Dict[str, Any]]:
+        """Return the snapshot for ``generation``, or None if there is no usable one."""
+        key = self._key(repo_id, language)
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            if pending[0] == generation:
+                with self._lock:
+                    self._stats["loaded"] += 1
+                return pending[1]
+            self._count("misses")
+            return None
+
+        path = self._path(key, generation)
+        try:
+            blob = path.read_bytes()
+        except OSError:
+            self._count("misses")
+            return None
+        try:
+            if not blob.startswith(_MAGIC):
+                raise ValueError("bad snapshot header")
+            document = json.loads(zlib.decompress(blob[len(_MAGIC) :]))
+            if document.get("key") != list(key) or document.get("generation") != generation:
+                raise ValueError("snapshot does not match its key")
+            state = document["state"]
+        except (ValueError, KeyError, TypeError, zlib.error) as exc:
+            logger.debug("Discarding unreadable plugin snapshot %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            self._count("corrupt")
+            return None
+        self._count("loaded")
+        return state
+
+    def discard(self, repo_id: Optional[str], language: str) -> None:
+        """Forget every snapshot of ``(repo_id, language)``."""
+        key = self._key(repo_id, language)
+        future = self._futures.get(key)
+        if future is not None:
+            future.result()
+        with self._lock:
+            self._pending.pop(key, None)
+        for path in self.root.glob(f"{self._prefix(key)}-*{_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+    def flush(self) -> None:
+        """Wait until every queued snapshot is on disk."""
+        with self._lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        files = list(self.root.glob(f"*{_SUFFIX}"))
+        with self._lock:
+            return {
+                **self._stats,
+                "pending": len(self._pending),
+                "files": len(files),
+                "bytes": sum(self._size(path) for path in files),
+            }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _write(self, key: _SnapshotKey, generation: str, state: Dict[str, Any]) -> None:
+        try:
+            document = {"key": list(key), "generation": generation, "state": state}
+            payload = json.dumps(document, separators=(",", ":")).encode("utf-8")
+            blob = _MAGIC + zlib.compress(payload, 1)
+            path = self._path(key, generation)
+            if len(blob) > self.max_bytes:
+                logger.debug("Plugin snapshot %s exceeds the store bound; skipped", path)
+                return
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(blob)
+            os.replace(tmp, path)
+            for stale in self.root.glob(f"{self._prefix(key)}-*{_SUFFIX}"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+            self._count("saved")
+            self._enforce_bound(keep=path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.warning("Failed to write plugin snapshot for %s: %s", key, exc)
+        finally:
+            with self._lock:
+                if self._pending.get(key, (None, None))[1] is state:
+                    self._pending.pop(key, None)
+                    self._futures.pop(key, None)
+
+    def _enforce_bound(self, keep: Path) -> None:
+        files = []
+        for path in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            self._count("evicted")
+
+
+__all__ = ["PluginSnapshotStore"]
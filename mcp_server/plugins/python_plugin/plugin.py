@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
 from typing import Iterable, Optional, cast
 
@@ -21,9 +20,11 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...storage.sqlite_store import SQLiteStore
 from ...utils.fuzzy_indexer import FuzzyIndexer
+from ...utils.incremental_parse import get_incremental_chunker
 from ...utils.treesitter_wrapper import TreeSitterWrapper
 
 
@@ -67,7 +68,7 @@ class Plugin(IPlugin):
                 str(Path.cwd()), Path.cwd().name, {"language": "python"}
             )
 
-        if preindex and os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex and preindex_enabled():
             self._preindex()
 
     # ------------------------------------------------------------------
@@ -127,13 +128,14 @@ class Plugin(IPlugin):
         if isinstance(path, str):
             path = Path(path)
         self._indexer.add_file(str(path), content)
-        tree = self._ts._parser.parse(content.encode("utf-8"))
-        root = tree.root_node
+        root = self._ts.parse(content.encode("utf-8"), path)
         bounded_chunk_path = self._uses_bounded_chunk_path(path)
         chunks = []
         if not bounded_chunk_path and chunk_text is not None:
             try:
-                chunks = chunk_text(content, "python")
+                chunks = get_incremental_chunker().chunk(
+                    content, "python", path=str(path), chunk_fn=chunk_text
+                )
             except Exception:
                 pass
 
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import os
 from pathlib import Path
 from typing import Iterable, Optional, cast
 
@@ -23,10 +22,12 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...plugin_base_enhanced import PluginWithSemanticSearch
 from ...storage.sqlite_store import SQLiteStore
 from ...utils.fuzzy_indexer import FuzzyIndexer
+from ...utils.incremental_parse import get_incremental_chunker
 from ...utils.treesitter_wrapper import TreeSitterWrapper
 
 logger = logging.getLogger(__name__)
@@ -58,7 +59,7 @@ class PythonPluginSemantic(PluginWithSemanticSearch):
                 logger.warning(f"Failed to create repository: {e}")
                 self._repository_id = None
 
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def _preindex(self) -> None:
@@ -83,8 +84,7 @@ class PythonPluginSemantic(PluginWithSemanticSearch):
         self._indexer.add_file(str(path), content)
 
         # Parse with tree-sitter
-        tree = self._ts._parser.parse(content.encode("utf-8"))
-        root = tree.root_node
+        root = self._ts.parse(content.encode("utf-8"), path)
 
         # Store file in SQLite if available
         file_id = None
@@ -199,7 +199,9 @@ class PythonPluginSemantic(PluginWithSemanticSearch):
         if self._sqlite_store and file_id:
             _chunks = []
             try:
-                _chunks = chunk_text(content, "python")
+                _chunks = get_incremental_chunker().chunk(
+                    content, "python", path=str(path), chunk_fn=chunk_text
+                )
             except Exception as e:
                 logger.error(f"Failed to chunk {path}: {e}")
             self._sqlite_store.delete_chunks_for_file(file_id)
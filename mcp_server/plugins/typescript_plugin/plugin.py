@@ -17,10 +17,10 @@ from ...plugin_base import (
     SearchOpts,
     SearchResult,
     SymbolDef,
+    preindex_enabled,
 )
 from ...storage.sqlite_store import SQLiteStore
 from ...utils.fuzzy_indexer import FuzzyIndexer
-from ...utils.semantic_indexer import SemanticIndexer
 from .declaration_handler import DeclarationHandler
 from .tsconfig_parser import TSConfigParser
 from .type_system import TypeAnnotationExtractor, TypeInferenceEngine
@@ -67,6 +67,8 @@ class Plugin(IPlugin):
         self._semantic_indexer = None
         try:
             if os.getenv("VOYAGE_API_KEY") or os.getenv("VOYAGE_API_KEY_PATH"):
+                from ...utils.semantic_indexer import SemanticIndexer
+
                 self._semantic_indexer = SemanticIndexer(collection=f"typescript-{id(self)}")
                 logger.info("Semantic indexing enabled for TypeScript plugin")
             else:
@@ -104,7 +106,7 @@ class Plugin(IPlugin):
                 self._repository_id = None
 
         # Pre-index existing files
-        if os.getenv("MCP_SKIP_PLUGIN_PREINDEX", "false").lower() != "true":
+        if preindex_enabled():
             self._preindex()
 
     def _preindex(self) -> None:
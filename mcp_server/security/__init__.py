@@ -27,6 +27,7 @@ from .models import (
     User,
     UserRole,
 )
+from .rate_limiter import RateLimitDecision, RouteCosts, TokenBucketLimiter
 from .security_middleware import (
     AuthenticationMiddleware,
     AuthorizationMiddleware,
@@ -68,6 +69,10 @@ __all__ = [
     "AuthenticationError",
     "AuthorizationError",
     "SecurityError",
+    # Rate limiting
+    "RateLimitDecision",
+    "RouteCosts",
+    "TokenBucketLimiter",
     # Middleware
     "SecurityHeaders",
     "RateLimitMiddleware",
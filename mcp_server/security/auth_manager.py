@@ -5,7 +5,7 @@ import secrets
 import string
 import time
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Callable, Dict, List, Optional, cast
 
 import bcrypt
 import jwt
@@ -23,7 +23,6 @@ from .models import (
     AccessRule,
     AuthCredentials,
     Permission,
-    RateLimitInfo,
     RefreshTokenData,
     SecurityConfig,
     SecurityEvent,
@@ -32,6 +31,7 @@ from .models import (
     User,
     UserRole,
 )
+from .rate_limiter import RateLimitDecision, RouteCosts, TokenBucketLimiter
 
 
 class AuthenticationError(Exception):
@@ -186,49 +186,49 @@ class PasswordManager(IPasswordManager):
 
 
 class RateLimiter:
-    """Rate limiting for security protection."""
+    """Rate limiting for security protection.
 
-    def __init__(self, max_requests: int = 100, window_minutes: int = 1):
-        self.max_requests = max_requests
-        self.window_minutes = window_minutes
-        self.rate_limits: Dict[str, RateLimitInfo] = {}
-
-    def is_rate_limited(self, identifier: str) -> bool:
-        """Check if identifier is rate limited."""
-        now = datetime.utcnow()
+    Allows bursts of ``max_requests`` per identifier, refilled evenly over
+    ``window_minutes``; see ``rate_limiter.TokenBucketLimiter``.
+    """
 
-        if identifier not in self.rate_limits:
-            self.rate_limits[identifier] = RateLimitInfo(identifier=identifier)
+    def __init__(
+        self,
+        max_requests: int = 100,
+        window_minutes: int = 1,
+        *,
+        max_keys: int = 100_000,
+        route_costs: Optional[RouteCosts] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if window_minutes < 1:
+            raise ValueError("Rate limit window must be at least 1 minute")
+        self.window_minutes = window_minutes
+        self.max_keys = max_keys
+        self.route_costs = route_costs or RouteCosts()
+        self._clock = clock
+        self.max_requests = max_requests
 
-        rate_limit = self.rate_limits[identifier]
+    @property
+    def max_requests(self) -> int:
+        return self._max_requests
+
+    @max_requests.setter
+    def max_requests(self, value: int) -> None:
+        self._max_requests = value
+        self.buckets = TokenBucketLimiter(
+            rate=value / (self.window_minutes * 60),
+            burst=value,
+            max_keys=self.max_keys,
+            clock=self._clock,
+        )
 
-        # Check if window has expired (takes priority over block status)
-        window_end = rate_limit.window_start + timedelta(minutes=self.window_minutes)
-        if now > window_end:
-            rate_limit.requests_count = 0
-            rate_limit.window_start = now
-            rate_limit.is_blocked = False
-            rate_limit.blocked_until = None
+    def check(self, identifier: str, cost: float = 1.0) -> RateLimitDecision:
+        return self.buckets.acquire(identifier, cost)
 
-        # Check if currently blocked
-        if rate_limit.is_blocked and rate_limit.blocked_until:
-            if now < rate_limit.blocked_until:
-                return True
-            else:
-                # Unblock and reset
-                rate_limit.is_blocked = False
-                rate_limit.blocked_until = None
-                rate_limit.requests_count = 0
-                rate_limit.window_start = now
-
-        # Check rate limit
-        if rate_limit.requests_count >= self.max_requests:
-            rate_limit.is_blocked = True
-            rate_limit.blocked_until = now + timedelta(minutes=self.window_minutes)
-            return True
-
-        rate_limit.requests_count += 1
-        return False
+    def is_rate_limited(self, identifier: str, cost: float = 1.0) -> bool:
+        """Check if identifier is rate limited."""
+        return not self.buckets.acquire(identifier, cost).allowed
 
 
 class AuthManager(IAuthenticator, IAuthorizer):
@@ -240,6 +240,11 @@ class AuthManager(IAuthenticator, IAuthorizer):
         self.rate_limiter = RateLimiter(
             max_requests=config.rate_limit_requests,
             window_minutes=config.rate_limit_window_minutes,
+            max_keys=config.rate_limit_max_keys,
+            route_costs=RouteCosts(
+                config.rate_limit_route_costs,
+                semantic_multiplier=config.rate_limit_semantic_cost_multiplier,
+            ),
         )
 
         # In-memory storage (replace with database in production)
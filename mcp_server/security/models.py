@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, validator
 
+from .rate_limiter import DEFAULT_ROUTE_COSTS, DEFAULT_SEMANTIC_COST_MULTIPLIER
+
 
 class UserRole(str, Enum):
     """User roles for role-based access control."""
@@ -155,6 +157,11 @@ class SecurityConfig(BaseModel):
     lockout_duration_minutes: int = 15
     rate_limit_requests: int = 100
     rate_limit_window_minutes: int = 1
+    rate_limit_max_keys: int = 100_000
+    rate_limit_route_costs: Dict[str, float] = Field(
+        default_factory=lambda: dict(DEFAULT_ROUTE_COSTS)
+    )
+    rate_limit_semantic_cost_multiplier: float = DEFAULT_SEMANTIC_COST_MULTIPLIER
     cors_origins: List[str] = Field(default_factory=lambda: ["*"])
     cors_methods: List[str] = Field(default_factory=lambda: ["GET", "POST", "PUT", "DELETE"])
     cors_headers: List[str] = Field(default_factory=lambda: ["*"])
@@ -185,6 +192,12 @@ class SecurityConfig(BaseModel):
             raise ValueError("Refresh token expire days must be positive")
         return v
 
+    @validator("rate_limit_window_minutes")
+    def rate_limit_window_minutes_positive(cls, v):
+        if v < 1:
+            raise ValueError("Rate limit window must be at least 1 minute")
+        return v
+
 
 class SecurityEvent(BaseModel):
     """Security event for audit logging."""
@@ -0,0 +1,175 @@
+"""Token-bucket rate limiting with bounded per-key state.
+
+Each key (client IP, username) owns one bucket holding two floats: the tokens
+left and the monotonic time they were last topped up.  A request refills the
+bucket for the time elapsed since then and spends its cost, so a check is O(1)
+in time and memory whatever the request rate.
+
+Buckets live in lock-striped LRU maps.  A bucket left idle long enough to
+refill completely is indistinguishable from a new one and is dropped lazily;
+when a stripe still holds more than its share of ``max_keys`` the least
+recently seen key is evicted, so a flood of distinct identifiers cannot grow
+memory without bound.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+# Relative request costs for the HTTP gateway, matched against the request
+# path in order (first match wins).  Paths matching nothing cost 1.
+DEFAULT_ROUTE_COSTS: Dict[str, float] = {
+    "/health*": 0.25,
+    "/ready": 0.25,
+    "/liveness": 0.25,
+    "/search/rebuild": 10.0,
+    "/reindex": 10.0,
+    "/search": 2.0,
+    "/graph/*": 2.0,
+}
+
+# Multiplier applied on top of the route cost when a search asks for
+# semantic reranking (embedding + vector lookup per request).
+DEFAULT_SEMANTIC_COST_MULTIPLIER = 4.0
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0
+
+
+class RouteCosts:
+    """Maps request paths to token costs."""
+
+    def __init__(
+        self,
+        costs: Optional[Mapping[str, float]] = None,
+        semantic_multiplier: float = DEFAULT_SEMANTIC_COST_MULTIPLIER,
+        default: float = 1.0,
+    ):
+        self.rules: List[Tuple[str, float]] = list(
+            (DEFAULT_ROUTE_COSTS if costs is None else costs).items()
+        )
+        self.semantic_multiplier = semantic_multiplier
+        self.default = default
+
+    def cost(self, path: str, *, semantic: bool = False) -> float:
+        cost = self.default
+        for pattern, rule_cost in self.rules:
+            if fnmatch.fnmatchcase(path, pattern):
+                cost = rule_cost
+                break
+        return cost * self.semantic_multiplier if semantic else cost
+
+
+class _Stripe:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # key -> [tokens, last_refill]
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+class TokenBucketLimiter:
+    """``burst`` tokens per key, refilled at ``rate`` tokens per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        *,
+        max_keys: int = 100_000,
+        stripes: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max(1, max_keys)
+        self._stripes = [_Stripe() for _ in range(max(1, stripes))]
+        self._per_stripe = max(1, math.ceil(self.max_keys / len(self._stripes)))
+        self._clock = clock
+        self.evictions = 0
+
+    @property
+    def idle_ttl(self) -> float:
+        """Seconds after which an untouched bucket is full again."""
+        return self.burst / self.rate
+
+    def _stripe(self, key: str) -> _Stripe:
+        return self._stripes[zlib.crc32(key.encode("utf-8")) % len(self._stripes)]
+
+    def _expire(self, stripe: _Stripe, now: float) -> None:
+        buckets = stripe.buckets
+        horizon = now - self.idle_ttl
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if oldest[1] > horizon and len(buckets) <= self._per_stripe:
+                return
+            buckets.popitem(last=False)
+            if oldest[1] > horizon:
+                self.evictions += 1
+
+    def acquire(self, key: str, cost: float = 1.0) -> RateLimitDecision:
+        """Spend ``cost`` tokens from ``key``'s bucket if it holds enough.
+
+        A cost above ``burst`` is treated as needing a full bucket.
+        """
+        cost = min(max(cost, 0.0), self.burst)
+        stripe = self._stripe(key)
+        with stripe.lock:
+            now = self._clock()
+            bucket = stripe.buckets.get(key)
+            if bucket is None:
+                bucket = [self.burst, now]
+                stripe.buckets[key] = bucket
+            else:
+                stripe.buckets.move_to_end(key)
+                elapsed = now - bucket[1]
+                if elapsed > 0:
+                    bucket[0] = min(self.burst, bucket[0] + elapsed * self.rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                decision = RateLimitDecision(True, bucket[0])
+            else:
+                decision = RateLimitDecision(False, bucket[0], (cost - bucket[0]) / self.rate)
+            self._expire(stripe, now)
+        return decision
+
+    def reset(self, key: str) -> None:
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return sum(len(stripe.buckets) for stripe in self._stripes)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "tracked_keys": len(self),
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+            "rate": self.rate,
+            "burst": self.burst,
+        }
+
+
+__all__ = [
+    "DEFAULT_ROUTE_COSTS",
+    "DEFAULT_SEMANTIC_COST_MULTIPLIER",
+    "RateLimitDecision",
+    "RouteCosts",
+    "TokenBucketLimiter",
+]
@@ -1,6 +1,7 @@
 """FastAPI security middleware for authentication and authorization."""
 
 import logging
+import math
 import re
 from typing import Awaitable, Callable, Dict, List, Literal, Optional, cast
 from urllib.parse import unquote
@@ -67,7 +68,12 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         client_ip = self._get_client_ip(request)
 
         # Check rate limiting
-        if auth_manager.rate_limiter.is_rate_limited(client_ip):
+        rate_limiter = auth_manager.rate_limiter
+        cost = rate_limiter.route_costs.cost(
+            request.url.path, semantic=self._wants_semantic(request)
+        )
+        decision = rate_limiter.check(client_ip, cost)
+        if not decision.allowed:
             await auth_manager._log_security_event(
                 "rate_limit_exceeded",
                 ip_address=client_ip,
@@ -77,11 +83,21 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={"detail": "Rate limit exceeded. Please try again later."},
+                headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))},
             )
 
         response = await call_next(request)
         return response
 
+    @staticmethod
+    def _wants_semantic(request: Request) -> bool:
+        """Whether a search request asks for semantic reranking."""
+        params = request.query_params
+        return params.get("semantic", "").lower() in ("1", "true", "yes") or params.get("mode") in (
+            "semantic",
+            "hybrid",
+        )
+
     def _get_client_ip(self, request: Request) -> str:
         """Extract client IP address from request."""
         # Check for forwarded headers first
@@ -0,0 +1,297 @@
+"""Content-addressed, reference-counted storage for ``code_chunks`` bodies.
+
+Chunk rows reference their text by ``code_chunks.body_hash``; the bytes live
+once in ``chunk_bodies`` however many files, branches or reindexes produce the
+same chunk.  Triggers from migration 008 keep ``chunk_bodies.refcount`` in step
+with every insert, update and delete of a chunk row (including ``ON DELETE
+CASCADE`` from ``files``), and :meth:`ChunkBodyStore.collect_garbage` drops
+bodies nothing references any more.
+
+Bodies of at least ``min_compress_bytes`` are stored zstd-compressed.  Once
+enough bodies exist, a dictionary is trained on the repository's own chunks
+(``chunk_body_dicts``) and used for new bodies; existing ones are recompressed
+with it.  ``zstandard`` is a core dependency; should it be missing anyway,
+new bodies are stored raw and reading a compressed one raises.
+
+Readers select ``chunk_content(c.content, c.body_hash)``, a SQL function that
+:func:`register_chunk_body_functions` installs on a connection.  Rows written
+before migration 008, or too small to be worth a hash, keep their text inline
+in ``content`` with a NULL ``body_hash``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+from typing import Any, Dict, Optional, Set, Tuple
+
+from mcp_server.config.env_vars import get_chunk_body_compress_min_bytes
+
+try:  # optional dependency
+    import zstandard
+except ImportError:  # pragma: no cover - exercised only without zstandard
+    zstandard = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+CODEC_RAW = "raw"
+CODEC_ZSTD = "zstd"
+
+# Bodies shorter than this stay inline: a hash reference would not be smaller.
+INLINE_MAX_BYTES = 64
+ZSTD_LEVEL = 3
+DICT_SIZE_BYTES = 64 * 1024
+# Compressible bodies written before a dictionary is trained.
+TRAIN_AFTER_BODIES = 512
+MAX_TRAINING_SAMPLES = 4096
+
+
+def body_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+class _Decoder:
+    """Per-connection decompression with lazily loaded dictionaries."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._decompressors: Dict[Optional[int], Any] = {}
+        self._missing: Set[str] = set()
+
+    def _decompressor(self, dict_id: Optional[int]) -> Any:
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id is None:
+                decompressor = zstandard.ZstdDecompressor()
+            else:
+                row = self._conn.execute(
+                    "SELECT dict FROM chunk_body_dicts WHERE id = ?", (dict_id,)
+                ).fetchone()
+                if row is None:
+                    raise sqlite3.DatabaseError(f"missing chunk body dictionary {dict_id}")
+                decompressor = zstandard.ZstdDecompressor(
+                    dict_data=zstandard.ZstdCompressionDict(bytes(row[0]))
+                )
+            self._decompressors[dict_id] = decompressor
+        return decompressor
+
+    def decode(self, codec: str, dict_id: Optional[int], body: bytes) -> str:
+        if codec == CODEC_RAW:
+            return bytes(body).decode("utf-8")
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read compressed chunk bodies")
+            return self._decompressor(dict_id).decompress(bytes(body)).decode("utf-8")
+        raise ValueError(f"unknown chunk body codec {codec!r}")
+
+    def read(self, digest: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT codec, dict_id, body FROM chunk_bodies WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            if digest not in self._missing:
+                self._missing.add(digest)
+                logger.error(
+                    "Chunk body %s is missing from chunk_bodies; the index is corrupt "
+                    "and the chunk reads as empty until it is reindexed",
+                    digest,
+                )
+            return None
+        return self.decode(row[0], row[1], row[2])
+
+
+def register_chunk_body_functions(conn: sqlite3.Connection) -> None:
+    """Install ``chunk_content(content, body_hash)`` on *conn*."""
+    decoder = _Decoder(conn)
+
+    def chunk_content(content: Optional[str], digest: Optional[str]) -> Optional[str]:
+        if digest is None:
+            return content
+        text = decoder.read(digest)
+        return content if text is None else text
+
+    conn.create_function("chunk_content", 2, chunk_content)
+
+
+def chunk_content_sql(conn: sqlite3.Connection, alias: str = "c") -> str:
+    """Return the SQL expression for a chunk's text on a caller-owned connection.
+
+    Registers ``chunk_content`` on *conn* when the schema has ``body_hash``;
+    otherwise returns the plain ``content`` column.
+    """
+    prefix = f"{alias}." if alias else ""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(code_chunks)")}
+    if "body_hash" not in columns:
+        return f"{prefix}content"
+    register_chunk_body_functions(conn)
+    return f"chunk_content({prefix}content, {prefix}body_hash)"
+
+
+class ChunkBodyStore:
+    """Writes, compresses and garbage-collects chunk bodies for one database."""
+
+    def __init__(
+        self,
+        min_compress_bytes: Optional[int] = None,
+        dict_size: int = DICT_SIZE_BYTES,
+        train_after: int = TRAIN_AFTER_BODIES,
+    ):
+        self.min_compress_bytes = (
+            get_chunk_body_compress_min_bytes()
+            if min_compress_bytes is None
+            else min_compress_bytes
+        )
+        self.dict_size = dict_size
+        self.train_after = train_after
+        self._dict_id: Optional[int] = None
+        self._compressor: Any = None
+        self._dict_checked = False
+        self._written_since_check = 0
+
+    # -- writing --------------------------------------------------------------
+
+    def prepare(self, conn: sqlite3.Connection, text: str) -> Tuple[str, Optional[str]]:
+        """Return ``(content, body_hash)`` column values for a chunk row.
+
+        Short bodies stay inline; anything longer is stored once in
+        ``chunk_bodies`` (a no-op when the same bytes are already there) and
+        the row keeps an empty ``content``.
+        """
+        raw = text.encode("utf-8")
+        if len(raw) < INLINE_MAX_BYTES:
+            return text, None
+        digest = body_hash(text)
+        if conn.execute("SELECT 1 FROM chunk_bodies WHERE hash = ?", (digest,)).fetchone():
+            return "", digest
+        codec, dict_id, body = self._encode(conn, raw)
+        conn.execute(
+            """INSERT OR IGNORE INTO chunk_bodies (hash, refcount, raw_size, codec, dict_id, body)
+               VALUES (?, 0, ?, ?, ?, ?)""",
+            (digest, len(raw), codec, dict_id, body),
+        )
+        if self._dict_id is None and zstandard is not None and len(raw) >= self.min_compress_bytes:
+            self._written_since_check += 1
+            if self._written_since_check >= self.train_after:
+                self._written_since_check = 0
+                self.train_dictionary(conn, replace=False)
+        return "", digest
+
+    def _load_dictionary(self, conn: sqlite3.Connection) -> None:
+        if self._dict_checked or zstandard is None:
+            return
+        self._dict_checked = True
+        row = conn.execute(
+            "SELECT id, dict FROM chunk_body_dicts ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            self._use_dictionary(int(row[0]), bytes(row[1]))
+
+    def _use_dictionary(self, dict_id: int, data: bytes) -> None:
+        self._dict_id = dict_id
+        self._compressor = zstandard.ZstdCompressor(
+            level=ZSTD_LEVEL, dict_data=zstandard.ZstdCompressionDict(data)
+        )
+
+    def _encode(self, conn: sqlite3.Connection, raw: bytes) -> Tuple[str, Optional[int], bytes]:
+        if zstandard is None or len(raw) < self.min_compress_bytes:
+            return CODEC_RAW, None, raw
+        self._load_dictionary(conn)
+        if self._compressor is not None:
+            compressed, dict_id = self._compressor.compress(raw), self._dict_id
+        else:
+            compressed, dict_id = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw), None
+        if len(compressed) >= len(raw):
+            return CODEC_RAW, None, raw
+        return CODEC_ZSTD, dict_id, compressed
+
+    # -- dictionary -------------------------------------------------------------
+
+    def train_dictionary(self, conn: sqlite3.Connection, replace: bool = True) -> Optional[int]:
+        """Train a dictionary on stored bodies and recompress them with it.
+
+        With ``replace=False`` an existing dictionary (possibly trained by
+        another store on the same database) is adopted instead.  Returns the
+        dictionary id in use, or ``None`` when zstandard is missing or there
+        are too few samples to train on.
+        """
+        if zstandard is None:
+            return None
+        if not replace:
+            self._dict_checked = False
+            self._load_dictionary(conn)
+            if self._dict_id is not None:
+                return self._dict_id
+        decoder = _Decoder(conn)
+        samples = [
+            decoder.decode(codec, dict_id, body).encode("utf-8")
+            for codec, dict_id, body in conn.execute(
+                """SELECT codec, dict_id, body FROM chunk_bodies
+                   WHERE raw_size >= ? ORDER BY random() LIMIT ?""",
+                (self.min_compress_bytes, MAX_TRAINING_SAMPLES),
+            )
+        ]
+        if len(samples) < 8:
+            return None
+        try:
+            trained = zstandard.train_dictionary(self.dict_size, samples, level=ZSTD_LEVEL)
+        except zstandard.ZstdError as exc:
+            logger.info("Chunk body dictionary training skipped: %s", exc)
+            return None
+        cursor = conn.execute(
+            "INSERT INTO chunk_body_dicts (dict, sample_count) VALUES (?, ?)",
+            (trained.as_bytes(), len(samples)),
+        )
+        dict_id = int(cursor.lastrowid)
+        self._use_dictionary(dict_id, trained.as_bytes())
+        self._dict_checked = True
+        recompressed = self._recompress(conn, decoder)
+        logger.info(
+            "Trained chunk body dictionary %d on %d samples; recompressed %d bodies",
+            dict_id,
+            len(samples),
+            recompressed,
+        )
+        return dict_id
+
+    def _recompress(self, conn: sqlite3.Connection, decoder: _Decoder) -> int:
+        rows = conn.execute(
+            """SELECT hash, codec, dict_id, body FROM chunk_bodies
+               WHERE raw_size >= ? AND (dict_id IS NULL OR dict_id != ?)""",
+            (self.min_compress_bytes, self._dict_id),
+        ).fetchall()
+        updates = []
+        for digest, codec, dict_id, body in rows:
+            raw = decoder.decode(codec, dict_id, body).encode("utf-8")
+            new_codec, new_dict_id, new_body = self._encode(conn, raw)
+            if len(new_body) < len(body):
+                updates.append((new_codec, new_dict_id, new_body, digest))
+        conn.executemany(
+            "UPDATE chunk_bodies SET codec = ?, dict_id = ?, body = ? WHERE hash = ?", updates
+        )
+        return len(updates)
+
+    # -- maintenance ------------------------------------------------------------
+
+    @staticmethod
+    def collect_garbage(conn: sqlite3.Connection) -> int:
+        """Delete bodies that no chunk row references any more."""
+        return conn.execute("DELETE FROM chunk_bodies WHERE refcount <= 0").rowcount
+
+    @staticmethod
+    def stats(conn: sqlite3.Connection) -> Dict[str, int]:
+        row = conn.execute(
+            """SELECT COUNT(*), COALESCE(SUM(refcount), 0), COALESCE(SUM(raw_size), 0),
+                      COALESCE(SUM(LENGTH(body)), 0)
+               FROM chunk_bodies"""
+        ).fetchone()
+        return {
+            "bodies": int(row[0]),
+            "references": int(row[1]),
+            "raw_bytes": int(row[2]),
+            "stored_bytes": int(row[3]),
+        }
@@ -4,12 +4,27 @@ Thread-safe bounded SQLite connection pool.
 The factory callable must return connections opened with
 ``check_same_thread=False``; failure to do so will raise
 ``sqlite3.ProgrammingError`` when connections are used across threads.
+
+``ReadWriteConnections`` builds on the pool to split a store's traffic into
+one dedicated writer connection and a pool of read-only reader connections,
+each tuned once at open time (see ``ConnectionTuning``).
 """
 
 import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Callable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+from mcp_server.config.env_vars import (
+    get_sqlite_cache_size_kib,
+    get_sqlite_mmap_size_bytes,
+    get_sqlite_reader_pool_size,
+    get_sqlite_statement_cache_size,
+)
+from mcp_server.storage.chunk_bodies import register_chunk_body_functions
 
 
 class ConnectionPool:
@@ -59,3 +74,164 @@ class ConnectionPool:
                     pass
             except queue.Empty:
                 break
+
+
+@dataclass(frozen=True)
+class ConnectionTuning:
+    """Per-connection PRAGMA settings applied once when a connection is opened."""
+
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    temp_store: str = "MEMORY"
+    statement_cache_size: int = 256
+    busy_timeout_ms: int = 5000
+
+    @classmethod
+    def from_env(cls) -> "ConnectionTuning":
+        return cls(
+            mmap_size=get_sqlite_mmap_size_bytes(),
+            cache_size_kib=get_sqlite_cache_size_kib(),
+            statement_cache_size=get_sqlite_statement_cache_size(),
+        )
+
+
+def apply_connection_tuning(
+    conn: sqlite3.Connection, tuning: ConnectionTuning, readonly: bool = False
+) -> None:
+    """Apply *tuning* to an open connection.
+
+    Reader connections are additionally pinned with ``PRAGMA query_only`` so a
+    stray write through the read path fails loudly instead of taking the
+    write lock.
+    """
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(tuning.busy_timeout_ms)}")
+    conn.execute(f"PRAGMA mmap_size = {int(tuning.mmap_size)}")
+    # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+    conn.execute(f"PRAGMA cache_size = -{abs(int(tuning.cache_size_kib))}")
+    conn.execute(f"PRAGMA temp_store = {tuning.temp_store}")
+    conn.execute("PRAGMA foreign_keys = ON")
+    register_chunk_body_functions(conn)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+
+
+def open_tuned_connection(
+    db_path: str, tuning: ConnectionTuning, readonly: bool = False
+) -> sqlite3.Connection:
+    """Open a cross-thread connection to *db_path* with *tuning* applied.
+
+    Readonly connections are opened through a ``mode=ro`` URI so SQLite itself
+    refuses writes, independent of ``query_only``.
+    """
+    if readonly:
+        target = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    else:
+        target = db_path
+    conn = sqlite3.connect(
+        target,
+        uri=readonly,
+        check_same_thread=False,
+        timeout=tuning.busy_timeout_ms / 1000.0,
+        cached_statements=tuning.statement_cache_size,
+    )
+    apply_connection_tuning(conn, tuning, readonly=readonly)
+    return conn
+
+
+class ReadWriteConnections:
+    """One dedicated writer connection plus a lazily-opened reader pool.
+
+    The writer is guarded by a re-entrant lock; nested ``writer()`` scopes on
+    the owning thread reuse the same connection and only the outermost scope
+    is reported as such, so callers commit exactly once.  ``reader()`` hands
+    out ``mode=ro`` connections from a ``ConnectionPool``; when the calling
+    thread currently holds the writer it receives the writer connection so it
+    can observe its own uncommitted rows.
+
+    Readers are opened on first use rather than at construction because a
+    ``mode=ro`` connection cannot create the database or its schema.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        tuning: Optional[ConnectionTuning] = None,
+        reader_pool_size: Optional[int] = None,
+    ):
+        self.db_path = db_path
+        self.tuning = tuning or ConnectionTuning.from_env()
+        self._reader_pool_size = max(
+            1, reader_pool_size if reader_pool_size is not None else get_sqlite_reader_pool_size()
+        )
+        self._writer: Optional[sqlite3.Connection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_owner: Optional[int] = None
+        self._writer_depth = 0
+        self._readers: Optional[ConnectionPool] = None
+        self._readers_lock = threading.Lock()
+        self._closed = False
+
+    def holds_writer(self) -> bool:
+        """Return True when the calling thread is inside a ``writer()`` scope."""
+        return self._writer_owner == threading.get_ident()
+
+    @contextmanager
+    def writer(self) -> Iterator[Tuple[sqlite3.Connection, bool]]:
+        """Yield ``(connection, outermost)`` while holding the writer lock."""
+        if self._closed:
+            raise RuntimeError("ReadWriteConnections is closed; cannot acquire writer")
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = open_tuned_connection(self.db_path, self.tuning)
+            self._writer_owner = threading.get_ident()
+            self._writer_depth += 1
+            try:
+                yield self._writer, self._writer_depth == 1
+            finally:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    self._writer_owner = None
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Yield a read-only connection (or the writer if this thread holds it)."""
+        if self.holds_writer():
+            yield self._writer  # type: ignore[misc]
+            return
+        with self._reader_pool().acquire() as conn:
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+
+    def _reader_pool(self) -> ConnectionPool:
+        if self._closed:
+            raise RuntimeError("ReadWriteConnections is closed; cannot acquire reader")
+        pool = self._readers
+        if pool is None:
+            with self._readers_lock:
+                if self._readers is None:
+                    self._readers = ConnectionPool(
+                        factory=lambda: open_tuned_connection(
+                            self.db_path, self.tuning, readonly=True
+                        ),
+                        size=self._reader_pool_size,
+                    )
+                pool = self._readers
+        return pool
+
+    def close_all(self) -> None:
+        """Close the writer and every reader.  Idempotent."""
+        self._closed = True
+        with self._readers_lock:
+            if self._readers is not None:
+                self._readers.close_all()
+        with self._writer_lock:
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                except Exception:
+                    pass
+                self._writer = None
@@ -0,0 +1,281 @@
+"""Federated full-text search across repository indexes.
+
+Searching each repository's index separately costs one connection, one query
+and one Python-side merge per repository.  ``FederatedSearchEngine`` instead
+``ATTACH``es repository indexes read-only to a shared connection, in groups
+of at most SQLite's attach limit, and answers each group with a single
+``UNION ALL`` statement:
+
+- every repository contributes a subquery over its ``bm25_content`` table
+  (or ``fts_code`` when there is none) with its own ``LIMIT``;
+- BM25 scores are normalized per repository (best hit = 1.0), because raw
+  scores depend on each corpus' statistics and are not comparable;
+- the outer query orders the union by normalized score under the global
+  ``LIMIT``.
+
+Attach groups are kept in an LRU keyed by their repository set, and a group
+is rebuilt when one of its index files is replaced.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_TOKENS = 32
+
+# Per-repository subqueries.  ``{schema}`` is an ``rN`` alias chosen by the
+# engine; everything user-supplied is bound as a parameter.
+_FTS_CODE_SUBQUERY = """
+    SELECT ? AS repository_id,
+           COALESCE(f.path, f.relative_path, CAST(fts_code.file_id AS TEXT)) AS file,
+           snippet(fts_code, 0, '<mark>', '</mark>', '...', {tokens}) AS snippet,
+           bm25(fts_code) AS raw_score
+    FROM {schema}.fts_code
+    LEFT JOIN {schema}.files f ON fts_code.file_id = f.id
+        OR CAST(fts_code.file_id AS TEXT) = f.path
+        OR CAST(fts_code.file_id AS TEXT) = f.relative_path
+    WHERE fts_code MATCH ?{pattern}
+    ORDER BY raw_score
+    LIMIT ?"""
+
+_BM25_CONTENT_SUBQUERY = """
+    SELECT ? AS repository_id,
+           bm25_content.filepath AS file,
+           snippet(bm25_content, 3, '<mark>', '</mark>', '...', {tokens}) AS snippet,
+           bm25(bm25_content) AS raw_score
+    FROM {schema}.bm25_content
+    WHERE bm25_content MATCH ?{pattern}
+    ORDER BY raw_score
+    LIMIT ?"""
+
+_FILE_EXPRESSIONS = {
+    "fts_code": "COALESCE(f.path, f.relative_path, CAST(fts_code.file_id AS TEXT))",
+    "bm25_content": "bm25_content.filepath",
+}
+_SUBQUERIES = {"fts_code": _FTS_CODE_SUBQUERY, "bm25_content": _BM25_CONTENT_SUBQUERY}
+# Preferred full-text table first, matching the per-repository search path.
+_SOURCE_TABLES = ("bm25_content", "fts_code")
+
+
+@dataclass(frozen=True)
+class FederatedRepository:
+    repository_id: str
+    name: str
+    index_path: Path
+
+
+@dataclass
+class FederatedSearchResult:
+    """Hits ranked by normalized score, plus repositories that could not be searched."""
+
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    statements: int = 0
+    groups: int = 0
+    search_time: float = 0.0
+
+
+def _file_identity(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def sqlite_attach_limit() -> int:
+    """``SQLITE_LIMIT_ATTACHED`` of the linked SQLite library."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        return int(conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+    finally:
+        conn.close()
+
+
+class _AttachGroup:
+    """One read-only connection with up to the attach limit of indexes attached."""
+
+    def __init__(self, repos: Sequence[FederatedRepository]):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.sources: Dict[str, Tuple[str, str]] = {}
+        self.errors: Dict[str, str] = {}
+        self._identities: Dict[Path, Optional[Tuple[int, int]]] = {}
+        for index, repo in enumerate(repos):
+            schema = f"r{index}"
+            path = Path(repo.index_path).resolve(strict=False)
+            self._identities[path] = _file_identity(path)
+            try:
+                self.conn.execute("ATTACH DATABASE ? AS " + schema, (f"{path.as_uri()}?mode=ro",))
+                table = self._source_table(schema)
+            except sqlite3.Error as exc:
+                self.errors[repo.repository_id] = str(exc)
+                continue
+            if table is None:
+                self.conn.execute(f"DETACH DATABASE {schema}")
+                self.errors[repo.repository_id] = "index has no full-text table"
+                continue
+            self.sources[repo.repository_id] = (schema, table)
+        self.conn.execute("PRAGMA query_only = ON")
+
+    def _source_table(self, schema: str) -> Optional[str]:
+        names = {
+            str(row[0])
+            for row in self.conn.execute(
+                f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'"
+            )
+        }
+        for table in _SOURCE_TABLES:
+            if table in names:
+                return table
+        return None
+
+    def is_current(self) -> bool:
+        return all(_file_identity(path) == ident for path, ident in self._identities.items())
+
+    def build_sql(
+        self,
+        query: str,
+        limit: Optional[int],
+        per_repo_limit: int,
+        file_pattern: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        parts: List[str] = []
+        params: List[Any] = []
+        for repository_id, (schema, table) in self.sources.items():
+            pattern = ""
+            if file_pattern:
+                pattern = f" AND {_FILE_EXPRESSIONS[table]} GLOB ?"
+            subquery = _SUBQUERIES[table].format(
+                schema=schema, tokens=SNIPPET_TOKENS, pattern=pattern
+            )
+            parts.append(
+                "SELECT repository_id, file, snippet, raw_score, "
+                "CASE WHEN MIN(raw_score) OVER () < 0 "
+                "THEN raw_score / MIN(raw_score) OVER () ELSE 1.0 END AS score "
+                f"FROM ({subquery})"
+            )
+            params.extend([repository_id, query])
+            if file_pattern:
+                params.append(file_pattern)
+            params.append(per_repo_limit)
+        sql = "\nUNION ALL\n".join(parts) + "\nORDER BY score DESC, raw_score"
+        if limit is not None:
+            sql += "\nLIMIT ?"
+            params.append(limit)
+        return sql, params
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class FederatedSearchEngine:
+    """Runs one BM25 statement per attach group instead of one per repository."""
+
+    def __init__(self, max_attached: Optional[int] = None, max_groups: int = 8):
+        limit = sqlite_attach_limit()
+        self.group_size = max(1, min(limit, max_attached) if max_attached else limit)
+        self.max_groups = max_groups
+        self._groups: "OrderedDict[Tuple[Tuple[str, str], ...], _AttachGroup]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _checkout(self, repos: Sequence[FederatedRepository]) -> _AttachGroup:
+        key = tuple((repo.repository_id, str(repo.index_path)) for repo in repos)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is not None and group.is_current():
+                self._groups.move_to_end(key)
+                self.hits += 1
+                return group
+            if group is not None:
+                del self._groups[key]
+                group.close()
+            self.misses += 1
+            group = _AttachGroup(repos)
+            self._groups[key] = group
+            while len(self._groups) > self.max_groups:
+                _key, evicted = self._groups.popitem(last=False)
+                evicted.close()
+            return group
+
+    def search(
+        self,
+        query: str,
+        repos: Sequence[FederatedRepository],
+        *,
+        limit: Optional[int] = 50,
+        per_repo_limit: Optional[int] = None,
+        file_pattern: Optional[str] = None,
+    ) -> FederatedSearchResult:
+        """Search ``repos`` for an FTS5 ``query``.
+
+        ``per_repo_limit`` (default ``limit``) caps each repository's
+        contribution; ``limit=None`` returns every repository's top hits.
+        """
+        started = time.perf_counter()
+        per_repo = per_repo_limit if per_repo_limit is not None else (limit or 50)
+        ordered = sorted(repos, key=lambda repo: repo.repository_id)
+        result = FederatedSearchResult()
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(ordered), self.group_size):
+            group = self._checkout(ordered[start : start + self.group_size])
+            result.groups += 1
+            result.errors.update(group.errors)
+            if not group.sources:
+                continue
+            sql, params = group.build_sql(query, limit, per_repo, file_pattern)
+            try:
+                with group.lock:
+                    fetched = group.conn.execute(sql, params).fetchall()
+            except sqlite3.Error as exc:
+                for repository_id in group.sources:
+                    result.errors[repository_id] = str(exc)
+                continue
+            result.statements += 1
+            rows.extend(dict(row) for row in fetched)
+        rows.sort(key=lambda row: (-row["score"], row["raw_score"]))
+        result.results = rows if limit is None else rows[:limit]
+        result.search_time = time.perf_counter() - started
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            groups = list(self._groups.values())
+            self._groups.clear()
+        for group in groups:
+            group.close()
+
+
+def normalize_bm25_scores(raw_scores: Sequence[float]) -> List[float]:
+    """Normalize one repository's raw BM25 scores the way the federated query does.
+
+    The best (most negative) hit scores 1.0 and the others their ratio to
+    it; when no score is negative every hit scores 1.0.
+    """
+    best = min(raw_scores, default=0.0)
+    if best >= 0:
+        return [1.0 for _ in raw_scores]
+    return [raw / best for raw in raw_scores]
+
+
+__all__ = [
+    "FederatedRepository",
+    "FederatedSearchEngine",
+    "FederatedSearchResult",
+    "normalize_bm25_scores",
+    "sqlite_attach_limit",
+]
@@ -979,6 +979,38 @@ class GitAwareIndexManager:
         result.duration_seconds = (datetime.now() - start_time).total_seconds()
         return result
 
+    def catch_up_semantic(
+        self, repo_id: str, from_commit: Optional[str], to_commit: str
+    ) -> Dict[str, Any]:
+        """Embed what an index worker process synced lexically.
+
+        Workers run with semantic indexing disabled because a file-mode Qdrant
+        store allows one process only, so the owning process replays the vector
+        side of ``from_commit..to_commit`` here.  Without ``from_commit`` (a full
+        index) every indexed file is embedded.
+        """
+        repo_info = self.registry.get_repository(repo_id)
+        ctx = self._resolve_ctx(repo_id)
+        apply = getattr(self.dispatcher, "apply_semantic_changes", None)
+        if not repo_info or ctx is None or apply is None or from_commit == to_commit:
+            return {"semantic_stage": "skipped"}
+
+        repo_path = Path(repo_info.path)
+        if not from_commit:
+            files = ctx.sqlite_store.get_all_files() if ctx.sqlite_store else []
+            return apply(ctx, indexed=[repo_path / f["relative_path"] for f in files])
+
+        changes = self._get_changed_files(repo_path, from_commit, to_commit)
+        removed = [repo_path / path for path in changes.deleted]
+        moved = []
+        for old_path, new_path in changes.renamed:
+            if (repo_path / new_path).exists():
+                moved.append((repo_path / old_path, repo_path / new_path))
+            else:
+                removed.append(repo_path / old_path)
+        indexed = [repo_path / path for path in changes.added + changes.modified]
+        return apply(ctx, indexed=indexed, removed=removed, moved=moved)
+
     def _coerce_index_result(self, value: object, *, path: Path) -> IndexResult:
         if isinstance(value, IndexResult):
             return value
@@ -0,0 +1,678 @@
+"""Durable SQLite-backed queue for indexing work.
+
+Reindex triggers (git commits, full rescans) are recorded as rows in a local
+SQLite database next to the repository registry, so queued work survives a
+restart and concurrent triggers for the same work collapse into one job:
+
+- jobs are deduplicated by ``(repo, path set, commit)`` while queued, and a
+  duplicate only raises the queued job's priority;
+- a worker claims the highest-priority runnable job under a lease and keeps
+  it alive with heartbeats; a job whose lease expires (crashed worker) is
+  claimed again;
+- at most one job per repository is leased at a time, because repository
+  syncs are serialized anyway and per-repo locks are process-local;
+- failures are retried with exponential backoff up to ``max_attempts``.
+
+``IndexWorkerPool`` runs a configurable number of worker processes that
+claim jobs from the queue and report completions back to the parent; workers
+that die are restarted with backoff.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATES = frozenset({DONE, FAILED, CANCELLED})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_jobs (
+    id INTEGER PRIMARY KEY,
+    repo_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    paths TEXT NOT NULL,
+    commit_sha TEXT NOT NULL DEFAULT '',
+    dedup_key TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    heartbeat_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    task_id TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    notified INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_index_jobs_queued_key
+    ON index_jobs(dedup_key) WHERE state = 'queued';
+CREATE INDEX IF NOT EXISTS idx_index_jobs_claim
+    ON index_jobs(state, priority DESC, run_after, id);
+CREATE INDEX IF NOT EXISTS idx_index_jobs_finished
+    ON index_jobs(notified) WHERE notified = 0 AND state IN ('done', 'failed', 'cancelled');
+"""
+
+
+class JobCancelled(Exception):
+    """Raised from a progress report when the job's lease is lost or cancelled."""
+
+
+@dataclass
+class IndexJob:
+    id: int
+    repo_id: str
+    kind: str
+    paths: List[str]
+    commit: str
+    priority: int
+    state: str
+    attempts: int
+    max_attempts: int
+    run_after: float
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    task_id: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "IndexJob":
+        return cls(
+            id=row["id"],
+            repo_id=row["repo_id"],
+            kind=row["kind"],
+            paths=json.loads(row["paths"]),
+            commit=row["commit_sha"],
+            priority=row["priority"],
+            state=row["state"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            lease_owner=row["lease_owner"],
+            lease_expires=row["lease_expires"],
+            task_id=row["task_id"],
+            progress=json.loads(row["progress"]) if row["progress"] else {},
+            result=json.loads(row["result"]) if row["result"] else {},
+            error=row["error"],
+            cancel_requested=bool(row["cancel_requested"]),
+        )
+
+
+def job_dedup_key(repo_id: str, kind: str, paths: Iterable[str], commit: str = "") -> str:
+    """Identity of a job's work: repository, kind, sorted path set and commit."""
+    digest = hashlib.sha256()
+    for part in (repo_id, kind, commit, *sorted(set(paths))):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IndexJobQueue:
+    """Priority job queue with leases, heartbeats and retry backoff in SQLite.
+
+    Every operation opens its own short-lived connection, so one queue object
+    may be shared across threads and each worker process opens the same file.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = Path(db_path)
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._clock = clock
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+
+    @classmethod
+    def for_registry(cls, registry_path: Path, **kwargs: Any) -> "IndexJobQueue":
+        """Queue stored beside the repository registry file."""
+        return cls(Path(registry_path).parent / "index_jobs.db", **kwargs)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Delay before retry number ``attempts`` (1-based): base * 2^(n-1), capped."""
+        return min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** max(attempts - 1, 0))
+
+    def enqueue(
+        self,
+        repo_id: str,
+        *,
+        kind: str = "sync",
+        paths: Iterable[str] = (),
+        commit: str = "",
+        priority: int = 0,
+        task_id: Optional[str] = None,
+    ) -> int:
+        """Queue a job and return its id.
+
+        When the same work is already queued, or already running for the same
+        commit, the existing job id is returned; a queued duplicate takes the
+        higher of the two priorities.
+        """
+        path_list = sorted(set(paths))
+        key = job_dedup_key(repo_id, kind, path_list, commit)
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, state FROM index_jobs WHERE dedup_key = ? AND state = ?",
+                (key, QUEUED),
+            ).fetchone()
+            if row is None and commit:
+                # A running job for the same commit and paths does the same work.
+                row = conn.execute(
+                    "SELECT id, state FROM index_jobs WHERE dedup_key = ? AND state = ?",
+                    (key, LEASED),
+                ).fetchone()
+            if row is not None:
+                if row["state"] == QUEUED:
+                    conn.execute(
+                        "UPDATE index_jobs SET priority = MAX(priority, ?), "
+                        "task_id = COALESCE(task_id, ?), updated_at = ? WHERE id = ?",
+                        (priority, task_id, now, row["id"]),
+                    )
+                return int(row["id"])
+            cursor = conn.execute(
+                """
+                INSERT INTO index_jobs
+                    (repo_id, kind, paths, commit_sha, dedup_key, priority, state,
+                     max_attempts, run_after, task_id, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    repo_id,
+                    kind,
+                    json.dumps(path_list),
+                    commit,
+                    key,
+                    priority,
+                    QUEUED,
+                    self.max_attempts,
+                    now,
+                    task_id,
+                    now,
+                    now,
+                ),
+            )
+            return int(cursor.lastrowid)
+
+    def claim(self, worker_id: str, lease_seconds: float = 60.0) -> Optional[IndexJob]:
+        """Lease the next runnable job to ``worker_id``, or return None.
+
+        Jobs whose lease expired are reclaimed (counting as an attempt) or, once
+        out of attempts, failed.  Repositories with a live lease are skipped.
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    """
+                    SELECT * FROM index_jobs
+                    WHERE ((state = 'queued' AND run_after <= :now)
+                           OR (state = 'leased' AND lease_expires < :now))
+                      AND repo_id NOT IN (
+                          SELECT repo_id FROM index_jobs
+                          WHERE state = 'leased' AND lease_expires >= :now
+                      )
+                    ORDER BY priority DESC, run_after, id
+                    LIMIT 1
+                    """,
+                    {"now": now},
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["state"] == LEASED and row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        "UPDATE index_jobs SET state = ?, error = ?, lease_owner = NULL, "
+                        "updated_at = ? WHERE id = ?",
+                        (FAILED, "lease expired", now, row["id"]),
+                    )
+                    continue
+                if row["state"] == LEASED:
+                    logger.warning(
+                        "Reclaiming index job %s from %s after lease expiry",
+                        row["id"],
+                        row["lease_owner"],
+                    )
+                conn.execute(
+                    """
+                    UPDATE index_jobs
+                    SET state = ?, attempts = attempts + 1, lease_owner = ?,
+                        lease_expires = ?, heartbeat_at = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (LEASED, worker_id, now + lease_seconds, now, now, row["id"]),
+                )
+                return IndexJob.from_row(
+                    conn.execute("SELECT * FROM index_jobs WHERE id = ?", (row["id"],)).fetchone()
+                )
+
+    def heartbeat(
+        self,
+        job_id: int,
+        worker_id: str,
+        lease_seconds: float = 60.0,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Extend the lease (and record progress); False if the worker should stop."""
+        now = self._clock()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE index_jobs
+                SET lease_expires = ?, heartbeat_at = ?, updated_at = ?,
+                    progress = COALESCE(?, progress)
+                WHERE id = ? AND lease_owner = ? AND state = 'leased'
+                """,
+                (
+                    now + lease_seconds,
+                    now,
+                    now,
+                    json.dumps(progress) if progress is not None else None,
+                    job_id,
+                    worker_id,
+                ),
+            )
+            if cursor.rowcount != 1:
+                return False
+            row = conn.execute(
+                "SELECT cancel_requested FROM index_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return not row["cancel_requested"]
+
+    def complete(
+        self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        now = self._clock()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE index_jobs
+                SET state = ?, result = ?, error = NULL, lease_owner = NULL,
+                    lease_expires = NULL, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND state = 'leased'
+                """,
+                (DONE, json.dumps(result or {}, default=str), now, job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """Record a failed attempt: requeue with backoff, or fail when out of attempts."""
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM index_jobs WHERE id = ? AND lease_owner = ? AND state = 'leased'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return False
+            retry = row["attempts"] < row["max_attempts"] and not row["cancel_requested"]
+            if (
+                retry
+                and conn.execute(
+                    "SELECT 1 FROM index_jobs WHERE dedup_key = ? AND state = 'queued'",
+                    (row["dedup_key"],),
+                ).fetchone()
+            ):
+                # A newer trigger already queued the same work.
+                retry = False
+            if retry:
+                conn.execute(
+                    """
+                    UPDATE index_jobs
+                    SET state = ?, run_after = ?, error = ?, lease_owner = NULL,
+                        lease_expires = NULL, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (QUEUED, now + self.backoff_seconds(row["attempts"]), error, now, job_id),
+                )
+            else:
+                state = CANCELLED if row["cancel_requested"] else FAILED
+                conn.execute(
+                    "UPDATE index_jobs SET state = ?, error = ?, lease_owner = NULL, "
+                    "lease_expires = NULL, updated_at = ? WHERE id = ?",
+                    (state, error, now, job_id),
+                )
+        return True
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued job, or ask the worker holding a leased one to stop."""
+        now = self._clock()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE index_jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?",
+                (CANCELLED, now, job_id, QUEUED),
+            )
+            if cursor.rowcount:
+                return True
+            cursor = conn.execute(
+                "UPDATE index_jobs SET cancel_requested = 1, updated_at = ? "
+                "WHERE id = ? AND state = ?",
+                (now, job_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> Optional[IndexJob]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM index_jobs WHERE id = ?", (job_id,)).fetchone()
+        return IndexJob.from_row(row) if row is not None else None
+
+    def take_finished(self, limit: int = 100) -> List[IndexJob]:
+        """Return finished jobs not yet handed out, marking them as handed out."""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM index_jobs WHERE notified = 0 "
+                "AND state IN ('done', 'failed', 'cancelled') ORDER BY updated_at, id LIMIT ?",
+                (limit,),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE index_jobs SET notified = 1 WHERE id = ?", [(row["id"],) for row in rows]
+            )
+        return [IndexJob.from_row(row) for row in rows]
+
+    def purge(self, older_than_seconds: float = 7 * 24 * 3600) -> int:
+        """Delete handed-out finished jobs older than ``older_than_seconds``."""
+        cutoff = self._clock() - older_than_seconds
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM index_jobs WHERE notified = 1 "
+                "AND state IN ('done', 'failed', 'cancelled') AND updated_at < ?",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) FROM index_jobs GROUP BY state").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+
+JobHandler = Callable[[IndexJob, Callable[[Dict[str, Any]], None]], Optional[Dict[str, Any]]]
+
+
+def run_job(
+    queue: IndexJobQueue,
+    job: IndexJob,
+    handler: JobHandler,
+    worker_id: str,
+    lease_seconds: float = 60.0,
+) -> bool:
+    """Run a claimed ``job`` through ``handler`` while heartbeating its lease.
+
+    ``handler(job, report)`` may call ``report(progress_dict)``; ``report``
+    raises ``JobCancelled`` once the lease is lost or cancellation was
+    requested.  Returns True when the job completed.
+    """
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.heartbeat(job.id, worker_id, lease_seconds):
+                lost.set()
+                return
+
+    def report(progress: Dict[str, Any]) -> None:
+        if lost.is_set() or not queue.heartbeat(job.id, worker_id, lease_seconds, progress):
+            lost.set()
+            raise JobCancelled(f"index job {job.id} lost its lease or was cancelled")
+
+    heartbeat = threading.Thread(target=beat, daemon=True, name=f"mcp-index-job-{job.id}")
+    heartbeat.start()
+    try:
+        result = handler(job, report)
+    except Exception as exc:
+        logger.warning("Index job %s (%s %s) failed: %s", job.id, job.kind, job.repo_id, exc)
+        queue.fail(job.id, worker_id, f"{type(exc).__name__}: {exc}")
+        return False
+    finally:
+        stop.set()
+        heartbeat.join(timeout=5)
+    return queue.complete(job.id, worker_id, result)
+
+
+def _worker_main(
+    db_path: str,
+    handler: JobHandler,
+    worker_id: str,
+    lease_seconds: float,
+    poll_seconds: float,
+    stop_event: Any,
+) -> None:
+    queue = IndexJobQueue(Path(db_path))
+    while not stop_event.is_set():
+        try:
+            job = queue.claim(worker_id, lease_seconds)
+        except sqlite3.Error as exc:
+            logger.warning("Index worker %s could not claim a job: %s", worker_id, exc)
+            job = None
+        if job is None:
+            stop_event.wait(poll_seconds)
+            continue
+        run_job(queue, job, handler, worker_id, lease_seconds)
+
+
+@dataclass
+class _WorkerSlot:
+    index: int
+    process: Any = None
+    started_at: float = 0.0
+    crashes: int = 0
+    respawn_at: Optional[float] = None
+
+
+class IndexWorkerPool:
+    """Worker processes draining an ``IndexJobQueue``.
+
+    ``handler`` runs inside the workers, so it must be picklable (a
+    module-level function or a ``functools.partial`` of one).  The parent
+    polls for finished jobs and passes each to ``on_finished``, and restarts
+    workers that exit unexpectedly with exponential backoff; a job a dead
+    worker held is claimed again once its lease expires.
+    """
+
+    def __init__(
+        self,
+        queue: IndexJobQueue,
+        handler: JobHandler,
+        workers: int = 2,
+        *,
+        lease_seconds: float = 60.0,
+        poll_seconds: float = 0.5,
+        restart_backoff_seconds: float = 1.0,
+        restart_backoff_max_seconds: float = 60.0,
+        on_finished: Optional[Callable[[IndexJob], None]] = None,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self.restart_backoff_max_seconds = restart_backoff_max_seconds
+        self.on_finished = on_finished
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._slots: List[_WorkerSlot] = []
+        self._spawned = 0
+        self._monitor: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """True while the pool is started, including while a worker awaits restart."""
+        if self._monitor is not None and self._monitor.is_alive():
+            return True
+        return any(slot.process.is_alive() for slot in self._slots)
+
+    def start(self) -> None:
+        if self._slots:
+            return
+        self._stop.clear()
+        self._slots = [_WorkerSlot(index) for index in range(self.workers)]
+        for slot in self._slots:
+            self._spawn(slot)
+        self._monitor = threading.Thread(
+            target=self._watch_finished, daemon=True, name="mcp-index-job-monitor"
+        )
+        self._monitor.start()
+        logger.info("Started %d index worker processes", self.workers)
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        # A fresh id per process keeps a restarted worker distinct in leases and logs.
+        worker_id = f"{os.getpid()}-{slot.index}-{self._spawned}"
+        self._spawned += 1
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                str(self.queue.db_path),
+                self.handler,
+                worker_id,
+                self.lease_seconds,
+                self.poll_seconds,
+                self._stop,
+            ),
+            name=f"mcp-index-worker-{slot.index}",
+            daemon=True,
+        )
+        process.start()
+        slot.process = process
+        slot.started_at = time.monotonic()
+        slot.respawn_at = None
+
+    def restart_backoff(self, crashes: int) -> float:
+        """Delay before restarting a worker after ``crashes`` consecutive exits."""
+        return min(
+            self.restart_backoff_max_seconds,
+            self.restart_backoff_seconds * 2 ** max(crashes - 1, 0),
+        )
+
+    def _respawn_exited(self) -> None:
+        now = time.monotonic()
+        for slot in self._slots:
+            if self._stop.is_set():
+                return
+            if slot.process.is_alive():
+                continue
+            if slot.respawn_at is None:
+                # A worker that stayed up longer than the backoff cap was healthy.
+                if now - slot.started_at > self.restart_backoff_max_seconds:
+                    slot.crashes = 0
+                slot.crashes += 1
+                slot.process.join(0)
+                slot.respawn_at = now + self.restart_backoff(slot.crashes)
+                logger.warning(
+                    "Index worker %d exited with code %s; restarting in %.1fs",
+                    slot.index,
+                    slot.process.exitcode,
+                    slot.respawn_at - now,
+                )
+            if now >= slot.respawn_at:
+                self._spawn(slot)
+
+    def dispatch_finished(self) -> int:
+        """Hand finished jobs to ``on_finished``; returns how many were handled."""
+        jobs = self.queue.take_finished()
+        for job in jobs:
+            if self.on_finished is None:
+                continue
+            try:
+                self.on_finished(job)
+            except Exception as exc:
+                logger.warning("Index job %s completion hook failed: %s", job.id, exc)
+        return len(jobs)
+
+    def _watch_finished(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.dispatch_finished()
+            except sqlite3.Error as exc:
+                logger.warning("Index job monitor failed: %s", exc)
+            try:
+                self._respawn_exited()
+            except Exception as exc:
+                logger.warning("Could not restart index worker: %s", exc)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        # Stop the monitor first so it cannot restart workers while they exit.
+        if self._monitor is not None:
+            self._monitor.join(timeout=5)
+            self._monitor = None
+        deadline = time.monotonic() + timeout
+        for slot in self._slots:
+            process = slot.process
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                # Its lease expires and another worker reclaims the job.
+                process.terminate()
+                process.join(1)
+        self._slots.clear()
+        self.dispatch_finished()
+        logger.info("Stopped index worker processes")
+
+
+__all__ = [
+    "IndexJob",
+    "IndexJobQueue",
+    "IndexWorkerPool",
+    "JobCancelled",
+    "job_dedup_key",
+    "run_job",
+]
@@ -0,0 +1,491 @@
+"""Background FTS5 and SQLite maintenance for long-running servers.
+
+Watcher-driven deletes and inserts leave ``fts_code``, ``fts_symbols`` and
+``bm25_*`` with a growing number of FTS5 segments, and query latency drifts
+up with them.  ``IndexMaintenanceScheduler`` keeps watched indexes compact
+without downtime:
+
+- per FTS5 table it reads the structure record (segments per level and the
+  write counter FTS5 bumps on every flush), so write counts are tracked
+  without instrumenting the write paths;
+- while the server is idle it runs incremental ``'merge'`` steps until a
+  per-tick wall-clock budget is spent, and a full ``'optimize'`` once a table
+  crosses a segment threshold;
+- after enough writes it runs ``PRAGMA optimize`` with an analysis limit, and
+  it truncates the WAL and (on ``auto_vacuum=INCREMENTAL`` databases) returns
+  free pages once those cross their thresholds.
+
+Ticks are skipped while a search is in flight or has just finished (see
+:meth:`IndexMaintenanceScheduler.searching`), and a merge loop stops early
+when a search starts.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from mcp_server.config.env_vars import (
+    get_index_maintenance_budget_ms,
+    get_index_maintenance_idle_seconds,
+    get_index_maintenance_interval_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+#: ``<table>_data`` rowid holding the FTS5 structure record.
+FTS5_STRUCTURE_ROWID = 10
+_FTS5_STRUCTURE_V2 = b"\xff\x00\x00\x01"
+
+#: Leaf pages written by one ``'merge'`` step.
+MERGE_PAGES = 256
+#: Segments on one level before incremental merging starts (FTS5's usermerge default).
+MERGE_MIN_SEGMENTS = 4
+#: Total segments after which a table is fully optimized.
+OPTIMIZE_SEGMENTS = 64
+#: FTS5 writes (summed over tables) between ``PRAGMA optimize`` runs.
+ANALYZE_WRITES = 10_000
+ANALYSIS_LIMIT = 400
+CHECKPOINT_WAL_BYTES = 64 * 1024 * 1024
+VACUUM_FREE_PAGES = 1024
+VACUUM_PAGES_PER_TICK = 512
+
+
+@dataclass(frozen=True)
+class Fts5Structure:
+    """Decoded FTS5 structure record: segments per level and the write counter."""
+
+    write_counter: int
+    level_segments: Tuple[int, ...]
+
+    @property
+    def segments(self) -> int:
+        return sum(self.level_segments)
+
+    @property
+    def needs_merge(self) -> bool:
+        return any(count >= MERGE_MIN_SEGMENTS for count in self.level_segments)
+
+
+def _read_varint(buf: bytes, pos: int) -> Tuple[int, int]:
+    """Decode an SQLite varint at ``pos``; returns ``(value, next_pos)``."""
+    value = 0
+    for i in range(8):
+        byte = buf[pos + i]
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, pos + i + 1
+    return (value << 8) | buf[pos + 8], pos + 9
+
+
+def decode_fts5_structure(record: bytes) -> Fts5Structure:
+    """Decode an FTS5 structure record (both the original and the v2 layout)."""
+    pos = 4  # cookie
+    per_segment = 3
+    if record[4:8] == _FTS5_STRUCTURE_V2:
+        pos = 8
+        per_segment = 8  # adds origin1, origin2 and the tombstone/entry counts
+    n_level, pos = _read_varint(record, pos)
+    _n_segment, pos = _read_varint(record, pos)
+    write_counter, pos = _read_varint(record, pos)
+    if per_segment == 8:
+        _origin_counter, pos = _read_varint(record, pos)
+    levels: List[int] = []
+    for _ in range(n_level):
+        _n_merge, pos = _read_varint(record, pos)
+        n_seg, pos = _read_varint(record, pos)
+        for _ in range(n_seg * per_segment):
+            _value, pos = _read_varint(record, pos)
+        levels.append(n_seg)
+    return Fts5Structure(write_counter=write_counter, level_segments=tuple(levels))
+
+
+def read_fts5_structure(conn: sqlite3.Connection, table: str) -> Optional[Fts5Structure]:
+    try:
+        row = conn.execute(
+            f'SELECT block FROM "{table.replace(chr(34), chr(34) * 2)}_data" WHERE id = ?',
+            (FTS5_STRUCTURE_ROWID,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    try:
+        return decode_fts5_structure(bytes(row[0]))
+    except IndexError:
+        logger.debug("Unrecognized FTS5 structure record for %s", table)
+        return None
+
+
+def _fts5_command_sql(table: str, values: str) -> str:
+    quoted = '"' + table.replace('"', '""') + '"'
+    rank = ", rank" if "," in values else ""
+    return f"INSERT INTO {quoted}({quoted}{rank}) VALUES({values})"
+
+
+def fts5_tables(conn: sqlite3.Connection) -> List[str]:
+    return [
+        str(row[0])
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            "AND sql LIKE '%USING fts5%' ORDER BY name"
+        )
+    ]
+
+
+@dataclass
+class FtsTableState:
+    name: str
+    segments: int = 0
+    level_segments: Tuple[int, ...] = ()
+    write_counter: Optional[int] = None
+    writes: int = 0
+    merge_steps: int = 0
+    optimizes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "segments": self.segments,
+            "level_segments": list(self.level_segments),
+            "writes": self.writes,
+            "merge_steps": self.merge_steps,
+            "optimizes": self.optimizes,
+        }
+
+
+@dataclass
+class MaintenanceProgress:
+    """Per-index maintenance state and counters."""
+
+    index_path: str
+    tables: Dict[str, FtsTableState] = field(default_factory=dict)
+    writes_since_analyze: int = 0
+    analyzes: int = 0
+    checkpoints: int = 0
+    vacuumed_pages: int = 0
+    ticks: int = 0
+    paused_ticks: int = 0
+    busy_ticks: int = 0
+    busy_ms: float = 0.0
+    last_tick_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index_path": self.index_path,
+            "tables": {name: state.to_dict() for name, state in self.tables.items()},
+            "writes_since_analyze": self.writes_since_analyze,
+            "analyzes": self.analyzes,
+            "checkpoints": self.checkpoints,
+            "vacuumed_pages": self.vacuumed_pages,
+            "ticks": self.ticks,
+            "paused_ticks": self.paused_ticks,
+            "busy_ticks": self.busy_ticks,
+            "busy_ms": round(self.busy_ms, 3),
+            "last_error": self.last_error,
+        }
+
+
+def _record_metric(operation: str, seconds: float, count: int = 1) -> None:
+    try:
+        from mcp_server.metrics.prometheus_exporter import (
+            mcp_index_maintenance_operations_total,
+            mcp_index_maintenance_seconds_total,
+        )
+
+        mcp_index_maintenance_operations_total.labels(operation=operation).inc(count)
+        mcp_index_maintenance_seconds_total.labels(operation=operation).inc(seconds)
+    except Exception:  # pragma: no cover - metrics must never break maintenance
+        pass
+
+
+class IndexMaintenanceScheduler:
+    """Idle-time, budgeted FTS5 merging and SQLite upkeep for watched indexes."""
+
+    def __init__(
+        self,
+        interval_seconds: Optional[float] = None,
+        budget_ms: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        merge_pages: int = MERGE_PAGES,
+        optimize_segments: int = OPTIMIZE_SEGMENTS,
+        analyze_writes: int = ANALYZE_WRITES,
+        checkpoint_wal_bytes: int = CHECKPOINT_WAL_BYTES,
+        vacuum_free_pages: int = VACUUM_FREE_PAGES,
+    ):
+        self.interval_seconds = (
+            get_index_maintenance_interval_seconds()
+            if interval_seconds is None
+            else interval_seconds
+        )
+        self.budget_ms = get_index_maintenance_budget_ms() if budget_ms is None else budget_ms
+        self.idle_seconds = (
+            get_index_maintenance_idle_seconds() if idle_seconds is None else idle_seconds
+        )
+        self.merge_pages = merge_pages
+        self.optimize_segments = optimize_segments
+        self.analyze_writes = analyze_writes
+        self.checkpoint_wal_bytes = checkpoint_wal_bytes
+        self.vacuum_free_pages = vacuum_free_pages
+        self._progress: Dict[str, MaintenanceProgress] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._searches_in_flight = 0
+        self._last_search_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0 and self.budget_ms > 0
+
+    # -- search activity --------------------------------------------------------
+
+    @contextmanager
+    def searching(self) -> Iterator[None]:
+        """Mark a search as in flight; maintenance pauses until it is idle again."""
+        with self._lock:
+            self._searches_in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._searches_in_flight -= 1
+                self._last_search_at = time.monotonic()
+
+    def paused(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._searches_in_flight:
+                return True
+            return self._last_search_at > 0 and now - self._last_search_at < self.idle_seconds
+
+    # -- lifecycle --------------------------------------------------------------
+
+    def watch(self, index_path: str) -> None:
+        """Add ``index_path`` to background maintenance and start the thread."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if index_path not in self._progress:
+                self._progress[index_path] = MaintenanceProgress(index_path)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="index-maintenance", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+
+    def progress(self, index_path: str) -> Optional[MaintenanceProgress]:
+        with self._lock:
+            return self._progress.get(index_path)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {path: progress.to_dict() for path, progress in self._progress.items()}
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            with self._lock:
+                paths = list(self._progress)
+            for index_path in paths:
+                if self._stop.is_set():
+                    return
+                try:
+                    self.tick(index_path)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.debug("Maintenance tick failed for %s: %s", index_path, exc)
+
+    # -- one tick ---------------------------------------------------------------
+
+    def tick(self, index_path: str, now: Optional[float] = None) -> Dict[str, int]:
+        """Run one budgeted maintenance pass over ``index_path``.
+
+        Returns the operations performed, e.g. ``{"merge": 3, "checkpoint": 1}``.
+        Does nothing when called again within ``interval_seconds``, while
+        searches are in flight or recent, or when the database is locked.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            progress = self._progress.setdefault(index_path, MaintenanceProgress(index_path))
+            if (
+                progress.last_tick_at is not None
+                and now - progress.last_tick_at < self.interval_seconds
+            ):
+                return {}
+        if self.paused(now):
+            with self._lock:
+                progress.paused_ticks += 1
+            _record_metric("paused", 0.0)
+            return {}
+        with self._lock:
+            progress.last_tick_at = now
+            progress.ticks += 1
+
+        path = Path(index_path)
+        if not path.exists():
+            return {}
+        started = time.perf_counter()
+        done: Dict[str, int] = {}
+        try:
+            conn = sqlite3.connect(str(path), timeout=0, isolation_level=None)
+        except sqlite3.Error:
+            return {}
+        try:
+            self._maintain(conn, path, progress, started, done)
+        except sqlite3.OperationalError as exc:
+            message = str(exc).lower()
+            if "locked" in message or "busy" in message:
+                with self._lock:
+                    progress.busy_ticks += 1
+            else:
+                progress.last_error = str(exc)
+                logger.warning("Index maintenance failed for %s: %s", index_path, exc)
+        finally:
+            conn.close()
+            with self._lock:
+                progress.busy_ms += (time.perf_counter() - started) * 1000
+        return done
+
+    def _maintain(
+        self,
+        conn: sqlite3.Connection,
+        path: Path,
+        progress: MaintenanceProgress,
+        started: float,
+        done: Dict[str, int],
+    ) -> None:
+        deadline = started + self.budget_ms / 1000.0
+        structures = self._observe_tables(conn, progress)
+
+        for table, structure in structures.items():
+            state = progress.tables[table]
+            if structure.segments >= self.optimize_segments:
+                # 'optimize' is not interruptible; it only runs on an idle start.
+                self._timed(done, "optimize", conn.execute, _fts5_command_sql(table, "'optimize'"))
+                state.optimizes += 1
+            elif structure.needs_merge:
+                steps = self._merge(conn, table, deadline)
+                state.merge_steps += steps
+                if steps:
+                    done["merge"] = done.get("merge", 0) + steps
+            if time.perf_counter() >= deadline or self.paused():
+                break
+        if done:
+            self._observe_tables(conn, progress)
+
+        if progress.writes_since_analyze >= self.analyze_writes:
+            conn.execute(f"PRAGMA analysis_limit = {int(ANALYSIS_LIMIT)}")
+            self._timed(done, "analyze", conn.execute, "PRAGMA optimize")
+            progress.writes_since_analyze = 0
+            progress.analyzes += 1
+
+        if self._wal_bytes(path) >= self.checkpoint_wal_bytes:
+            cursor = self._timed(
+                done, "checkpoint", conn.execute, "PRAGMA wal_checkpoint(TRUNCATE)"
+            )
+            row = cursor.fetchone()
+            if row and row[0] == 0:
+                progress.checkpoints += 1
+
+        if int(conn.execute("PRAGMA auto_vacuum").fetchone()[0]) == 2:
+            free = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+            if free >= self.vacuum_free_pages:
+                pages = min(free, VACUUM_PAGES_PER_TICK)
+                self._timed(done, "vacuum", conn.execute, f"PRAGMA incremental_vacuum({pages})")
+                progress.vacuumed_pages += pages
+
+    def _observe_tables(
+        self, conn: sqlite3.Connection, progress: MaintenanceProgress
+    ) -> Dict[str, Fts5Structure]:
+        structures: Dict[str, Fts5Structure] = {}
+        for table in fts5_tables(conn):
+            structure = read_fts5_structure(conn, table)
+            if structure is None:
+                continue
+            structures[table] = structure
+            state = progress.tables.setdefault(table, FtsTableState(table))
+            if state.write_counter is not None and structure.write_counter > state.write_counter:
+                delta = structure.write_counter - state.write_counter
+                state.writes += delta
+                progress.writes_since_analyze += delta
+            state.write_counter = structure.write_counter
+            state.segments = structure.segments
+            state.level_segments = structure.level_segments
+        return structures
+
+    def _merge(self, conn: sqlite3.Connection, table: str, deadline: float) -> int:
+        """Run ``'merge'`` steps until nothing is left, the budget is spent or a search starts."""
+        steps = 0
+        started = time.perf_counter()
+        while time.perf_counter() < deadline and not self.paused():
+            before = conn.total_changes
+            conn.execute(_fts5_command_sql(table, "'merge', ?"), (self.merge_pages,))
+            # FTS5 reports fewer than two changes when there was nothing to merge.
+            if conn.total_changes - before < 2:
+                break
+            steps += 1
+        if steps:
+            _record_metric("merge", time.perf_counter() - started, steps)
+        return steps
+
+    @staticmethod
+    def _timed(done: Dict[str, int], operation: str, fn: Any, *args: Any) -> Any:
+        started = time.perf_counter()
+        result = fn(*args)
+        _record_metric(operation, time.perf_counter() - started)
+        done[operation] = done.get(operation, 0) + 1
+        return result
+
+    @staticmethod
+    def _wal_bytes(path: Path) -> int:
+        try:
+            return os.stat(f"{path}-wal").st_size
+        except OSError:
+            return 0
+
+
+_scheduler: Optional[IndexMaintenanceScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_index_maintenance_scheduler() -> IndexMaintenanceScheduler:
+    """Return the process-wide maintenance scheduler (created on first use)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = IndexMaintenanceScheduler()
+        return _scheduler
+
+
+def _reset_index_maintenance_scheduler() -> None:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.stop()
+        _scheduler = None
+
+
+__all__ = [
+    "Fts5Structure",
+    "FtsTableState",
+    "IndexMaintenanceScheduler",
+    "MaintenanceProgress",
+    "decode_fts5_structure",
+    "fts5_tables",
+    "get_index_maintenance_scheduler",
+    "read_fts5_structure",
+]
@@ -0,0 +1,9 @@
+-- Migration 007: Track git blob OIDs per file for git-native change detection
+
+ALTER TABLE files ADD COLUMN git_blob_oid TEXT;
+
+INSERT OR REPLACE INTO schema_version (version, description)
+VALUES (7, 'Git blob OID per file for incremental change detection');
+
+INSERT INTO migrations (version_from, version_to, status)
+VALUES (6, 7, 'completed');
@@ -0,0 +1,46 @@
+-- Migration 008: Content-addressed, reference-counted chunk bodies
+
+ALTER TABLE code_chunks ADD COLUMN body_hash TEXT;
+
+CREATE TABLE IF NOT EXISTS chunk_bodies (
+    hash TEXT PRIMARY KEY,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    raw_size INTEGER NOT NULL,
+    codec TEXT NOT NULL,
+    dict_id INTEGER,
+    body BLOB NOT NULL
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_chunk_bodies_unreferenced
+    ON chunk_bodies(refcount) WHERE refcount <= 0;
+
+CREATE TABLE IF NOT EXISTS chunk_body_dicts (
+    id INTEGER PRIMARY KEY,
+    dict BLOB NOT NULL,
+    sample_count INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Reference counts follow every chunk row write, including ON CONFLICT
+-- updates and ON DELETE CASCADE from files.
+CREATE TRIGGER IF NOT EXISTS code_chunks_body_ai AFTER INSERT ON code_chunks
+WHEN new.body_hash IS NOT NULL BEGIN
+    UPDATE chunk_bodies SET refcount = refcount + 1 WHERE hash = new.body_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS code_chunks_body_ad AFTER DELETE ON code_chunks
+WHEN old.body_hash IS NOT NULL BEGIN
+    UPDATE chunk_bodies SET refcount = refcount - 1 WHERE hash = old.body_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS code_chunks_body_au AFTER UPDATE OF body_hash ON code_chunks
+WHEN old.body_hash IS NOT new.body_hash BEGIN
+    UPDATE chunk_bodies SET refcount = refcount + 1 WHERE hash = new.body_hash;
+    UPDATE chunk_bodies SET refcount = refcount - 1 WHERE hash = old.body_hash;
+END;
+
+INSERT OR REPLACE INTO schema_version (version, description)
+VALUES (8, 'Content-addressed chunk bodies with reference counts');
+
+INSERT INTO migrations (version_from, version_to, status)
+VALUES (7, 8, 'completed');
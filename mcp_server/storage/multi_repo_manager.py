@@ -5,6 +5,7 @@ This module manages multiple repository indexes and enables efficient
 cross-repository code search operations.
 """
 
+import fnmatch
 import hashlib
 import logging
 import os
@@ -15,6 +16,12 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from mcp_server.config.env_vars import get_federated_search_enabled
+from mcp_server.storage.federated_search import (
+    FederatedRepository,
+    FederatedSearchEngine,
+    normalize_bm25_scores,
+)
 from mcp_server.storage.repo_identity import compute_repo_id
 from mcp_server.storage.repository_registry import RepositoryRegistry
 from mcp_server.storage.sqlite_store import SQLiteStore
@@ -125,6 +132,9 @@ class MultiRepositoryManager:
         # Cached repository connections (delegated to StoreRegistry)
         self._store_registry = StoreRegistry.for_registry(self.registry)
 
+        # Attach groups for single-statement code search across repositories
+        self._federated = FederatedSearchEngine()
+
         # Search statistics
         self._search_stats = {
             "total_searches": 0,
@@ -590,8 +600,12 @@ class MultiRepositoryManager:
         self._search_stats["total_searches"] += 1
         self._search_stats["total_repositories_searched"] += len(repos)
 
-        # Search in parallel using thread pool
         results = []
+        pending = repos
+        if get_federated_search_enabled():
+            results, pending = self._search_code_federated(repos, query, file_pattern, limit)
+
+        # Repositories the federated query could not serve are searched one by one
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_repo = {
                 executor.submit(
@@ -601,7 +615,7 @@ class MultiRepositoryManager:
                     file_pattern,
                     limit,
                 ): repo
-                for repo in repos
+                for repo in pending
             }
 
             # Collect results
@@ -609,7 +623,7 @@ class MultiRepositoryManager:
                 repo = future_to_repo[future]
                 try:
                     result = future.result()
-                    if result:
+                    if result and (result.results or result.error):
                         results.append(result)
                 except Exception as e:
                     logger.error(f"Search failed in {repo.name}: {e}")
@@ -637,6 +651,63 @@ class MultiRepositoryManager:
 
         return results
 
+    def _search_code_federated(
+        self,
+        repos: List[RepositoryInfo],
+        query: str,
+        file_pattern: Optional[str],
+        limit: int,
+    ) -> tuple[List[CrossRepoSearchResult], List[RepositoryInfo]]:
+        """Search ``repos`` through attach groups, one SQL statement per group.
+
+        Returns per-repository results (each repository's top ``limit`` hits,
+        scores normalized per repository; repositories without hits are left
+        out) and the repositories that still need the per-repository path.
+        """
+        by_id = {repo.repository_id: repo for repo in repos}
+        federated = self._federated.search(
+            query,
+            [
+                FederatedRepository(repo.repository_id, repo.name, Path(repo.index_path))
+                for repo in repos
+            ],
+            limit=None,
+            per_repo_limit=limit,
+            file_pattern=file_pattern,
+        )
+        hits: Dict[str, List[Dict[str, Any]]] = {
+            repository_id: [] for repository_id in by_id if repository_id not in federated.errors
+        }
+        for row in federated.results:
+            repo_info = by_id[row["repository_id"]]
+            hits[row["repository_id"]].append(
+                {
+                    "file": row["file"] or "",
+                    "line": 0,
+                    "snippet": row["snippet"] or "",
+                    "score": row["score"],
+                    "repository": repo_info.name,
+                    "repository_id": repo_info.repository_id,
+                }
+            )
+        results = [
+            CrossRepoSearchResult(
+                repository_id=repository_id,
+                repository_name=by_id[repository_id].name,
+                results=repo_hits,
+                search_time=federated.search_time,
+            )
+            for repository_id, repo_hits in hits.items()
+            if repo_hits
+        ]
+        logger.debug(
+            "Federated code search: %d repositories, %d statements, %d fallbacks",
+            len(repos),
+            federated.statements,
+            len(federated.errors),
+        )
+        return results, [by_id[repository_id] for repository_id in federated.errors]
+
     def _search_code_in_repository(
         self, repository_id: str, query: str, file_pattern: Optional[str], limit: int
     ) -> Optional[CrossRepoSearchResult]:
@@ -652,27 +723,28 @@ class MultiRepositoryManager:
             return None
 
         try:
-            # Use BM25 search on the appropriate table
-            # Try both bm25_content and fts_code tables
+            # Use BM25 search on the appropriate table: bm25_content, or
+            # fts_code when there is none (the federated path's choice)
             bm25_results = []
-
-            # First try bm25_content table
+            table = (
+                "bm25_content"
+                if store.schema_capabilities.has_table("bm25_content")
+                else "fts_code"
+            )
             try:
-                bm25_results = store.search_bm25(query, table="bm25_content", limit=limit)
+                bm25_results = store.search_bm25(query, table=table, limit=limit)
             except Exception as e:
-                logger.debug(f"bm25_content search failed, trying fts_code: {e}")
-                # Fall back to fts_code table
-                try:
-                    bm25_results = store.search_bm25(query, table="fts_code", limit=limit)
-                except Exception as e2:
-                    logger.warning(f"Both BM25 tables failed for {repository_id}: {e2}")
+                logger.warning(f"BM25 search on {table} failed for {repository_id}: {e}")
 
             # Format results
             formatted_results = []
             for result in bm25_results:
+                file_path = result.get("filepath", result.get("file_path", ""))
+                if file_pattern and not fnmatch.fnmatchcase(str(file_path), file_pattern):
+                    continue
                 formatted_results.append(
                     {
-                        "file": result.get("filepath", result.get("file_path", "")),
+                        "file": file_path,
                         "line": result.get("line", 0),
                         "snippet": result.get("snippet", ""),
                         "score": result.get("score", 0.0),
@@ -680,6 +752,10 @@ class MultiRepositoryManager:
                         "repository_id": repository_id,
                     }
                 )
+            # Same per-repository scale as the federated path.
+            normalized = normalize_bm25_scores([hit["score"] for hit in formatted_results])
+            for hit, score in zip(formatted_results, normalized):
+                hit["score"] = score
 
             search_time = (datetime.now() - start_time).total_seconds()
 
@@ -808,6 +884,7 @@ class MultiRepositoryManager:
     def close(self):
         """Close all connections and save registry."""
         self._store_registry.shutdown()
+        self._federated.close()
 
         # Save registry
         self.registry.save()
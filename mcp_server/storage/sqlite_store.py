@@ -10,13 +10,16 @@ import json
 import logging
 import re
 import sqlite3
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
 
 from ..core.errors import TransientArtifactError
 from ..core.path_resolver import PathResolver
+from ..core.tracing import traced
 from ..indexing.friction import extract_friction_markers
 from ..indexing.github_issues import issue_history_dedupe_key
 from ..indexing.source_metadata import (
@@ -25,7 +28,8 @@ from ..indexing.source_metadata import (
     extract_matching_source_metadata,
     merge_source_metadata,
 )
-from .connection_pool import ConnectionPool
+from .chunk_bodies import ChunkBodyStore, register_chunk_body_functions
+from .connection_pool import ConnectionPool, ReadWriteConnections
 
 logger = logging.getLogger(__name__)
 
@@ -164,9 +168,57 @@ CHUNK_SCHEME_REBUILD_KEY = "chunk_scheme_rebuild_target"
 #: are NOT produced by the tree-sitter chunker and must survive a rebuild.
 PRESERVED_CHUNK_TYPE = "document"
 
+#: ``index_config`` key stamping the ``index_counters`` rows with the counting
+#: scheme they were seeded under.  Bump ``INDEX_COUNTERS_STAMP`` whenever what a
+#: counter counts changes; stores carrying another stamp are re-seeded on open.
+INDEX_COUNTERS_STAMP_KEY = "index_counters_stamp"
+INDEX_COUNTERS_STAMP = "files_rows_v1"
+_FILE_COUNTER_TRIGGERS = ("files_count_ai", "files_count_ad")
+
 _SCHEME_READ_BLOCKING = frozenset({"mismatch", "missing_marker", "rebuilding"})
 _SCHEME_WRITE_BLOCKING = frozenset({"mismatch", "missing_marker"})
 
+#: ``code_chunks`` columns written by every chunk upsert, in parameter order.
+_CHUNK_UPSERT_COLUMNS = (
+    "file_id",
+    "symbol_id",
+    "content",
+    "content_start",
+    "content_end",
+    "line_start",
+    "line_end",
+    "chunk_id",
+    "node_id",
+    "treesitter_file_id",
+    "symbol_hash",
+    "definition_id",
+    "token_count",
+    "token_model",
+    "chunk_type",
+    "language",
+    "node_type",
+    "parent_chunk_id",
+    "depth",
+    "chunk_index",
+    "metadata",
+)
+
+
+def _chunk_upsert_sql(columns: Tuple[str, ...]) -> str:
+    updates = ",\n".join(
+        f"{col}=excluded.{col}" for col in columns if col not in ("file_id", "chunk_id")
+    )
+    return (
+        f"INSERT INTO code_chunks ({', '.join(columns)})\n"
+        f"VALUES ({', '.join('?' for _ in columns)})\n"
+        "ON CONFLICT(file_id, chunk_id) DO UPDATE SET\n"
+        f"{updates},\nupdated_at=CURRENT_TIMESTAMP"
+    )
+
+
+_CHUNK_UPSERT_SQL = _chunk_upsert_sql(_CHUNK_UPSERT_COLUMNS)
+_CHUNK_UPSERT_BODY_SQL = _chunk_upsert_sql(_CHUNK_UPSERT_COLUMNS + ("body_hash",))
+
 
 def _escape_like(text: str) -> str:
     """Escape SQL LIKE metacharacters so a literal id matches only itself.
@@ -264,6 +316,37 @@ def _is_missing_schema_error(error: sqlite3.OperationalError) -> bool:
     return "no such table" in message or "no such column" in message
 
 
+def _read_record_varint(data: bytes) -> int:
+    """Decode the SQLite record varint at the start of ``data`` (0 when empty)."""
+    value = 0
+    for i, byte in enumerate(data[:9]):
+        if i == 8:
+            return (value << 8) | byte
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value
+    return value
+
+
+def fts5_row_count(conn: sqlite3.Connection, table: str) -> Optional[int]:
+    """Return the row count of FTS5 ``table`` without scanning it.
+
+    FTS5 keeps the total row count as the leading varint of its "averages"
+    record (``id = 1`` in the ``<table>_data`` shadow table) to compute bm25
+    length normalisation, so this is a single primary-key lookup.  Returns
+    None when ``table`` is not an FTS5 table.
+    """
+    try:
+        row = conn.execute(f'SELECT block FROM "{table}_data" WHERE id = 1').fetchone()
+    except sqlite3.OperationalError as error:
+        if _is_missing_schema_error(error):
+            return None
+        raise
+    if row is None or row[0] is None:
+        return 0
+    return _read_record_varint(bytes(row[0]))
+
+
 def _scheme_read_config_value(conn: sqlite3.Connection, key: str) -> Optional[str]:
     try:
         row = conn.execute(
@@ -341,6 +424,42 @@ def assert_chunk_scheme_readable(
         )
 
 
+@dataclass(frozen=True)
+class SchemaCapabilities:
+    """Snapshot of the tables and columns present in a store's database.
+
+    Computed once per store (and refreshed after migrations) so hot read
+    paths such as ``search_bm25`` can branch on schema shape without
+    querying ``sqlite_master`` / ``PRAGMA table_info`` per call.
+    """
+
+    tables: FrozenSet[str] = frozenset()
+    columns: Mapping[str, FrozenSet[str]] = field(default_factory=dict)
+    schema_cookie: int = -1
+
+    def has_table(self, table: str) -> bool:
+        return table in self.tables
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.columns.get(table, frozenset())
+
+    @classmethod
+    def probe(cls, conn: sqlite3.Connection) -> "SchemaCapabilities":
+        cookie = conn.execute("PRAGMA schema_version").fetchone()[0]
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+        ).fetchall()
+        tables = frozenset(row[0] for row in rows)
+        columns: Dict[str, FrozenSet[str]] = {}
+        for table in tables:
+            try:
+                info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            except sqlite3.Error:
+                continue
+            columns[table] = frozenset(row[1] for row in info)
+        return cls(tables=tables, columns=columns, schema_cookie=cookie)
+
+
 class SQLiteStore:
     """SQLite-based storage implementation with FTS5 support."""
 
@@ -349,6 +468,7 @@ class SQLiteStore:
         db_path: str = "code_index.db",
         path_resolver: Optional[PathResolver] = None,
         pool: Optional[ConnectionPool] = None,
+        connections: Optional[ReadWriteConnections] = None,
     ):
         """
         Initialize the SQLite store.
@@ -358,18 +478,29 @@ class SQLiteStore:
             path_resolver: PathResolver instance for path management
             pool: Optional ConnectionPool for read operations; factory must use
                   check_same_thread=False.
+            connections: Optional ReadWriteConnections providing a dedicated
+                  writer and a read-only reader pool.  Takes precedence over
+                  ``pool``.
         """
         self.db_path = db_path
         self.path_resolver = path_resolver or PathResolver()
         self._pool = pool
+        self._connections = connections
+        # Connection held by the current thread's ``write_batch`` scope when no
+        # ReadWriteConnections writer is attached.
+        self._batch = threading.local()
         self._readonly = False
         self._readonly_diagnostics: Optional[Dict[str, Any]] = None
+        self._schema_capabilities: Optional[SchemaCapabilities] = None
+        self.chunk_bodies = ChunkBodyStore()
 
         self._init_database()
         self._run_migrations()
         self._ensure_semantic_points_table()
         self._ensure_pending_vector_deletions_table()
         self._ensure_chunk_summary_audit_columns()
+        self._ensure_index_counters()
+        self.refresh_schema_capabilities()
 
     def _require_writable(self) -> None:
         if self._readonly:
@@ -377,9 +508,41 @@ class SQLiteStore:
 
     def close(self) -> None:
         """Close the store.  If a connection pool is attached, drain it."""
+        if self._connections is not None:
+            self._connections.close_all()
         if self._pool is not None:
             self._pool.close_all()
 
+    @property
+    def schema_capabilities(self) -> SchemaCapabilities:
+        """Return the cached schema snapshot, probing it on first use."""
+        if self._schema_capabilities is None:
+            return self.refresh_schema_capabilities()
+        return self._schema_capabilities
+
+    def refresh_schema_capabilities(self) -> SchemaCapabilities:
+        """Re-probe tables/columns; call after any DDL outside the migration path."""
+        with self._get_read_connection() as conn:
+            capabilities = SchemaCapabilities.probe(conn)
+        self._schema_capabilities = capabilities
+        return capabilities
+
+    def _has_table(self, table: str) -> bool:
+        """Check the schema snapshot, re-probing only if the schema changed.
+
+        Tables can be created after the snapshot (e.g. by the BM25 indexer),
+        so a miss is confirmed against SQLite's schema cookie, a single header
+        read, before being trusted.
+        """
+        capabilities = self.schema_capabilities
+        if capabilities.has_table(table):
+            return True
+        with self._get_read_connection() as conn:
+            cookie = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if cookie == capabilities.schema_cookie:
+            return False
+        return self.refresh_schema_capabilities().has_table(table)
+
     def get_readonly_diagnostics(self) -> Optional[Dict[str, Any]]:
         """Return the most recent storage-failure provenance that forced read-only mode."""
         if self._readonly_diagnostics is None:
@@ -446,6 +609,87 @@ class SQLiteStore:
                     ON pending_vector_deletions(profile_id);
                 """)
 
+    def _ensure_index_counters(self) -> None:
+        """Maintain an O(1) ``files`` row counter for startup validation.
+
+        Triggers on ``files`` keep ``index_counters`` in step with every insert
+        and delete.  The counter is re-seeded from ``COUNT(*)`` - once - when it
+        is missing, when either trigger had to be (re)created (a rebuilt
+        ``files`` table drops its triggers), or when the stamp in
+        ``index_config`` is not ``INDEX_COUNTERS_STAMP``.
+        """
+        with self._get_connection() as conn:
+            if not conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='files'"
+            ).fetchone():
+                return
+            existing = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (?, ?)",
+                    _FILE_COUNTER_TRIGGERS,
+                )
+            }
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS index_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+
+                CREATE TRIGGER IF NOT EXISTS files_count_ai AFTER INSERT ON files BEGIN
+                    UPDATE index_counters SET value = value + 1 WHERE name = 'files';
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS files_count_ad AFTER DELETE ON files BEGIN
+                    UPDATE index_counters SET value = value - 1 WHERE name = 'files';
+                END;
+                """)
+            seeded = conn.execute("SELECT 1 FROM index_counters WHERE name = 'files'").fetchone()
+            if (
+                seeded is not None
+                and existing == set(_FILE_COUNTER_TRIGGERS)
+                and _scheme_read_config_value(conn, INDEX_COUNTERS_STAMP_KEY)
+                == INDEX_COUNTERS_STAMP
+            ):
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO index_counters (name, value) "
+                "SELECT 'files', COUNT(*) FROM files"
+            )
+            self._set_config(
+                conn,
+                INDEX_COUNTERS_STAMP_KEY,
+                INDEX_COUNTERS_STAMP,
+                "Counting scheme of the index_counters rows",
+            )
+
+    def get_index_counts(self) -> Dict[str, Optional[int]]:
+        """Return ``files`` and ``bm25_content`` row counts without scanning either.
+
+        ``files`` comes from the trigger-maintained ``index_counters`` row and
+        ``bm25_documents`` from the FTS5 averages record.  A value is None when
+        its source is unavailable (no such table, or an unstamped counter), in
+        which case callers needing an exact figure must count themselves.
+        """
+        with self._get_read_connection() as conn:
+            total_files: Optional[int] = None
+            try:
+                if (
+                    _scheme_read_config_value(conn, INDEX_COUNTERS_STAMP_KEY)
+                    == INDEX_COUNTERS_STAMP
+                ):
+                    row = conn.execute(
+                        "SELECT value FROM index_counters WHERE name = 'files'"
+                    ).fetchone()
+                    total_files = row[0] if row is not None else None
+            except sqlite3.OperationalError as error:
+                if not _is_missing_schema_error(error):
+                    raise
+            return {
+                "total_files": total_files,
+                "bm25_documents": fts5_row_count(conn, "bm25_content"),
+            }
+
     def _record_pending_vector_deletions(
         self, conn: sqlite3.Connection, points: List[Dict[str, Any]]
     ) -> None:
@@ -778,42 +1022,128 @@ class SQLiteStore:
     def _get_connection(self):
         """Get a database connection with proper error handling.
 
-        When a ConnectionPool is attached, borrows a connection from it
-        (skipping open/close) and applies row_factory + foreign_keys each
-        time.  Commit/rollback semantics are identical to the non-pool path.
+        With ReadWriteConnections attached, this is the writer path: the
+        dedicated writer connection is held for the scope and only the
+        outermost scope commits.  When a ConnectionPool is attached, borrows
+        a connection from it (skipping open/close); foreign_keys is enabled
+        once per pooled connection rather than on every borrow.
+        Commit/rollback semantics are identical across all paths.  Inside a
+        ``write_batch`` scope on this thread, the batch connection is reused
+        and the batch commits.
         """
-        if self._pool is not None:
+        held = getattr(self._batch, "conn", None)
+        if held is not None:
+            yield held
+        elif self._connections is not None:
+            with self._connections.writer() as (conn, outermost):
+                if not outermost:
+                    yield conn
+                    return
+                with self._transaction_scope(conn):
+                    yield conn
+        elif self._pool is not None:
             with self._pool.acquire() as conn:
-                conn.row_factory = sqlite3.Row
-                conn.execute("PRAGMA foreign_keys = ON")
-                try:
+                if conn.row_factory is not sqlite3.Row:
+                    # First borrow of this pooled connection: configure it once.
+                    conn.row_factory = sqlite3.Row
+                    conn.execute("PRAGMA foreign_keys = ON")
+                    register_chunk_body_functions(conn)
+                with self._transaction_scope(conn):
                     yield conn
-                    conn.commit()
-                except sqlite3.OperationalError as e:
-                    conn.rollback()
-                    if self._mark_readonly_from_storage_failure(e) is not None:
-                        raise TransientArtifactError(str(e)) from e
-                    raise
-                except Exception:
-                    conn.rollback()
-                    raise
         else:
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = sqlite3.Row
             conn.execute("PRAGMA foreign_keys = ON")
+            register_chunk_body_functions(conn)
+            try:
+                with self._transaction_scope(conn):
+                    yield conn
+            finally:
+                conn.close()
+
+    @contextmanager
+    def _get_read_connection(self):
+        """Get a connection for read-only queries.
+
+        Uses a ``mode=ro`` reader from ReadWriteConnections when attached so
+        searches never queue behind the writer; otherwise falls back to
+        ``_get_connection``.
+        """
+        if self._connections is None:
+            with self._get_connection() as conn:
+                yield conn
+            return
+        with self._connections.reader() as conn:
             try:
                 yield conn
-                conn.commit()
             except sqlite3.OperationalError as e:
-                conn.rollback()
                 if self._mark_readonly_from_storage_failure(e) is not None:
                     raise TransientArtifactError(str(e)) from e
                 raise
-            except Exception:
-                conn.rollback()
-                raise
+
+    @contextmanager
+    def write_batch(self):
+        """Group the store writes made inside the scope into one transaction.
+
+        Every store method called on this thread inside the scope reuses one
+        connection, and the batch commits once on exit (or rolls back on
+        error).  With ReadWriteConnections attached that is the writer, so
+        other threads' writes wait for the batch; keep it bounded.
+        """
+        if getattr(self._batch, "conn", None) is not None:
+            yield self
+            return
+        with self._get_connection() as conn:
+            if self._connections is not None:
+                yield self
+                return
+            self._batch.conn = conn
+            try:
+                yield self
             finally:
-                conn.close()
+                self._batch.conn = None
+
+    @contextmanager
+    def batch_operation(self):
+        """Make the store writes inside the scope all-or-nothing within a batch.
+
+        Inside ``write_batch`` the scope runs under a savepoint: an error
+        raised out of it rolls back only this operation's writes, and the
+        batch still commits once.  Outside a batch it does nothing.
+        """
+        in_batch = getattr(self._batch, "conn", None) is not None or (
+            self._connections is not None and self._connections.holds_writer()
+        )
+        if not in_batch:
+            yield self
+            return
+        with self._get_connection() as conn:
+            if not conn.in_transaction:
+                # A savepoint opened outside a transaction would commit on release.
+                conn.execute("BEGIN")
+            conn.execute("SAVEPOINT batch_operation")
+            try:
+                yield self
+            except BaseException:
+                conn.execute("ROLLBACK TO batch_operation")
+                conn.execute("RELEASE batch_operation")
+                raise
+            conn.execute("RELEASE batch_operation")
+
+    @contextmanager
+    def _transaction_scope(self, conn: sqlite3.Connection):
+        """Commit on success, roll back on error, flag ENOSPC-style failures."""
+        try:
+            yield conn
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            if self._mark_readonly_from_storage_failure(e) is not None:
+                raise TransientArtifactError(str(e)) from e
+            raise
+        except Exception:
+            conn.rollback()
+            raise
 
     def _check_fts5_support(self, conn: sqlite3.Connection) -> bool:
         """Check if FTS5 is supported in this SQLite build."""
@@ -1175,7 +1505,7 @@ class SQLiteStore:
 
     def get_repository(self, path: str) -> Optional[Dict]:
         """Get repository by path."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute("SELECT * FROM repositories WHERE path = ?", (path,))
             row = cursor.fetchone()
             return dict(row) if row else None
@@ -1277,14 +1607,23 @@ class SQLiteStore:
                 )
                 return existing["id"]
 
+            # A recorded git blob OID only vouches for the content it was
+            # taken from; drop it whenever the row's content changes.
+            oid_reset = (
+                """git_blob_oid=CASE WHEN files.content_hash IS excluded.content_hash
+                   THEN files.git_blob_oid ELSE NULL END,
+                   """
+                if self.schema_capabilities.has_column("files", "git_blob_oid")
+                else ""
+            )
             # Store using relative path as primary identifier
             cursor = conn.execute(
-                """INSERT INTO files 
+                f"""INSERT INTO files 
                    (repository_id, path, relative_path, language, size, hash, content_hash,
                     last_modified, indexed_at, metadata, is_deleted, deleted_at)
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                    ON CONFLICT(repository_id, relative_path) DO UPDATE SET
-                   path=excluded.path,
+                   {oid_reset}path=excluded.path,
                    language=excluded.language,
                    size=excluded.size,
                    hash=excluded.hash,
@@ -1329,7 +1668,7 @@ class SQLiteStore:
             # Path might already be relative
             relative_path = str(file_path).replace("\\", "/")
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             if repository_id:
                 cursor = conn.execute(
                     "SELECT * FROM files WHERE relative_path = ? AND repository_id = ? AND is_deleted = FALSE",
@@ -1366,7 +1705,7 @@ class SQLiteStore:
         except ValueError:
             relative_path = str(file_path).replace("\\", "/")
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             query = "SELECT * FROM files WHERE relative_path = ? AND is_deleted = FALSE"
             params: Tuple[Union[str, int], ...]
 
@@ -1382,7 +1721,7 @@ class SQLiteStore:
 
     def get_all_files(self, repository_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get all non-deleted files with normalized paths and content hashes."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             query = "SELECT * FROM files WHERE is_deleted = FALSE"
             params: Tuple[Union[str, int], ...] = ()
 
@@ -1393,6 +1732,23 @@ class SQLiteStore:
             cursor = conn.execute(query, params)
             return [self._normalize_file_record(row) for row in cursor.fetchall()]
 
+    def set_file_git_blob_oids(self, repository_id: int, oids: Dict[str, Optional[str]]) -> int:
+        """Record git blob OIDs for already-stored files in one transaction.
+
+        Returns the number of file rows updated.  Paths without a files row
+        are ignored; a ``None`` OID clears the stored value.
+        """
+        if not oids or not self.schema_capabilities.has_column("files", "git_blob_oid"):
+            return 0
+        self._require_writable()
+        with self._get_connection() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE files SET git_blob_oid = ? WHERE repository_id = ? AND relative_path = ?",
+                [(oid, repository_id, path) for path, oid in oids.items()],
+            )
+            return conn.total_changes - before
+
     def _normalize_file_record(self, row: sqlite3.Row) -> Dict[str, Any]:
         """Normalize file record paths and include content hash."""
         record = dict(row)
@@ -1482,9 +1838,10 @@ class SQLiteStore:
                 (symbol_id, trigram),
             )
 
+    @traced("sqlite.get_symbol")
     def get_symbol(self, name: str, kind: Optional[str] = None) -> List[Dict]:
         """Get symbols by name and optionally kind."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             if kind:
                 cursor = conn.execute(
                     """SELECT s.*, f.path as file_path
@@ -1505,7 +1862,7 @@ class SQLiteStore:
 
     def count_symbols_for_file(self, file_id: int) -> int:
         """Return the number of symbols stored for a given file."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute("SELECT COUNT(*) FROM symbols WHERE file_id = ?", (file_id,))
             return cursor.fetchone()[0]
 
@@ -1859,10 +2216,69 @@ class SQLiteStore:
             # Repopulation runs inside the same transaction; a failure here rolls
             # the whole rebuild back to the prior coherent index.
             repopulate(conn)
+            self._collect_chunk_bodies(conn)
             self._stamp_scheme(conn, target)
             self._delete_config(conn, CHUNK_SCHEME_REBUILD_KEY)
         return {"target_scheme": target, "profile_id": profile_id, **stale}
 
+    def _upsert_chunk_row(
+        self, conn: sqlite3.Connection, values: Tuple[Any, ...]
+    ) -> sqlite3.Cursor:
+        """Insert or update one ``code_chunks`` row from ``_CHUNK_UPSERT_COLUMNS`` values.
+
+        On schemas with ``body_hash`` the body goes through the shared
+        content-addressed store and the row keeps only its hash.
+        """
+        if not self.schema_capabilities.has_column("code_chunks", "body_hash"):
+            return conn.execute(_CHUNK_UPSERT_SQL, values)
+        content, digest = self.chunk_bodies.prepare(conn, values[2])
+        return conn.execute(_CHUNK_UPSERT_BODY_SQL, (*values[:2], content, *values[3:], digest))
+
+    def _chunk_content_sql(self, alias: str = "c") -> str:
+        """SQL expression for a chunk's text, resolving shared bodies."""
+        prefix = f"{alias}." if alias else ""
+        if self.schema_capabilities.has_column("code_chunks", "body_hash"):
+            return f"chunk_content({prefix}content, {prefix}body_hash)"
+        return f"{prefix}content"
+
+    def _chunk_row_columns(self) -> str:
+        if self.schema_capabilities.has_column("code_chunks", "body_hash"):
+            return "*, chunk_content(content, body_hash) AS resolved_content"
+        return "*"
+
+    @staticmethod
+    def _chunk_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        chunk = dict(row)
+        if "resolved_content" in chunk:
+            chunk["content"] = chunk.pop("resolved_content")
+        return chunk
+
+    def _collect_chunk_bodies(self, conn: sqlite3.Connection) -> int:
+        if not self.schema_capabilities.has_table("chunk_bodies"):
+            return 0
+        return ChunkBodyStore.collect_garbage(conn)
+
+    def collect_chunk_bodies(self) -> int:
+        """Drop shared chunk bodies no chunk row references; returns the count."""
+        self._require_writable()
+        with self._get_connection() as conn:
+            return self._collect_chunk_bodies(conn)
+
+    def chunk_body_stats(self) -> Dict[str, int]:
+        """Return counts and byte totals for the shared chunk body store."""
+        if not self.schema_capabilities.has_table("chunk_bodies"):
+            return {}
+        with self._get_read_connection() as conn:
+            return ChunkBodyStore.stats(conn)
+
+    def train_chunk_body_dictionary(self) -> Optional[int]:
+        """Retrain the chunk body compression dictionary and recompress bodies."""
+        if not self.schema_capabilities.has_table("chunk_bodies"):
+            return None
+        self._require_writable()
+        with self._get_connection() as conn:
+            return self.chunk_bodies.train_dictionary(conn)
+
     def store_chunk(
         self,
         file_id: int,
@@ -1902,35 +2318,8 @@ class SQLiteStore:
             self._assert_chunk_scheme_writable(
                 conn, chunk_type=chunk_type, target=scheme_target
             )
-            cursor = conn.execute(
-                """INSERT INTO code_chunks
-                   (file_id, symbol_id, content, content_start, content_end,
-                    line_start, line_end, chunk_id, node_id, treesitter_file_id,
-                    symbol_hash, definition_id, token_count, token_model,
-                    chunk_type, language, node_type, parent_chunk_id, depth,
-                    chunk_index, metadata)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                   ON CONFLICT(file_id, chunk_id) DO UPDATE SET
-                   symbol_id=excluded.symbol_id,
-                   content=excluded.content,
-                   content_start=excluded.content_start,
-                   content_end=excluded.content_end,
-                   line_start=excluded.line_start,
-                   line_end=excluded.line_end,
-                   node_id=excluded.node_id,
-                   treesitter_file_id=excluded.treesitter_file_id,
-                   symbol_hash=excluded.symbol_hash,
-                   definition_id=excluded.definition_id,
-                   token_count=excluded.token_count,
-                   token_model=excluded.token_model,
-                   chunk_type=excluded.chunk_type,
-                   language=excluded.language,
-                   node_type=excluded.node_type,
-                   parent_chunk_id=excluded.parent_chunk_id,
-                   depth=excluded.depth,
-                   chunk_index=excluded.chunk_index,
-                   metadata=excluded.metadata,
-                   updated_at=CURRENT_TIMESTAMP""",
+            cursor = self._upsert_chunk_row(
+                conn,
                 (
                     file_id,
                     symbol_id,
@@ -1967,52 +2356,61 @@ class SQLiteStore:
 
     def get_chunk_by_chunk_id(self, chunk_id: str, file_id: Optional[int] = None) -> Optional[Dict]:
         """Get chunk by chunk_id, optionally filtered by file_id."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             if file_id is not None:
                 cursor = conn.execute(
-                    "SELECT * FROM code_chunks WHERE chunk_id = ? AND file_id = ?",
+                    f"SELECT {self._chunk_row_columns()} FROM code_chunks "
+                    "WHERE chunk_id = ? AND file_id = ?",
                     (chunk_id, file_id),
                 )
             else:
-                cursor = conn.execute("SELECT * FROM code_chunks WHERE chunk_id = ?", (chunk_id,))
+                cursor = conn.execute(
+                    f"SELECT {self._chunk_row_columns()} FROM code_chunks WHERE chunk_id = ?",
+                    (chunk_id,),
+                )
             row = cursor.fetchone()
-            return dict(row) if row else None
+            return self._chunk_dict(row) if row else None
 
     def get_chunk_by_node_id(self, node_id: str, file_id: Optional[int] = None) -> Optional[Dict]:
         """Get chunk by node_id, optionally filtered by file_id."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             if file_id is not None:
                 cursor = conn.execute(
-                    "SELECT * FROM code_chunks WHERE node_id = ? AND file_id = ?",
+                    f"SELECT {self._chunk_row_columns()} FROM code_chunks "
+                    "WHERE node_id = ? AND file_id = ?",
                     (node_id, file_id),
                 )
             else:
-                cursor = conn.execute("SELECT * FROM code_chunks WHERE node_id = ?", (node_id,))
+                cursor = conn.execute(
+                    f"SELECT {self._chunk_row_columns()} FROM code_chunks WHERE node_id = ?",
+                    (node_id,),
+                )
             row = cursor.fetchone()
-            return dict(row) if row else None
+            return self._chunk_dict(row) if row else None
 
     def get_chunk_by_definition_id(self, definition_id: str) -> List[Dict]:
         """Get chunks by definition_id (may return multiple chunks)."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                "SELECT * FROM code_chunks WHERE definition_id = ?", (definition_id,)
+                f"SELECT {self._chunk_row_columns()} FROM code_chunks WHERE definition_id = ?",
+                (definition_id,),
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return [self._chunk_dict(row) for row in cursor.fetchall()]
 
     def get_chunks_for_file(self, file_id: int) -> List[Dict]:
         """Get all chunks for a file, ordered by chunk_index."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                """SELECT * FROM code_chunks
+                f"""SELECT {self._chunk_row_columns()} FROM code_chunks
                    WHERE file_id = ?
                    ORDER BY chunk_index, line_start""",
                 (file_id,),
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return [self._chunk_dict(row) for row in cursor.fetchall()]
 
     def update_chunk_token_count(
         self,
@@ -2049,7 +2447,11 @@ class SQLiteStore:
             return cursor.rowcount > 0
 
     def delete_chunks_for_file(self, file_id: int) -> int:
-        """Delete all chunks for a file. Returns number of chunks deleted."""
+        """Delete all chunks for a file. Returns number of chunks deleted.
+
+        Shared bodies are released but kept until the next garbage collection
+        (see :meth:`collect_chunk_bodies`), so re-storing the file reuses them.
+        """
         with self._get_connection() as conn:
             self._assert_chunk_scheme_deletable(conn)
             cursor = conn.execute("DELETE FROM code_chunks WHERE file_id = ?", (file_id,))
@@ -2084,7 +2486,7 @@ class SQLiteStore:
         placeholders = ",".join(["?"] * len(chunk_ids))
         params: List[Union[str, int]] = [profile_id, *chunk_ids]
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 f"""SELECT point_id
                     FROM semantic_points
@@ -2153,35 +2555,8 @@ class SQLiteStore:
                         chunk["content"],
                         int(chunk["line_start"]),
                     )
-                    conn.execute(
-                        """INSERT INTO code_chunks
-                           (file_id, symbol_id, content, content_start, content_end,
-                            line_start, line_end, chunk_id, node_id, treesitter_file_id,
-                            symbol_hash, definition_id, token_count, token_model,
-                            chunk_type, language, node_type, parent_chunk_id, depth,
-                            chunk_index, metadata)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                           ON CONFLICT(file_id, chunk_id) DO UPDATE SET
-                           symbol_id=excluded.symbol_id,
-                           content=excluded.content,
-                           content_start=excluded.content_start,
-                           content_end=excluded.content_end,
-                           line_start=excluded.line_start,
-                           line_end=excluded.line_end,
-                           node_id=excluded.node_id,
-                           treesitter_file_id=excluded.treesitter_file_id,
-                           symbol_hash=excluded.symbol_hash,
-                           definition_id=excluded.definition_id,
-                           token_count=excluded.token_count,
-                           token_model=excluded.token_model,
-                           chunk_type=excluded.chunk_type,
-                           language=excluded.language,
-                           node_type=excluded.node_type,
-                           parent_chunk_id=excluded.parent_chunk_id,
-                           depth=excluded.depth,
-                           chunk_index=excluded.chunk_index,
-                           metadata=excluded.metadata,
-                           updated_at=CURRENT_TIMESTAMP""",
+                    self._upsert_chunk_row(
+                        conn,
                         (
                             chunk["file_id"],
                             chunk.get("symbol_id"),
@@ -2215,8 +2590,12 @@ class SQLiteStore:
                     logger.warning(f"Failed to store chunk {chunk.get('chunk_id')}: {e}")
                     continue
 
+            # Bodies released by a preceding delete_chunks_for_file() are only
+            # dropped now, so the ones the file still uses are never rewritten.
+            self._collect_chunk_bodies(conn)
             return count
 
+    @traced("sqlite.search_chunks_by_source_metadata")
     def search_chunks_by_source_metadata(
         self,
         *,
@@ -2227,10 +2606,11 @@ class SQLiteStore:
         limit: int = 20,
     ) -> List[Dict[str, Any]]:
         """Return chunks whose stored source metadata matches the requested filters."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                """SELECT c.content, c.line_start, c.line_end, c.metadata,
+                f"""SELECT {self._chunk_content_sql()} AS content,
+                          c.line_start, c.line_end, c.metadata,
                           COALESCE(f.path, f.relative_path, CAST(c.file_id AS TEXT)) AS file_path
                    FROM code_chunks c
                    JOIN files f ON c.file_id = f.id
@@ -2342,7 +2722,7 @@ class SQLiteStore:
     def _refresh_fts_code_for_file(self, file_id: int) -> None:
         with self._get_connection() as conn:
             cursor = conn.execute(
-                """SELECT content
+                f"""SELECT {self._chunk_content_sql(alias="")} AS content
                    FROM code_chunks
                    WHERE file_id = ?
                    ORDER BY line_start, chunk_index, id""",
@@ -2388,7 +2768,7 @@ class SQLiteStore:
 
     def get_references(self, symbol_id: int) -> List[Dict]:
         """Get all references to a symbol."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT r.*, f.path as file_path
                    FROM symbol_references r
@@ -2399,6 +2779,7 @@ class SQLiteStore:
             return [dict(row) for row in cursor.fetchall()]
 
     # Search operations
+    @traced("sqlite.search_symbols")
     def search_symbols(
         self,
         query: Optional[str] = None,
@@ -2446,7 +2827,7 @@ class SQLiteStore:
 
         parameters.append(limit)
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(sql, parameters)
             results = [dict(row) for row in cursor.fetchall()]
 
@@ -2460,6 +2841,7 @@ class SQLiteStore:
 
         return results
 
+    @traced("sqlite.search_symbols_fuzzy")
     def search_symbols_fuzzy(self, query: str, limit: int = 20) -> List[Dict]:
         """
         Fuzzy search for symbols using trigrams.
@@ -2488,7 +2870,7 @@ class SQLiteStore:
         # matched_syms: symbols that share at least one trigram with the query.
         # sym_totals:   total trigram count per matched symbol (uses idx_trigrams_symbol_id).
         # Jaccard = intersection / (|query| + |symbol| - intersection)
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 f"""
                 WITH matched_syms AS (
@@ -2519,7 +2901,7 @@ class SQLiteStore:
 
     def get_file_id_by_path(self, file_path: str) -> Optional[int]:
         """Return the integer file id for a given relative or absolute path, or None."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             # Try relative_path first (most common), then path
             for col in ("relative_path", "path"):
                 cursor = conn.execute(f"SELECT id FROM files WHERE {col} = ? LIMIT 1", (file_path,))
@@ -2534,6 +2916,7 @@ class SQLiteStore:
             row = cursor.fetchone()
             return row[0] if row else None
 
+    @traced("sqlite.search_files_fuzzy")
     def search_files_fuzzy(self, query: str, limit: int = 20) -> List[Dict]:
         """
         Fuzzy search for file paths using trigrams.
@@ -2557,7 +2940,7 @@ class SQLiteStore:
         if not query_trigrams:
             return []
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 "SELECT id, COALESCE(relative_path, path) as relative_path FROM files WHERE is_deleted = 0 OR is_deleted IS NULL"
             )
@@ -2583,6 +2966,7 @@ class SQLiteStore:
         results.sort(key=lambda r: r["score"], reverse=True)
         return results[:limit]
 
+    @traced("sqlite.find_best_chunk_for_file")
     def find_best_chunk_for_file(self, file_id: int, query_words: List[str]) -> Optional[Dict]:
         """
         Find the best-matching code chunk for a file given query words.
@@ -2598,11 +2982,12 @@ class SQLiteStore:
         Returns:
             Dict with symbol, line_start, line_end, node_type or None
         """
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                """
-                SELECT cc.line_start, cc.line_end, cc.node_type, cc.content,
+                f"""
+                SELECT cc.line_start, cc.line_end, cc.node_type,
+                       {self._chunk_content_sql("cc")} AS content,
                        s.name as symbol_name
                 FROM code_chunks cc
                 LEFT JOIN symbols s ON cc.symbol_id = s.id
@@ -2640,6 +3025,7 @@ class SQLiteStore:
             "content": best_chunk[3],
         }
 
+    @traced("sqlite.search_symbols_fts")
     def search_symbols_fts(self, query: str, limit: int = 20) -> List[Dict]:
         """
         Full-text search for symbols.
@@ -2651,7 +3037,7 @@ class SQLiteStore:
         Returns:
             List of matching symbols
         """
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT s.*, f.path as file_path
                    FROM symbols s
@@ -2676,7 +3062,7 @@ class SQLiteStore:
             List of matching code snippets
         """
         fetch_limit = min(max(limit * 4, limit), 100)
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT
                        fts.*,
@@ -2733,7 +3119,7 @@ class SQLiteStore:
         """
         index_data = {}
 
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute("""SELECT st.trigram, s.name, s.id, s.file_id, f.path
                    FROM symbol_trigrams st
                    JOIN symbols s ON st.symbol_id = s.id
@@ -2763,7 +3149,7 @@ class SQLiteStore:
     def get_statistics(self) -> Dict[str, int]:
         """Get database statistics."""
         stats = {}
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             tables = [
                 "repositories",
                 "files",
@@ -2921,6 +3307,7 @@ class SQLiteStore:
 
     # Enhanced FTS5 search methods for BM25
 
+    @traced("sqlite.search_bm25")
     def search_bm25(
         self,
         query: str,
@@ -2942,20 +3329,12 @@ class SQLiteStore:
         Returns:
             List of search results with BM25 scores
         """
-        with self._get_connection() as conn:
-            # Check if this is a simple BM25 table (like bm25_content) or structured FTS
-            cursor = conn.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)
-            )
-            if not cursor.fetchone():
-                # Table doesn't exist
-                return []
-
-            # Check table structure
-            cursor = conn.execute(f"PRAGMA table_info({table})")
-            table_columns = {row[1] for row in cursor.fetchall()}
+        if not self._has_table(table):
+            return []
+        capabilities = self.schema_capabilities
 
-            if table == "fts_code" and "file_id" in table_columns:
+        with self._get_read_connection() as conn:
+            if table == "fts_code" and capabilities.has_column(table, "file_id"):
                 # Support both integer file_id references and legacy path-style file_id values.
                 cursor = conn.execute(
                     """
@@ -2977,7 +3356,7 @@ class SQLiteStore:
                     """,
                     (query, limit, offset),
                 )
-            elif table == "bm25_content" and "filepath" in table_columns:
+            elif table == "bm25_content" and capabilities.has_column(table, "filepath"):
                 # Legacy BM25 schema with direct filepath column
                 if not columns:
                     columns = ["*", f"bm25({table}) as score"]
@@ -3039,7 +3418,7 @@ class SQLiteStore:
         Returns:
             List of results with snippets
         """
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 f"""
                 SELECT 
@@ -3079,7 +3458,7 @@ class SQLiteStore:
         Returns:
             List of results with highlighted content
         """
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 f"""
                 SELECT 
@@ -3225,7 +3604,7 @@ class SQLiteStore:
     # New file operation methods for path management
     def get_file_by_content_hash(self, content_hash: str, repository_id: int) -> Optional[Dict]:
         """Get file by content hash."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT * FROM files 
                    WHERE content_hash = ? AND repository_id = ? AND is_deleted = FALSE
@@ -3283,6 +3662,7 @@ class SQLiteStore:
             )
             conn.execute("DELETE FROM symbols WHERE file_id = ?", (file_id,))
             conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+            self._collect_chunk_bodies(conn)
 
             logger.info(f"Removed file and all associated data: {relative_path}")
             return True
@@ -3402,7 +3782,7 @@ class SQLiteStore:
 
     def get_chunk_summary(self, chunk_hash: str) -> Optional[Dict[str, Any]]:
         """Get a specific chunk summary."""
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT chunk_hash, file_id, chunk_start, chunk_end, symbol, 
                           summary_text, is_authoritative, llm_model, provider_name,
@@ -3556,7 +3936,8 @@ class SQLiteStore:
         with self._get_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                """SELECT c.chunk_id, c.file_id, c.content_start, c.content_end, c.line_start, c.line_end, c.content, s.name as symbol
+                f"""SELECT c.chunk_id, c.file_id, c.content_start, c.content_end, c.line_start, c.line_end,
+                          {self._chunk_content_sql()} AS content, s.name as symbol
                    FROM code_chunks c
                    LEFT JOIN symbols s ON c.symbol_id = s.id
                    LEFT JOIN chunk_summaries cs ON c.chunk_id = cs.chunk_hash
@@ -3649,6 +4030,7 @@ class SQLiteStore:
                 "collection_mismatches": collection_mismatches,
             }
 
+    @traced("sqlite.find_chunk_at_line")
     def find_chunk_at_line(self, file_path: str, line: int) -> Optional[Dict[str, Any]]:
         """Return the tightest code chunk that covers *line* in *file_path*.
 
@@ -3657,11 +4039,11 @@ class SQLiteStore:
         ``chunk_hash``, ``file_id``, ``chunk_start``, ``chunk_end``,
         ``symbol``, ``content``.
         """
-        with self._get_connection() as conn:
+        with self._get_read_connection() as conn:
             assert_chunk_scheme_readable(conn)
             cursor = conn.execute(
-                """SELECT c.chunk_id, c.file_id, c.line_start, c.line_end,
-                          c.content, s.name AS symbol, c.metadata
+                f"""SELECT c.chunk_id, c.file_id, c.line_start, c.line_end,
+                          {self._chunk_content_sql()} AS content, s.name AS symbol, c.metadata
                    FROM code_chunks c
                    JOIN files f ON c.file_id = f.id
                    LEFT JOIN symbols s ON c.symbol_id = s.id
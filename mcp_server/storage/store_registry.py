@@ -3,13 +3,12 @@ Thread-safe registry of SQLiteStore instances keyed by repo_id.
 """
 
 import logging
-import sqlite3
 import threading
 from pathlib import Path
 from typing import Dict
 
 from mcp_server.core.path_resolver import PathResolver
-from mcp_server.storage.connection_pool import ConnectionPool
+from mcp_server.storage.connection_pool import ReadWriteConnections
 from mcp_server.storage.repository_registry import RepositoryRegistry
 from mcp_server.storage.sqlite_store import SQLiteStore
 
@@ -31,6 +30,9 @@ class StoreRegistry:
     Double-check pattern: after acquiring the per-key lock, re-check the
     cache — the first thread inserts and the rest return the cached instance.
 
+    Each store gets its own ReadWriteConnections: one writer connection for
+    indexing and a read-only reader pool so searches never wait on writes.
+
     Use for_registry() to construct. __init__ is treated as private.
     """
 
@@ -74,11 +76,10 @@ class StoreRegistry:
                     return existing
             index_path_obj = Path(info.index_path)
             index_path_obj.parent.mkdir(parents=True, exist_ok=True)
-            pool = ConnectionPool(
-                factory=lambda p=index_path: sqlite3.connect(p, check_same_thread=False),
-                size=4,
+            connections = ReadWriteConnections(index_path)
+            store = SQLiteStore(
+                index_path, path_resolver=PathResolver(info.path), connections=connections
             )
-            store = SQLiteStore(index_path, path_resolver=PathResolver(info.path), pool=pool)
             with self._lock:
                 self._cache[repo_id] = store
             return store
@@ -9,6 +9,7 @@ from .fuzzy_indexer import FuzzyIndexer
 from .index_discovery import IndexDiscovery
 from .semantic_indexer_registry import SemanticIndexerRegistry
 from .token_counter import TokenCounter, compare_model_costs, quick_estimate
+from .tokenizer import count_tokens, get_tokenizer
 
 # SemanticIndexer requires optional dependencies (voyageai, qdrant-client)
 # Use lazy import to avoid ImportError when semantic deps not installed
@@ -40,4 +41,6 @@ __all__ = [
     "TokenCounter",
     "quick_estimate",
     "compare_model_costs",
+    "count_tokens",
+    "get_tokenizer",
 ]
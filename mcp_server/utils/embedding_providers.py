@@ -5,6 +5,15 @@ Providers emit the frozen ``embedding-response.v1`` contract via
 provenance authority (IF-0-EMBEDPROV-1). The legacy bare-vector
 :meth:`EmbeddingProvider.embed` is preserved for back-compat and delegates to
 ``embed_with_provenance``.
+
+:class:`LocalEmbeddingProvider` runs a small model in process on the CPU, so
+indexing and query embedding need neither network access nor API keys.
+
+Remote providers route their SDK calls through an
+:class:`~mcp_server.utils.embedding_request_engine.EmbeddingRequestEngine`,
+which applies the configured rate budgets, adaptive concurrency and retries;
+:meth:`EmbeddingProvider.embed_batches_with_provenance` uses it to keep several
+batches in flight at once.
 """
 
 from __future__ import annotations
@@ -12,8 +21,13 @@ from __future__ import annotations
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import List, Optional, Sequence
+from typing import Callable, List, Optional, Sequence, TypeVar
 
+from mcp_server.config.env_vars import (
+    get_local_embedding_batch_size,
+    get_local_embedding_model_dir,
+    get_local_embedding_threads,
+)
 from mcp_server.interfaces.inference_contracts import (
     EmbeddingItem,
     EmbeddingItemStatus,
@@ -22,6 +36,14 @@ from mcp_server.interfaces.inference_contracts import (
     ProviderCapability,
     ProvenanceField,
 )
+from mcp_server.utils.embedding_request_engine import (
+    EmbeddingRequestEngine,
+    get_http_client,
+    get_request_engine,
+)
+from mcp_server.utils.tokenizer import count_tokens
+
+T = TypeVar("T")
 
 
 def _role_from_input_type(input_type: str) -> EmbeddingRole:
@@ -38,6 +60,9 @@ def _role_from_input_type(input_type: str) -> EmbeddingRole:
 class EmbeddingProvider(ABC):
     """Provider interface for generating vector embeddings."""
 
+    #: Request engine for remote providers; ``None`` calls the backend directly.
+    engine: Optional[EmbeddingRequestEngine] = None
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
@@ -69,6 +94,39 @@ class EmbeddingProvider(ABC):
         response = self.embed_with_provenance(texts, input_type)
         return [item.vector for item in response.items]
 
+    def embed_batches_with_provenance(
+        self, batches: Sequence[Sequence[str]], input_type: str = "document"
+    ) -> List[EmbeddingResponseV1]:
+        """Embed several batches, one response per batch in input order.
+
+        With a request engine the batches are in flight concurrently, within
+        its concurrency limit and rate budgets; the first failure is raised.
+        """
+        if self.engine is None or len(batches) <= 1:
+            return [self.embed_with_provenance(batch, input_type) for batch in batches]
+        return self.engine.map(lambda batch: self.embed_with_provenance(batch, input_type), batches)
+
+    def _request(
+        self,
+        send: Callable[[], T],
+        texts: Sequence[str],
+        role: EmbeddingRole = EmbeddingRole.DOCUMENT,
+    ) -> T:
+        """Run one backend call through the request engine, if there is one.
+
+        Only ``send`` is retried. Callers validate the response afterwards, so
+        a malformed response fails closed instead of being retried. Query
+        embeddings are kept off the bulk concurrency limiter.
+        """
+        if self.engine is None:
+            return send()
+        tokens = 0
+        if self.engine.budget.tokens_per_minute:
+            tokens = sum(count_tokens(text) for text in texts)
+        return self.engine.call(
+            send, tokens=tokens, units=len(texts), query=role is EmbeddingRole.QUERY
+        )
+
 
 class VoyageEmbeddingProvider(EmbeddingProvider):
     """Voyage AI embedding provider.
@@ -94,12 +152,15 @@ class VoyageEmbeddingProvider(EmbeddingProvider):
                 "Install semantic dependencies first."
             ) from exc
 
+        # Retries belong to the request engine, shared by every Voyage provider
+        # using the same key. The SDK keeps one HTTP session per thread, so the
+        # engine's long-lived workers reuse connections.
         api_key = os.environ.get("VOYAGE_API_KEY")
         if api_key:
-            self.client = voyageai.Client(api_key=api_key)
+            self.client = voyageai.Client(api_key=api_key, max_retries=0)
         else:
             try:
-                self.client = voyageai.Client()
+                self.client = voyageai.Client(max_retries=0)
             except Exception as exc:
                 raise RuntimeError(
                     "Semantic search requires Voyage AI API key. " "Set VOYAGE_API_KEY."
@@ -108,6 +169,7 @@ class VoyageEmbeddingProvider(EmbeddingProvider):
         self.model_name = model_name
         self.vector_dimension = vector_dimension
         self.normalization = normalization
+        self.engine = get_request_engine(self.provider_name, None, api_key)
 
     @property
     def provider_name(self) -> str:
@@ -136,12 +198,16 @@ class VoyageEmbeddingProvider(EmbeddingProvider):
         request_size = len(texts_list)
 
         started = time.perf_counter()
-        response = self.client.embed(
+        response = self._request(
+            lambda: self.client.embed(
+                texts_list,
+                model=self.model_name,
+                input_type=input_type,
+                output_dimension=self.vector_dimension,
+                output_dtype="float",
+            ),
             texts_list,
-            model=self.model_name,
-            input_type=input_type,
-            output_dimension=self.vector_dimension,
-            output_dtype="float",
+            role,
         )
         latency_ms = (time.perf_counter() - started) * 1000.0
 
@@ -226,7 +292,16 @@ class OpenAICompatibleEmbeddingProvider(EmbeddingProvider):
             or "http://localhost:8001/v1"
         )
 
-        self.client = OpenAI(api_key=resolved_api_key, base_url=resolved_base_url)
+        # One pooled keep-alive client serves every provider instance; retries
+        # belong to the request engine, shared by every instance on this
+        # endpoint and key.
+        self.client = OpenAI(
+            api_key=resolved_api_key,
+            base_url=resolved_base_url,
+            http_client=get_http_client(),
+            max_retries=0,
+        )
+        self.engine = get_request_engine(self.provider_name, resolved_base_url, resolved_api_key)
         self.model_name = model_name
         self.vector_dimension = vector_dimension
         self.normalization = normalization
@@ -265,7 +340,11 @@ class OpenAICompatibleEmbeddingProvider(EmbeddingProvider):
         request_size = len(texts_list)
 
         started = time.perf_counter()
-        response = self.client.embeddings.create(model=self.model_name, input=texts_list)
+        response = self._request(
+            lambda: self.client.embeddings.create(model=self.model_name, input=texts_list),
+            texts_list,
+            role,
+        )
         latency_ms = (time.perf_counter() - started) * 1000.0
 
         # Fail closed on the request<->response index mapping. Each response item
@@ -355,12 +434,123 @@ class OpenAICompatibleEmbeddingProvider(EmbeddingProvider):
         )
 
 
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """In-process CPU provider for an ONNX or static-table model on local disk.
+
+    Nothing leaves the process, so every provenance field is measured from the
+    loaded artifacts: ``model_revision`` and ``processor_id`` are digests of
+    the weights and ``tokenizer.json`` and ``dimension`` is measured from the
+    vectors, all ``reported``. ``served_model_id`` comes from the model's
+    ``config.json`` (else the directory name) and ``normalization`` from what
+    this provider applies, both ``declared``. ``role`` is ``reported`` only when
+    the model defines role prefixes, i.e. when the role changes the input.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        vector_dimension: int,
+        model_path: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        from .local_embedding_model import LocalEmbeddingModel
+
+        resolved_path = model_path or get_local_embedding_model_dir()
+        if not resolved_path and os.path.isdir(model_name):
+            resolved_path = model_name
+        if not resolved_path:
+            raise RuntimeError(
+                "Local embeddings require a model directory. Set "
+                "MCP_LOCAL_EMBEDDING_MODEL_DIR or the profile's local_model_path."
+            )
+
+        self.model = LocalEmbeddingModel(
+            resolved_path,
+            num_threads=num_threads if num_threads is not None else get_local_embedding_threads(),
+            batch_size=batch_size if batch_size is not None else get_local_embedding_batch_size(),
+        )
+        self.model_name = model_name or self.model.model_id
+        self.vector_dimension = vector_dimension
+        if vector_dimension and self.model.dimension and self.model.dimension != vector_dimension:
+            raise RuntimeError(
+                f"Embedding dimension mismatch for local model {self.model.model_id}: "
+                f"expected {vector_dimension}, got {self.model.dimension}."
+            )
+
+    @property
+    def provider_name(self) -> str:
+        return "local"
+
+    @property
+    def _role_aware(self) -> bool:
+        return self.model.prefixes["query"] != self.model.prefixes["document"]
+
+    def capability(self) -> ProviderCapability:
+        return ProviderCapability(
+            provider=self.provider_name,
+            supported_roles=frozenset({EmbeddingRole.QUERY, EmbeddingRole.DOCUMENT}),
+            reportable_fields={
+                "served_model_id": False,  # declared from the model's config
+                "model_revision": True,  # digest of the loaded weights
+                "dimension": True,  # measured from returned vector
+                "normalization": False,  # declared: applied by this provider
+                "role": self._role_aware,  # reaches the model only via prefixes
+                "processor_id": True,  # digest of the loaded tokenizer
+            },
+        )
+
+    def embed_with_provenance(
+        self, texts: Sequence[str], input_type: str = "document"
+    ) -> EmbeddingResponseV1:
+        role = _role_from_input_type(input_type)
+
+        started = time.perf_counter()
+        vectors = self.model.embed(list(texts), role.value)
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        dimension = int(vectors.shape[1]) if len(vectors) else self.vector_dimension
+        if len(vectors) and self.vector_dimension and dimension != self.vector_dimension:
+            raise RuntimeError(
+                "Embedding dimension mismatch for local model "
+                f"{self.model.model_id}: expected {self.vector_dimension}, got {dimension}."
+            )
+
+        items = [
+            EmbeddingItem(
+                index=idx,
+                status=EmbeddingItemStatus.OK,
+                error=None,
+                vector=vector,
+            )
+            for idx, vector in enumerate(vectors.tolist())
+        ]
+
+        if self._role_aware:
+            role_field = ProvenanceField.reported(role.value)
+        else:
+            role_field = ProvenanceField.declared(role.value)
+
+        return EmbeddingResponseV1(
+            provider=self.provider_name,
+            served_model_id=ProvenanceField.declared(self.model.model_id),
+            model_revision=ProvenanceField.reported(self.model.revision),
+            dimension=ProvenanceField.reported(dimension),
+            normalization=ProvenanceField.declared("l2" if self.model.normalize else "none"),
+            role=role_field,
+            processor_id=ProvenanceField.reported(self.model.processor_id),
+            items=items,
+            latency_ms=latency_ms,
+        )
+
+
 def create_embedding_provider(
     provider_name: str,
     model_name: str,
     vector_dimension: int,
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
+    model_path: Optional[str] = None,
 ) -> EmbeddingProvider:
     """Create embedding provider instance from semantic profile provider name."""
     normalized = (provider_name or "").strip().lower()
@@ -385,7 +575,14 @@ def create_embedding_provider(
             base_url=base_url,
         )
 
+    if normalized in {"local", "onnx", "static", "offline"}:
+        return LocalEmbeddingProvider(
+            model_name=model_name,
+            vector_dimension=vector_dimension,
+            model_path=model_path,
+        )
+
     raise ValueError(
         "Unsupported semantic profile provider "
-        f"'{provider_name}'. Supported providers: voyage, openai_compatible."
+        f"'{provider_name}'. Supported providers: voyage, openai_compatible, local."
     )
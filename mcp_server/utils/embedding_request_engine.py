@@ -0,0 +1,440 @@
+"""Concurrent request engine for remote embedding providers.
+
+Remote providers used to send one batch at a time and leave retries to the
+SDK defaults, so indexing throughput was bounded by round-trip latency rather
+than by the provider's quota. :class:`EmbeddingRequestEngine` sits between a
+provider and its SDK call:
+
+- batches are fanned out over a fixed pool of worker threads, each of which
+  keeps its HTTP connections alive (the OpenAI-compatible client shares one
+  pooled ``httpx.Client``; the Voyage SDK keeps a session per thread);
+- :class:`AdaptiveConcurrencyLimiter` bounds in-flight requests with AIMD:
+  the limit grows by one per window of successes, shrinks gently when latency
+  per input climbs well above its moving average, and halves on a 429. Query
+  embeddings have a limiter of their own, so a fast single-text query never
+  sets the baseline bulk indexing batches are judged against;
+- :class:`RateBudget` spreads requests and tokens over per-minute budgets and
+  pauses every worker while the provider's ``Retry-After`` is in effect;
+- failed calls that are worth retrying (429, 5xx, connection errors and
+  timeouts) are retried with full-jitter exponential backoff.
+
+The engine retries only the SDK call. Providers validate each response's
+request-to-vector index mapping after every attempt, and a response that
+fails validation is never retried into acceptance. Providers share one
+engine per endpoint and credential (:func:`get_request_engine`), so every
+provider instance pointed at the same quota draws from the same budget.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from mcp_server.config.env_vars import (
+    get_embedding_http_timeout,
+    get_embedding_max_in_flight,
+    get_embedding_max_retries,
+    get_embedding_requests_per_minute,
+    get_embedding_tokens_per_minute,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "ServerError",
+    "ServiceUnavailableError",
+    "Timeout",
+    "TimeoutException",
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for source in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "http_status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for an HTTP 429 from any of the supported SDKs."""
+    return _status_code(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for throttling, server errors and transport failures."""
+    if is_rate_limited(exc):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status >= 500 or status == 408
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__) or isinstance(
+        exc, (ConnectionError, TimeoutError)
+    )
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """The server's ``Retry-After`` hint, when the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        headers = getattr(exc, "headers", None)
+    if headers is None:
+        return None
+    try:
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent requests.
+
+    Every success adds ``1 / limit`` (one per window of ``limit`` requests).
+    Latency is compared per unit of work (inputs in the batch) against an
+    exponentially weighted moving average, so batch size does not read as
+    congestion and one unusually fast request stops mattering after a few
+    more. A request slower than ``latency_tolerance`` times the average
+    multiplies the limit by ``latency_backoff``; a 429 multiplies it by
+    ``throttle_backoff``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        minimum: int = 1,
+        maximum: Optional[int] = None,
+        latency_tolerance: float = 2.0,
+        latency_backoff: float = 0.9,
+        throttle_backoff: float = 0.5,
+        baseline_weight: float = 0.1,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_tolerance = latency_tolerance
+        self.latency_backoff = latency_backoff
+        self.throttle_backoff = throttle_backoff
+        self.baseline_weight = min(1.0, max(0.0, baseline_weight))
+        self.latency_baseline: Optional[float] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def release(
+        self, *, latency: Optional[float] = None, units: int = 1, throttled: bool = False
+    ) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.throttle_backoff)
+            elif latency is not None:
+                per_unit = latency / max(1, units)
+                baseline = self.latency_baseline
+                if baseline is None:
+                    baseline = per_unit
+                if per_unit > self.latency_tolerance * baseline:
+                    self.limit = max(self.minimum, self.limit * self.latency_backoff)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                self.latency_baseline = baseline + self.baseline_weight * (per_unit - baseline)
+            self._cond.notify_all()
+
+
+class RateBudget:
+    """Request-per-minute and token-per-minute token buckets.
+
+    A budget of 0 is unlimited. A single request larger than the whole token
+    budget waits for a full bucket instead of deadlocking.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.requests_per_minute = max(0, requests_per_minute)
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._requests = float(self.requests_per_minute)
+        self._tokens = float(self.tokens_per_minute)
+        self._updated = now
+        self._paused_until = 0.0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60.0,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60.0,
+            )
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one request of ``tokens`` tokens fits both budgets."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                delay = max(0.0, self._paused_until - now)
+                needed = min(float(tokens), float(self.tokens_per_minute))
+                if self.requests_per_minute and self._requests < 1.0:
+                    delay = max(delay, (1.0 - self._requests) * 60.0 / self.requests_per_minute)
+                if self.tokens_per_minute and self._tokens < needed:
+                    delay = max(delay, (needed - self._tokens) * 60.0 / self.tokens_per_minute)
+                if delay <= 0.0:
+                    if self.requests_per_minute:
+                        self._requests -= 1.0
+                    if self.tokens_per_minute:
+                        self._tokens -= needed
+                    return
+                self.waited_seconds += delay
+            self._sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back for ``seconds`` (the provider's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class EmbeddingRequestEngine:
+    """Budgeted, adaptively concurrent, retrying executor for provider calls."""
+
+    def __init__(
+        self,
+        *,
+        max_in_flight: int = 4,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self.limiter = AdaptiveConcurrencyLimiter(self.max_in_flight, maximum=self.max_in_flight)
+        self.query_limiter = AdaptiveConcurrencyLimiter(
+            self.max_in_flight, maximum=self.max_in_flight
+        )
+        self.budget = RateBudget(requests_per_minute, tokens_per_minute, clock=clock, sleep=sleep)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0}
+
+    @classmethod
+    def from_env(cls) -> "EmbeddingRequestEngine":
+        return cls(
+            max_in_flight=get_embedding_max_in_flight(),
+            requests_per_minute=get_embedding_requests_per_minute(),
+            tokens_per_minute=get_embedding_tokens_per_minute(),
+            max_retries=get_embedding_max_retries(),
+        )
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        delay = random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+        hint = retry_after_seconds(exc)
+        return max(delay, hint) if hint is not None else delay
+
+    def call(
+        self, send: Callable[[], T], *, tokens: int = 0, units: int = 1, query: bool = False
+    ) -> T:
+        """Run one provider request under the budgets, the limiter and retries.
+
+        ``units`` is the number of inputs in the request, used to normalize
+        its latency. ``query`` requests go through :attr:`query_limiter` and
+        leave the bulk limiter's latency baseline alone.
+        """
+        limiter = self.query_limiter if query else self.limiter
+        attempt = 0
+        while True:
+            self.budget.acquire(tokens)
+            limiter.acquire()
+            started = time.perf_counter()
+            try:
+                result = send()
+            except Exception as exc:
+                throttled = is_rate_limited(exc)
+                limiter.release(throttled=throttled)
+                if throttled:
+                    self._count("throttled")
+                    hint = retry_after_seconds(exc)
+                    if hint:
+                        self.budget.pause(hint)
+                if attempt >= self.max_retries or not is_retryable(exc):
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt, exc)
+                attempt += 1
+                self._count("retries")
+                logger.debug(
+                    "Embedding request failed (%s); retry %d in %.2fs", exc, attempt, delay
+                )
+                self._sleep(delay)
+                continue
+            limiter.release(latency=time.perf_counter() - started, units=units)
+            self._count("requests")
+            return result
+
+    def map(self, fn: Callable[[R], T], items: Sequence[R]) -> List[T]:
+        """Apply ``fn`` to every item on the worker pool, keeping input order.
+
+        ``fn`` is expected to go through :meth:`call`, which enforces the
+        concurrency limit. The first failure cancels work not yet started and
+        is re-raised.
+        """
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        executor = self._pool()
+        futures = [executor.submit(fn, item) for item in items]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                for other in pending:
+                    other.cancel()
+                raise future.exception()
+        return [future.result() for future in futures]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight, thread_name_prefix="embed-request"
+                )
+            return self._executor
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats.update(
+            concurrency_limit=self.limiter.limit,
+            peak_in_flight=self.limiter.peak_in_flight,
+            budget_wait_seconds=self.budget.waited_seconds,
+        )
+        return stats
+
+    def close(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_http_client: Optional[Any] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> Any:
+    """Process-wide keep-alive ``httpx.Client`` for embedding endpoints."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            import httpx
+
+            connections = max(2, get_embedding_max_in_flight() * 2)
+            _http_client = httpx.Client(
+                timeout=get_embedding_http_timeout(),
+                limits=httpx.Limits(
+                    max_connections=connections,
+                    max_keepalive_connections=connections,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return _http_client
+
+
+def _reset_http_client() -> None:
+    global _http_client
+    with _http_client_lock:
+        client, _http_client = _http_client, None
+    if client is not None:
+        client.close()
+
+
+_request_engines: Dict[Tuple[str, str, str], EmbeddingRequestEngine] = {}
+_request_engines_lock = threading.Lock()
+
+
+def get_request_engine(
+    provider: str, endpoint: Optional[str] = None, api_key: Optional[str] = None
+) -> EmbeddingRequestEngine:
+    """The process-wide request engine for one provider endpoint and credential.
+
+    Provider instances that share a quota share its concurrency limit, rate
+    budget and worker pool. The key holds a digest of ``api_key``, never the
+    key itself.
+    """
+    key_digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    key = (provider, endpoint or "", key_digest)
+    with _request_engines_lock:
+        engine = _request_engines.get(key)
+        if engine is None:
+            engine = _request_engines[key] = EmbeddingRequestEngine.from_env()
+        return engine
+
+
+def _reset_request_engines() -> None:
+    global _request_engines
+    with _request_engines_lock:
+        engines, _request_engines = _request_engines, {}
+    for engine in engines.values():
+        engine.close()
+
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "EmbeddingRequestEngine",
+    "RateBudget",
+    "get_http_client",
+    "get_request_engine",
+    "is_rate_limited",
+    "is_retryable",
+    "retry_after_seconds",
+]
@@ -222,6 +222,26 @@ class FuzzyIndexer:
             logger.error(f"Failed to initialize SQLite backend: {e}")
             return False
 
+    # ------------------------------------------------------------------
+    def export_state(self) -> Dict[str, Any]:
+        """Return the in-memory index as JSON-serialisable data."""
+        return {
+            "version": 1,
+            "files": {path: [list(line) for line in lines] for path, lines in self.index.items()},
+            "symbols": {name: dict(meta) for name, meta in self._symbol_metadata.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> bool:
+        """Replace the in-memory index with data from :meth:`export_state`."""
+        if state.get("version") != 1:
+            return False
+        self.index = {
+            path: [(int(line_no), text) for line_no, text in lines]
+            for path, lines in state.get("files", {}).items()
+        }
+        self._symbol_metadata = dict(state.get("symbols", {}))
+        return True
+
     # ------------------------------------------------------------------
     def clear(self) -> None:
         """Clear the in-memory index."""
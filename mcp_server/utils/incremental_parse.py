@@ -0,0 +1,504 @@
+"""Incremental tree-sitter reparsing for files that change repeatedly.
+
+Editors save constantly, and every save used to re-parse and re-chunk the
+whole file.  For a 20k-line generated parser that takes seconds, although
+the edit usually touches a single function.
+
+:class:`ParseTreeCache` keeps the last tree and source of recently changed
+files in a bounded LRU.  When a file comes back, the cache computes the
+byte-level edit against the cached source.  It applies the edit with
+``tree.edit()`` and reparses with the old tree, so tree-sitter reuses every
+unchanged subtree.  ``changed_ranges()`` plus the edited span tell callers
+which part of the file actually differs.
+
+:class:`IncrementalChunker` uses those ranges to re-chunk only the top-level
+declarations they touch:
+
+- chunks before the edit are reused unchanged;
+- chunks after the edit are shifted by the edit's byte and line delta;
+- only the dirty region is handed to :func:`chunker.chunk_text`.  The
+  source before that region is blanked to whitespace of the same byte and
+  line length, so the chunker computes the same offsets and ids as for the
+  whole file.
+
+Anything the chunker could not reproduce this way falls back to a full
+``chunk_text`` run.  That covers syntax errors, chunks spanning the region
+boundary and unknown grammars.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from tree_sitter import Parser
+from tree_sitter_language_pack import get_language as _get_ts_language
+
+from ..config.env_vars import get_parse_cache_max_bytes, get_parse_cache_size
+
+logger = logging.getLogger(__name__)
+
+_LANGUAGE_ALIASES = {"c_sharp": "csharp"}
+
+# Blank everything except newlines: same byte length, same line numbers.
+_MASK_TABLE = bytes(10 if b == 10 else 32 for b in range(256))
+
+_COMPARE_BLOCK = 4096
+
+_ANONYMOUS_SEGMENT = re.compile(r"^(.*:anon@)(\d+)$")
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i : i + _COMPARE_BLOCK] == b[i : i + _COMPARE_BLOCK]:
+        i += _COMPARE_BLOCK
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return min(i, limit)
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    i = 0
+    la, lb = len(a), len(b)
+    while i < limit:
+        step = min(_COMPARE_BLOCK, limit - i)
+        if a[la - i - step : la - i] != b[lb - i - step : lb - i]:
+            break
+        i += step
+    while i < limit and a[la - i - 1] == b[lb - i - 1]:
+        i += 1
+    return i
+
+
+def _point(source: bytes, offset: int) -> Tuple[int, int]:
+    row = source.count(b"\n", 0, offset)
+    return row, offset - (source.rfind(b"\n", 0, offset) + 1)
+
+
+@dataclass(frozen=True)
+class TextEdit:
+    """A single contiguous replacement, in tree-sitter's ``Tree.edit`` terms."""
+
+    start_byte: int
+    old_end_byte: int
+    new_end_byte: int
+    start_point: Tuple[int, int]
+    old_end_point: Tuple[int, int]
+    new_end_point: Tuple[int, int]
+
+    @property
+    def byte_delta(self) -> int:
+        return self.new_end_byte - self.old_end_byte
+
+    @property
+    def line_delta(self) -> int:
+        return self.new_end_point[0] - self.old_end_point[0]
+
+    def as_kwargs(self) -> Dict[str, Any]:
+        return {
+            "start_byte": self.start_byte,
+            "old_end_byte": self.old_end_byte,
+            "new_end_byte": self.new_end_byte,
+            "start_point": self.start_point,
+            "old_end_point": self.old_end_point,
+            "new_end_point": self.new_end_point,
+        }
+
+
+def compute_edit(old: bytes, new: bytes) -> Optional[TextEdit]:
+    """Smallest single edit turning ``old`` into ``new``; ``None`` if equal."""
+    if old == new:
+        return None
+    start = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - start)
+    old_end = len(old) - suffix
+    new_end = len(new) - suffix
+    return TextEdit(
+        start_byte=start,
+        old_end_byte=old_end,
+        new_end_byte=new_end,
+        start_point=_point(new, start),
+        old_end_point=_point(old, old_end),
+        new_end_point=_point(new, new_end),
+    )
+
+
+def _merge_ranges(ranges: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+@dataclass
+class ParseResult:
+    """Outcome of :meth:`ParseTreeCache.parse`.
+
+    ``changed_ranges`` are byte ranges of the new source that differ from the
+    cached parse: the whole file after a cold parse, nothing when the source
+    is unchanged.  ``previous`` is whatever was attached to the cached entry
+    (see :meth:`ParseTreeCache.attach`) and still describes the old source.
+    """
+
+    tree: Any
+    source: bytes
+    edit: Optional[TextEdit]
+    changed_ranges: List[Tuple[int, int]]
+    incremental: bool
+    previous: Any = None
+
+
+@dataclass
+class _Entry:
+    language: str
+    source: bytes
+    tree: Any
+    payload: Any = None
+
+
+class ParseTreeCache:
+    """Bounded LRU of parse trees for recently changed files.
+
+    Entries are bounded by count and by total source bytes; a tree costs a
+    small multiple of its source, so the byte budget bounds memory as well.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max(0, max_entries)
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.full_parses = 0
+        self.incremental_parses = 0
+        self.unchanged = 0
+
+    def _parser(self, language: str) -> Parser:
+        # Parsers are not thread-safe; keep one per thread and language.
+        parsers = getattr(self._local, "parsers", None)
+        if parsers is None:
+            parsers = self._local.parsers = {}
+        parser = parsers.get(language)
+        if parser is None:
+            parser = Parser(_get_ts_language(_LANGUAGE_ALIASES.get(language, language)))
+            parsers[language] = parser
+        return parser
+
+    def _take(self, key: Hashable) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.source)
+            return entry
+
+    def _put(self, key: Hashable, entry: _Entry) -> None:
+        if not self.max_entries or len(entry.source) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.source)
+            self._entries[key] = entry
+            self._bytes += len(entry.source)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.source)
+
+    def parse(self, key: Hashable, language: str, source: str | bytes) -> ParseResult:
+        """Parse ``source``, reusing the cached tree for ``key`` when there is one."""
+        data = source.encode("utf-8") if isinstance(source, str) else source
+        parser = self._parser(language)
+        entry = self._take(key)
+        if entry is not None and entry.language != language:
+            entry = None
+
+        if entry is None:
+            tree = parser.parse(data)
+            result = ParseResult(tree, data, None, [(0, len(data))], incremental=False)
+            self.full_parses += 1
+        else:
+            edit = compute_edit(entry.source, data)
+            if edit is None:
+                result = ParseResult(
+                    entry.tree, data, None, [], incremental=True, previous=entry.payload
+                )
+                self.unchanged += 1
+            else:
+                old_tree = entry.tree
+                old_tree.edit(**edit.as_kwargs())
+                tree = parser.parse(data, old_tree)
+                ranges = [(r.start_byte, r.end_byte) for r in old_tree.changed_ranges(tree)]
+                ranges.append((edit.start_byte, edit.new_end_byte))
+                result = ParseResult(
+                    tree,
+                    data,
+                    edit,
+                    _merge_ranges(ranges),
+                    incremental=True,
+                    previous=entry.payload,
+                )
+                self.incremental_parses += 1
+
+        self._put(key, _Entry(language, data, result.tree))
+        return result
+
+    def attach(self, key: Hashable, payload: Any) -> None:
+        """Attach derived data (e.g. chunks) to the current entry for ``key``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.payload = payload
+
+    def invalidate(self, key: Hashable) -> None:
+        self._take(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self),
+            "bytes": self._bytes,
+            "full_parses": self.full_parses,
+            "incremental_parses": self.incremental_parses,
+            "unchanged": self.unchanged,
+        }
+
+
+def _effective_route(chunk: Any) -> List[str]:
+    # Mirrors chunker.core.chunk_text: routeless chunks get a positional route.
+    route = chunk.qualified_route or chunk.parent_route
+    if route:
+        return route
+    return [f"{chunk.node_type or 'chunk'}@L{chunk.start_line}"]
+
+
+def _shift_anonymous(segment: str, delta: int) -> str:
+    # Unnamed definitions are routed by start line ("lambda:anon@120").
+    match = _ANONYMOUS_SEGMENT.match(segment)
+    if match is None:
+        return segment
+    return f"{match.group(1)}{int(match.group(2)) + delta}"
+
+
+def _shift_call_spans(metadata: Dict[str, Any], delta: int) -> Dict[str, Any]:
+    # Call spans are the only absolute byte offsets the chunker puts in metadata.
+    spans = [
+        {
+            key: value + delta if isinstance(value, int) and not isinstance(value, bool) else value
+            for key, value in span.items()
+        }
+        for span in metadata["call_spans"]
+    ]
+    return {**metadata, "call_spans": spans}
+
+
+def _run(chunk_fn: Callable[..., List[Any]], text: str, language: str, file_path: str):
+    # Same call shape as the callers used before, so their chunk_text seams keep working.
+    if file_path:
+        return chunk_fn(text, language, file_path=file_path)
+    return chunk_fn(text, language)
+
+
+class IncrementalChunker:
+    """``chunk_text`` that re-chunks only the declarations an edit touched."""
+
+    def __init__(self, cache: Optional[ParseTreeCache] = None):
+        self.cache = cache if cache is not None else ParseTreeCache()
+        self.full_chunks = 0
+        self.partial_chunks = 0
+        self.reused_chunks = 0
+
+    def chunk(
+        self,
+        text: str,
+        language: str,
+        path: Optional[str] = None,
+        file_path: str = "",
+        chunk_fn: Optional[Callable[..., List[Any]]] = None,
+    ) -> List[Any]:
+        """Chunk ``text`` exactly like ``chunker.chunk_text(text, language, file_path)``.
+
+        ``path`` keys the cache; without it this is a plain ``chunk_text`` call.
+        ``chunk_fn`` replaces ``chunker.chunk_text`` for the actual chunking.
+        """
+        if chunk_fn is None:
+            from chunker import chunk_text as chunk_fn
+        if not path:
+            return _run(chunk_fn, text, language, file_path)
+        key = (path, language, file_path)
+        try:
+            result = self.cache.parse(key, language, text)
+        except Exception as exc:
+            logger.debug("Incremental parse unavailable for %s (%s): %s", path, language, exc)
+            return _run(chunk_fn, text, language, file_path)
+
+        chunks: Optional[List[Any]] = None
+        if result.previous is not None:
+            if result.edit is None:
+                chunks = result.previous
+                self.reused_chunks += 1
+            else:
+                try:
+                    chunks = self._rechunk(result, language, file_path, chunk_fn)
+                except Exception as exc:
+                    logger.debug("Partial re-chunk of %s failed: %s", path, exc)
+                    chunks = None
+                if chunks is not None:
+                    self.partial_chunks += 1
+        if chunks is None:
+            try:
+                chunks = _run(chunk_fn, text, language, file_path)
+            except Exception:
+                self.cache.invalidate(key)
+                raise
+            self.full_chunks += 1
+
+        self.cache.attach(key, chunks)
+        # Callers get their own chunk objects; the cached ones stay pristine.
+        return [copy.copy(chunk) for chunk in chunks]
+
+    def _rechunk(
+        self,
+        result: ParseResult,
+        language: str,
+        file_path: str,
+        chunk_fn: Callable[..., List[Any]],
+    ) -> Optional[List[Any]]:
+        edit = result.edit
+        root = result.tree.root_node
+        if root.has_error:
+            return None
+
+        # Grow the changed ranges to whole top-level nodes.  A comment right
+        # before a declaration becomes its docstring, so comments are kept
+        # together with the node that follows them.
+        region_start, region_end = edit.start_byte, edit.new_end_byte
+        for start, end in result.changed_ranges:
+            region_start = min(region_start, start)
+            region_end = max(region_end, end)
+        children = root.children
+        first = last = None
+        for index, child in enumerate(children):
+            if child.end_byte < region_start:
+                continue
+            if child.start_byte > region_end and (
+                last is None or "comment" not in children[last].type
+            ):
+                break
+            region_start = min(region_start, child.start_byte)
+            region_end = max(region_end, child.end_byte)
+            first = index if first is None else first
+            last = index
+        while first and "comment" in children[first - 1].type:
+            first -= 1
+            region_start = children[first].start_byte
+
+        old_region_end = region_end - edit.byte_delta
+        before: List[Any] = []
+        after: List[Any] = []
+        for chunk in result.previous:
+            if chunk.byte_end <= region_start:
+                before.append(chunk)
+            elif chunk.byte_start >= old_region_end:
+                after.append(chunk)
+            elif chunk.byte_start < region_start or chunk.byte_end > old_region_end:
+                return None  # spans the region boundary
+
+        from chunker.types import compute_definition_id, compute_node_id
+
+        source = result.source
+        masked = source[:region_start].translate(_MASK_TABLE) + source[region_start:region_end]
+        region = [
+            chunk
+            for chunk in _run(chunk_fn, masked.decode("utf-8"), language, file_path)
+            if chunk.byte_start >= region_start
+        ]
+
+        renamed: Dict[str, str] = {}
+        shifted: List[Any] = []
+        for chunk in after:
+            moved = copy.copy(chunk)
+            moved.byte_start += edit.byte_delta
+            moved.byte_end += edit.byte_delta
+            moved.start_line += edit.line_delta
+            moved.end_line += edit.line_delta
+            if edit.line_delta and moved.qualified_route:
+                moved.qualified_route = [
+                    _shift_anonymous(segment, edit.line_delta) for segment in moved.qualified_route
+                ]
+            route = _effective_route(moved)
+            moved.definition_id = compute_definition_id(file_path, moved.language, route)
+            moved.node_id = compute_node_id(
+                file_path, moved.language, route, moved.byte_start, moved.content
+            )
+            moved.chunk_id = moved.node_id
+            if moved.metadata and moved.metadata.get("call_spans"):
+                moved.metadata = _shift_call_spans(moved.metadata, edit.byte_delta)
+            renamed[chunk.node_id] = moved.node_id
+            shifted.append(moved)
+        for moved in shifted:
+            if moved.parent_chunk_id in renamed:
+                moved.parent_chunk_id = renamed[moved.parent_chunk_id]
+        return before + region + shifted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "full_chunks": self.full_chunks,
+            "partial_chunks": self.partial_chunks,
+            "reused_chunks": self.reused_chunks,
+            "parse_cache": self.cache.stats(),
+        }
+
+
+# -- process-wide instances ---------------------------------------------------
+
+_chunker: Optional[IncrementalChunker] = None
+_chunker_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseTreeCache:
+    """The shared parse-tree cache, sized from ``MCP_PARSE_CACHE_*``."""
+    return get_incremental_chunker().cache
+
+
+def get_incremental_chunker() -> IncrementalChunker:
+    global _chunker
+    with _chunker_lock:
+        if _chunker is None:
+            _chunker = IncrementalChunker(
+                ParseTreeCache(get_parse_cache_size(), get_parse_cache_max_bytes())
+            )
+        return _chunker
+
+
+def _reset_incremental_chunker() -> None:
+    global _chunker
+    with _chunker_lock:
+        _chunker = None
+
+
+__all__ = [
+    "IncrementalChunker",
+    "ParseResult",
+    "ParseTreeCache",
+    "TextEdit",
+    "compute_edit",
+    "get_incremental_chunker",
+    "get_parse_cache",
+]
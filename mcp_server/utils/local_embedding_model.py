@@ -0,0 +1,253 @@
+"""In-process CPU embedding models loaded from a local directory.
+
+Two model formats are supported, detected from the files in the directory:
+
+- ONNX: ``model.onnx`` (or an int8-quantized ``model_quantized.onnx`` /
+  ``model_int8.onnx``) run with onnxruntime on the CPU. The first output is
+  either already pooled ``[batch, dim]`` or a ``[batch, tokens, dim]`` hidden
+  state that is mean- or CLS-pooled here.
+- Static: ``embeddings.npy``, a ``[vocab, dim]`` token-embedding table such as
+  a distilled model2vec model. A text embeds as the mean of its token rows.
+  An ``int8`` table with per-row ``embeddings_scales.npy`` is dequantized on
+  the fly.
+
+Both need the model's Hugging Face ``tokenizer.json``. An optional
+``config.json`` carries ``model_id``, ``max_length``, ``pooling``,
+``normalize`` and the ``query_prefix`` / ``document_prefix`` some models
+expect.
+
+Texts are tokenized in one batch call, ordered by token count and cut into
+batches, so each batch is padded only to its own longest member. Batches run
+in parallel on a thread pool; onnxruntime and numpy release the GIL while
+they compute. A single short input, the usual query, runs on the calling
+thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILES = ("model_quantized.onnx", "model_int8.onnx", "model.onnx")
+STATIC_TABLE_FILE = "embeddings.npy"
+STATIC_SCALES_FILE = "embeddings_scales.npy"
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class LocalEmbeddingModel:
+    """A tokenizer plus an ONNX graph or static table, with batched CPU inference."""
+
+    def __init__(
+        self,
+        model_dir: str | Path,
+        *,
+        num_threads: int = 0,
+        batch_size: int = 32,
+    ) -> None:
+        self.model_dir = Path(model_dir).expanduser()
+        if not self.model_dir.is_dir():
+            raise FileNotFoundError(f"Local embedding model directory not found: {self.model_dir}")
+
+        try:
+            from tokenizers import Tokenizer
+        except ImportError as exc:
+            raise RuntimeError(
+                "Local embeddings require the tokenizers package. "
+                "Install it to use local embedding models."
+            ) from exc
+
+        config_path = self.model_dir / "config.json"
+        config: Dict[str, Any] = {}
+        if config_path.exists():
+            config = json.loads(config_path.read_text(encoding="utf-8"))
+
+        tokenizer_path = self.model_dir / "tokenizer.json"
+        if not tokenizer_path.exists():
+            raise FileNotFoundError(f"tokenizer.json not found in {self.model_dir}")
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.no_padding()
+
+        self.model_id = str(config.get("model_id") or self.model_dir.name)
+        self.pooling = str(config.get("pooling", "mean"))
+        self.normalize = bool(config.get("normalize", True))
+        self.prefixes = {
+            "query": str(config.get("query_prefix", "")),
+            "document": str(config.get("document_prefix", "")),
+        }
+        self.num_threads = num_threads if num_threads > 0 else (os.cpu_count() or 1)
+        self.batch_size = max(1, batch_size)
+
+        candidates = [self.model_dir / name for name in ONNX_MODEL_FILES]
+        onnx_path = next((path for path in candidates if path.exists()), None)
+        if onnx_path is not None:
+            self.format = "onnx"
+            self._load_onnx(onnx_path)
+            weights = onnx_path
+            default_max_length = 256
+        elif (self.model_dir / STATIC_TABLE_FILE).exists():
+            self.format = "static"
+            weights = self.model_dir / STATIC_TABLE_FILE
+            self._load_static(weights)
+            default_max_length = 512
+        else:
+            raise FileNotFoundError(
+                f"No model found in {self.model_dir}: expected one of "
+                f"{', '.join(ONNX_MODEL_FILES)} or {STATIC_TABLE_FILE}"
+            )
+
+        self.max_length = int(config.get("max_length", default_max_length))
+        self.tokenizer.enable_truncation(self.max_length)
+        self.revision = _file_digest(weights)
+        self.processor_id = f"tokenizer:{_file_digest(tokenizer_path)}"
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _load_onnx(self, path: Path) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise RuntimeError(
+                "ONNX embedding models require the onnxruntime package. "
+                "Install it to use local embedding models."
+            ) from exc
+
+        options = ort.SessionOptions()
+        # Parallelism comes from running batches side by side; one thread per run
+        # avoids oversubscribing the cores.
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            str(path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {node.name for node in self._session.get_inputs()}
+        self._output_name = self._session.get_outputs()[0].name
+        self._add_special_tokens = True
+        self.dimension = 0  # measured on first inference
+
+    def _load_static(self, path: Path) -> None:
+        table = np.load(path, mmap_mode="r")
+        if table.ndim != 2:
+            raise ValueError(f"{path} must hold a [vocab, dim] table, got shape {table.shape}")
+        self._table = table
+        self._scales: Optional[np.ndarray] = None
+        if table.dtype == np.int8:
+            scales_path = self.model_dir / STATIC_SCALES_FILE
+            if not scales_path.exists():
+                raise FileNotFoundError(f"int8 table {path} needs {STATIC_SCALES_FILE}")
+            self._scales = np.load(scales_path).astype(np.float32).reshape(-1)
+        self._add_special_tokens = False
+        self.dimension = int(table.shape[1])
+
+    # ------------------------------------------------------------------
+    def embed(self, texts: Sequence[str], role: str = "document") -> np.ndarray:
+        """Embed ``texts`` into a ``[len(texts), dim]`` float32 array."""
+        prefix = self.prefixes.get(role, "")
+        inputs = [prefix + text for text in texts] if prefix else list(texts)
+        if not inputs:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        encodings = self.tokenizer.encode_batch(inputs, add_special_tokens=self._add_special_tokens)
+        lengths = np.fromiter((len(e.ids) for e in encodings), dtype=np.int64, count=len(encodings))
+        order = np.argsort(lengths, kind="stable")
+        step = self.batch_size
+        batches = [order[start : start + step] for start in range(0, len(order), step)]
+
+        if len(batches) == 1:
+            results = [self._run_batch([encodings[i] for i in batches[0]])]
+        else:
+            pool = self._executor()
+            results = list(
+                pool.map(lambda batch: self._run_batch([encodings[i] for i in batch]), batches)
+            )
+
+        dimension = results[0].shape[1]
+        self.dimension = dimension
+        vectors = np.empty((len(inputs), dimension), dtype=np.float32)
+        for batch, result in zip(batches, results):
+            vectors[batch] = result
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.num_threads, thread_name_prefix="local-embed"
+                )
+            return self._pool
+
+    def _run_batch(self, encodings: List[Any]) -> np.ndarray:
+        if self.format == "onnx":
+            return self._run_onnx(encodings)
+        return self._run_static(encodings)
+
+    def _run_onnx(self, encodings: List[Any]) -> np.ndarray:
+        width = max(1, max(len(e.ids) for e in encodings))
+        ids = np.zeros((len(encodings), width), dtype=np.int64)
+        mask = np.zeros((len(encodings), width), dtype=np.int64)
+        types = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            n = len(encoding.ids)
+            ids[row, :n] = encoding.ids
+            mask[row, :n] = encoding.attention_mask
+            types[row, :n] = encoding.type_ids
+
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": types}
+        output = self._session.run(
+            [self._output_name], {name: feeds[name] for name in self._input_names if name in feeds}
+        )[0].astype(np.float32, copy=False)
+        if output.ndim == 2:
+            return output
+        if self.pooling == "cls":
+            return output[:, 0, :]
+        weights = mask[:, :, None].astype(np.float32)
+        counts = np.maximum(weights.sum(axis=1), 1.0)
+        return (output * weights).sum(axis=1) / counts
+
+    def _run_static(self, encodings: List[Any]) -> np.ndarray:
+        pooled = np.zeros((len(encodings), self.dimension), dtype=np.float32)
+        lengths = np.array([len(e.ids) for e in encodings], dtype=np.int64)
+        present = np.flatnonzero(lengths)
+        if not len(present):
+            return pooled
+        ids = np.concatenate([np.asarray(encodings[i].ids, dtype=np.int64) for i in present])
+        ids = np.clip(ids, 0, self._table.shape[0] - 1)
+        rows = np.asarray(self._table[ids], dtype=np.float32)
+        if self._scales is not None:
+            rows *= self._scales[ids, None]
+        # Sum each text's token rows without padding: reduceat over the
+        # concatenated sequence at every text's first token.
+        starts = np.concatenate(([0], np.cumsum(lengths[present])[:-1]))
+        pooled[present] = np.add.reduceat(rows, starts, axis=0) / lengths[present, None]
+        return pooled
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+__all__ = ["LocalEmbeddingModel"]
@@ -11,7 +11,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
 try:
     from chunker.core import chunk_file as chunk_file
@@ -38,9 +38,13 @@ from ..artifacts.semantic_profiles import (
     get_primary_semantic_profile_metadata,
 )
 from ..core.path_resolver import PathResolver
+from ..core.tracing import span as trace_span
+from ..core.tracing import traced
 from ..interfaces.inference_contracts import EmbeddingRole
 from ..plugins.language_registry import get_language_by_extension
-from .embedding_providers import create_embedding_provider
+from .embedding_providers import EmbeddingProvider, create_embedding_provider
+from .semantic_path_metadata import PathMove, PointPathMetadata
+from .tokenizer import get_tokenizer
 
 if TYPE_CHECKING:
     from ..storage.sqlite_store import SQLiteStore
@@ -361,6 +365,7 @@ class SemanticIndexer:
             vector_dimension=self.embedding_dimension,
             api_key=_resolved_api_key,
             base_url=_build_metadata.get("openai_api_base"),
+            model_path=_build_metadata.get("local_model_path"),
         )
         self.embedding_provider = self.embedding_client.provider_name
 
@@ -572,6 +577,27 @@ class SemanticIndexer:
             return self._validate_embedding_response(response, len(texts_list))
         return self.embedding_client.embed(texts_list, input_type=input_type)
 
+    def _embed_text_batches(
+        self, batches: List[List[str]], input_type: str = "document"
+    ) -> List[List[float]]:
+        """Embed consecutive batches and return their vectors in order.
+
+        Providers with a request engine keep several batches in flight; each
+        response is validated exactly as :meth:`_embed_texts` validates one.
+        Other clients are called one batch at a time.
+        """
+        client = getattr(self, "embedding_client", None)
+        if len(batches) > 1 and isinstance(client, EmbeddingProvider) and client.engine:
+            responses = client.embed_batches_with_provenance(batches, input_type=input_type)
+            vectors: List[List[float]] = []
+            for batch, response in zip(batches, responses):
+                vectors.extend(self._validate_embedding_response(response, len(batch)))
+            return vectors
+        vectors = []
+        for batch in batches:
+            vectors.extend(self._embed_texts(batch, input_type=input_type))
+        return vectors
+
     def _max_chunk_chars(self) -> int:
         """Return max chunk size for embedding payloads."""
         raw = os.environ.get("SEMANTIC_MAX_CHARS", "12000")
@@ -2745,40 +2771,50 @@ class SemanticIndexer:
 
         # Phase 3: embed in token-aware batches.
         # Voyage AI enforces a hard 120 000-token-per-request limit in addition to
-        # the 1 000-input limit.  We estimate tokens as len(text)//4 (a conservative
-        # approximation) and split whenever the running total would exceed the budget.
-        MAX_TOKENS_PER_BATCH = 100_000  # stay under the 120 000 hard limit
-        all_embeds: List[List[float]] = []
+        # the 1 000-input limit.  When the configured vocabulary is declared to be
+        # this model's own, batches are packed close to the limit (leaving room
+        # for the provider's per-input special tokens).  Any other count, exact
+        # or not, is an estimate of the provider's and keeps a wide margin.
+        tokenizer = get_tokenizer()
+        if tokenizer.matches_model(self.embedding_model):
+            max_tokens_per_batch = 118_000
+            per_input_overhead = 2
+        else:
+            max_tokens_per_batch = 100_000  # stay under the 120 000 hard limit
+            per_input_overhead = 0
+        batches: List[List[str]] = []
         batch: List[str] = []
-        batch_token_est = 0
+        batch_tokens = 0
         batch_start_idx = 0
 
-        def _flush_batch(b: List[str], start: int) -> None:
+        def _flush_batch(b: List[str], start: int, tokens: int) -> None:
             if not b:
                 return
             logger.info(
-                "Embedding texts %d–%d of %d (~%d estimated tokens)",
+                "Embedding texts %d–%d of %d (%s%d tokens)",
                 start + 1,
                 start + len(b),
                 len(all_texts),
-                sum(len(t) // 4 for t in b),
+                "" if tokenizer.exact else "~",
+                tokens,
             )
-            all_embeds.extend(self._embed_texts(b, input_type="document"))
+            batches.append(b)
 
         for idx, text in enumerate(all_texts):
-            token_est = max(1, len(text) // 4)
+            text_tokens = max(1, tokenizer.count(text)) + per_input_overhead
             # Flush when adding this text would exceed either limit
             if batch and (
-                len(batch) >= embed_batch_size or batch_token_est + token_est > MAX_TOKENS_PER_BATCH
+                len(batch) >= embed_batch_size or batch_tokens + text_tokens > max_tokens_per_batch
             ):
-                _flush_batch(batch, batch_start_idx)
+                _flush_batch(batch, batch_start_idx, batch_tokens)
                 batch = []
-                batch_token_est = 0
+                batch_tokens = 0
                 batch_start_idx = idx
             batch.append(text)
-            batch_token_est += token_est
+            batch_tokens += text_tokens
 
-        _flush_batch(batch, batch_start_idx)
+        _flush_batch(batch, batch_start_idx, batch_tokens)
+        all_embeds = self._embed_text_batches(batches, input_type="document")
 
         # Phase 4: store per-file using pre-computed embeddings
         indexed = 0
@@ -2846,53 +2882,57 @@ class SemanticIndexer:
                 "Check connection status with validate_connection()."
             )
 
-        if self._provider_supports_provenance():
-            try:
-                response = self.embedding_client.embed_with_provenance(
-                    [text], input_type="query"
-                )
-                embedding = self._validate_embedding_response(response, 1)[0]
-            except Exception as e:
-                raise RuntimeError(f"Failed to generate query embedding: {e}")
-            # Fail closed if the query model drifted from the indexed vectors.
-            self._check_query_provenance(response)
-        else:
-            try:
-                embedding = self._embed_texts([text], input_type="query")[0]
-            except Exception as e:
-                raise RuntimeError(f"Failed to generate query embedding: {e}")
+        with trace_span("semantic.embed_query"):
+            if self._provider_supports_provenance():
+                try:
+                    response = self.embedding_client.embed_with_provenance(
+                        [text], input_type="query"
+                    )
+                    embedding = self._validate_embedding_response(response, 1)[0]
+                except Exception as e:
+                    raise RuntimeError(f"Failed to generate query embedding: {e}")
+                # Fail closed if the query model drifted from the indexed vectors.
+                self._check_query_provenance(response)
+            else:
+                try:
+                    embedding = self._embed_texts([text], input_type="query")[0]
+                except Exception as e:
+                    raise RuntimeError(f"Failed to generate query embedding: {e}")
 
         query_limit = limit
         if self._looks_like_code_intent(text):
             query_limit = min(max(limit * 4, limit), 50)
 
         try:
-            if hasattr(self.qdrant, "search"):
-                results = self.qdrant.search(
-                    collection_name=self.collection,
-                    query_vector=embedding,
-                    limit=query_limit,
-                )
-            else:
-                response = self.qdrant.query_points(
-                    collection_name=self.collection,
-                    query=embedding,
-                    limit=query_limit,
-                    with_payload=True,
-                )
-                results = list(getattr(response, "points", []) or [])
-
-            rerank_input: List[dict[str, Any]] = []
-            for res in results:
-                payload = dict(res.payload or {})
-                # Never surface the reserved collection-provenance sentinel.
-                if payload.get(self.PROVENANCE_TAG):
-                    continue
-                payload["score"] = res.score
-                payload.update(self._semantic_result_metadata())
-                rerank_input.append(payload)
-
-            yield from self._rerank_query_results(text, rerank_input, limit)
+            with trace_span("semantic.vector_search", limit=query_limit):
+                if hasattr(self.qdrant, "search"):
+                    results = self.qdrant.search(
+                        collection_name=self.collection,
+                        query_vector=embedding,
+                        limit=query_limit,
+                    )
+                else:
+                    response = self.qdrant.query_points(
+                        collection_name=self.collection,
+                        query=embedding,
+                        limit=query_limit,
+                        with_payload=True,
+                    )
+                    results = list(getattr(response, "points", []) or [])
+
+                rerank_input: List[dict[str, Any]] = []
+                for res in results:
+                    payload = dict(res.payload or {})
+                    # Never surface the reserved collection-provenance sentinel.
+                    if payload.get(self.PROVENANCE_TAG):
+                        continue
+                    payload["score"] = res.score
+                    payload.update(self._semantic_result_metadata())
+                    rerank_input.append(payload)
+
+            with trace_span("semantic.rerank"):
+                reranked = self._rerank_query_results(text, rerank_input, limit)
+            yield from reranked
         except Exception as e:
             logger.error(f"Qdrant search failed: {type(e).__name__}: {e}")
             self._qdrant_available = False
@@ -3321,7 +3361,38 @@ class SemanticIndexer:
             ),
         }
 
+    def move_semantic_artifacts(
+        self,
+        old_path: Union[str, Path],
+        new_path: Union[str, Path],
+        invalidation: Mapping[str, Any],
+        sqlite_store: Optional["SQLiteStore"] = None,
+    ) -> Dict[str, Any]:
+        """Carry a renamed file's vectors over to ``new_path`` without re-embedding.
+
+        Chunk points keep their vectors and ``semantic_points`` mappings and only
+        get a payload-only path update via :meth:`move_files`.  The file-summary
+        point is keyed by path, so it is dropped together with any invalidated
+        summaries.  Without Qdrant this degrades to
+        :meth:`cleanup_stale_semantic_artifacts`.
+        """
+        profile_id = self.semantic_profile.profile_id
+        if not self._qdrant_available:
+            return self.cleanup_stale_semantic_artifacts(profile_id, invalidation, sqlite_store)
+
+        moved = self.move_files([(old_path, new_path)])
+        path_keyed = dict(invalidation)
+        path_keyed["vector_chunk_ids"] = [
+            chunk_id
+            for chunk_id in invalidation.get("vector_chunk_ids", []) or []
+            if chunk_id == invalidation.get("file_summary_chunk_id")
+        ]
+        stats = self.cleanup_stale_semantic_artifacts(profile_id, path_keyed, sqlite_store)
+        stats["vectors_moved"] = sum(moved.values())
+        return stats
+
     # ------------------------------------------------------------------
+    @traced("semantic.query")
     def search(self, query: str, limit: int = 20) -> list[dict[str, Any]]:
         """Search for code using semantic similarity.
 
@@ -3696,6 +3767,16 @@ class SemanticIndexer:
     # File operation methods for path management
     # ------------------------------------------------------------------
 
+    def _path_metadata(self) -> PointPathMetadata:
+        return PointPathMetadata(self.qdrant, self.collection)
+
+    def _relative_path(self, file_path: Union[str, Path]) -> str:
+        try:
+            return self.path_resolver.normalize_path(file_path)
+        except ValueError:
+            # Path might already be relative
+            return str(file_path).replace("\\", "/")
+
     def remove_file(self, file_path: Union[str, Path]) -> int:
         """Remove all embeddings for a file from the index.
 
@@ -3711,42 +3792,15 @@ class SemanticIndexer:
         if not self._qdrant_available:
             raise RuntimeError(f"Qdrant is not available - cannot remove file {file_path}")
 
-        # Normalize to relative path
-        try:
-            relative_path = self.path_resolver.normalize_path(file_path)
-        except ValueError:
-            # Path might already be relative
-            relative_path = str(file_path).replace("\\", "/")
-
-        # Search for all points with this file
-        filter_condition = Filter(
-            must=[FieldCondition(key="relative_path", match=MatchValue(value=relative_path))]
-        )
+        relative_path = self._relative_path(file_path)
 
         try:
-            # Get count before deletion for logging
-            search_result = self.qdrant.search(
-                collection_name=self.collection,
-                query_vector=[0.0] * self.embedding_dimension,  # Dummy vector
-                filter=filter_condition,
-                limit=1000,  # Get all matches
-                with_payload=False,
-                with_vectors=False,
-            )
-
-            point_ids = [point.id for point in search_result]
-
-            if point_ids:
-                # Delete all points
-                self.qdrant.delete(
-                    collection_name=self.collection,
-                    points_selector=models.PointIdsList(points=point_ids),
-                )
-                logger.info(f"Removed {len(point_ids)} embeddings for file: {relative_path}")
+            removed = self._path_metadata().delete([relative_path])[relative_path]
+            if removed:
+                logger.info(f"Removed {removed} embeddings for file: {relative_path}")
                 # Incremental mutation: fail-closed by dropping the provenance sentinel.
                 self._invalidate_collection_provenance()
-
-            return len(point_ids)
+            return removed
         except Exception as e:
             logger.error(f"Failed to remove file {relative_path}: {type(e).__name__}: {e}")
             self._qdrant_available = False
@@ -3763,7 +3817,7 @@ class SemanticIndexer:
         Args:
             old_path: Old file path
             new_path: New file path
-            content_hash: Optional content hash for verification
+            content_hash: Optional content hash; only points carrying it are moved
 
         Returns:
             Number of points updated
@@ -3776,97 +3830,91 @@ class SemanticIndexer:
                 f"Qdrant is not available - cannot move file {old_path} -> {new_path}"
             )
 
-        # Normalize paths
         old_relative = self.path_resolver.normalize_path(old_path)
-        new_relative = self.path_resolver.normalize_path(new_path)
+        moved = self.move_files([(old_path, new_path, content_hash)])
+        if not moved.get(old_relative):
+            logger.warning(f"No embeddings found for file: {old_relative}")
+        return moved.get(old_relative, 0)
 
-        # Find all points for the old file
-        filter_condition = Filter(
-            must=[FieldCondition(key="relative_path", match=MatchValue(value=old_relative))]
-        )
-
-        try:
-            # Search for all points
-            search_result = self.qdrant.search(
-                collection_name=self.collection,
-                query_vector=[0.0] * self.embedding_dimension,  # Dummy vector
-                filter=filter_condition,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False,
-            )
+    def move_files(
+        self,
+        moves: Union[
+            Mapping[Union[str, Path], Union[str, Path]],
+            Iterable[Sequence[Any]],
+        ],
+    ) -> Dict[str, int]:
+        """Apply a batch of renames as payload-only updates in a single request.
+
+        ``moves`` is either a rename map (``{old: new}``, e.g. from ``git diff
+        -M``) or an iterable of ``(old, new)`` / ``(old, new, content_hash)``
+        tuples as produced by the watcher.  Only ``relative_path`` and ``file``
+        change; vectors are never fetched or re-sent.  Chains and swaps within
+        the batch are applied as if simultaneous.
 
-            if not search_result:
-                logger.warning(f"No embeddings found for file: {old_relative}")
-                return 0
-
-            # Update payloads with new path
-            updated_points = []
-            for point in search_result:
-                # Update payload
-                new_payload = point.payload.copy()
-                new_payload["relative_path"] = new_relative
-                new_payload["file"] = str(new_path)  # Update absolute path too
-
-                # Verify content hash if provided
-                if content_hash and new_payload.get("content_hash") != content_hash:
-                    logger.warning(f"Content hash mismatch for {old_relative} -> {new_relative}")
-                    continue
+        Returns:
+            Points moved, keyed by old relative path
 
-                updated_points.append(
-                    models.PointStruct(
-                        id=point.id,
-                        payload=new_payload,
-                        vector=[],  # Empty vector, we're only updating payload
-                    )
+        Raises:
+            RuntimeError: If Qdrant is unavailable or update fails
+        """
+        items = moves.items() if isinstance(moves, Mapping) else moves
+        path_moves = []
+        for item in items:
+            old_path, new_path = item[0], item[1]
+            content_hash = item[2] if len(item) > 2 else None
+            path_moves.append(
+                PathMove(
+                    old_relative=self.path_resolver.normalize_path(old_path),
+                    new_relative=self.path_resolver.normalize_path(new_path),
+                    new_file=str(new_path),
+                    content_hash=content_hash,
                 )
+            )
+        if not path_moves:
+            return {}
+        if not self._qdrant_available:
+            raise RuntimeError(f"Qdrant is not available - cannot move {len(path_moves)} file(s)")
 
-            # Batch update payloads
-            if updated_points:
-                # PAYLOAD-ONLY update on EXISTING points: re-fetches the existing
-                # vectors and re-attaches them unchanged (no re-embed / no source
-                # egress), only the relative_path/file payload changes. This is
-                # metadata maintenance, not a new attested write, so it correctly
-                # does NOT go through the _prepare_for_writes attestation gate.
-                point_ids = [p.id for p in updated_points]
-
-                # Fetch full points with vectors
-                full_points = self.qdrant.retrieve(
-                    collection_name=self.collection,
-                    ids=point_ids,
-                    with_payload=True,
-                    with_vectors=True,
-                )
+        try:
+            # PAYLOAD-ONLY update on EXISTING points (no re-embed / no source
+            # egress). This is metadata maintenance, not a new attested write,
+            # so it correctly does NOT go through the _prepare_for_writes gate.
+            moved = self._path_metadata().move(path_moves)
+        except Exception as e:
+            logger.error(f"Failed to move {len(path_moves)} file(s): {type(e).__name__}: {e}")
+            self._qdrant_available = False
+            raise RuntimeError(f"Failed to move files in Qdrant: {e}")
 
-                # Create new points with updated payloads
-                new_points = []
-                for i, full_point in enumerate(full_points):
-                    new_points.append(
-                        models.PointStruct(
-                            id=full_point.id,
-                            vector=full_point.vector,
-                            payload=updated_points[i].payload,
-                        )
-                    )
+        total = sum(moved.values())
+        if total:
+            logger.info(f"Updated {total} embeddings across {len(path_moves)} moved file(s)")
+            # Incremental mutation: fail-closed by dropping the provenance sentinel.
+            self._invalidate_collection_provenance()
+        return moved
 
-                # Upsert updated points
-                self.qdrant.upsert(collection_name=self.collection, points=new_points)
+    def update_chunk_payloads(self, payloads: Mapping[str, Dict[str, Any]]) -> int:
+        """Rewrite payload fields of existing chunk points, keyed by ``chunk_id``.
 
-                logger.info(
-                    f"Updated {len(new_points)} embeddings: {old_relative} -> {new_relative}"
-                )
-                # Incremental mutation: fail-closed by dropping the provenance sentinel.
-                self._invalidate_collection_provenance()
+        Used for chunks whose text is unchanged but whose position moved, so
+        their ``line``/``span`` stay current without re-embedding.
 
-            return len(updated_points)
+        Returns:
+            Number of chunks updated
+
+        Raises:
+            RuntimeError: If Qdrant is unavailable or update fails
+        """
+        if not payloads:
+            return 0
+        if not self._qdrant_available:
+            raise RuntimeError(f"Qdrant is not available - cannot update {len(payloads)} chunk(s)")
+        try:
+            # Payload-only maintenance of existing points, like move_files.
+            return self._path_metadata().update_chunks(payloads)
         except Exception as e:
-            logger.error(
-                f"Failed to move file {old_relative} -> {new_relative}: " f"{type(e).__name__}: {e}"
-            )
+            logger.error(f"Failed to update {len(payloads)} chunk(s): {type(e).__name__}: {e}")
             self._qdrant_available = False
-            raise RuntimeError(
-                f"Failed to move file {old_relative} -> {new_relative} in Qdrant: {e}"
-            )
+            raise RuntimeError(f"Failed to update chunk payloads in Qdrant: {e}")
 
     def get_embeddings_by_content_hash(self, content_hash: str) -> List[Dict[str, Any]]:
         """Get all embeddings with a specific content hash.
@@ -3888,16 +3936,8 @@ class SemanticIndexer:
         )
 
         try:
-            results = self.qdrant.search(
-                collection_name=self.collection,
-                query_vector=[0.0] * self.embedding_dimension,  # Dummy vector
-                filter=filter_condition,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False,
-            )
-
-            return [{"id": res.id, **res.payload} for res in results]
+            points = self._path_metadata().scroll(filter_condition, with_payload=True)
+            return [{"id": point.id, **(point.payload or {})} for point in points]
         except Exception as e:
             logger.error(f"Failed to get embeddings by content hash: {type(e).__name__}: {e}")
             self._qdrant_available = False
@@ -3918,61 +3958,17 @@ class SemanticIndexer:
         if not self._qdrant_available:
             raise RuntimeError(f"Qdrant is not available - cannot mark file {file_path} as deleted")
 
-        # This is similar to move_file but only updates is_deleted flag
         relative_path = self.path_resolver.normalize_path(file_path)
 
-        filter_condition = Filter(
-            must=[FieldCondition(key="relative_path", match=MatchValue(value=relative_path))]
-        )
-
         try:
-            # Search and update
-            search_result = self.qdrant.search(
-                collection_name=self.collection,
-                query_vector=[0.0] * self.embedding_dimension,
-                filter=filter_condition,
-                limit=1000,
-                with_payload=True,
-                with_vectors=False,
-            )
-
-            if not search_result:
-                return 0
-
-            # Update is_deleted flag
-            point_ids = []
-            for point in search_result:
-                point.payload["is_deleted"] = True
-                point_ids.append(point.id)
-
-            # PAYLOAD-ONLY update on EXISTING points: re-fetches the existing
-            # vectors and re-attaches them unchanged (no re-embed / no source
-            # egress), only the is_deleted flag changes. Metadata maintenance, not
-            # a new attested write, so it correctly bypasses _prepare_for_writes.
-            # Re-fetch and update (same process as move_file)
-            full_points = self.qdrant.retrieve(
-                collection_name=self.collection,
-                ids=point_ids,
-                with_payload=True,
-                with_vectors=True,
-            )
-
-            updated_points = []
-            for i, full_point in enumerate(full_points):
-                updated_points.append(
-                    models.PointStruct(
-                        id=full_point.id,
-                        vector=full_point.vector,
-                        payload=search_result[i].payload,
-                    )
-                )
-
-            self.qdrant.upsert(collection_name=self.collection, points=updated_points)
-
-            logger.info(f"Marked {len(updated_points)} embeddings as deleted for: {relative_path}")
-            # Incremental mutation: fail-closed by dropping the provenance sentinel.
-            self._invalidate_collection_provenance()
-            return len(updated_points)
+            # PAYLOAD-ONLY update of the is_deleted flag; bypasses _prepare_for_writes
+            # for the same reason as move_files.
+            marked = self._path_metadata().mark_deleted([relative_path])[relative_path]
+            if marked:
+                logger.info(f"Marked {marked} embeddings as deleted for: {relative_path}")
+                # Incremental mutation: fail-closed by dropping the provenance sentinel.
+                self._invalidate_collection_provenance()
+            return marked
         except Exception as e:
             logger.error(
                 f"Failed to mark file {relative_path} as deleted: " f"{type(e).__name__}: {e}"
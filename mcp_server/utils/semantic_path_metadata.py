@@ -0,0 +1,193 @@
+"""Payload-only path maintenance for semantic (Qdrant) points.
+
+File moves and soft deletes only change a point's ``relative_path``/``file``
+or ``is_deleted`` payload, so they never need the vectors.  This module locates
+points with payload filters, counts them with paginated ``scroll`` calls that
+return only ids and the fields being matched, and applies every change for a
+batch as filtered ``set_payload``/delete operations in one
+``batch_update_points`` request.  There is no cap on chunks per file.
+Document chunks that moved within their file get their position payload
+updated the same way, keyed by ``chunk_id``.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from qdrant_client.http import models
+from qdrant_client.http.models import FieldCondition, Filter, MatchAny, MatchValue
+
+logger = logging.getLogger(__name__)
+
+_SCROLL_PAGE_SIZE = 1024
+# Paths per ``MatchAny`` condition when counting a large batch.
+_PATHS_PER_SCROLL = 256
+_TEMP_PATH_PREFIX = "\x00moving:"
+
+
+@dataclass(frozen=True)
+class PathMove:
+    """Rename of every point whose ``relative_path`` is ``old_relative``."""
+
+    old_relative: str
+    new_relative: str
+    new_file: str
+    content_hash: Optional[str] = None
+
+
+def path_filter(relative_path: str, content_hash: Optional[str] = None) -> Filter:
+    conditions = [FieldCondition(key="relative_path", match=MatchValue(value=relative_path))]
+    if content_hash:
+        conditions.append(FieldCondition(key="content_hash", match=MatchValue(value=content_hash)))
+    return Filter(must=conditions)
+
+
+def sequence_moves(moves: Sequence[PathMove]) -> List[Tuple[PathMove, Dict[str, Any]]]:
+    """Order moves so applying them one after another equals applying them at once.
+
+    Filtered updates in a batch run sequentially, so ``a -> b`` followed by
+    ``b -> c`` would carry ``a``'s points on to ``c``.  Moves whose source is
+    still needed as another move's destination are delayed; cycles such as a
+    swap are broken through a temporary path.  Returns ``(filter_move,
+    payload)`` pairs where ``filter_move`` names the source path to match.
+    """
+    pending: Dict[str, PathMove] = {m.old_relative: m for m in moves}
+    ordered: List[Tuple[PathMove, Dict[str, Any]]] = []
+
+    def payload_for(move: PathMove) -> Dict[str, Any]:
+        return {"relative_path": move.new_relative, "file": move.new_file}
+
+    while pending:
+        # A move is safe once no pending move still reads from its destination.
+        ready = [m for src, m in pending.items() if m.new_relative not in pending]
+        if ready:
+            for move in ready:
+                ordered.append((move, payload_for(move)))
+                del pending[move.old_relative]
+            continue
+        # Only cycles remain: park one source on a temporary path.
+        src, move = next(iter(pending.items()))
+        temp = f"{_TEMP_PATH_PREFIX}{src}"
+        ordered.append((move, {"relative_path": temp}))
+        pending[temp] = PathMove(temp, move.new_relative, move.new_file)
+        del pending[src]
+    return ordered
+
+
+class PointPathMetadata:
+    """Moves, soft-deletes and deletes a collection's points by file path."""
+
+    def __init__(self, client: Any, collection: str, page_size: int = _SCROLL_PAGE_SIZE):
+        self.client = client
+        self.collection = collection
+        self.page_size = page_size
+
+    def scroll(self, scroll_filter: Filter, with_payload: Any = False) -> Iterator[Any]:
+        """Yield every point matching ``scroll_filter``, one page at a time (no vectors)."""
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                scroll_filter=scroll_filter,
+                limit=self.page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    def count_by_path(
+        self, relative_paths: Iterable[str], content_hashes: Optional[Dict[str, str]] = None
+    ) -> Counter:
+        """Count points per ``relative_path`` (restricted to ``content_hashes`` when given)."""
+        paths = list(dict.fromkeys(relative_paths))
+        content_hashes = content_hashes or {}
+        fields = ["relative_path", "content_hash"] if content_hashes else ["relative_path"]
+        counts: Counter = Counter()
+        for start in range(0, len(paths), _PATHS_PER_SCROLL):
+            group = paths[start : start + _PATHS_PER_SCROLL]
+            scroll_filter = Filter(
+                must=[FieldCondition(key="relative_path", match=MatchAny(any=group))]
+            )
+            for point in self.scroll(scroll_filter, with_payload=fields):
+                payload = point.payload or {}
+                path = payload.get("relative_path")
+                expected = content_hashes.get(path)
+                if expected and payload.get("content_hash") != expected:
+                    continue
+                counts[path] += 1
+        return counts
+
+    def move(self, moves: Sequence[PathMove]) -> Dict[str, int]:
+        """Rename all points of each move in one request; returns points moved per old path."""
+        moves = [m for m in moves if m.old_relative != m.new_relative]
+        if not moves:
+            return {}
+        hashes = {m.old_relative: m.content_hash for m in moves if m.content_hash}
+        counts = self.count_by_path((m.old_relative for m in moves), hashes)
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(
+                    payload=payload,
+                    filter=path_filter(move.old_relative, move.content_hash),
+                )
+            )
+            for move, payload in sequence_moves([m for m in moves if counts[m.old_relative]])
+        ]
+        if operations:
+            self.client.batch_update_points(
+                collection_name=self.collection, update_operations=operations
+            )
+        return {m.old_relative: counts[m.old_relative] for m in moves}
+
+    def mark_deleted(self, relative_paths: Sequence[str]) -> Dict[str, int]:
+        """Set ``is_deleted`` on every point of each path in one request."""
+        counts = self.count_by_path(relative_paths)
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(payload={"is_deleted": True}, filter=path_filter(p))
+            )
+            for p in counts
+        ]
+        if operations:
+            self.client.batch_update_points(
+                collection_name=self.collection, update_operations=operations
+            )
+        return {p: counts[p] for p in relative_paths}
+
+    def delete(self, relative_paths: Sequence[str]) -> Dict[str, int]:
+        """Delete every point of each path in one request."""
+        counts = self.count_by_path(relative_paths)
+        operations = [
+            models.DeleteOperation(delete=models.FilterSelector(filter=path_filter(p)))
+            for p in counts
+        ]
+        if operations:
+            self.client.batch_update_points(
+                collection_name=self.collection, update_operations=operations
+            )
+        return {p: counts[p] for p in relative_paths}
+
+    def update_chunks(self, payloads: Mapping[str, Dict[str, Any]]) -> int:
+        """Set ``payloads[chunk_id]`` on the points of each chunk in one request."""
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(
+                    payload=payload,
+                    filter=Filter(
+                        must=[FieldCondition(key="chunk_id", match=MatchValue(value=chunk_id))]
+                    ),
+                )
+            )
+            for chunk_id, payload in payloads.items()
+        ]
+        if operations:
+            self.client.batch_update_points(
+                collection_name=self.collection, update_operations=operations
+            )
+        return len(operations)
@@ -3,12 +3,14 @@
 from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple
 
+from .tokenizer import get_tokenizer
+
 
 @dataclass
 class TokenCounter:
     """Simple token counter with cost estimation for various models."""
 
-    # Rough estimation: 4 characters ≈ 1 token (industry standard approximation)
+    # Rough estimation used without a vocabulary: 4 characters ≈ 1 token
     CHARS_PER_TOKEN = 4
 
     # Model pricing per 1M tokens (as of 2024)
@@ -43,27 +45,19 @@ class TokenCounter:
     @staticmethod
     def count_tokens(text: str, model: str = "gpt-4") -> int:
         """
-        Count tokens in text using character-based estimation.
+        Count tokens in text.
+
+        Exact when a BPE vocabulary is configured (``MCP_TOKENIZER_VOCAB``),
+        otherwise a character-based estimate.
 
         Args:
             text: Text to count tokens for
-            model: Model name (used for tracking, estimation is the same)
+            model: Model name (used for tracking; counting uses the configured vocabulary)
 
         Returns:
-            Estimated token count
+            Token count
         """
-        if not text:
-            return 0
-
-        # Basic character-based estimation
-        token_count = len(text) // TokenCounter.CHARS_PER_TOKEN
-
-        # Account for whitespace and special characters (slight adjustment)
-        whitespace_count = text.count(" ") + text.count("\n") + text.count("\t")
-        token_count += whitespace_count // 10  # Minor adjustment for formatting
-
-        # Ensure at least 1 token for non-empty text
-        return max(1, token_count)
+        return get_tokenizer().count(text)
 
     def add_input_tokens(self, text: str, model: str = "gpt-4") -> int:
         """Add tokens from input text and return count."""
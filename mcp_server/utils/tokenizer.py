@@ -0,0 +1,438 @@
+"""Exact BPE token counting from local vocabulary files.
+
+Chunk budgets, embedding batch packing and cost accounting all need token
+counts.  A character-ratio estimate is wrong in both directions: underestimates
+get whole embedding batches rejected by the provider, overestimates leave
+batches half full.  When a byte-level BPE vocabulary is available locally this
+module counts exactly; otherwise it falls back to the heuristic the rest of
+the code has always used.
+
+Supported vocabulary files (``MCP_TOKENIZER_VOCAB``):
+
+- tiktoken rank files (``cl100k_base.tiktoken``): one ``<base64 token> <rank>``
+  per line;
+- Hugging Face ``tokenizer.json`` files with a byte-level BPE model, whose
+  merge list is converted to ranks.
+
+Encoding works like tiktoken.  Text is first split into pieces with the
+encoding's pre-tokenizer regex.  Each piece is then merged bottom-up, always
+merging the lowest-ranked adjacent pair first.  Source code repeats the same
+identifiers and punctuation runs constantly, so per-piece results are
+memoized.  Whole-text counts are cached by content hash, because the same
+chunk is counted by the chunker, the batch packer and the cost tracker.
+
+Pre-tokenizer patterns use ``\\p{L}``-style classes, which need the
+third-party ``regex`` module; without it the heuristic is used.
+"""
+
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from mcp_server.config.env_vars import (
+    get_token_count_cache_size,
+    get_tokenizer_encoding,
+    get_tokenizer_models,
+    get_tokenizer_vocab,
+)
+
+try:
+    import regex
+
+    REGEX_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without the regex package
+    regex = None
+    REGEX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+# Pre-tokenizer patterns, as published with each encoding.
+GPT2_PATTERN = (
+    r"""'(?:[sdmt]|ll|ve|re)| ?\p{L}++| ?\p{N}++| ?[^\s\p{L}\p{N}]++|\s++$|\s+(?!\S)|\s"""
+)
+CL100K_PATTERN = (
+    r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+"""
+    r"""| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+)
+O200K_PATTERN = "|".join(
+    [
+        r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+"""
+        r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+        r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*"""
+        r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+        r"""\p{N}{1,3}""",
+        r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+        r"""\s*[\r\n]+""",
+        r"""\s+(?!\S)""",
+        r"""\s+""",
+    ]
+)
+
+PATTERNS: Dict[str, str] = {
+    "gpt2": GPT2_PATTERN,
+    "r50k_base": GPT2_PATTERN,
+    "p50k_base": GPT2_PATTERN,
+    "cl100k_base": CL100K_PATTERN,
+    "o200k_base": O200K_PATTERN,
+}
+
+_NO_RANK = 1 << 62
+
+
+def heuristic_token_count(text: str) -> int:
+    """Character-based estimate: ~4 characters per token plus a formatting allowance."""
+    if not text:
+        return 0
+    token_count = len(text) // CHARS_PER_TOKEN
+    whitespace_count = text.count(" ") + text.count("\n") + text.count("\t")
+    token_count += whitespace_count // 10
+    return max(1, token_count)
+
+
+class TokenCountCache:
+    """Bounded LRU of token counts keyed by a digest of the text."""
+
+    def __init__(self, max_entries: int = 65_536):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(namespace: str, text: str) -> bytes:
+        digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16)
+        digest.update(namespace.encode("utf-8"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[int]:
+        with self._lock:
+            count = self._entries.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: bytes, count: int) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses}
+
+
+class HeuristicTokenizer:
+    """Fallback used when no vocabulary is configured or it cannot be loaded."""
+
+    name = "heuristic"
+    exact = False
+
+    def __init__(self, reason: str = "no vocabulary configured"):
+        self.reason = reason
+
+    def matches_model(self, model: str) -> bool:
+        return False
+
+    def count(self, text: str) -> int:
+        return heuristic_token_count(text)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, max_tokens) * CHARS_PER_TOKEN]
+
+    def stats(self) -> Dict[str, object]:
+        return {"name": self.name, "exact": False, "reason": self.reason}
+
+
+class BPETokenizer:
+    """Byte-level BPE tokenizer over a ``bytes -> rank`` table."""
+
+    exact = True
+
+    def __init__(
+        self,
+        ranks: Dict[bytes, int],
+        pattern: str,
+        *,
+        name: str = "bpe",
+        models: Iterable[str] = (),
+        piece_cache_size: int = 65_536,
+        count_cache: Optional[TokenCountCache] = None,
+    ):
+        if regex is None:
+            raise ImportError("the 'regex' package is required for exact BPE tokenization")
+        missing = [b for b in range(256) if bytes([b]) not in ranks]
+        if missing:
+            raise ValueError(
+                f"vocabulary {name!r} is not byte-level: {len(missing)} single bytes have no rank"
+            )
+        self.name = name
+        self.models: FrozenSet[str] = frozenset(models)
+        self._ranks = ranks
+        self._pattern = regex.compile(pattern)
+        self._cache = count_cache if count_cache is not None else TokenCountCache()
+        self._piece_tokens = functools.lru_cache(maxsize=piece_cache_size)(self._bpe)
+
+    @property
+    def vocab_size(self) -> int:
+        return len(self._ranks)
+
+    def matches_model(self, model: str) -> bool:
+        """Whether this vocabulary was declared to be ``model``'s own tokenizer.
+
+        Exact counts from a different model's vocabulary are still only an
+        estimate of what that provider will bill and enforce.
+        """
+        return model in self.models
+
+    def _bpe(self, piece: bytes) -> Tuple[int, ...]:
+        """Merge ``piece`` into tokens, lowest-ranked adjacent pair first."""
+        ranks = self._ranks
+        # parts[i]..parts[i + 1] is the i-th current token; pair_ranks[i] is
+        # the rank the i-th and (i + 1)-th tokens would have merged.
+        parts = list(range(len(piece) + 1))
+        pair_ranks = [ranks.get(piece[i : i + 2], _NO_RANK) for i in range(len(piece) - 1)]
+        while pair_ranks:
+            best = min(pair_ranks)
+            if best == _NO_RANK:
+                break
+            i = pair_ranks.index(best)
+            del parts[i + 1]
+            del pair_ranks[i]
+            if i < len(pair_ranks):
+                pair_ranks[i] = ranks.get(piece[parts[i] : parts[i + 2]], _NO_RANK)
+            if i > 0:
+                pair_ranks[i - 1] = ranks.get(piece[parts[i - 1] : parts[i + 1]], _NO_RANK)
+        return tuple(ranks[piece[parts[i] : parts[i + 1]]] for i in range(len(parts) - 1))
+
+    def encode(self, text: str) -> List[int]:
+        ranks = self._ranks
+        tokens: List[int] = []
+        for piece in self._pattern.findall(text):
+            data = piece.encode("utf-8", "surrogatepass")
+            rank = ranks.get(data)
+            if rank is not None:
+                tokens.append(rank)
+            else:
+                tokens.extend(self._piece_tokens(data))
+        return tokens
+
+    def _count_uncached(self, text: str) -> int:
+        ranks = self._ranks
+        total = 0
+        for piece in self._pattern.findall(text):
+            data = piece.encode("utf-8", "surrogatepass")
+            total += 1 if data in ranks else len(self._piece_tokens(data))
+        return total
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        key = TokenCountCache.key(self.name, text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        total = self._count_uncached(text)
+        self._cache.put(key, total)
+        return total
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Longest prefix of ``text`` ending on a piece boundary within ``max_tokens``."""
+        ranks = self._ranks
+        used = 0
+        end = 0
+        for match in self._pattern.finditer(text):
+            data = match.group().encode("utf-8", "surrogatepass")
+            cost = 1 if data in ranks else len(self._piece_tokens(data))
+            if used + cost > max_tokens:
+                break
+            used += cost
+            end = match.end()
+        return text[:end]
+
+    def stats(self) -> Dict[str, object]:
+        info = self._piece_tokens.cache_info()
+        return {
+            "name": self.name,
+            "exact": True,
+            "models": sorted(self.models),
+            "vocab_size": self.vocab_size,
+            "piece_cache": {"entries": info.currsize, "hits": info.hits, "misses": info.misses},
+            "count_cache": self._cache.stats(),
+        }
+
+
+Tokenizer = Union[BPETokenizer, HeuristicTokenizer]
+
+
+# -- vocabulary loading -------------------------------------------------------
+
+
+def load_tiktoken_ranks(path: Union[str, Path]) -> Dict[bytes, int]:
+    ranks: Dict[bytes, int] = {}
+    with open(path, "rb") as handle:
+        for line_no, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                token, rank = line.split()
+                ranks[base64.b64decode(token)] = int(rank)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{line_no}: not a tiktoken rank line") from exc
+    return ranks
+
+
+def _byte_unicode_table() -> Dict[str, int]:
+    """Inverse of GPT-2's printable-character encoding of raw bytes."""
+    printable = (
+        list(range(ord("!"), ord("~") + 1))
+        + list(range(ord("¡"), ord("¬") + 1))
+        + list(range(ord("®"), ord("ÿ") + 1))
+    )
+    chars = list(printable)
+    extra = 0
+    for byte in range(256):
+        if byte not in printable:
+            printable.append(byte)
+            chars.append(256 + extra)
+            extra += 1
+    return {chr(c): b for b, c in zip(printable, chars)}
+
+
+def load_hf_tokenizer_json(path: Union[str, Path]) -> Tuple[Dict[bytes, int], Optional[str]]:
+    """Ranks and pre-tokenizer pattern from a byte-level BPE ``tokenizer.json``."""
+    with open(path, "r", encoding="utf-8") as handle:
+        spec = json.load(handle)
+    model = spec.get("model") or {}
+    if model.get("type") != "BPE":
+        raise ValueError(f"{path}: only BPE tokenizer.json models are supported")
+    to_byte = _byte_unicode_table()
+
+    def decode(symbol: str) -> bytes:
+        try:
+            return bytes(to_byte[ch] for ch in symbol)
+        except KeyError as exc:
+            raise ValueError(f"{path}: vocabulary is not byte-level BPE") from exc
+
+    # Single bytes rank first, then every merge in priority order -- the same
+    # conversion tiktoken applies to GPT-2's vocab.bpe.
+    ranks: Dict[bytes, int] = {bytes([b]): b for b in range(256)}
+    for merge in model.get("merges") or []:
+        left, right = merge.split(" ", 1) if isinstance(merge, str) else merge
+        merged = decode(left) + decode(right)
+        ranks.setdefault(merged, len(ranks))
+
+    pattern = None
+    pre = spec.get("pre_tokenizer") or {}
+    for step in pre.get("pretokenizers") or [pre]:
+        if step.get("type") == "Split":
+            pattern = (step.get("pattern") or {}).get("Regex")
+        elif step.get("type") == "ByteLevel" and step.get("use_regex", True) and pattern is None:
+            pattern = GPT2_PATTERN
+    return ranks, pattern
+
+
+def load_tokenizer(
+    path: Union[str, Path],
+    *,
+    encoding: Optional[str] = None,
+    models: Iterable[str] = (),
+    count_cache_size: int = 65_536,
+) -> BPETokenizer:
+    """Build a :class:`BPETokenizer` from a tiktoken or ``tokenizer.json`` file.
+
+    ``encoding`` picks the pre-tokenizer pattern; by default it is inferred
+    from the file name (``o200k_base.tiktoken``) and falls back to cl100k.
+    ``models`` names the embedding models this vocabulary belongs to.
+    """
+    path = Path(path)
+    cache = TokenCountCache(count_cache_size)
+    if path.suffix == ".json":
+        ranks, pattern = load_hf_tokenizer_json(path)
+        name = encoding or path.parent.name or "tokenizer"
+        pattern = PATTERNS.get(encoding or "", pattern) or GPT2_PATTERN
+    else:
+        ranks = load_tiktoken_ranks(path)
+        name = encoding or path.stem
+        pattern = PATTERNS.get(name, CL100K_PATTERN)
+    return BPETokenizer(ranks, pattern, name=name, models=models, count_cache=cache)
+
+
+# -- process-wide tokenizer ---------------------------------------------------
+
+_tokenizer: Optional[Tokenizer] = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer() -> Tokenizer:
+    """The configured tokenizer, loaded once; heuristic when unavailable."""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            _tokenizer = _load_configured()
+        return _tokenizer
+
+
+def _load_configured() -> Tokenizer:
+    vocab = get_tokenizer_vocab()
+    if not vocab:
+        return HeuristicTokenizer()
+    if not REGEX_AVAILABLE:
+        logger.warning("MCP_TOKENIZER_VOCAB is set but 'regex' is not installed; estimating")
+        return HeuristicTokenizer("regex package not installed")
+    try:
+        tokenizer = load_tokenizer(
+            vocab,
+            encoding=get_tokenizer_encoding() or None,
+            models=[m.strip() for m in get_tokenizer_models().split(",") if m.strip()],
+            count_cache_size=get_token_count_cache_size(),
+        )
+    except (OSError, ValueError) as exc:
+        logger.warning("Could not load tokenizer vocabulary %s: %s; estimating", vocab, exc)
+        return HeuristicTokenizer(f"failed to load {vocab}: {exc}")
+    logger.info(
+        "Loaded %s tokenizer (%d tokens) from %s", tokenizer.name, tokenizer.vocab_size, vocab
+    )
+    return tokenizer
+
+
+def _reset_tokenizer() -> None:
+    global _tokenizer
+    with _tokenizer_lock:
+        _tokenizer = None
+
+
+def count_tokens(text: str) -> int:
+    return get_tokenizer().count(text)
+
+
+__all__ = [
+    "BPETokenizer",
+    "HeuristicTokenizer",
+    "TokenCountCache",
+    "Tokenizer",
+    "count_tokens",
+    "get_tokenizer",
+    "heuristic_token_count",
+    "load_tokenizer",
+]
@@ -13,6 +13,8 @@ from pathlib import Path
 from tree_sitter import Parser
 from tree_sitter_language_pack import get_language as _get_ts_language
 
+from .incremental_parse import get_parse_cache
+
 
 class TreeSitterWrapper:
     """Utility class around :mod:`tree_sitter` for parsing Python files."""
@@ -42,9 +44,16 @@ class TreeSitterWrapper:
         return f"({node.type} {' '.join(parts)})"
 
     # ------------------------------------------------------------------
-    def parse(self, content: bytes):
-        """Parse ``content`` and return the root :class:`~tree_sitter.Node`."""
+    def parse(self, content: bytes, path: str | Path | None = None):
+        """Parse ``content`` and return the root :class:`~tree_sitter.Node`.
+
+        With ``path`` the previous tree for that file is reused through the
+        shared :class:`~mcp_server.utils.incremental_parse.ParseTreeCache`.
+        """
 
+        if path is not None:
+            key = ("treesitter_wrapper", str(path))
+            return get_parse_cache().parse(key, "python", content).tree.root_node
         tree = self._parser.parse(content)
         return tree.root_node
 
@@ -53,11 +62,11 @@ class TreeSitterWrapper:
         """Parse the given file and return the AST root as an S-expression."""
 
         content = path.read_bytes()
-        root = self.parse(content)
+        root = self.parse(content, path)
         return self._sexp(root)
 
     # Convenience -------------------------------------------------------
     def parse_path(self, path: Path):
         """Parse ``path`` and return the root node."""
 
-        return self.parse(path.read_bytes())
+        return self.parse(path.read_bytes(), path)
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import threading
 import time
+from collections import deque
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Optional
@@ -9,6 +10,12 @@ from typing import Optional
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
+from ..config.env_vars import (
+    get_watcher_storm_batch_size,
+    get_watcher_storm_defer_semantic,
+    get_watcher_storm_quiet_ms,
+    get_watcher_storm_threshold,
+)
 from ..core.path_resolver import PathResolver
 from ..core.repo_context import RepoContext
 from ..dispatcher.dispatcher_enhanced import EnhancedDispatcher
@@ -71,12 +78,22 @@ class _Handler(FileSystemEventHandler):
     """Watchdog handler with path-level debouncing.
 
     Every file event is coalesced into a per-path "pending action" that fires
-    after a quiet window. This prevents rebase/checkout/merge storms from
-    generating thousands of dispatcher calls.
+    after a quiet window.
+
+    When more than ``storm_threshold`` events arrive within
+    ``STORM_WINDOW_SECONDS`` (a checkout, ``npm install``, code generation)
+    the handler switches to storm mode: per-path debouncing stops and events
+    are folded into one deduplicated change set until no event has arrived
+    for ``storm_quiet_seconds``.  The set is then handed to the dispatcher's
+    bulk path (``index_changes``) as batched moves, deletes and reindexes.
+    Sets larger than ``storm_batch_size`` are applied lexically while the
+    storm is still running; with ``defer_semantic`` the semantic re-embed of
+    every batch waits until the storm settles and runs once.
     """
 
     DEBOUNCE_SECONDS = 0.5
     DRAIN_TICK_SECONDS = 0.1
+    STORM_WINDOW_SECONDS = 1.0
 
     def __init__(
         self,
@@ -107,6 +124,24 @@ class _Handler(FileSystemEventHandler):
         # actions: "reindex", "remove", "move" (extra = destination Path)
         self._pending: dict[Path, tuple[float, str, Optional[Path]]] = {}
         self._lock = threading.Lock()
+
+        # Event-storm state (guarded by _lock).  Storm changes are split into
+        # moves (src -> dest) and per-path "reindex"/"remove" actions so a path
+        # can be both a move source and recreated in place.
+        self.storm_threshold = get_watcher_storm_threshold()
+        self.storm_quiet_seconds = get_watcher_storm_quiet_ms() / 1000.0
+        self.storm_batch_size = max(1, get_watcher_storm_batch_size())
+        self.defer_semantic = get_watcher_storm_defer_semantic()
+        self._event_times: deque[float] = deque()
+        self._storm_active = False
+        self._storm_last_event = 0.0
+        self._storm_changes: dict[Path, str] = {}
+        self._storm_moves: dict[Path, Path] = {}
+        self._storm_move_origins: dict[Path, Path] = {}  # dest -> original src
+        # Paths indexed during the current storm whose semantic re-embed is
+        # deferred until it settles (worker thread only).
+        self._deferred_semantic: dict[Path, None] = {}
+
         self._stop_event = threading.Event()
         self._worker = threading.Thread(
             target=self._drain_loop, daemon=True, name="mcp-watcher-debounce"
@@ -119,13 +154,90 @@ class _Handler(FileSystemEventHandler):
     def _enqueue(self, path: Path, action: str, extra: Optional[Path] = None) -> None:
         if _is_excluded(path) or (extra is not None and _is_excluded(extra)):
             return
+        now = time.monotonic()
         with self._lock:
+            if self._observe_storm(now):
+                self._record_storm_change(path, action, extra)
+                return
             self._pending[path] = (
-                time.monotonic() + self.DEBOUNCE_SECONDS,
+                now + self.DEBOUNCE_SECONDS,
                 action,
                 extra,
             )
 
+    @property
+    def in_storm(self) -> bool:
+        """True while events are being collected for a bulk update."""
+        return self._storm_active
+
+    def _observe_storm(self, now: float) -> bool:
+        """Track the event rate; return True when the event belongs to a storm.
+
+        Must be called with ``_lock`` held.  Crossing the threshold moves every
+        still-debouncing path into the storm change set.
+        """
+        if self._storm_active:
+            self._storm_last_event = now
+            return True
+        if self.storm_threshold <= 0:
+            return False
+        self._event_times.append(now)
+        cutoff = now - self.STORM_WINDOW_SECONDS
+        while self._event_times and self._event_times[0] < cutoff:
+            self._event_times.popleft()
+        if len(self._event_times) < self.storm_threshold:
+            return False
+        logger.info(
+            "Event storm detected (%d events in %.1fs); collecting changes until quiet",
+            len(self._event_times),
+            self.STORM_WINDOW_SECONDS,
+        )
+        self._storm_active = True
+        self._storm_last_event = now
+        self._event_times.clear()
+        for path, (_, action, extra) in self._pending.items():
+            self._record_storm_change(path, action, extra)
+        self._pending.clear()
+        return True
+
+    def _record_storm_change(self, path: Path, action: str, extra: Optional[Path]) -> None:
+        """Fold one event into the storm change set.  Must hold ``_lock``."""
+        if action == "reindex":
+            self._storm_changes[path] = "reindex"
+        elif action == "remove":
+            self._storm_changes[path] = "remove"
+        elif action == "move" and extra is not None:
+            # Whatever was pending for the destination is superseded by the move.
+            self._storm_changes.pop(extra, None)
+            if self._storm_changes.get(path) == "reindex":
+                # Written during the storm, then renamed (e.g. atomic save):
+                # the old path may not be indexed yet, so drop it and index
+                # the destination instead of moving a stale row.
+                self._storm_changes[path] = "remove"
+                self._storm_changes[extra] = "reindex"
+                return
+            origin = self._storm_move_origins.pop(path, path)
+            self._storm_moves[origin] = extra
+            self._storm_move_origins[extra] = origin
+
+    def _take_storm_batch(
+        self, now: float, force: bool = False
+    ) -> Optional[tuple[dict[Path, Path], dict[Path, str], bool]]:
+        """Return ``(moves, changes, settled)`` when a storm batch is due."""
+        with self._lock:
+            if not self._storm_active:
+                return None
+            settled = force or now - self._storm_last_event >= self.storm_quiet_seconds
+            size = len(self._storm_changes) + len(self._storm_moves)
+            if not settled and size < self.storm_batch_size:
+                return None
+            moves, changes = self._storm_moves, self._storm_changes
+            self._storm_moves, self._storm_changes = {}, {}
+            self._storm_move_origins = {}
+            if settled:
+                self._storm_active = False
+        return moves, changes, settled
+
     def _drain_loop(self) -> None:
         while not self._stop_event.is_set():
             now = time.monotonic()
@@ -147,6 +259,13 @@ class _Handler(FileSystemEventHandler):
                         self._handle_file_move(path, extra)
                 except Exception:
                     logger.exception("watcher drain failed for %s (action=%s)", path, action)
+
+            storm_batch = self._take_storm_batch(now)
+            if storm_batch is not None:
+                try:
+                    self._apply_storm_batch(*storm_batch)
+                except Exception:
+                    logger.exception("watcher bulk update failed")
             self._stop_event.wait(self.DRAIN_TICK_SECONDS)
 
     def stop(self) -> None:
@@ -169,6 +288,70 @@ class _Handler(FileSystemEventHandler):
                     self._handle_file_move(path, extra)
             except Exception:
                 logger.exception("flush drain failed for %s (action=%s)", path, action)
+        storm_batch = self._take_storm_batch(time.monotonic(), force=True)
+        if storm_batch is not None:
+            self._apply_storm_batch(*storm_batch)
+
+    # ------------------------------------------------------------------
+    # Storm bulk updates (run on the worker thread)
+
+    def _apply_storm_batch(
+        self, moves: dict[Path, Path], changes: dict[Path, str], settled: bool
+    ) -> None:
+        indexed: list[Path] = []
+        removed: list[Path] = []
+        moved: list[tuple[Path, Path, Optional[str]]] = []
+        for src, dest in moves.items():
+            dest_is_code = dest.suffix in self.code_extensions and dest.exists()
+            if src == dest or src.suffix not in self.code_extensions:
+                if dest_is_code:
+                    indexed.append(dest)
+            elif not dest_is_code:
+                removed.append(src)
+            else:
+                moved.append((src, dest, self.path_resolver.compute_content_hash(dest)))
+        for path, action in changes.items():
+            if path.suffix not in self.code_extensions:
+                continue
+            if action == "remove":
+                removed.append(path)
+            elif path.exists():
+                indexed.append(path)
+
+        logger.info(
+            "Applying watcher bulk update: %d moved, %d removed, %d reindexed%s",
+            len(moved),
+            len(removed),
+            len(indexed),
+            "" if settled else " (storm still active)",
+        )
+        bulk = getattr(type(self.dispatcher), "index_changes", None)
+        if bulk is None or self.ctx is None:
+            for src, dest, _ in moved:
+                self._handle_file_move(src, dest)
+            for path in removed:
+                self._remove_file_from_index(path)
+            for path in indexed:
+                self._trigger_reindex(path)
+            return
+
+        result = self.dispatcher.index_changes(
+            self.ctx,
+            indexed=indexed,
+            removed=removed,
+            moved=moved,
+            do_semantic=not self.defer_semantic,
+        )
+        if self.defer_semantic:
+            self._deferred_semantic.update(dict.fromkeys(result.get("semantic_paths") or ()))
+        self._kick_cache_invalidation(
+            *indexed, *removed, *(dest for _, dest, _ in moved), *(src for src, _, _ in moved)
+        )
+        if settled and self._deferred_semantic:
+            deferred = list(self._deferred_semantic)
+            self._deferred_semantic.clear()
+            logger.info("Storm settled; re-embedding %d deferred paths", len(deferred))
+            self.dispatcher.rebuild_semantic_for_paths(self.ctx, deferred)
 
     # ------------------------------------------------------------------
     # Dispatcher-side actions (run on the worker thread)
@@ -183,8 +366,12 @@ class _Handler(FileSystemEventHandler):
         except Exception:
             logger.exception("Cache invalidation failed for %s", path)
 
-    def _kick_cache_invalidation(self, path: Path) -> None:
-        if not self.query_cache:
+    async def _invalidate_cache_for_files(self, paths: tuple[Path, ...]) -> None:
+        for path in paths:
+            await self._invalidate_cache_for_file(path)
+
+    def _kick_cache_invalidation(self, *paths: Path) -> None:
+        if not self.query_cache or not paths:
             return
         try:
             loop = asyncio.get_event_loop()
@@ -192,12 +379,12 @@ class _Handler(FileSystemEventHandler):
             loop = None
         try:
             if loop is not None and loop.is_running():
-                task = asyncio.ensure_future(self._invalidate_cache_for_file(path), loop=loop)
+                task = asyncio.ensure_future(self._invalidate_cache_for_files(paths), loop=loop)
                 task.add_done_callback(_swallow_task_exception)
             else:
-                asyncio.run(self._invalidate_cache_for_file(path))
+                asyncio.run(self._invalidate_cache_for_files(paths))
         except Exception:
-            logger.exception("Failed to schedule cache invalidation for %s", path)
+            logger.exception("Failed to schedule cache invalidation for %s", paths[0])
 
     def _trigger_reindex(self, path: Path) -> None:
         if path.suffix not in self.code_extensions:
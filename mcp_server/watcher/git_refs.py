@@ -0,0 +1,181 @@
+"""Resolve git HEAD by reading ref files directly, without spawning git.
+
+Handles the on-disk layouts the watcher meets in practice: a ``.git``
+directory, a ``.git`` file with ``gitdir:`` indirection (linked worktrees,
+submodules), ``commondir`` for refs shared across worktrees, symbolic refs,
+loose refs and ``packed-refs``.  Layouts this module cannot read (the
+``reftable`` ref backend, a missing git dir) raise ``RefStorageUnavailable``
+so callers can fall back to ``git rev-parse``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAX_SYMREF_DEPTH = 5
+# Refs that live in each worktree's private git dir rather than the common dir.
+_PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+class RefStorageUnavailable(Exception):
+    """The repository's refs cannot be read from files (use ``git`` instead)."""
+
+
+def _is_object_id(value: str) -> bool:
+    return len(value) in (40, 64) and set(value) <= _HEX_DIGITS
+
+
+@dataclass(frozen=True)
+class GitDirs:
+    """The per-worktree git dir and the common dir holding shared refs."""
+
+    git_dir: Path
+    common_dir: Path
+
+    @classmethod
+    def resolve(cls, repo_path: Path) -> "GitDirs":
+        """Locate the git dirs for a work tree root, following ``gitdir:`` files."""
+        dot_git = Path(repo_path) / ".git"
+        if dot_git.is_dir():
+            git_dir = dot_git
+        elif dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError as e:
+                raise RefStorageUnavailable(f"unreadable {dot_git}: {e}") from e
+            if not content.startswith("gitdir:"):
+                raise RefStorageUnavailable(f"{dot_git} has no gitdir line")
+            git_dir = Path(content[len("gitdir:") :].strip())
+            if not git_dir.is_absolute():
+                git_dir = dot_git.parent / git_dir
+        else:
+            raise RefStorageUnavailable(f"no .git at {repo_path}")
+
+        git_dir = Path(os.path.normpath(git_dir))
+        common_dir = git_dir
+        commondir_file = git_dir / "commondir"
+        if commondir_file.is_file():
+            try:
+                relative = commondir_file.read_text(encoding="utf-8").strip()
+            except OSError as e:
+                raise RefStorageUnavailable(f"unreadable {commondir_file}: {e}") from e
+            common_dir = Path(os.path.normpath(git_dir / relative))
+        if not (git_dir / "HEAD").is_file():
+            raise RefStorageUnavailable(f"no HEAD in {git_dir}")
+        if (common_dir / "reftable").is_dir():
+            raise RefStorageUnavailable(f"reftable ref storage in {common_dir}")
+        return cls(git_dir=git_dir, common_dir=common_dir)
+
+    def ref_path(self, refname: str) -> Path:
+        """Return the loose-ref file for *refname*."""
+        if "/" not in refname or refname.startswith(_PER_WORKTREE_PREFIXES):
+            return self.git_dir / refname
+        return self.common_dir / refname
+
+    @property
+    def packed_refs_path(self) -> Path:
+        return self.common_dir / "packed-refs"
+
+
+class GitRefReader:
+    """Reads a work tree's HEAD commit from ref files.
+
+    ``packed-refs`` is parsed once and re-read only when its stat signature
+    changes, so a steady-state read costs a couple of small file reads.
+    """
+
+    def __init__(self, repo_path: Path):
+        self.repo_path = Path(repo_path)
+        self._dirs: Optional[GitDirs] = None
+        self._packed: Dict[str, str] = {}
+        self._packed_signature: Optional[Tuple[int, int, int]] = None
+
+    @property
+    def dirs(self) -> GitDirs:
+        if self._dirs is None or not self._dirs.git_dir.is_dir():
+            self._dirs = GitDirs.resolve(self.repo_path)
+        return self._dirs
+
+    def head_commit(self) -> Optional[str]:
+        """Return the commit HEAD points at, or None on an unborn branch."""
+        return self._resolve("HEAD", 0)
+
+    def head_ref(self) -> Optional[str]:
+        """Return the ref HEAD points at (e.g. ``refs/heads/main``), None if detached."""
+        content = self._read_ref_file(self.dirs.ref_path("HEAD"))
+        if content is not None and content.startswith("ref:"):
+            return content[len("ref:") :].strip()
+        return None
+
+    def resolve_ref(self, refname: str) -> Optional[str]:
+        """Return the object id *refname* resolves to, or None if it does not exist."""
+        return self._resolve(refname, 0)
+
+    def _resolve(self, refname: str, depth: int) -> Optional[str]:
+        if depth > _MAX_SYMREF_DEPTH:
+            raise RefStorageUnavailable(f"symbolic ref loop at {refname}")
+        dirs = self.dirs
+        content = self._read_ref_file(dirs.ref_path(refname))
+        if content is None:
+            return self._packed_refs().get(refname)
+        if content.startswith("ref:"):
+            return self._resolve(content[len("ref:") :].strip(), depth + 1)
+        if _is_object_id(content):
+            return content
+        raise RefStorageUnavailable(f"unrecognised content in ref {refname}")
+
+    @staticmethod
+    def _read_ref_file(path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8").strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+        except OSError as e:
+            raise RefStorageUnavailable(f"unreadable ref {path}: {e}") from e
+
+    def _packed_refs(self) -> Dict[str, str]:
+        path = self.dirs.packed_refs_path
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._packed, self._packed_signature = {}, None
+            return self._packed
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if signature == self._packed_signature:
+            return self._packed
+        packed: Dict[str, str] = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line or line[0] in "#^":
+                        continue
+                    oid, _, refname = line.rstrip("\n").partition(" ")
+                    if refname and _is_object_id(oid):
+                        packed[refname] = oid
+        except OSError as e:
+            raise RefStorageUnavailable(f"unreadable {path}: {e}") from e
+        self._packed, self._packed_signature = packed, signature
+        return packed
+
+    def is_ref_file(self, path: Path) -> bool:
+        """Return True when a filesystem event on *path* can move HEAD."""
+        dirs = self.dirs
+        name = path.name
+        if name.endswith(".lock"):
+            return False
+        if path.parent in (dirs.git_dir, dirs.common_dir):
+            return name in ("HEAD", "packed-refs")
+        for base in (dirs.common_dir / "refs", dirs.git_dir / "refs"):
+            try:
+                path.relative_to(base)
+                return True
+            except ValueError:
+                continue
+        return False
@@ -157,12 +157,10 @@ class WatcherSweeper:
             repo_has_drift = False
 
             fs_by_path: Dict[str, str] = {}
-            for fs_path in repo_root.rglob("*"):
-                if not fs_path.is_file():
-                    continue
+            for fs_path in self._walk_files(repo_root, gitignore_filter):
                 if fs_path.suffix not in _CODE_EXTENSIONS:
                     continue
-                if gitignore_filter(fs_path):
+                if gitignore_filter(fs_path, is_dir=False):
                     continue
 
                 try:
@@ -200,6 +198,15 @@ class WatcherSweeper:
 
         return drifted
 
+    @staticmethod
+    def _walk_files(repo_root: Path, gitignore_filter):
+        """Yield files under *repo_root*, pruning ignored directories before descending."""
+        for current_root, dirnames, filenames in os.walk(repo_root, followlinks=False):
+            root_path = Path(current_root)
+            dirnames[:] = [d for d in dirnames if not gitignore_filter(root_path / d, is_dir=True)]
+            for filename in filenames:
+                yield root_path / filename
+
     def _hash_file(self, path: Path) -> str:
         digest = hashlib.sha256()
         with path.open("rb") as handle:
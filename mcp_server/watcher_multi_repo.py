@@ -8,9 +8,11 @@ import hashlib
 import logging
 import subprocess
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
 
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
@@ -22,78 +24,220 @@ from .core.repo_resolver import RepoResolver
 from .dispatcher.dispatcher_enhanced import EnhancedDispatcher, IndexResult, IndexResultStatus
 from .indexing.lock_registry import lock_registry
 from .storage.git_index_manager import GitAwareIndexManager, should_reindex_for_branch
+from .storage.index_job_queue import IndexJob, IndexWorkerPool
 from .storage.repository_registry import RepositoryRegistry
 from .utils.subprocess_env import get_full_env
 from .watcher import _Handler
+from .watcher.git_refs import GitRefReader, RefStorageUnavailable
 from .watcher.sweeper import WatcherSweeper
 
 logger = logging.getLogger(__name__)
 
 
+class _RefChangeHandler(FileSystemEventHandler):
+    """Forwards ref-file events for one repository to ``GitMonitor``."""
+
+    def __init__(self, monitor: "GitMonitor", repo_id: str, reader: GitRefReader):
+        self.monitor = monitor
+        self.repo_id = repo_id
+        self.reader = reader
+
+    def on_any_event(self, event) -> None:
+        if event.is_directory:
+            return
+        # git updates refs by renaming "<ref>.lock" into place, so the
+        # destination of a move is the interesting path.
+        paths = [event.src_path]
+        dest = getattr(event, "dest_path", None)
+        if dest:
+            paths.append(dest)
+        try:
+            if any(self.reader.is_ref_file(Path(p)) for p in paths):
+                self.monitor.schedule_check(self.repo_id)
+        except RefStorageUnavailable:
+            self.monitor.schedule_check(self.repo_id)
+
+
 class GitMonitor:
-    """Monitors git state changes in repositories."""
+    """Monitors git state changes in repositories.
+
+    HEAD is resolved by reading ``.git/HEAD``, loose refs and ``packed-refs``
+    directly (see ``GitRefReader``), and those files are watched so a commit,
+    checkout or fetch into the tracked branch is noticed immediately.  Bursts
+    of ref updates (a rebase rewrites refs many times) are coalesced into one
+    check per ``coalesce_seconds``.  The ``check_interval`` poll remains as a
+    safety net; it only spawns ``git rev-parse`` for repositories whose refs
+    cannot be read from files.
+    """
 
-    def __init__(self, registry: RepositoryRegistry, callback):
+    def __init__(
+        self,
+        registry: RepositoryRegistry,
+        callback,
+        watch_refs: bool = True,
+        coalesce_seconds: float = 0.2,
+    ):
         self.registry = registry
         self.callback = callback
         self.running = False
         self.monitor_thread = None
         self.check_interval = 30  # seconds
+        self.coalesce_seconds = coalesce_seconds
         self.last_commits = {}  # repo_id -> commit
 
+        self.watch_refs = watch_refs
+        self._readers: Dict[str, GitRefReader] = {}
+        self._observer: Optional[Observer] = None
+        self._watches: Dict[str, List[Any]] = {}  # repo_id -> watchdog ObservedWatch handles
+        self._due: Dict[str, float] = {}  # repo_id -> monotonic deadline
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
     def start(self):
         """Start monitoring git repositories."""
         if self.running:
             return
 
         self.running = True
-        self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        if self.watch_refs:
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.start()
+        self.monitor_thread = threading.Thread(
+            target=self._monitor_loop, daemon=True, name="mcp-git-monitor"
+        )
         self.monitor_thread.start()
         logger.info("Git monitor started")
 
     def stop(self):
         """Stop monitoring."""
         self.running = False
+        self._wake.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        self._watches.clear()
         logger.info("Git monitor stopped")
 
+    def schedule_check(self, repo_id: str) -> None:
+        """Check *repo_id* after the coalescing window (called from watch events)."""
+        with self._lock:
+            self._due.setdefault(repo_id, time.monotonic() + self.coalesce_seconds)
+        self._wake.set()
+
+    def _take_due(self, now: float) -> Tuple[List[str], Optional[float]]:
+        with self._lock:
+            ready = [repo_id for repo_id, due in self._due.items() if due <= now]
+            for repo_id in ready:
+                del self._due[repo_id]
+            next_due = min(self._due.values(), default=None)
+        return ready, next_due
+
     def _monitor_loop(self):
-        """Main monitoring loop."""
+        """Main monitoring loop: ref-change wakeups plus the fallback poll."""
+        next_poll = 0.0
         while self.running:
-            try:
-                self._check_repositories()
-            except Exception as e:
-                logger.error(f"Error in git monitor: {e}")
+            now = time.monotonic()
+            if now >= next_poll:
+                try:
+                    self._check_repositories()
+                except Exception as e:
+                    logger.error(f"Error in git monitor: {e}")
+                next_poll = now + self.check_interval
+
+            ready, next_due = self._take_due(time.monotonic())
+            for repo_id in ready:
+                repo_info = self.registry.get_repository(repo_id)
+                if repo_info is not None:
+                    self._check_repository(repo_id, repo_info)
 
-            # Sleep with interruption support
-            for _ in range(self.check_interval):
-                if not self.running:
-                    break
-                threading.Event().wait(1)
+            wake_at = next_poll if next_due is None else min(next_poll, next_due)
+            self._wake.wait(max(0.0, wake_at - time.monotonic()))
+            self._wake.clear()
 
     def _check_repositories(self):
         """Check all repositories for git state changes."""
+        active = set()
         for repo_id, repo_info in self.registry.get_all_repositories().items():
             if not repo_info.auto_sync:
                 continue
+            active.add(repo_id)
+            self._ensure_ref_watch(repo_id, repo_info.path)
+            self._check_repository(repo_id, repo_info)
+        for repo_id in set(self._watches) - active:
+            self._drop_ref_watch(repo_id)
 
-            try:
-                current_commit = self._get_current_commit(repo_info.path)
-                if not current_commit:
-                    continue
+    def _check_repository(self, repo_id: str, repo_info) -> None:
+        try:
+            current_commit = self._read_current_commit(repo_id, repo_info.path)
+            if not current_commit:
+                return
 
-                last_commit = self.last_commits.get(repo_id)
+            last_commit = self.last_commits.get(repo_id)
 
-                if last_commit and current_commit != last_commit:
-                    # Commit changed
-                    logger.info(f"New commit detected in {repo_info.name}: {current_commit[:8]}")
-                    self.callback(repo_id, current_commit)
+            if last_commit and current_commit != last_commit:
+                # Commit changed
+                logger.info(f"New commit detected in {repo_info.name}: {current_commit[:8]}")
+                self.callback(repo_id, current_commit)
 
-                self.last_commits[repo_id] = current_commit
+            self.last_commits[repo_id] = current_commit
 
-            except Exception as e:
-                logger.error(f"Error checking repository {repo_id}: {e}")
+        except Exception as e:
+            logger.error(f"Error checking repository {repo_id}: {e}")
+
+    def _reader_for(self, repo_id: str, repo_path: str) -> GitRefReader:
+        reader = self._readers.get(repo_id)
+        if reader is None or reader.repo_path != Path(repo_path):
+            reader = GitRefReader(Path(repo_path))
+            self._readers[repo_id] = reader
+        return reader
+
+    def _read_current_commit(self, repo_id: str, repo_path: str) -> Optional[str]:
+        """Resolve HEAD from ref files, falling back to ``git rev-parse``."""
+        try:
+            return self._reader_for(repo_id, repo_path).head_commit()
+        except RefStorageUnavailable as e:
+            logger.debug("Reading refs for %s from files failed (%s); using git", repo_id, e)
+            return self._get_current_commit(repo_path)
+
+    def _ensure_ref_watch(self, repo_id: str, repo_path: str) -> None:
+        if self._observer is None or repo_id in self._watches:
+            return
+        reader = self._reader_for(repo_id, repo_path)
+        try:
+            dirs = reader.dirs
+        except RefStorageUnavailable:
+            return  # polled via git instead
+        handler = _RefChangeHandler(self, repo_id, reader)
+        targets = {(dirs.git_dir, False), (dirs.common_dir, False)}
+        refs_dir = dirs.common_dir / "refs"
+        if refs_dir.is_dir():
+            targets.add((refs_dir, True))
+        watches: List[Any] = []
+        try:
+            for path, recursive in sorted(targets):
+                watches.append(self._observer.schedule(handler, str(path), recursive=recursive))
+        except Exception as e:
+            logger.warning("Could not watch refs for %s (%s); polling instead", repo_id, e)
+            for watch in watches:
+                self._observer.unschedule(watch)
+            return
+        self._watches[repo_id] = watches
+
+    def _drop_ref_watch(self, repo_id: str) -> None:
+        watches = self._watches.pop(repo_id, [])
+        self._readers.pop(repo_id, None)
+        self.last_commits.pop(repo_id, None)
+        if self._observer is None:
+            return
+        for watch in watches:
+            try:
+                self._observer.unschedule(watch)
+            except Exception:
+                pass
 
     def _get_current_commit(self, repo_path: str) -> Optional[str]:
         """Get current git commit for a repository."""
@@ -322,6 +466,7 @@ class MultiRepositoryWatcher:
         store_registry: Optional[object] = None,
         plugin_set_registry: Optional[object] = None,
         semantic_indexer_registry: Optional[object] = None,
+        job_pool: Optional[IndexWorkerPool] = None,
     ):
         self.registry = registry
         self.dispatcher = dispatcher
@@ -344,6 +489,12 @@ class MultiRepositoryWatcher:
         self.executor = ThreadPoolExecutor(max_workers=4)
         self.running = False
 
+        # When set, commit syncs and rescans go through the durable job queue
+        # and run in worker processes instead of this process' thread pool.
+        self.job_pool = job_pool
+        if job_pool is not None:
+            job_pool.on_finished = self.handle_finished_job
+
         # Injected by caller; never instantiated here (circular-import guard).
         self._artifact_publisher = None
 
@@ -385,6 +536,9 @@ class MultiRepositoryWatcher:
 
     def enqueue_full_rescan(self, repo_id: str) -> None:
         """Submit a force-full reindex to the thread pool; returns immediately."""
+        if self.job_pool is not None:
+            self.job_pool.queue.enqueue(repo_id, kind="full", priority=-1)
+            return
 
         def _rescan():
             self.index_manager.sync_repository_index(repo_id, force_full=True)
@@ -447,6 +601,9 @@ class MultiRepositoryWatcher:
         if self.sweeper is not None:
             self.sweeper.start()
 
+        if self.job_pool is not None:
+            self.job_pool.start()
+
         logger.info(f"Started watching {len(self.watchers)} repositories")
 
     def stop_watching_all(self):
@@ -460,6 +617,9 @@ class MultiRepositoryWatcher:
         if self.sweeper is not None:
             self.sweeper.stop()
 
+        if self.job_pool is not None:
+            self.job_pool.stop()
+
         # Stop all file watchers
         for repo_id, observer in self.observers.items():
             observer.stop()
@@ -581,9 +741,30 @@ class MultiRepositoryWatcher:
         # Remove from changed set (changes are now committed)
         self.changed_repos.discard(repo_id)
 
+        if self.job_pool is not None:
+            self.job_pool.queue.enqueue(repo_id, kind="sync", commit=commit)
+            return
+
         # Submit index sync task
         _ = self.executor.submit(self._sync_repository, repo_id, commit)
 
+    def handle_finished_job(self, job: IndexJob) -> None:
+        """Embed a worker-synced repository, then run the post-sync steps for sync jobs."""
+        if job.state != "done":
+            if job.state == "failed":
+                logger.error(f"Failed to sync repository {job.repo_id}: {job.error}")
+            return
+        result = SimpleNamespace(**job.result)
+        if result.action in {"full_index", "incremental_update"}:
+            try:
+                self.index_manager.catch_up_semantic(
+                    job.repo_id, getattr(result, "from_commit", None), result.commit
+                )
+            except Exception as e:
+                logger.error(f"Semantic catch-up failed for {job.repo_id}: {e}")
+        if job.kind == "sync":
+            self._after_sync(job.repo_id, job.commit, result)
+
     def _sync_repository(self, repo_id: str, commit: str):
         """Sync repository index with new commit.
 
@@ -594,7 +775,13 @@ class MultiRepositoryWatcher:
         try:
             # Sync the index
             result = self.index_manager.sync_repository_index(repo_id)
+            self._after_sync(repo_id, commit, result)
+        except Exception as e:
+            logger.error(f"Failed to sync repository {repo_id}: {e}")
 
+    def _after_sync(self, repo_id: str, commit: str, result: Any) -> None:
+        """Log a sync result and create or publish the commit's artifact."""
+        try:
             successful_mutation = result.action in {"full_index", "incremental_update"}
             if successful_mutation and result.files_processed > 0:
                 logger.info(
@@ -648,7 +835,7 @@ class MultiRepositoryWatcher:
                     )
 
         except Exception as e:
-            logger.error(f"Failed to sync repository {repo_id}: {e}")
+            logger.error(f"Post-sync steps failed for repository {repo_id}: {e}")
 
     def _create_and_upload_artifact(self, repo_id: str, commit: str):
         """Create and upload artifact for commit.
@@ -735,4 +922,46 @@ class MultiRepositoryWatcher:
                 repo_status["has_uncommitted_changes"] = repo_id in self.changed_repos
                 status["repositories"][repo_id] = repo_status
 
+        if self.job_pool is not None:
+            status["index_jobs"] = self.job_pool.queue.stats()
+
         return status
+
+
+# Per-worker-process GitAwareIndexManager, keyed by registry path.
+_job_index_managers: Dict[str, GitAwareIndexManager] = {}
+
+
+def run_repository_sync_job(job: IndexJob, report: Any, *, registry_path: str) -> Dict[str, Any]:
+    """``IndexWorkerPool`` handler: sync ``job.repo_id`` inside a worker process.
+
+    The first job in a process builds its own service pool from the registry at
+    ``registry_path``; later jobs reuse it.  Workers only do the lexical sync: a
+    file-mode Qdrant store cannot be opened by a second process, so the parent
+    replays the vector changes (``GitAwareIndexManager.catch_up_semantic``)
+    from the ``from_commit`` recorded in the result.
+    """
+    index_manager = _job_index_managers.get(registry_path)
+    if index_manager is None:
+        from .cli.bootstrap import initialize_stateless_services
+
+        *_, index_manager = initialize_stateless_services(
+            registry_path=Path(registry_path), semantic_search_enabled=False
+        )
+        _job_index_managers[registry_path] = index_manager
+
+    repo_info = index_manager.registry.get_repository(job.repo_id)
+    from_commit = None
+    if repo_info is not None and job.kind != "full":
+        from_commit = repo_info.last_indexed_commit
+    report({"stage": "syncing", "repo_id": job.repo_id, "commit": job.commit})
+    result = index_manager.sync_repository_index(job.repo_id, force_full=job.kind == "full")
+    if result.action == "failed":
+        raise RuntimeError(result.error or f"sync of {job.repo_id} failed")
+    return {
+        "action": result.action,
+        "commit": getattr(result, "commit", None) or job.commit,
+        "from_commit": from_commit,
+        "files_processed": result.files_processed,
+        "duration_seconds": result.duration_seconds,
+    }
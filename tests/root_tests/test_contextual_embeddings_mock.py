@@ -195,9 +195,10 @@ class TestContextCache:
         # Verify it's in memory cache
         assert len(cache.memory_cache) == 1
 
-        # Verify disk cache
-        cache_files = list(tmp_path.glob("*.json"))
-        assert len(cache_files) == 1
+        # Verify disk cache: one row in a single database file
+        cache.flush()
+        assert cache.stats()["disk_entries"] == 1
+        assert list(tmp_path.glob("*.json")) == []
 
     def test_cache_different_categories(self, tmp_path):
         """Test that different categories produce different cache keys."""
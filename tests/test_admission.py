@@ -0,0 +1,150 @@
+"""Per-tool admission control for stdio tool calls."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import mcp.types as types
+import pytest
+
+from mcp_server.cli import admission, stdio_runner
+from mcp_server.cli.admission import (
+    HEAVY,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionRejected,
+    ToolPolicy,
+)
+from mcp_server.cli.handshake import HandshakeGate
+from mcp_server.core.deadline import bounded_timeout_ms, remaining_seconds
+
+
+def _controller(**policies):
+    return AdmissionController(policies, interactive_workers=2, heavy_workers=1)
+
+
+@pytest.mark.asyncio
+async def test_queue_full_is_rejected_immediately():
+    controller = _controller(
+        reindex=ToolPolicy(HEAVY, max_concurrent=1, max_queue=1, deadline_seconds=None)
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit("reindex"):
+            await release.wait()
+
+    running = asyncio.ensure_future(hold())
+    waiting = asyncio.ensure_future(hold())
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        async with controller.admit("reindex"):
+            pass
+    busy = excinfo.value.to_dict()
+    assert busy["code"] == "server_busy" and busy["reason"] == "queue_full"
+    assert (busy["active"], busy["queued"]) == (1, 1)
+
+    release.set()
+    await asyncio.gather(running, waiting)
+    stats = controller.stats()["reindex"]
+    assert (stats["admitted"], stats["rejected"], stats["active"]) == (2, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_call_still_queued_at_its_deadline_is_rejected():
+    controller = _controller(
+        symbol_lookup=ToolPolicy(INTERACTIVE, max_concurrent=1, max_queue=4, deadline_seconds=0.05)
+    )
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit("symbol_lookup"):
+            await release.wait()
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected, match="deadline_exceeded"):
+        async with controller.admit("symbol_lookup"):
+            pass
+    release.set()
+    await holder
+
+    # The abandoned wait did not leak the slot.
+    async with controller.admit("symbol_lookup"):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_heavy_lane_saturation_does_not_block_interactive_calls():
+    controller = _controller(
+        reindex=ToolPolicy(HEAVY, max_concurrent=4, max_queue=4, deadline_seconds=None),
+        symbol_lookup=ToolPolicy(INTERACTIVE, max_concurrent=4, max_queue=4, deadline_seconds=5.0),
+    )
+    gate = threading.Event()
+
+    async def reindex():
+        async with controller.admit("reindex"):
+            return await controller.run(gate.wait, 5)
+
+    heavy = [asyncio.ensure_future(reindex()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    async def lookup():
+        async with controller.admit("symbol_lookup") as ticket:
+            return ticket.lane, await controller.run(remaining_seconds)
+
+    lane, remaining = await asyncio.wait_for(lookup(), timeout=2)
+    assert lane == INTERACTIVE
+    # The deadline travels into the executor thread.
+    assert remaining is not None and 0 < remaining <= 5.0
+
+    gate.set()
+    assert await asyncio.gather(*heavy) == [True, True, True]
+    controller.shutdown(wait=True)
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_dispatcher_timeouts():
+    controller = _controller(search_code=ToolPolicy(INTERACTIVE, deadline_seconds=0.5))
+    assert bounded_timeout_ms(2000) == 2000
+    async with controller.admit("search_code"):
+        assert bounded_timeout_ms(2000) <= 500
+        assert await controller.run(bounded_timeout_ms, 2000) <= 500
+
+
+@pytest.mark.asyncio
+async def test_call_tool_returns_structured_busy_error(monkeypatch):
+    controller = _controller(
+        search_code=ToolPolicy(INTERACTIVE, max_concurrent=1, max_queue=0, deadline_seconds=5.0)
+    )
+    monkeypatch.setattr(stdio_runner, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(stdio_runner, "_gate", HandshakeGate(secret=""))
+    monkeypatch.setattr(stdio_runner, "_lazy_summarizer", object())
+    monkeypatch.setattr(stdio_runner, "sqlite_store", object())
+    monkeypatch.setattr(stdio_runner, "initialization_error", None)
+    release = asyncio.Event()
+
+    async def slow_search_code(**kwargs):
+        await release.wait()
+        return [types.TextContent(type="text", text=json.dumps({"results": []}))]
+
+    monkeypatch.setattr(stdio_runner.tool_handlers, "handle_search_code", slow_search_code)
+
+    first = asyncio.ensure_future(stdio_runner.call_tool("search_code", {"query": "a"}))
+    await asyncio.sleep(0.01)
+    busy = await stdio_runner.call_tool("search_code", {"query": "b"})
+    release.set()
+    done = await first
+
+    assert json.loads(busy.content[0].text)["code"] == "server_busy"
+    assert json.loads(done.content[0].text) == {"results": []}
+
+
+def test_default_policies_separate_interactive_and_heavy_tools():
+    policies = admission.DEFAULT_POLICIES
+    assert policies["symbol_lookup"].lane == INTERACTIVE
+    assert policies["reindex"].lane == HEAVY
+    assert policies["reindex"].max_concurrent < policies["symbol_lookup"].max_concurrent
@@ -0,0 +1,154 @@
+"""Content-addressed, reference-counted chunk bodies in SQLiteStore."""
+
+import sqlite3
+
+import pytest
+
+from mcp_server.storage import chunk_bodies
+from mcp_server.storage.chunk_bodies import ChunkBodyStore, body_hash, chunk_content_sql
+from mcp_server.storage.sqlite_store import SQLiteStore
+
+BODY = "def handler(request):\n    return render(request, 'index.html', {'items': items})\n" * 4
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "index.db"))
+    store.chunk_bodies = ChunkBodyStore(min_compress_bytes=128, train_after=16)
+    return store
+
+
+def _file(store, repo_id, name):
+    return store.store_file(repo_id, f"/repo/{name}", relative_path=name, language="python")
+
+
+def _chunk(store, file_id, chunk_id, content=BODY):
+    return store.store_chunk(
+        file_id=file_id,
+        content=content,
+        content_start=0,
+        content_end=len(content),
+        line_start=1,
+        line_end=content.count("\n") + 1,
+        chunk_id=chunk_id,
+        node_id=chunk_id,
+        treesitter_file_id=str(file_id),
+    )
+
+
+def _body_row(store, text=BODY):
+    with store._get_connection() as conn:
+        return conn.execute(
+            "SELECT refcount, codec FROM chunk_bodies WHERE hash = ?", (body_hash(text),)
+        ).fetchone()
+
+
+def test_identical_chunks_share_one_body_until_unreferenced(store):
+    repo_id = store.create_repository("/repo", "repo")
+    first, second = _file(store, repo_id, "a.py"), _file(store, repo_id, "b.py")
+    _chunk(store, first, "a-1")
+    _chunk(store, second, "b-1")
+
+    assert store.chunk_body_stats()["bodies"] == 1
+    assert _body_row(store)[0] == 2
+    with store._get_connection() as conn:
+        assert [r[0] for r in conn.execute("SELECT DISTINCT content FROM code_chunks")] == [""]
+
+    store.delete_chunks_for_file(first)
+    assert store.collect_chunk_bodies() == 0
+    assert store.get_chunk_by_chunk_id("b-1", file_id=second)["content"] == BODY
+
+    store.remove_file("b.py", repo_id)
+    assert _body_row(store) is None
+
+
+def test_upsert_moves_the_reference_to_the_new_body(store):
+    repo_id = store.create_repository("/repo", "repo")
+    file_id = _file(store, repo_id, "a.py")
+    _chunk(store, file_id, "a-1")
+    _chunk(store, file_id, "a-1", content=BODY.upper())
+
+    assert _body_row(store)[0] == 0
+    assert _body_row(store, BODY.upper())[0] == 1
+    store.collect_chunk_bodies()
+    assert store.get_chunks_for_file(file_id)[0]["content"] == BODY.upper()
+
+
+def test_short_chunks_stay_inline(store):
+    repo_id = store.create_repository("/repo", "repo")
+    file_id = _file(store, repo_id, "a.py")
+    _chunk(store, file_id, "a-1", content="x = 1")
+
+    chunk = store.get_chunk_by_node_id("a-1", file_id=file_id)
+    assert chunk["content"] == "x = 1" and chunk["body_hash"] is None
+    assert store.chunk_body_stats()["bodies"] == 0
+
+
+def test_batch_store_reuses_bodies_and_readers_resolve_them(store):
+    repo_id = store.create_repository("/repo", "repo")
+    file_id = _file(store, repo_id, "a.py")
+    chunks = [
+        {
+            "file_id": file_id,
+            "content": BODY,
+            "content_start": 0,
+            "content_end": len(BODY),
+            "line_start": i * 10 + 1,
+            "line_end": i * 10 + 8,
+            "chunk_id": f"c-{i}",
+            "node_id": f"c-{i}",
+            "treesitter_file_id": "a.py",
+            "chunk_index": i,
+        }
+        for i in range(3)
+    ]
+    assert store.store_chunks_batch(chunks) == 3
+    store.delete_chunks_for_file(file_id)
+    assert store.store_chunks_batch(chunks) == 3
+
+    assert _body_row(store)[0] == 3
+    assert store.find_chunk_at_line("/repo/a.py", 12)["content"] == BODY
+    assert [c["content"] for c in store.get_missing_summaries()] == [BODY] * 3
+    with sqlite3.connect(store.db_path) as conn:
+        expr = chunk_content_sql(conn)
+        assert conn.execute(f"SELECT {expr} FROM code_chunks c LIMIT 1").fetchone()[0] == BODY
+
+
+@pytest.mark.skipif(not chunk_bodies.zstd_available(), reason="zstandard not installed")
+def test_dictionary_is_trained_and_bodies_recompressed(store):
+    repo_id = store.create_repository("/repo", "repo")
+    file_id = _file(store, repo_id, "a.py")
+    texts = [
+        f"class Model{i}(Base):\n    name = Column(String({i}))\n"
+        f"    def save(self):\n        return session.add(self)  # {i}\n" * 3
+        for i in range(40)
+    ]
+    for i, text in enumerate(texts):
+        _chunk(store, file_id, f"m-{i}", content=text)
+
+    with store._get_connection() as conn:
+        dict_ids = {row[0] for row in conn.execute("SELECT dict_id FROM chunk_bodies")}
+        assert conn.execute("SELECT COUNT(*) FROM chunk_body_dicts").fetchone()[0] == 1
+    assert None not in dict_ids and len(dict_ids) == 1
+
+    stats = store.chunk_body_stats()
+    assert stats["stored_bytes"] < stats["raw_bytes"]
+    assert [c["content"] for c in store.get_chunks_for_file(file_id)] == texts
+
+
+def test_missing_body_is_logged_once(store, caplog):
+    repo_id = store.create_repository("/repo", "repo")
+    file_id = _file(store, repo_id, "a.py")
+    _chunk(store, file_id, "a-1")
+    with store._get_connection() as conn:
+        conn.execute("DELETE FROM chunk_bodies WHERE hash = ?", (body_hash(BODY),))
+
+    with caplog.at_level("ERROR", logger=chunk_bodies.__name__):
+        with store._get_connection() as conn:
+            expr = chunk_content_sql(conn)
+            rows = [
+                conn.execute(f"SELECT {expr} FROM code_chunks c").fetchone()[0] for _ in range(3)
+            ]
+    assert rows == [""] * 3
+    missing = [r for r in caplog.records if "missing from chunk_bodies" in r.getMessage()]
+    assert len(missing) == 1 and body_hash(BODY) in missing[0].getMessage()
@@ -165,7 +165,7 @@ def test_mismatch_refuses_dispatcher_raw_path(tmp_path, monkeypatch):
     _force_scheme(monkeypatch, FOREIGN_SCHEME)
     with store._get_connection() as conn:
         with pytest.raises(ChunkSchemeMismatchError):
-            # Exact call the dispatcher makes before _clear_file_index_rows.
+            # Exact call the dispatcher makes before syncing the file's rows.
             store._assert_chunk_scheme_writable(conn, chunk_type="code")
 
 
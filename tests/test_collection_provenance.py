@@ -27,7 +27,6 @@ from mcp_server.utils.semantic_indexer import (
     read_collection_provenance,
 )
 
-
 # ---------------------------------------------------------------------------
 # In-memory doubles (no network, no SDK)
 # ---------------------------------------------------------------------------
@@ -40,6 +39,11 @@ def _payload_matches(filter_obj, payload) -> bool:
     for cond in getattr(filter_obj, "must", None) or []:
         key = getattr(cond, "key", None)
         match = getattr(cond, "match", None)
+        any_of = getattr(match, "any", None)
+        if any_of is not None:
+            if payload.get(key) not in any_of:
+                return False
+            continue
         want = getattr(match, "value", None)
         if payload.get(key) != want:
             return False
@@ -47,7 +51,7 @@ def _payload_matches(filter_obj, payload) -> bool:
 
 
 class FakeQdrant:
-    """Minimal in-memory qdrant double supporting upsert/retrieve/search/delete."""
+    """Minimal in-memory qdrant double supporting upsert/retrieve/search/scroll/delete."""
 
     def __init__(self) -> None:
         # id -> SimpleNamespace(id, vector, payload)
@@ -106,6 +110,26 @@ class FakeQdrant:
         for pid in ids:
             self.points.pop(pid, None)
 
+    def scroll(self, *, collection_name, scroll_filter=None, limit=10, offset=None, **kwargs):
+        matched = [
+            SimpleNamespace(id=stored.id, payload=dict(stored.payload))
+            for stored in self.points.values()
+            if _payload_matches(scroll_filter, stored.payload)
+        ]
+        start = offset or 0
+        next_offset = start + limit if start + limit < len(matched) else None
+        return matched[start : start + limit], next_offset
+
+    def batch_update_points(self, *, collection_name, update_operations):
+        for operation in update_operations:
+            selector = operation.delete
+            for pid in [
+                pid
+                for pid, stored in self.points.items()
+                if _payload_matches(selector.filter, stored.payload)
+            ]:
+                self.points.pop(pid, None)
+
 
 class _RaisingUpsertQdrant(FakeQdrant):
     def upsert(self, *, collection_name, points):
@@ -0,0 +1,157 @@
+"""Single-file SQLite context cache for contextual embeddings."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+
+from mcp_server.document_processing import (
+    ChunkMetadata,
+    ChunkType,
+    ContextCache,
+    ContextualEmbeddingService,
+    DocumentCategory,
+    DocumentChunk,
+    contextual_embeddings,
+)
+
+GENERAL = DocumentCategory.GENERAL
+
+
+def _chunk(content: str, path: str = "docs/guide.md", chunk_id: str = "c") -> DocumentChunk:
+    return DocumentChunk(
+        id=chunk_id,
+        content=content,
+        type=ChunkType.PARAGRAPH,
+        metadata=ChunkMetadata(
+            document_path=path,
+            section_hierarchy=[],
+            chunk_index=0,
+            total_chunks=1,
+            has_code=False,
+        ),
+    )
+
+
+def test_moved_document_still_hits(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path)
+    cache.set(_chunk("body", "docs/old.md"), GENERAL, "context")
+    assert cache.get(_chunk("body", "archive/new.md"), GENERAL) == "context"
+    assert cache.get(_chunk("body"), DocumentCategory.REFERENCE) is None
+
+
+def test_every_prompt_input_but_the_path_is_part_of_the_key(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path)
+    cache.set(_chunk("body"), GENERAL, "context", {"title": "Guide"})
+    assert cache.get(_chunk("body", "archive/guide.md"), GENERAL, {"title": "Guide"}) == "context"
+    assert cache.get(_chunk("body"), GENERAL, {"title": "Manual"}) is None
+    assert cache.get(_chunk("body"), GENERAL) is None
+
+    nested = _chunk("body")
+    nested.metadata.section_hierarchy = ["Install"]
+    assert cache.get(nested, GENERAL, {"title": "Guide"}) is None
+    heading = _chunk("body")
+    heading.type = ChunkType.HEADING
+    assert cache.get(heading, GENERAL, {"title": "Guide"}) is None
+
+
+def test_writes_are_batched_and_persist_in_one_file(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path, write_batch=10)
+    for i in range(25):
+        cache.set(_chunk(f"body {i}"), GENERAL, f"context {i}")
+    stats = cache.stats()
+    assert stats["flushes"] == 2 and stats["pending_writes"] == 5
+    assert stats["disk_entries"] == 20
+    cache.close()
+
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".db"] == ["contexts.db"]
+    reopened = ContextCache(cache_dir=tmp_path)
+    assert reopened.stats()["disk_entries"] == 25
+    assert reopened.get(_chunk("body 24"), GENERAL) == "context 24"
+
+
+def test_exit_flush_tracks_open_caches_without_one_hook_each(tmp_path):
+    caches = [ContextCache(cache_dir=tmp_path / str(i), write_batch=10) for i in range(3)]
+    open_caches = contextual_embeddings._open_caches
+    assert all(cache in open_caches for cache in caches)
+
+    caches[0].close()
+    assert caches[0] not in open_caches
+    caches[1].set(_chunk("body"), GENERAL, "context")
+    del caches[2]
+    gc.collect()
+    assert len([c for c in open_caches if c.cache_dir.parent == tmp_path]) == 1
+
+    contextual_embeddings._flush_context_caches()
+    assert caches[1] not in open_caches
+    assert ContextCache(cache_dir=tmp_path / "1").stats()["disk_entries"] == 1
+
+
+def test_prefetch_loads_many_contexts_with_bulk_reads(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path)
+    for i in range(1200):
+        cache.set(_chunk(f"body {i}"), GENERAL, f"context {i}")
+    cache.close()
+
+    cache = ContextCache(cache_dir=tmp_path)
+    items = [(_chunk(f"body {i}"), GENERAL) for i in range(1300)]
+    assert cache.prefetch(items) == 1200
+    assert cache.get(_chunk("body 700"), GENERAL) == "context 700"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1 and stats["disk_hits"] == 0
+
+
+def test_memory_tier_is_bounded_in_bytes(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path, max_memory_bytes=1000)
+    for i in range(50):
+        cache.set(_chunk(f"body {i}"), GENERAL, "x" * 100)
+    assert cache.stats()["memory_bytes"] <= 1000
+    assert len(cache.memory_cache) == 10
+
+    # Evicted from memory, still on disk.
+    assert cache.get(_chunk("body 0"), GENERAL) == "x" * 100
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ContextCache(cache_dir=tmp_path, max_disk_bytes=5000, write_batch=1)
+    cache.set(_chunk("keep"), GENERAL, "k" * 100)
+    for i in range(100):
+        # Reading "keep" keeps it recent while older contexts age out.
+        assert cache.get(_chunk("keep"), GENERAL)
+        cache.set(_chunk(f"body {i}"), GENERAL, "x" * 100)
+    cache.flush()
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 5000 and stats["evicted"] > 0
+    fresh = ContextCache(cache_dir=tmp_path)
+    assert fresh.get(_chunk("keep"), GENERAL) == "k" * 100
+    assert fresh.get(_chunk("body 0"), GENERAL) is None
+    assert fresh.get(_chunk("body 99"), GENERAL) == "x" * 100
+
+
+def test_clear_removes_database_rows_and_legacy_files(tmp_path):
+    (tmp_path / "0123456789abcdef.json").write_text("{}")
+    cache = ContextCache(cache_dir=tmp_path)
+    cache.set(_chunk("body"), GENERAL, "context")
+    cache.flush()
+    cache.clear()
+    assert cache.get(_chunk("body"), GENERAL) is None
+    assert cache.stats()["disk_entries"] == 0
+    assert list(tmp_path.glob("*.json")) == []
+
+
+def test_batch_generation_prefetches_and_flushes(tmp_path):
+    chunks = [_chunk(f"body {i}", chunk_id=f"c{i}") for i in range(20)]
+
+    service = ContextualEmbeddingService(cache_dir=tmp_path)
+    service.client = None
+    first = asyncio.run(service.generate_contexts_batch(chunks))
+    assert service.get_metrics().cached_chunks == 0
+    assert service.cache.stats()["disk_entries"] == 20
+
+    again = ContextualEmbeddingService(cache_dir=tmp_path)
+    again.client = None
+    assert asyncio.run(again.generate_contexts_batch(chunks)) == first
+    assert again.get_metrics().cached_chunks == 20
+    assert again.cache.stats()["disk_hits"] == 0
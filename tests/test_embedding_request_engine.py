@@ -0,0 +1,328 @@
+"""Concurrent, rate-aware request engine for remote embedding providers."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mcp_server.utils.embedding_request_engine import (
+    AdaptiveConcurrencyLimiter,
+    EmbeddingRequestEngine,
+    RateBudget,
+    _reset_http_client,
+    _reset_request_engines,
+    get_request_engine,
+    is_retryable,
+)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_limiter_is_additive_increase_multiplicative_decrease():
+    limiter = AdaptiveConcurrencyLimiter(8, maximum=8)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    assert limiter.limit == 8.0
+
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4.0
+
+    limiter.acquire()
+    limiter.release(latency=0.5)  # 5x the average latency
+    assert limiter.limit == pytest.approx(3.6)
+
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(latency=0.1)
+    assert 3.6 < limiter.limit <= 8.0
+
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(throttled=True)
+    assert limiter.limit == 1.0
+
+
+def test_limiter_baseline_is_per_input_and_decays():
+    limiter = AdaptiveConcurrencyLimiter(8, maximum=8)
+    # One unusually fast single-text request...
+    limiter.acquire()
+    limiter.release(latency=0.002, units=1)
+    # ...does not make every 32-text batch look congested.
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(latency=0.16, units=32)
+    assert limiter.limit == 8.0
+    assert limiter.latency_baseline == pytest.approx(0.005, rel=0.1)
+
+    # Once the baseline has moved past an outlier, it no longer throttles.
+    limiter = AdaptiveConcurrencyLimiter(8, maximum=8)
+    limiter.acquire()
+    limiter.release(latency=0.01)
+    for _ in range(30):
+        limiter.acquire()
+        limiter.release(latency=0.03)
+    assert limiter.limit > 4.0
+    assert limiter.latency_baseline > 0.025
+
+
+def test_query_traffic_stays_out_of_the_bulk_baseline():
+    engine = EmbeddingRequestEngine(max_in_flight=8)
+    engine.call(lambda: "doc", units=16)
+    baseline = engine.limiter.latency_baseline
+    for _ in range(5):
+        engine.call(lambda: "q", query=True)
+    assert engine.limiter.latency_baseline == baseline
+    assert engine.query_limiter.latency_baseline is not None
+
+
+def test_request_engines_are_shared_per_provider_endpoint_and_key():
+    _reset_request_engines()
+    try:
+        engine = get_request_engine("openai_compatible", "http://a/v1", "k1")
+        assert get_request_engine("openai_compatible", "http://a/v1", "k1") is engine
+        assert get_request_engine("openai_compatible", "http://b/v1", "k1") is not engine
+        assert get_request_engine("openai_compatible", "http://a/v1", "k2") is not engine
+        assert get_request_engine("voyage", "http://a/v1", "k1") is not engine
+    finally:
+        _reset_request_engines()
+
+
+def test_rate_budget_spaces_requests_and_tokens():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    budget = RateBudget(120, 600, clock=lambda: now[0], sleep=sleep)
+    for _ in range(120):
+        budget.acquire()
+    assert not slept
+    budget.acquire()
+    assert slept == [pytest.approx(0.5)]
+
+    budget.acquire(tokens=400)  # waits 0.5s for a request slot
+    budget.acquire(tokens=400)  # 200 left, refilling at 10 tokens/s
+    assert now[0] == pytest.approx(21.0)
+
+    budget.acquire(tokens=6000)  # larger than the budget: waits for a full bucket
+    assert now[0] == pytest.approx(81.0)
+
+    budget.pause(5.0)
+    before = now[0]
+    budget.acquire()
+    assert now[0] - before == pytest.approx(5.0)
+
+
+def test_call_retries_throttling_but_not_client_errors():
+    now = [0.0]
+    delays = []
+
+    def sleep(seconds):
+        delays.append(seconds)
+        now[0] += seconds
+
+    engine = EmbeddingRequestEngine(
+        max_in_flight=2, max_retries=3, clock=lambda: now[0], sleep=sleep
+    )
+    attempts = iter([_HTTPError(429, {"retry-after": "0.25"}), _HTTPError(503), "ok"])
+
+    limits = []
+
+    def send():
+        limits.append(engine.limiter.limit)
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert engine.call(send) == "ok"
+    assert len(delays) == 2 and delays[0] >= 0.25
+    stats = engine.stats()
+    assert stats["retries"] == 2 and stats["throttled"] == 1
+    # Halved by the 429, then one success adds 1 / limit.
+    assert limits == [2.0, 1.0, 1.0] and stats["concurrency_limit"] == 2.0
+
+    with pytest.raises(_HTTPError):
+        engine.call(lambda: (_ for _ in ()).throw(_HTTPError(400)))
+    assert engine.stats()["retries"] == 2
+
+    assert is_retryable(ConnectionResetError()) and not is_retryable(ValueError())
+
+
+def test_map_keeps_order_and_fails_fast():
+    engine = EmbeddingRequestEngine(max_in_flight=4)
+    assert engine.map(lambda n: engine.call(lambda: n * n), list(range(20))) == [
+        n * n for n in range(20)
+    ]
+
+    def boom(n):
+        if n == 3:
+            raise RuntimeError("batch 3 failed")
+        return n
+
+    with pytest.raises(RuntimeError, match="batch 3"):
+        engine.map(boom, list(range(6)))
+    engine.close()
+
+
+class _MockEmbeddingServer(ThreadingHTTPServer):
+    """``/v1/embeddings`` with a fixed latency and a 429 on every Nth request."""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.05, throttle_every=0, shuffle=False):
+        super().__init__(("127.0.0.1", 0), _EmbeddingHandler)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.shuffle = shuffle
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.active = 0
+        self.peak_active = 0
+        self.connections = set()
+
+
+class _EmbeddingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            throttle = server.throttle_every and server.requests % server.throttle_every == 0
+            server.active += 1
+            server.peak_active = max(server.peak_active, server.active)
+        try:
+            time.sleep(server.latency)
+            if throttle:
+                with server.lock:
+                    server.throttled += 1
+                self._send(429, {"error": {"message": "slow down"}}, {"Retry-After": "0"})
+                return
+            data = [
+                {"object": "embedding", "index": i, "embedding": [float(len(text)), float(i)]}
+                for i, text in enumerate(body["input"])
+            ]
+            if server.shuffle:
+                data.reverse()
+            self._send(200, {"object": "list", "model": body["model"], "data": data})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, payload, headers=None):
+        raw = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+@pytest.fixture
+def mock_server():
+    pytest.importorskip("openai")
+    servers = []
+
+    def start(**kwargs):
+        server = _MockEmbeddingServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    _reset_http_client()
+    _reset_request_engines()
+    yield start
+    _reset_http_client()
+    _reset_request_engines()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _provider(server, monkeypatch, **env):
+    from mcp_server.utils.embedding_providers import OpenAICompatibleEmbeddingProvider
+
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    provider = OpenAICompatibleEmbeddingProvider(
+        "mock-embed", 2, api_key="test", base_url=f"http://127.0.0.1:{server.server_port}/v1"
+    )
+    provider.engine.backoff_base = 0.01
+    return provider
+
+
+@pytest.mark.requires_network
+def test_batches_overlap_and_reuse_connections(mock_server, monkeypatch):
+    server = mock_server(latency=0.1)
+    provider = _provider(server, monkeypatch, MCP_EMBEDDING_MAX_IN_FLIGHT="4")
+    batches = [[f"text-{b}-{i}" * (b + 1) for i in range(3)] for b in range(12)]
+
+    started = time.perf_counter()
+    responses = provider.embed_batches_with_provenance(batches)
+    elapsed = time.perf_counter() - started
+
+    for batch, response in zip(batches, responses):
+        assert [item.vector[0] for item in response.items] == [float(len(t)) for t in batch]
+    assert server.peak_active > 1
+    assert elapsed < 12 * 0.1
+    # Keep-alive: far fewer TCP connections than requests.
+    assert len(server.connections) <= 4 < server.requests
+    provider.engine.close()
+
+
+@pytest.mark.requires_network
+def test_throttling_is_retried_and_shrinks_concurrency(mock_server, monkeypatch):
+    server = mock_server(latency=0.02, throttle_every=3, shuffle=True)
+    provider = _provider(server, monkeypatch, MCP_EMBEDDING_MAX_IN_FLIGHT="6")
+    batches = [[f"b{b}-{i}" for i in range(b % 4 + 1)] for b in range(15)]
+
+    responses = provider.embed_batches_with_provenance(batches, "document")
+
+    # Reordered items are still mapped by their server index.
+    for batch, response in zip(batches, responses):
+        assert [item.index for item in response.items] == list(range(len(batch)))
+        assert [item.vector[1] for item in response.items] == [float(i) for i in range(len(batch))]
+    stats = provider.engine.stats()
+    assert server.throttled > 0 and stats["throttled"] == server.throttled
+    assert stats["concurrency_limit"] < 6
+    provider.engine.close()
+
+
+@pytest.mark.requires_network
+def test_malformed_response_is_not_retried(mock_server, monkeypatch):
+    server = mock_server(latency=0.0)
+    provider = _provider(server, monkeypatch)
+    real_create = provider.client.embeddings.create
+
+    def short_response(**kwargs):
+        response = real_create(**kwargs)
+        response.data = response.data[:-1]
+        return response
+
+    monkeypatch.setattr(provider.client.embeddings, "create", short_response)
+    with pytest.raises(RuntimeError, match="arity mismatch"):
+        provider.embed_batches_with_provenance([["a", "b"], ["c", "d"]])
+    assert provider.engine.stats()["retries"] == 0
+    provider.engine.close()
@@ -0,0 +1,179 @@
+"""Single-statement BM25 search across attached repository indexes."""
+
+import os
+import shutil
+from datetime import datetime
+
+import pytest
+
+from mcp_server.storage.federated_search import FederatedRepository, FederatedSearchEngine
+from mcp_server.storage.multi_repo_manager import MultiRepositoryManager, RepositoryInfo
+from mcp_server.storage.sqlite_store import SQLiteStore
+
+
+def _index(tmp_path, name, documents):
+    """Create an index whose ``fts_code`` holds ``{relative_path: content}``."""
+    path = tmp_path / name / "index.db"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    store = SQLiteStore(str(path))
+    repo_id = store.create_repository(str(tmp_path / name), name)
+    rows = [
+        (
+            content,
+            store.store_file(
+                repo_id, f"/{name}/{relative_path}", relative_path=relative_path, language="python"
+            ),
+        )
+        for relative_path, content in documents.items()
+    ]
+    with store._get_connection() as conn:
+        conn.executemany("INSERT INTO fts_code (content, file_id) VALUES (?, ?)", rows)
+    return FederatedRepository(name, name, path)
+
+
+@pytest.fixture
+def repos(tmp_path):
+    return [
+        _index(
+            tmp_path,
+            f"repo{i}",
+            {
+                "handler.py": "def handler(request): return handler_response(request)",
+                "util.js": "function handler() { return 1 }",
+                f"other{i}.py": "def unrelated(): pass",
+            },
+        )
+        for i in range(5)
+    ]
+
+
+def test_one_statement_per_attach_group(repos):
+    engine = FederatedSearchEngine(max_attached=2)
+    result = engine.search("handler", repos, limit=None)
+
+    assert result.groups == 3 and result.statements == 3
+    assert not result.errors
+    assert {row["repository_id"] for row in result.results} == {r.repository_id for r in repos}
+    # Scores are normalized per repository: every repository's best hit is 1.0.
+    best = {}
+    for row in result.results:
+        best[row["repository_id"]] = max(best.get(row["repository_id"], 0), row["score"])
+    assert set(best.values()) == {1.0}
+    assert [row["score"] for row in result.results] == sorted(
+        (row["score"] for row in result.results), reverse=True
+    )
+    engine.close()
+
+
+def test_global_and_per_repository_limits(repos):
+    engine = FederatedSearchEngine(max_attached=2)
+
+    assert len(engine.search("handler", repos, limit=3).results) == 3
+    per_repo = engine.search("handler", repos, limit=None, per_repo_limit=1).results
+    assert len(per_repo) == len(repos)
+    assert len({row["repository_id"] for row in per_repo}) == len(repos)
+    engine.close()
+
+
+def test_file_pattern_is_applied_in_sql(repos):
+    engine = FederatedSearchEngine()
+    result = engine.search("handler", repos, limit=None, file_pattern="*.py")
+
+    assert result.results
+    assert all(row["file"].endswith(".py") for row in result.results)
+    assert result.statements == 1
+    engine.close()
+
+
+def test_attach_groups_are_reused_and_rebuilt_when_replaced(repos, tmp_path):
+    engine = FederatedSearchEngine(max_attached=2)
+    engine.search("handler", repos)
+    assert (engine.hits, engine.misses) == (0, 3)
+
+    engine.search("handler", repos)
+    assert (engine.hits, engine.misses) == (3, 3)
+
+    # Publishing a new index replaces the file; its group must be reattached.
+    target = repos[0].index_path
+    replacement = _index(tmp_path, "fresh", {"new.py": "def handler(): return 'fresh'"}).index_path
+    staged = target.with_suffix(".next")
+    shutil.copy(replacement, staged)
+    os.replace(staged, target)
+
+    result = engine.search("fresh", repos, limit=None)
+    assert engine.misses == 4
+    assert [row["repository_id"] for row in result.results] == [repos[0].repository_id]
+    engine.close()
+
+
+def test_missing_index_is_reported_not_raised(repos, tmp_path):
+    missing = FederatedRepository("gone", "gone", tmp_path / "gone" / "index.db")
+    engine = FederatedSearchEngine()
+    result = engine.search("handler", [*repos, missing], limit=None)
+
+    assert set(result.errors) == {"gone"}
+    assert len({row["repository_id"] for row in result.results}) == len(repos)
+    engine.close()
+
+
+@pytest.mark.asyncio
+async def test_manager_code_search_uses_federated_path(repos, tmp_path):
+    manager = MultiRepositoryManager(central_index_path=tmp_path / "registry.json", max_workers=2)
+    for priority, repo in enumerate(repos):
+        manager.registry.register(
+            RepositoryInfo(
+                repository_id=repo.repository_id,
+                name=repo.name,
+                path=repo.index_path.parent,
+                index_path=repo.index_path,
+                language_stats={},
+                total_files=3,
+                total_symbols=0,
+                indexed_at=datetime.now(),
+                priority=priority,
+            )
+        )
+
+    results = await manager.search_code("handler", file_pattern="*.py", limit=5)
+
+    assert manager._federated.misses == 1
+    assert [r.repository_id for r in results] == [r.repository_id for r in reversed(repos)]
+    for result in results:
+        assert result.error is None
+        assert [hit["file"] for hit in result.results] == [
+            "/" + result.repository_id + "/handler.py"
+        ]
+        assert result.results[0]["score"] == 1.0
+    manager.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("federated", ["1", "0"])
+async def test_fallback_path_scores_and_drops_repositories_like_federated(
+    repos, tmp_path, monkeypatch, federated
+):
+    monkeypatch.setenv("MCP_FEDERATED_SEARCH", federated)
+    quiet = _index(tmp_path, "quiet", {"other.py": "def unrelated(): pass"})
+    manager = MultiRepositoryManager(central_index_path=tmp_path / "registry.json", max_workers=2)
+    for repo in [*repos, quiet]:
+        manager.registry.register(
+            RepositoryInfo(
+                repository_id=repo.repository_id,
+                name=repo.name,
+                path=repo.index_path.parent,
+                index_path=repo.index_path,
+                language_stats={},
+                total_files=3,
+                total_symbols=0,
+                indexed_at=datetime.now(),
+            )
+        )
+
+    results = await manager.search_code("handler", limit=5)
+
+    assert {r.repository_id for r in results} == {r.repository_id for r in repos}
+    for result in results:
+        scores = [hit["score"] for hit in result.results]
+        assert max(scores) == 1.0
+        assert all(0 < score <= 1.0 for score in scores)
+    manager.close()
@@ -0,0 +1,158 @@
+"""Tests for git blob-OID change detection in incremental indexing."""
+
+import shutil
+import subprocess
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server.core.path_resolver import PathResolver
+from mcp_server.core.repo_context import RepoContext
+from mcp_server.indexing.change_detector import FileChange
+from mcp_server.indexing.git_blob_oids import GitBlobSnapshot, hash_blob_oid
+from mcp_server.indexing.incremental_indexer import IncrementalIndexer
+from mcp_server.storage.sqlite_store import SQLiteStore
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", *args],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def _stored_oid(store: SQLiteStore, repo_id: int, path: str):
+    return store.get_file(path, repository_id=repo_id)["git_blob_oid"]
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    _git(repo, "init", "-q")
+    (repo / "pkg" / "a.py").write_text("a = 1\n")
+    (repo / "b.py").write_text("b = 2\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "initial")
+    return repo
+
+
+class RecordingDispatcher:
+    def __init__(self, store: SQLiteStore) -> None:
+        self.store = store
+        self.indexed = []
+
+    def index_file(self, ctx: RepoContext, path: Path) -> None:
+        self.indexed.append(Path(path))
+        self.store.store_file(ctx.repo_id, path, language="python")
+
+
+@pytest.fixture
+def indexer(git_repo: Path, tmp_path: Path):
+    store = SQLiteStore(str(tmp_path / "code_index.db"), path_resolver=PathResolver(git_repo))
+    repo_id = store.create_repository(str(git_repo), "git-repo")
+    ctx = RepoContext(
+        repo_id=repo_id,
+        sqlite_store=store,
+        workspace_root=git_repo,
+        tracked_branch="main",
+        registry_entry=SimpleNamespace(repository_id=repo_id, path=git_repo),
+    )
+    dispatcher = RecordingDispatcher(store)
+    indexer = IncrementalIndexer(
+        store=store, dispatcher=dispatcher, repo_path=git_repo, ctx=ctx
+    )  # type: ignore[arg-type]
+    indexer._get_repository_id = lambda: repo_id  # type: ignore[method-assign]
+    return indexer, store, dispatcher, repo_id
+
+
+def test_hash_blob_oid_matches_git_hash_object(git_repo: Path):
+    target = git_repo / "pkg" / "a.py"
+    assert hash_blob_oid(target) == _git(git_repo, "hash-object", str(target))
+
+
+def test_snapshot_reads_index_and_dirty_paths(git_repo: Path):
+    (git_repo / "b.py").write_text("b = 3\n")
+
+    snapshot = GitBlobSnapshot.load(git_repo)
+
+    assert snapshot is not None
+    assert set(snapshot.oids) == {"pkg/a.py", "b.py"}
+    assert snapshot.dirty == {"b.py"}
+    assert snapshot.current_oid("b.py", git_repo / "b.py") == _git(git_repo, "hash-object", "b.py")
+
+
+def test_snapshot_paths_are_relative_to_subdirectory(git_repo: Path):
+    snapshot = GitBlobSnapshot.load(git_repo / "pkg")
+
+    assert snapshot is not None
+    assert set(snapshot.oids) == {"a.py"}
+
+
+def test_snapshot_is_none_outside_git(tmp_path: Path):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    assert GitBlobSnapshot.load(plain) is None
+
+
+def test_unchanged_clean_files_skip_without_hashing(indexer, git_repo: Path, monkeypatch):
+    incremental, store, dispatcher, repo_id = indexer
+    changes = [FileChange("pkg/a.py", "added"), FileChange("b.py", "added")]
+
+    first = incremental.update_from_changes(changes)
+    assert first.files_indexed == 2
+    assert _stored_oid(store, repo_id, "pkg/a.py") == _git(git_repo, "rev-parse", ":pkg/a.py")
+    assert _stored_oid(store, repo_id, "b.py") == _git(git_repo, "rev-parse", ":b.py")
+
+    def fail_hash(*args, **kwargs):
+        raise AssertionError("clean tracked files must not be hashed")
+
+    monkeypatch.setattr(incremental, "_compute_file_hash", fail_hash)
+    monkeypatch.setattr("mcp_server.indexing.git_blob_oids.hash_blob_oid", fail_hash)
+
+    second = incremental.update_from_changes(changes)
+    assert second.files_skipped == 2
+    assert second.files_indexed == 0
+
+
+def test_dirty_file_is_reindexed_by_oid(indexer, git_repo: Path):
+    incremental, store, dispatcher, repo_id = indexer
+    incremental.update_from_changes([FileChange("b.py", "added")])
+
+    (git_repo / "b.py").write_text("b = 42\n")
+    stats = incremental.update_from_changes([FileChange("b.py", "modified")])
+
+    assert stats.files_indexed == 1
+    assert _stored_oid(store, repo_id, "b.py") == _git(git_repo, "hash-object", "b.py")
+
+
+def test_store_file_content_change_clears_recorded_oid(indexer, git_repo: Path):
+    incremental, store, dispatcher, repo_id = indexer
+    incremental.update_from_changes([FileChange("b.py", "added")])
+    assert _stored_oid(store, repo_id, "b.py") is not None
+
+    (git_repo / "b.py").write_text("b = 'rewritten elsewhere'\n")
+    store.store_file(repo_id, git_repo / "b.py", language="python")
+
+    assert _stored_oid(store, repo_id, "b.py") is None
+
+
+def test_failed_run_still_releases_the_snapshot(indexer, monkeypatch):
+    incremental, store, dispatcher, repo_id = indexer
+
+    def fail(changes, stats):
+        incremental._current_blob_oid("b.py", incremental.repo_path / "b.py")
+        raise RuntimeError("indexing aborted")
+
+    monkeypatch.setattr(incremental, "_index_files_with_checkpoint", fail)
+    with pytest.raises(RuntimeError):
+        incremental.update_from_changes([FileChange("b.py", "modified")])
+
+    assert incremental._git_snapshot is None
+    assert incremental._observed_blob_oids == {} and incremental._pending_blob_oids == {}
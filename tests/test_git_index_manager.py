@@ -9,7 +9,7 @@ from datetime import datetime
 from inspect import signature
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -665,6 +665,37 @@ def test_incremental_missing_rename_destination_is_clean_only_after_delete_succe
     assert result.moved == 0
 
 
+def test_catch_up_semantic_replays_the_commit_range_on_the_parent_dispatcher(tmp_path):
+    repo = _make_git_repo(tmp_path)
+    (repo / "renamed.py").write_text("x = 1\n")
+    ctx = _make_ctx("repo-1", repo, tmp_path / "index.db")
+    registry = MagicMock()
+    registry.get_repository.return_value = _make_repo_info(repo, "old")
+    dispatcher = MagicMock()
+    manager = GitAwareIndexManager(registry, dispatcher)
+    changes = ChangeSet(
+        added=["new.py"],
+        modified=["hello.py"],
+        deleted=["gone.py"],
+        renamed=[("before.py", "renamed.py"), ("vanished.py", "missing.py")],
+    )
+
+    with (
+        patch.object(manager, "_resolve_ctx", return_value=ctx),
+        patch.object(manager, "_get_changed_files", return_value=changes) as changed,
+    ):
+        manager.catch_up_semantic("repo-1", "old", "new")
+        assert manager.catch_up_semantic("repo-1", "new", "new") == {"semantic_stage": "skipped"}
+
+    changed.assert_called_once_with(repo, "old", "new")
+    dispatcher.apply_semantic_changes.assert_called_once_with(
+        ctx,
+        indexed=[repo / "new.py", repo / "hello.py"],
+        removed=[repo / "gone.py", repo / "vanished.py"],
+        moved=[(repo / "before.py", repo / "renamed.py")],
+    )
+
+
 def test_incremental_missing_rename_destination_not_clean_when_delete_not_found(tmp_path):
     repo = _make_git_repo(tmp_path)
     commit = _get_head_commit(repo)
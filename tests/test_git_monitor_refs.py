@@ -0,0 +1,149 @@
+"""Tests for ref-file based HEAD resolution and the watching GitMonitor."""
+
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from mcp_server.watcher.git_refs import GitRefReader, RefStorageUnavailable
+from mcp_server.watcher_multi_repo import GitMonitor
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not available")
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.email=t@example.com", "-c", "user.name=t", *args],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def _commit(repo: Path, name: str) -> str:
+    (repo / name).write_text(f"{name}\n")
+    _git(repo, "add", name)
+    _git(repo, "commit", "-q", "-m", name)
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def git_repo(tmp_path: Path) -> Path:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _commit(repo, "a.txt")
+    return repo
+
+
+def test_reader_resolves_loose_and_packed_refs(git_repo: Path):
+    reader = GitRefReader(git_repo)
+    assert reader.head_ref() == "refs/heads/main"
+    assert reader.head_commit() == _git(git_repo, "rev-parse", "HEAD")
+
+    _git(git_repo, "pack-refs", "--all")
+    assert not (git_repo / ".git" / "refs" / "heads" / "main").exists()
+    assert reader.head_commit() == _git(git_repo, "rev-parse", "HEAD")
+
+    # A new loose ref shadows the packed entry.
+    head = _commit(git_repo, "b.txt")
+    assert reader.head_commit() == head
+
+
+def test_reader_handles_detached_head_and_unborn_branch(git_repo: Path, tmp_path: Path):
+    sha = _git(git_repo, "rev-parse", "HEAD")
+    _git(git_repo, "checkout", "-q", "--detach")
+    reader = GitRefReader(git_repo)
+    assert reader.head_ref() is None
+    assert reader.head_commit() == sha
+
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    _git(empty, "init", "-q")
+    assert GitRefReader(empty).head_commit() is None
+
+
+def test_reader_follows_worktree_gitdir_indirection(git_repo: Path, tmp_path: Path):
+    worktree = tmp_path / "wt"
+    _git(git_repo, "worktree", "add", "-q", "-b", "feature", str(worktree))
+    feature_head = _commit(worktree, "f.txt")
+
+    reader = GitRefReader(worktree)
+    assert reader.dirs.common_dir == (git_repo / ".git").resolve()
+    assert reader.head_ref() == "refs/heads/feature"
+    assert reader.head_commit() == feature_head
+    assert GitRefReader(git_repo).head_commit() != feature_head
+
+
+def test_reader_rejects_unreadable_layouts(git_repo: Path, tmp_path: Path):
+    with pytest.raises(RefStorageUnavailable):
+        GitRefReader(tmp_path / "missing").head_commit()
+
+    (git_repo / ".git" / "reftable").mkdir()
+    with pytest.raises(RefStorageUnavailable):
+        GitRefReader(git_repo).head_commit()
+
+
+def _monitor_for(repo: Path, callback):
+    info = SimpleNamespace(path=str(repo), auto_sync=True, name="repo")
+    registry = Mock()
+    registry.get_all_repositories.return_value = {"repo-1": info}
+    registry.get_repository.side_effect = lambda repo_id: info if repo_id == "repo-1" else None
+    monitor = GitMonitor(registry, callback, coalesce_seconds=0.05)
+    monitor.check_interval = 3600  # only ref-file events can trigger a check
+    return monitor
+
+
+def test_monitor_reports_commit_from_ref_events_without_git(git_repo: Path, monkeypatch):
+    seen = []
+    fired = threading.Event()
+
+    def callback(repo_id, commit):
+        seen.append((repo_id, commit))
+        fired.set()
+
+    monitor = _monitor_for(git_repo, callback)
+    monkeypatch.setattr(
+        monitor, "_get_current_commit", Mock(side_effect=AssertionError("spawned git"))
+    )
+    monitor.start()
+    try:
+        for _ in range(250):  # wait for the initial poll to record the baseline
+            if "repo-1" in monitor.last_commits:
+                break
+            time.sleep(0.02)
+        head = _commit(git_repo, "b.txt")
+        assert fired.wait(5), "commit was not detected from ref-file events"
+    finally:
+        monitor.stop()
+
+    assert seen == [("repo-1", head)]
+
+
+def test_monitor_coalesces_rapid_ref_updates(git_repo: Path):
+    monitor = _monitor_for(git_repo, Mock())
+    for _ in range(50):
+        monitor.schedule_check("repo-1")
+
+    ready, next_due = monitor._take_due(now=0.0)
+    assert ready == [] and next_due is not None
+
+    ready, next_due = monitor._take_due(now=next_due)
+    assert ready == ["repo-1"]
+    assert next_due is None
+
+
+def test_monitor_falls_back_to_git_when_refs_unreadable(tmp_path: Path):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    monitor = _monitor_for(plain, Mock())
+    monitor._get_current_commit = Mock(return_value="f" * 40)
+
+    assert monitor._read_current_commit("repo-1", str(plain)) == "f" * 40
+    monitor._get_current_commit.assert_called_once_with(str(plain))
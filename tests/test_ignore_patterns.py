@@ -1,5 +1,7 @@
 """Tests for mcp_server/core/ignore_patterns.py — IgnorePatternManager and build_walker_filter."""
 
+import fnmatch
+import os
 from pathlib import Path
 
 import pytest
@@ -8,7 +10,9 @@ from mcp_server.core.ignore_patterns import (
     EXCLUDED_DIR_PARTS,
     IgnorePatternManager,
     build_walker_filter,
+    compile_ignore_rule,
 )
+from tests.conftest import measure_time
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
@@ -268,3 +272,140 @@ class TestWalkerIntegration:
         is_excluded = build_walker_filter(tmp_path)
         assert is_excluded(tmp_path / "app.log") is True
         assert is_excluded(tmp_path / "src" / "main.py") is False
+
+
+def _manager(root: Path, gitignore: str) -> IgnorePatternManager:
+    (root / ".gitignore").write_text(gitignore)
+    (root / ".mcp-index-ignore").write_text("")
+    return IgnorePatternManager(root_path=root)
+
+
+class TestGitignoreSemantics:
+    """Negation, anchoring, directory-only rules and nested .gitignore files."""
+
+    def test_negation_last_match_wins(self, tmp_path):
+        manager = _manager(tmp_path, "*.log\n!keep.log\n")
+        assert manager.should_ignore(Path("server.log")) is True
+        assert manager.should_ignore(Path("logs/keep.log")) is False
+
+        manager = _manager(tmp_path, "!keep.log\n*.log\n")
+        assert manager.should_ignore(Path("keep.log")) is True
+
+    def test_file_under_ignored_directory_cannot_be_reincluded(self, tmp_path):
+        manager = _manager(tmp_path, "build/\n!build/keep.py\n")
+        assert manager.should_ignore(Path("build/keep.py")) is True
+
+        manager = _manager(tmp_path, "build/*\n!build/keep.py\n")
+        assert manager.should_ignore(Path("build/keep.py")) is False
+        assert manager.should_ignore(Path("build/other.py")) is True
+
+    def test_anchored_and_basename_patterns(self, tmp_path):
+        manager = _manager(tmp_path, "/out.txt\ndocs/*.md\nnotes.txt\n")
+        assert manager.should_ignore(Path("out.txt")) is True
+        assert manager.should_ignore(Path("sub/out.txt")) is False
+        assert manager.should_ignore(Path("docs/a.md")) is True
+        assert manager.should_ignore(Path("docs/sub/a.md")) is False
+        assert manager.should_ignore(Path("a/b/notes.txt")) is True
+
+    def test_double_star_patterns(self, tmp_path):
+        manager = _manager(tmp_path, "**/gen/*.py\nlogs/**\na/**/z.txt\n")
+        assert manager.should_ignore(Path("gen/x.py")) is True
+        assert manager.should_ignore(Path("deep/er/gen/x.py")) is True
+        assert manager.should_ignore(Path("logs/2024/01/x.txt")) is True
+        assert manager.should_ignore(Path("a/z.txt")) is True
+        assert manager.should_ignore(Path("a/b/c/z.txt")) is True
+        assert manager.should_ignore(Path("b/z.txt")) is False
+
+    def test_directory_only_rule_skips_files_of_same_name(self, tmp_path):
+        manager = _manager(tmp_path, "cache/\n")
+        (tmp_path / "cache").write_text("not a directory\n")
+        assert manager.should_ignore(Path("cache")) is False
+        assert manager.should_ignore(Path("cache"), is_dir=True) is True
+        assert manager.should_ignore(Path("src/cache/x.py")) is True
+
+    def test_nested_gitignore_is_relative_and_overrides_parent(self, tmp_path):
+        manager = _manager(tmp_path, "*.gen\n")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / ".gitignore").write_text("/local.txt\n!keep.gen\n")
+        manager.reload()
+        assert manager.should_ignore(tmp_path / "pkg" / "local.txt") is True
+        assert manager.should_ignore(tmp_path / "pkg" / "sub" / "local.txt") is False
+        assert manager.should_ignore(tmp_path / "local.txt") is False
+        assert manager.should_ignore(tmp_path / "pkg" / "sub" / "keep.gen") is False
+        assert manager.should_ignore(tmp_path / "keep.gen") is True
+
+    def test_compile_ignore_rule_parses_flags(self):
+        assert compile_ignore_rule("# comment") is None
+        assert compile_ignore_rule("   ") is None
+        rule = compile_ignore_rule("!/dist/")
+        assert (rule.negate, rule.dir_only, rule.anchored) == (True, True, True)
+        assert compile_ignore_rule("\\#literal").regex == "\\#literal"
+        assert compile_ignore_rule("**/name").anchored is False
+
+
+class TestDirectoryPruning:
+    """Per-directory decisions are cached so walkers prune subtrees cheaply."""
+
+    def test_walker_prunes_ignored_subtree(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("generated/\n")
+        for rel in ("src/a.py", "generated/deep/b.py", "src/generated/c.py"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text("x = 1\n")
+
+        is_excluded = build_walker_filter(tmp_path)
+        visited = []
+        for root, dirnames, filenames in os.walk(tmp_path):
+            dirnames[:] = [d for d in dirnames if not is_excluded(Path(root) / d, is_dir=True)]
+            visited.extend(Path(root, f).relative_to(tmp_path).as_posix() for f in filenames)
+        assert sorted(visited) == [".gitignore", "src/a.py"]
+
+    def test_directory_decisions_are_cached_and_bounded(self, tmp_path):
+        (tmp_path / ".gitignore").write_text("skip/\n")
+        manager = IgnorePatternManager(root_path=tmp_path, dir_cache_size=4)
+        for i in range(20):
+            assert manager.should_ignore(Path(f"keep/f{i}.py")) is False
+            assert manager.should_ignore(Path(f"skip/f{i}.py")) is True
+        assert manager.dir_cache_misses == 2
+        assert manager.dir_cache_hits >= 38
+
+        for i in range(10):
+            manager.is_dir_ignored(Path(f"d{i}"))
+        assert len(manager._dir_cache) == 4
+
+    def test_reload_clears_cached_decisions(self, tmp_path):
+        manager = _manager(tmp_path, "")
+        assert manager.is_dir_ignored(Path("out")) is False
+        (tmp_path / ".gitignore").write_text("out/\n")
+        manager.reload()
+        assert manager.is_dir_ignored(Path("out")) is True
+
+
+class TestMatcherPerformance:
+    """Microbenchmark: compiled matcher vs. a per-pattern fnmatch loop."""
+
+    @pytest.mark.benchmark
+    def test_compiled_matcher_beats_pattern_loop(self, tmp_path, benchmark_results):
+        patterns = [f"*.ext{i}" for i in range(150)] + [f"dir{i}/" for i in range(150)]
+        manager = _manager(tmp_path, "\n".join(patterns) + "\n")
+        paths = [Path(f"src/pkg{i % 50}/mod{i}.py") for i in range(1000)]
+
+        def pattern_loop(path: Path) -> bool:
+            text = path.as_posix()
+            for pattern in patterns:
+                if pattern.endswith("/"):
+                    if any(fnmatch.fnmatch(p.name, pattern[:-1]) for p in path.parents):
+                        return True
+                elif fnmatch.fnmatch(text, pattern) or fnmatch.fnmatch(path.name, pattern):
+                    return True
+            return False
+
+        with measure_time("ignore_pattern_loop", benchmark_results):
+            expected = [pattern_loop(p) for p in paths]
+        with measure_time("ignore_compiled_matcher", benchmark_results):
+            actual = [manager.should_ignore(p) for p in paths]
+
+        assert actual == expected
+        assert (
+            benchmark_results["ignore_compiled_matcher"][-1]
+            < benchmark_results["ignore_pattern_loop"][-1]
+        )
@@ -0,0 +1,270 @@
+"""Section-level incremental re-chunking and re-embedding of documents."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from unittest.mock import Mock
+
+from mcp_server.document_processing import (
+    DocumentSection,
+    DocumentStructure,
+    Section,
+    SectionChunkCache,
+    SemanticChunker,
+    section_digest,
+)
+from mcp_server.document_processing.base_document_plugin import DocumentMetadata
+from mcp_server.plugins.markdown_plugin import MarkdownPlugin
+from mcp_server.plugins.markdown_plugin.section_extractor import SectionExtractor
+from mcp_server.plugins.plaintext_plugin.plugin import PlainTextPlugin
+
+PLAINTEXT_CONFIG = {"name": "plaintext", "code": "plaintext", "extensions": [".txt"]}
+
+
+def _markdown(parts: int) -> str:
+    body = ["# Design\n\nIntro paragraph about the design.\n"]
+    for i in range(parts):
+        prose = " ".join(f"Sentence {i}.{j} about topic {j % 7}." for j in range(40))
+        body.append(
+            f"## Part {i}\n\n{prose}\n\n### Detail {i}\n\n"
+            f"```python\ndef f{i}():\n    return {i}\n```\n"
+        )
+    return "\n".join(body)
+
+
+def _plaintext(parts: int) -> str:
+    body = ["PROJECT NOTES\n\nThese notes describe the system in some detail."]
+    for i in range(parts):
+        prose = " ".join(f"Statement {i}.{j} explains caching behaviour." for j in range(30))
+        body.append(f"# Topic {i}\n\n{prose}")
+    return "\n\n".join(body)
+
+
+def _markdown_view(chunks):
+    return [
+        (
+            c.id,
+            c.content,
+            c.metadata.line_start,
+            c.metadata.line_end,
+            c.metadata.chunk_index,
+            c.metadata.total_chunks,
+            c.context_before,
+            c.context_after,
+        )
+        for c in chunks
+    ]
+
+
+def _plaintext_view(chunks):
+    return [
+        (c.content, c.start_pos, c.end_pos, c.chunk_index, c.metadata, c.embedding_text)
+        for c in chunks
+    ]
+
+
+def test_markdown_sections_end_at_the_next_sibling_heading():
+    content = "# A\n\nalpha\n\n## B\n\nbeta\n\n# C\n\ngamma\n"
+    plugin = MarkdownPlugin(enable_semantic=False)
+    sections = SectionExtractor().extract(plugin.parser.parse(content), content)
+    a, c = sections
+    assert "beta" in a["content"] and "gamma" not in a["content"]
+    assert "gamma" not in a["subsections"][0]["content"]
+    assert c["content"].strip().endswith("gamma")
+
+
+def test_markdown_rechunking_matches_a_fresh_plugin():
+    text = _markdown(20)
+    plugin = MarkdownPlugin(enable_semantic=False)
+    plugin.chunk_document(text, Path("d.md"))
+    rng = random.Random(1)
+    for step in range(8):
+        lines = text.split("\n")
+        index = rng.randrange(len(lines))
+        if rng.random() < 0.5:
+            lines.insert(index, f"Inserted line {step}.")
+        else:
+            lines[index] += f" edit{step}"
+        text = "\n".join(lines)
+
+        got = plugin.chunk_document(text, Path("d.md"))
+        fresh = MarkdownPlugin(enable_semantic=False).chunk_document(text, Path("d.md"))
+        assert _markdown_view(got) == _markdown_view(fresh)
+
+    stats = plugin._section_chunks.stats()
+    assert stats["sections_reused"] > 4 * stats["sections_built"]
+
+
+def test_markdown_edit_under_one_enclosing_heading_rebuilds_only_its_section():
+    # Every "## Part" sits under the single "# Design" heading.
+    text = _markdown(30)
+    plugin = MarkdownPlugin(enable_semantic=False)
+    before = plugin.chunk_document(text, Path("d.md"))
+    built = plugin._section_chunks.stats()["sections_built"]
+
+    edited = text.replace("Sentence 4.3 about", "Sentence 4.3 now about")
+    after = plugin.chunk_document(edited, Path("d.md"))
+    assert plugin._section_chunks.stats()["sections_built"] == built + 1
+
+    def ids(chunks, title):
+        return [c.id for c in chunks if c.metadata.section_hierarchy[-1] == title]
+
+    changed = {c.id for c in after} - {c.id for c in before}
+    assert len(changed) == len(ids(after, "Part 4")) == 1
+    assert ids(after, "Design") == ids(before, "Design")
+    assert ids(after, "Part 7") == ids(before, "Part 7")
+    assert ids(after, "Detail 4") == ids(before, "Detail 4")
+    # The enclosing section is chunked on its own body, not its subsections'.
+    [design] = [c for c in after if c.metadata.section_hierarchy[-1] == "Design"]
+    assert "Part 0" not in design.content
+
+
+def test_plaintext_rechunking_matches_a_fresh_plugin_and_keeps_ids():
+    text = _plaintext(6)
+    plugin = PlainTextPlugin(PLAINTEXT_CONFIG, enable_semantic=False)
+    before = plugin.chunk_document(text, Path("d.txt"))
+
+    edited = text.replace("Statement 2.5 explains", "Statement 2.5 now explains")
+    after = plugin.chunk_document(edited, Path("d.txt"))
+    fresh = PlainTextPlugin(PLAINTEXT_CONFIG, enable_semantic=False)
+    assert _plaintext_view(after) == _plaintext_view(fresh.chunk_document(edited, Path("d.txt")))
+
+    ids_before = [c.metadata["chunk_id"] for c in before]
+    ids_after = [c.metadata["chunk_id"] for c in after]
+    assert len(set(ids_before) & set(ids_after)) == len(ids_after) - 1
+
+
+def test_semantic_chunker_keeps_ids_of_untouched_sections():
+    def structure(text):
+        lines = text.split("\n")
+        starts = [i for i, line in enumerate(lines) if line.startswith("# ")] + [len(lines)]
+        sections = [
+            Section(
+                id=lines[start],
+                heading=lines[start][2:],
+                level=1,
+                content="\n".join(lines[start + 1 : end]).strip(),
+                start_line=start,
+                end_line=end,
+            )
+            for start, end in zip(starts, starts[1:])
+        ]
+        return DocumentStructure(title="t", sections=sections, metadata={})
+
+    text = _plaintext(5)
+    chunker = SemanticChunker()
+    before = chunker.chunk_document(text, structure(text), {"path": "d.txt"}).chunks
+    edited = text.replace("Statement 0.1 explains", "Statement 0.1 also explains")
+    after = chunker.chunk_document(edited, structure(edited), {"path": "d.txt"}).chunks
+    fresh = SemanticChunker().chunk_document(edited, structure(edited), {"path": "d.txt"})
+
+    assert [(c.id, c.content, c.context_before, c.context_after) for c in after] == [
+        (c.id, c.content, c.context_before, c.context_after) for c in fresh.chunks
+    ]
+    assert len({c.id for c in before} & {c.id for c in after}) == len(after) - 1
+
+
+def test_cache_reports_embedding_delta():
+    cache = SectionChunkCache()
+    assert cache.embedding_delta("d", {"a": "x", "b": "y"}) == (["a", "b"], [])
+    cache.record_embeddings("d", {"a": "x", "b": "y"})
+    assert cache.embedding_delta("d", {"a": "x", "c": "z"}) == (["c"], ["b"])
+    assert cache.embedding_delta("d", {"a": "x2", "b": "y"}) == (["a"], ["a"])
+
+    sections = [DocumentSection(section_digest("s", i), payload=i) for i in range(3)]
+    chunks = cache.rechunk(
+        "d",
+        sections,
+        build=lambda unit: [{"n": unit.payload}],
+        relocate=lambda chunk, lines, chars: None,
+        assign_id=lambda chunk, chunk_id: chunk.update(id=chunk_id),
+    )
+    assert len(chunks) == 3 and cache.embedding_delta("d", {"a": "x"}) == ([], ["b"])
+    cache.invalidate("d")
+    assert len(cache) == 0
+
+
+def test_plugin_reembeds_only_changed_chunks():
+    plugin = PlainTextPlugin(PLAINTEXT_CONFIG, enable_semantic=False)
+    plugin.semantic_indexer = Mock()
+    metadata = DocumentMetadata(title="Notes")
+    text = _plaintext(6)
+
+    chunks = plugin.chunk_document(text, Path("d.txt"))
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    assert plugin.semantic_indexer.index_symbol.call_count == len(chunks)
+
+    plugin.semantic_indexer.reset_mock()
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    plugin.semantic_indexer.index_symbol.assert_not_called()
+
+    edited = text.replace("Statement 5.5 explains", "Statement 5.5 now explains")
+    chunks = plugin.chunk_document(edited, Path("d.txt"))
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    # The edited chunk plus the neighbour whose "previous context" changed.
+    assert 1 <= plugin.semantic_indexer.index_symbol.call_count <= 3
+    assert plugin.semantic_indexer.index_symbol.call_count < len(chunks)
+
+
+def test_plugin_clears_vectors_by_path_when_embedded_ids_are_unknown():
+    plugin = PlainTextPlugin(PLAINTEXT_CONFIG, enable_semantic=False)
+    plugin.semantic_indexer = Mock()
+    metadata = DocumentMetadata(title="Notes")
+    text = _plaintext(6)
+
+    chunks = plugin.chunk_document(text, Path("d.txt"))
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    plugin.semantic_indexer.remove_file.assert_called_once_with("d.txt")
+
+    plugin.semantic_indexer.reset_mock()
+    edited = text.replace("Statement 5.5 explains", "Statement 5.5 now explains")
+    chunks = plugin.chunk_document(edited, Path("d.txt"))
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    plugin.semantic_indexer.remove_file.assert_not_called()
+
+    # A restart (or LRU eviction) forgets which chunk ids were embedded, so the
+    # old vectors are dropped by path and every chunk is embedded again.
+    plugin.semantic_indexer.reset_mock()
+    plugin._section_chunks.clear()
+    plugin._index_chunks_semantically("d.txt", chunks, metadata)
+    plugin.semantic_indexer.remove_file.assert_called_once_with("d.txt")
+    assert plugin.semantic_indexer.index_symbol.call_count == len(chunks)
+
+
+def test_markdown_plugin_reembeds_changed_chunks_and_repositions_moved_ones():
+    plugin = MarkdownPlugin(enable_semantic=False)
+    plugin.semantic_indexer = Mock()
+    metadata = DocumentMetadata(title="Design")
+    text = _markdown(6)
+
+    chunks = plugin.chunk_document(text, Path("d.md"))
+    plugin._index_chunks_semantically("d.md", chunks, metadata)
+    calls = [c.kwargs for c in plugin.semantic_indexer.index_symbol.call_args_list]
+    assert [c["name"] for c in calls] == [f"d.md:chunk:{c.id}" for c in chunks]
+    part = next(c for c in calls if c["metadata"]["section"] == "Part 2")
+    assert (
+        part["metadata"]["section_hierarchy"]
+        == chunks[calls.index(part)].metadata.section_hierarchy
+    )
+    assert "Section: Part 2" in part["content"]
+
+    plugin.semantic_indexer.reset_mock()
+    plugin._index_chunks_semantically("d.md", chunks, metadata)
+    plugin.semantic_indexer.index_symbol.assert_not_called()
+    plugin.semantic_indexer.update_chunk_payloads.assert_not_called()
+
+    # Two lines inserted at the top shift every chunk without changing its text.
+    edited = text.replace("Intro paragraph", "Intro paragraph.\n\nAnother intro", 1)
+    chunks = plugin.chunk_document(edited, Path("d.md"))
+    plugin._index_chunks_semantically("d.md", chunks, metadata)
+    embedded = {c.kwargs["name"] for c in plugin.semantic_indexer.index_symbol.call_args_list}
+    [(moved,), _] = plugin.semantic_indexer.update_chunk_payloads.call_args
+    assert 1 <= len(embedded) <= 2
+    assert not embedded & set(moved)
+    assert len(embedded) + len(moved) == len(chunks)
+    for chunk in chunks:
+        payload = moved.get(f"d.md:chunk:{chunk.id}")
+        if payload is not None:
+            assert payload["line"] == chunk.metadata.line_start
+            assert payload["span"] == [chunk.metadata.line_start, chunk.metadata.line_end]
@@ -215,6 +215,21 @@ def test_incremental_deletion_handles_missing_files(incremental_indexer):
     assert semantic_indexer.cleanup_calls[-1]["chunk_ids"] == ["chunk-removed-1"]
 
 
+def test_incremental_rename_moves_without_reembedding(incremental_indexer):
+    repo_path, _, dispatcher, indexer, semantic_indexer, ctx = incremental_indexer
+    renamed = repo_path / "renamed.py"
+    renamed.write_text("value = 1\n")
+
+    stats = indexer.update_from_changes([FileChange("renamed.py", "renamed", old_path="old.py")])
+
+    assert stats.files_moved == 1
+    assert stats.errors == 0
+    assert [(old, new) for old, new, _ in dispatcher.moved] == [(repo_path / "old.py", renamed)]
+    assert dispatcher.ctx is ctx
+    assert dispatcher.semantic_rebuilds == []
+    assert semantic_indexer.cleanup_calls == []
+
+
 def test_incremental_cleanup_includes_split_semantic_chunk_ids(incremental_indexer):
     repo_path, store, dispatcher, indexer, semantic_indexer, ctx = incremental_indexer
     existing_file = repo_path / "split.py"
@@ -0,0 +1,179 @@
+"""Incremental reparsing, partial re-chunking and row-level re-persistence."""
+
+from __future__ import annotations
+
+import logging
+import random
+from types import SimpleNamespace
+
+import chunker
+import pytest
+
+from mcp_server.core.path_resolver import PathResolver
+from mcp_server.core.repo_context import RepoContext
+from mcp_server.dispatcher.dispatcher_enhanced import EnhancedDispatcher
+from mcp_server.storage.sqlite_store import SQLiteStore
+from mcp_server.utils.incremental_parse import IncrementalChunker, ParseTreeCache, compute_edit
+
+PYTHON = '''import os
+
+# -- helpers -------------------------------------------------------------
+
+
+def first(value):
+    """Return the value."""
+    return value
+
+
+class Holder:
+    @property
+    def items(self):
+        return [os.sep, first(1)]
+
+    def add(self, item):
+        self.items.append(lambda: item)
+
+
+def last(value):
+    return first(value) * 2
+'''
+
+JAVASCRIPT = """import { join } from "path";
+
+// Build a path.
+function build(parts) {
+  return join(...parts);
+}
+
+class Registry {
+  constructor() { this.items = []; }
+  add(item) { this.items.push(() => item); }
+}
+
+export const twice = (x) => build([x, x]);
+"""
+
+
+def _as_dicts(chunks):
+    return [chunk.__dict__ for chunk in chunks]
+
+
+def test_compute_edit_finds_the_smallest_replacement():
+    old = "def f():\n    return 1\n".encode()
+    new = "def f():\n    return 12\n    # é\n".encode()
+    edit = compute_edit(old, new)
+    assert (edit.start_byte, edit.old_end_byte) == (21, 21)
+    assert new[edit.start_byte : edit.new_end_byte] == "2\n    # é".encode()
+    assert edit.start_point == edit.old_end_point == (1, 12)
+    assert edit.new_end_point == (2, 8)  # columns count bytes
+    assert edit.line_delta == 1 and edit.byte_delta == len(new) - len(old)
+    assert compute_edit(old, old) is None
+    assert compute_edit(b"aaaa", b"aa").byte_delta == -2
+
+
+def test_reparse_matches_a_fresh_parse_and_reports_changed_ranges():
+    cache = ParseTreeCache()
+    cold = cache.parse("f.py", "python", PYTHON)
+    assert not cold.incremental and cold.changed_ranges == [(0, len(PYTHON))]
+
+    edited = PYTHON.replace("return value", "return value + 1")
+    result = cache.parse("f.py", "python", edited)
+    fresh = ParseTreeCache().parse("g.py", "python", edited)
+    assert result.incremental
+    assert str(result.tree.root_node) == str(fresh.tree.root_node)
+    start = edited.index("value + 1")
+    assert any(s <= start + 6 <= e for s, e in result.changed_ranges)
+    assert cache.parse("f.py", "python", edited).changed_ranges == []
+    assert cache.stats()["incremental_parses"] == 1 and cache.stats()["unchanged"] == 1
+
+
+def test_cache_is_bounded_by_entries_and_bytes():
+    cache = ParseTreeCache(max_entries=2, max_bytes=len(PYTHON) * 2 + 10)
+    for key in ("a", "b", "c"):
+        cache.parse(key, "python", PYTHON)
+    assert len(cache) == 2
+    assert not cache.parse("a", "python", PYTHON).incremental  # evicted first
+
+    cache.parse("big", "python", PYTHON * 3)  # larger than the whole budget
+    assert cache.stats()["bytes"] <= cache.max_bytes
+    assert not cache.parse("big", "python", PYTHON * 3).incremental
+
+
+@pytest.mark.parametrize(
+    "language,source,comment", [("python", PYTHON, "#"), ("javascript", JAVASCRIPT, "//")]
+)
+def test_partial_rechunk_matches_full_chunking(language, source, comment):
+    chunks = IncrementalChunker()
+    chunks.chunk(source, language, path="f", file_path="f")
+    rng = random.Random(5)
+    for step in range(40):
+        lines = source.split("\n")
+        index = rng.randrange(len(lines))
+        if rng.random() < 0.5:
+            indent = lines[index][: len(lines[index]) - len(lines[index].lstrip())]
+            lines.insert(index, f"{indent}{comment} note {step}")
+        elif lines[index].strip():
+            lines[index] += f"  {comment} edit {step}"
+        source = "\n".join(lines)
+
+        got = chunks.chunk(source, language, path="f", file_path="f")
+        assert _as_dicts(got) == _as_dicts(chunker.chunk_text(source, language, file_path="f"))
+
+    stats = chunks.stats()
+    assert stats["partial_chunks"] > 30 and stats["full_chunks"] == 1
+
+
+def test_syntax_errors_fall_back_to_full_chunking():
+    chunks = IncrementalChunker()
+    chunks.chunk(PYTHON, "python", path="f.py")
+    broken = PYTHON.replace("def last(value):", "def last(value)")
+    got = chunks.chunk(broken, "python", path="f.py")
+    assert _as_dicts(got) == _as_dicts(chunker.chunk_text(broken, "python"))
+    assert chunks.stats()["full_chunks"] == 2
+
+
+def test_returned_chunks_do_not_alias_the_cache():
+    chunks = IncrementalChunker()
+    first = chunks.chunk(PYTHON, "python", path="f.py")
+    first[0].byte_start = -1
+    assert chunks.chunk(PYTHON, "python", path="f.py")[0].byte_start >= 0
+
+
+def test_reindex_rewrites_only_the_rows_an_edit_touched(tmp_path):
+    logging.getLogger("mcp_server").setLevel(logging.WARNING)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    path = repo / "module.py"
+    path.write_text(PYTHON, encoding="utf-8")
+
+    store = SQLiteStore(str(tmp_path / "index.db"), path_resolver=PathResolver(repo))
+    repo_id = store.create_repository(str(repo), "repo")
+    ctx = RepoContext(
+        repo_id=str(repo_id),
+        sqlite_store=store,
+        workspace_root=repo,
+        tracked_branch="main",
+        registry_entry=SimpleNamespace(repository_id=repo_id, path=repo),
+    )
+    dispatcher = EnhancedDispatcher(semantic_search_enabled=False)
+
+    def rows():
+        with store._get_connection() as conn:
+            chunks = dict(conn.execute("SELECT chunk_id, id FROM code_chunks").fetchall())
+            symbols = dict(conn.execute("SELECT name, id FROM symbols").fetchall())
+        return chunks, symbols
+
+    dispatcher.index_file(ctx, path)
+    chunks_before, symbols_before = rows()
+
+    edited = PYTHON.replace("return first(value) * 2", "return first(value) * 3")
+    path.write_text(edited, encoding="utf-8")
+    dispatcher.index_file(ctx, path)
+    chunks_after, symbols_after = rows()
+
+    expected = {chunk.chunk_id for chunk in chunker.chunk_text(edited, "python")}
+    assert set(chunks_after) == expected
+    kept = set(chunks_before) & set(chunks_after)
+    assert len(kept) == len(expected) - 1
+    assert all(chunks_before[chunk_id] == chunks_after[chunk_id] for chunk_id in kept)
+    assert symbols_after == symbols_before
@@ -0,0 +1,204 @@
+"""Tests for tiered index integrity checks used by repository readiness."""
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from mcp_server.health import index_integrity, repository_readiness
+from mcp_server.health.index_integrity import (
+    CorruptHeaderError,
+    IntegrityVerifier,
+    deep_check_index,
+    read_sqlite_header,
+)
+from mcp_server.health.repository_readiness import (
+    ReadinessClassifier,
+    RepositoryReadinessState,
+)
+
+
+def _make_index(path: Path, rows: int = 200, wal: bool = False) -> Path:
+    conn = sqlite3.connect(path)
+    if wal:
+        conn.execute("PRAGMA journal_mode=WAL")
+    for table in ("schema_version", "repositories", "symbols", "code_chunks"):
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.execute(
+        "CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT, is_deleted BOOLEAN DEFAULT 0)"
+    )
+    conn.execute("CREATE INDEX idx_files_path ON files(path)")
+    conn.executemany(
+        "INSERT INTO files (path) VALUES (?)", [(f"src/{i}.py" + "x" * 200,) for i in range(rows)]
+    )
+    conn.executemany(
+        "INSERT INTO code_chunks (body) VALUES (?)", [("y" * 300,) for _ in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _corrupt_table(path: Path, table: str) -> None:
+    conn = sqlite3.connect(path)
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    (rootpage,) = conn.execute(
+        "SELECT rootpage FROM sqlite_master WHERE name = ?", (table,)
+    ).fetchone()
+    conn.close()
+    with open(path, "r+b") as f:
+        f.seek((rootpage - 1) * page_size)
+        f.write(b"\xff" * 64)
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    instance = IntegrityVerifier(pages_per_tick=4, interval_seconds=3600)
+    monkeypatch.setattr(index_integrity, "_verifier", instance)
+    ReadinessClassifier.clear_index_inspection_cache()
+    yield instance
+    instance.stop()
+    ReadinessClassifier.clear_index_inspection_cache()
+
+
+def test_header_probe_reads_fields_without_connecting(tmp_path):
+    db = _make_index(tmp_path / "wal.db", wal=True)
+    header = read_sqlite_header(db)
+    assert header.page_size == 4096
+    assert header.wal_mode is True
+    assert header.schema_cookie > 0
+
+    (tmp_path / "empty.db").write_bytes(b"")
+    assert read_sqlite_header(tmp_path / "empty.db") is None
+
+    (tmp_path / "text.db").write_text("not a database" * 20)
+    with pytest.raises(CorruptHeaderError):
+        read_sqlite_header(tmp_path / "text.db")
+
+
+def test_readiness_probe_does_not_scan_the_index(tmp_path, monkeypatch, verifier):
+    db = _make_index(tmp_path / "current.db")
+    statements = []
+    real_connect = sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", tracing_connect)
+    assert ReadinessClassifier._inspect_index(db) is None
+
+    scans = [s for s in statements if "check" in s.lower() or "count(" in s.lower()]
+    assert scans == []
+    assert verifier.progress(str(db.resolve())) is not None
+
+
+def test_schema_stamp_is_reused_until_schema_changes(tmp_path, verifier):
+    db = _make_index(tmp_path / "current.db")
+    assert repository_readiness._inspect_index_uncached(db) is None
+    assert len(repository_readiness._schema_stamp_cache) == 1
+
+    conn = sqlite3.connect(db)
+    conn.execute("DROP TABLE symbols")
+    conn.commit()
+    conn.close()
+    assert (
+        repository_readiness._inspect_index_uncached(db) == RepositoryReadinessState.MISSING_SCHEMA
+    )
+    assert len(repository_readiness._schema_stamp_cache) == 2
+
+
+def test_verifier_resumes_across_rate_limited_ticks(tmp_path):
+    db = str(_make_index(tmp_path / "current.db"))
+    verifier = IntegrityVerifier(pages_per_tick=4, interval_seconds=10)
+
+    assert verifier.tick(db, now=0.0) == 4
+    progress = verifier.progress(db)
+    assert progress.next_page == 5 < progress.page_count
+    assert verifier.tick(db, now=5.0) == 0  # rate-limited
+
+    now = 10.0
+    while progress.passes_completed == 0:
+        assert 0 < verifier.tick(db, now=now) <= 4
+        now += 10.0
+    assert progress.failure is None
+    assert progress.next_page == 1
+    assert progress.pages_checked == progress.to_dict()["pages_total"]
+
+
+def test_verifier_ticks_read_a_page_window_without_walking_btrees(tmp_path, monkeypatch):
+    db = str(_make_index(tmp_path / "current.db", rows=2000))
+    statements = []
+    real_connect = sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", tracing_connect)
+    verifier = IntegrityVerifier(pages_per_tick=8, interval_seconds=0)
+    assert verifier.tick(db, now=0.0) == 8
+
+    walks = [s for s in statements if "check" in s.lower() or "dbstat" in s.lower()]
+    assert walks == []
+
+
+def test_verifier_cursor_survives_a_restart(tmp_path):
+    db = str(_make_index(tmp_path / "current.db"))
+    first = IntegrityVerifier(pages_per_tick=4, interval_seconds=0)
+    first.tick(db, now=0.0)
+    first.tick(db, now=1.0)
+
+    resumed = IntegrityVerifier(pages_per_tick=4, interval_seconds=0)
+    assert resumed.progress(db) is None
+    resumed.tick(db, now=0.0)
+    assert resumed.progress(db).next_page == 13
+    assert resumed.progress(db).pages_checked == 12
+
+    os.replace(_make_index(tmp_path / "rebuilt.db"), db)
+    rebuilt = IntegrityVerifier(pages_per_tick=4, interval_seconds=0)
+    rebuilt.tick(db, now=0.0)
+    assert rebuilt.progress(db).next_page == 5
+
+
+def test_verifier_defers_bounded_ticks_while_wal_changes(tmp_path):
+    db = str(_make_index(tmp_path / "current.db"))
+    wal = Path(f"{db}-wal")
+    verifier = IntegrityVerifier(pages_per_tick=10_000, interval_seconds=0)
+
+    results = []
+    for i in range(5):
+        wal.write_bytes(b"\0" * (i + 1))
+        results.append(verifier.tick(db, now=float(i)))
+    assert results[:3] == [0, 0, 0]
+    assert results[3] > 0
+
+
+def test_background_failure_marks_index_corrupt_until_replaced(tmp_path, verifier):
+    db = _make_index(tmp_path / "current.db", rows=2000)
+    assert ReadinessClassifier._inspect_index(db) is None
+
+    _corrupt_table(db, "code_chunks")
+    verifier.pages_per_tick = 1_000_000
+    verifier.tick(str(db.resolve()), now=0.0)
+    assert "code_chunks" in verifier.failure(str(db.resolve()))
+    assert ReadinessClassifier._inspect_index(db) == RepositoryReadinessState.CORRUPT_SQLITE
+
+    os.replace(_make_index(tmp_path / "rebuilt.db"), db)
+    assert verifier.failure(str(db.resolve())) is None
+    assert ReadinessClassifier._inspect_index(db) is None
+
+
+def test_deep_check_reports_and_records_corruption(tmp_path, verifier):
+    db = _make_index(tmp_path / "current.db", rows=2000)
+    report = deep_check_index(db)
+    assert report.ok and report.errors == ()
+
+    _corrupt_table(db, "files")
+    report = ReadinessClassifier.deep_check(db)
+    assert report.ok is False
+    assert report.errors
+    assert ReadinessClassifier._inspect_index(db) == RepositoryReadinessState.CORRUPT_SQLITE
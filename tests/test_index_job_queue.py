@@ -0,0 +1,260 @@
+"""Durable indexing job queue: dedup, leases, retries and worker processes."""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from mcp.types import TaskMetadata
+
+from mcp_server.cli.task_reindex import follow_index_job, run_queued_reindex_task
+from mcp_server.storage.index_job_queue import (
+    IndexJobQueue,
+    IndexWorkerPool,
+    JobCancelled,
+    run_job,
+)
+from mcp_server.storage.mcp_task_registry import MCPTaskRegistry
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return IndexJobQueue(tmp_path / "index_jobs.db", max_attempts=3, clock=clock)
+
+
+def record_handler(job, report):
+    """Worker-process handler used by the pool test."""
+    report({"stage": "indexing", "job": job.id})
+    if job.kind == "broken":
+        raise RuntimeError("boom")
+    return {"repo": job.repo_id, "paths": job.paths}
+
+
+def crash_once_handler(job, report):
+    """Kill the worker process on the first attempt; succeed on the next."""
+    marker = Path(job.paths[0])
+    if not marker.exists():
+        marker.touch()
+        os._exit(1)
+    return {"attempts": job.attempts}
+
+
+def test_duplicates_collapse_and_raise_priority(queue):
+    first = queue.enqueue("repo-a", paths=["b.py", "a.py"], commit="c1")
+    again = queue.enqueue("repo-a", paths=["a.py", "b.py", "a.py"], commit="c1", priority=5)
+    other = queue.enqueue("repo-a", paths=["a.py"], commit="c1")
+
+    assert again == first and other != first
+    assert queue.get(first).priority == 5
+    assert queue.get(first).paths == ["a.py", "b.py"]
+
+    # A running job for the same commit absorbs new triggers.
+    job = queue.claim("w1")
+    assert job.id == first
+    assert queue.enqueue("repo-a", paths=["a.py", "b.py"], commit="c1") == first
+    assert queue.enqueue("repo-b") != queue.enqueue("repo-b", kind="full")
+
+
+def test_claim_order_and_one_lease_per_repository(queue):
+    low = queue.enqueue("repo-a", commit="c1")
+    high = queue.enqueue("repo-a", commit="c2", priority=10)
+    other = queue.enqueue("repo-b", commit="c1")
+
+    assert queue.claim("w1").id == high
+    # repo-a is busy, so the next worker gets repo-b even though low was queued first.
+    assert queue.claim("w2").id == other
+    assert queue.claim("w3") is None
+
+    queue.complete(high, "w1", {"ok": True})
+    assert queue.claim("w3").id == low
+    assert queue.get(high).result == {"ok": True}
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out(queue, clock):
+    job_id = queue.enqueue("repo-a")
+    assert queue.claim("w1", lease_seconds=10).attempts == 1
+    assert queue.heartbeat(job_id, "w1", lease_seconds=10)
+
+    clock.now += 11
+    reclaimed = queue.claim("w2", lease_seconds=10)
+    assert reclaimed.id == job_id and reclaimed.lease_owner == "w2" and reclaimed.attempts == 2
+    # The crashed worker's late heartbeat and completion are rejected.
+    assert not queue.heartbeat(job_id, "w1")
+    assert not queue.complete(job_id, "w1")
+
+    clock.now += 11
+    assert queue.claim("w3", lease_seconds=10).attempts == 3
+    clock.now += 11
+    assert queue.claim("w4") is None
+    assert queue.get(job_id).state == "failed"
+    assert queue.get(job_id).error == "lease expired"
+
+
+def test_failures_retry_with_exponential_backoff(queue, clock):
+    job_id = queue.enqueue("repo-a")
+
+    for attempt, delay in ((1, 2.0), (2, 4.0)):
+        queue.claim("w1")
+        queue.fail(job_id, "w1", "boom")
+        job = queue.get(job_id)
+        assert job.state == "queued" and job.run_after == clock.now + delay
+        assert queue.claim("w1") is None
+        clock.now += delay
+
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "boom")
+    assert queue.get(job_id).state == "failed"
+    assert [job.id for job in queue.take_finished()] == [job_id]
+    assert queue.take_finished() == []
+
+
+def test_run_job_reports_progress_and_honours_cancel(queue):
+    job_id = queue.enqueue("repo-a", paths=["a.py"])
+    assert run_job(queue, queue.claim("w1"), record_handler, "w1")
+    job = queue.get(job_id)
+    assert job.state == "done"
+    assert job.progress == {"stage": "indexing", "job": job_id}
+    assert job.result == {"repo": "repo-a", "paths": ["a.py"]}
+
+    cancelled_id = queue.enqueue("repo-a", kind="full")
+    claimed = queue.claim("w1")
+
+    def cancelling_handler(job, report):
+        queue.cancel(job.id)
+        report({"stage": "indexing"})
+
+    assert not run_job(queue, claimed, cancelling_handler, "w1")
+    assert queue.get(cancelled_id).state == "cancelled"
+    assert JobCancelled.__name__ in queue.get(cancelled_id).error
+
+
+def test_queue_survives_reopen(tmp_path):
+    path = tmp_path / "index_jobs.db"
+    job_id = IndexJobQueue(path).enqueue("repo-a", commit="c1")
+    reopened = IndexJobQueue(path)
+    assert reopened.claim("w1").id == job_id
+
+
+def test_worker_processes_drain_the_queue(tmp_path):
+    queue = IndexJobQueue(tmp_path / "index_jobs.db", max_attempts=1)
+    finished = []
+    pool = IndexWorkerPool(
+        queue,
+        record_handler,
+        workers=2,
+        lease_seconds=5,
+        poll_seconds=0.05,
+        on_finished=finished.append,
+    )
+    ids = [queue.enqueue(f"repo-{i}") for i in range(4)]
+    broken = queue.enqueue("repo-x", kind="broken")
+
+    pool.start()
+    try:
+        deadline = time.monotonic() + 60
+        while len(finished) < 5 and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        pool.stop()
+
+    states = {job.id: job.state for job in finished}
+    assert states == {**{job_id: "done" for job_id in ids}, broken: "failed"}
+    assert not pool.running
+
+
+def test_dead_worker_is_restarted_and_its_job_finishes(tmp_path):
+    queue = IndexJobQueue(tmp_path / "index_jobs.db", max_attempts=3)
+    finished = []
+    pool = IndexWorkerPool(
+        queue,
+        crash_once_handler,
+        workers=1,
+        lease_seconds=1,
+        poll_seconds=0.05,
+        restart_backoff_seconds=0.05,
+        on_finished=finished.append,
+    )
+    job_id = queue.enqueue("repo-a", paths=[str(tmp_path / "crashed")])
+
+    pool.start()
+    try:
+        deadline = time.monotonic() + 60
+        while not finished and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert pool.running
+    finally:
+        pool.stop()
+
+    assert [(job.id, job.state) for job in finished] == [(job_id, "done")]
+    assert finished[0].result == {"attempts": 2}
+    assert not pool.running
+
+
+def test_follow_index_job_mirrors_progress_into_task_registry(queue):
+    registry = MCPTaskRegistry()
+
+    async def scenario():
+        task = await registry.create_task(TaskMetadata(ttl=60000))
+        job_id = queue.enqueue("repo-a")
+        job = queue.claim("w1")
+        queue.heartbeat(job_id, "w1", progress={"stage": "indexing", "files": 3})
+
+        async def finish():
+            await asyncio.sleep(0.05)
+            queue.complete(job.id, "w1", {"files": 3})
+
+        follower = asyncio.create_task(
+            follow_index_job(
+                task_id=task.taskId,
+                registry=registry,
+                queue=queue,
+                job_id=job_id,
+                poll_seconds=0.01,
+            )
+        )
+        await finish()
+        done = await follower
+        record = await registry.get_record(task.taskId)
+        return done, record
+
+    done, record = asyncio.run(scenario())
+    assert done.state == "done" and done.result == {"files": 3}
+    assert record.progress["files"] == 3 and record.progress["job_id"] == done.id
+    assert record.task.statusMessage == "Index job leased: indexing"
+
+
+def test_task_backed_reindex_runs_as_a_queued_full_job(queue, tmp_path):
+    registry = MCPTaskRegistry()
+    ctx = SimpleNamespace(repo_id="repo-a", workspace_root=tmp_path)
+
+    async def scenario():
+        task = await registry.create_task(TaskMetadata(ttl=60000))
+        runner = asyncio.create_task(
+            run_queued_reindex_task(
+                task=SimpleNamespace(task_id=task.taskId), registry=registry, queue=queue, ctx=ctx
+            )
+        )
+        while (job := queue.claim("w1")) is None:
+            await asyncio.sleep(0.01)
+        queue.complete(job.id, "w1", {"action": "full_index", "files_processed": 4})
+        return job, await runner
+
+    job, result = asyncio.run(scenario())
+    assert job.kind == "full" and job.task_id is not None
+    assert result.structuredContent["mode"] == "queued_full"
+    assert result.structuredContent["files_processed"] == 4 and not result.isError
@@ -0,0 +1,125 @@
+"""Background FTS5 merging and SQLite upkeep."""
+
+import sqlite3
+
+import pytest
+
+from mcp_server.storage.index_maintenance import (
+    IndexMaintenanceScheduler,
+    decode_fts5_structure,
+    read_fts5_structure,
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "index.db"
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE VIRTUAL TABLE fts_code USING fts5(content, file_id UNINDEXED)")
+    # Each autocommit insert flushes its own level-0 segment.
+    for i in range(12):
+        conn.execute("INSERT INTO fts_code VALUES (?, ?)", (f"def handler_{i}(): pass", str(i)))
+    yield path, conn
+    conn.close()
+
+
+def _scheduler(**kwargs):
+    options = dict(interval_seconds=30, budget_ms=500, idle_seconds=1)
+    options.update(kwargs)
+    return IndexMaintenanceScheduler(**options)
+
+
+def test_decodes_structure_record():
+    # cookie, 1 level, 2 segments, write counter 7; level 0: no merge, 2 segments.
+    record = bytes.fromhex("00000000" "01" "02" "07" "00" "02" "010101" "020101")
+    structure = decode_fts5_structure(record)
+    assert structure.write_counter == 7
+    assert structure.level_segments == (2,)
+
+
+def test_decodes_v2_structure_record():
+    # cookie, v2 marker, 2 levels, 3 segments, write counter 7, origin counter 300;
+    # each v2 segment is id, first/last page, origin1/2, tombstone pages/entries, entries.
+    record = bytes.fromhex(
+        "00000000 ff000001 02 03 07 822c"
+        " 00 02 0101010102000003 0201010304000005"
+        " 01 01 0301010106000007"
+    )
+    structure = decode_fts5_structure(record)
+    assert structure.write_counter == 7
+    assert structure.level_segments == (2, 1)
+
+
+def test_tick_merges_segments_and_tracks_writes(index):
+    path, conn = index
+    before = read_fts5_structure(conn, "fts_code")
+    assert before.needs_merge
+
+    scheduler = _scheduler()
+    done = scheduler.tick(str(path), now=100.0)
+
+    assert done["merge"] >= 1
+    after = read_fts5_structure(conn, "fts_code")
+    assert after.segments < before.segments
+    assert not after.needs_merge
+    state = scheduler.progress(str(path)).tables["fts_code"]
+    assert state.merge_steps == done["merge"] and state.segments == after.segments
+    assert (
+        conn.execute("SELECT COUNT(*) FROM fts_code WHERE fts_code MATCH 'pass'").fetchone()[0]
+        == 12
+    )
+
+    conn.execute("INSERT INTO fts_code VALUES ('later', '99')")
+    scheduler.tick(str(path), now=200.0)
+    assert scheduler.progress(str(path)).tables["fts_code"].writes >= 1
+
+
+def test_tick_is_rate_limited(index):
+    path, _conn = index
+    scheduler = _scheduler()
+    assert scheduler.tick(str(path), now=100.0)
+    assert scheduler.tick(str(path), now=110.0) == {}
+
+
+def test_paused_while_searches_are_in_flight_or_recent(index):
+    path, conn = index
+    scheduler = _scheduler(idle_seconds=60)
+    segments = read_fts5_structure(conn, "fts_code").segments
+
+    with scheduler.searching():
+        assert scheduler.tick(str(path)) == {}
+    assert scheduler.tick(str(path)) == {}
+
+    assert scheduler.progress(str(path)).paused_ticks == 2
+    assert read_fts5_structure(conn, "fts_code").segments == segments
+
+
+def test_thresholds_trigger_optimize_analyze_and_checkpoint(index):
+    path, conn = index
+    scheduler = _scheduler(optimize_segments=2, analyze_writes=1, checkpoint_wal_bytes=1)
+    scheduler.tick(str(path), now=100.0)
+    for i in range(3):
+        conn.execute("INSERT INTO fts_code VALUES (?, ?)", (f"more {i}", str(i)))
+
+    done = scheduler.tick(str(path), now=200.0)
+
+    assert done["optimize"] == 1
+    assert done["analyze"] == 1
+    assert done["checkpoint"] == 1
+    assert read_fts5_structure(conn, "fts_code").segments == 1
+    assert (path.parent / "index.db-wal").stat().st_size == 0
+    stats = scheduler.stats()[str(path)]
+    assert stats["analyzes"] == 1 and stats["writes_since_analyze"] == 0
+
+
+def test_locked_database_is_skipped(index):
+    path, conn = index
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("INSERT INTO fts_code VALUES ('pending', '0')")
+    try:
+        scheduler = _scheduler()
+        assert scheduler.tick(str(path), now=100.0) == {}
+        assert scheduler.progress(str(path)).busy_ticks == 1
+    finally:
+        conn.execute("ROLLBACK")
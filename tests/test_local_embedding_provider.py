@@ -0,0 +1,190 @@
+"""In-process CPU embedding provider (ONNX graph or static token table)."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tokenizers")
+
+from tokenizers import Tokenizer, models, pre_tokenizers  # noqa: E402
+
+from mcp_server.interfaces.inference_contracts import (  # noqa: E402
+    EmbeddingRole,
+    ProvenanceAuthority,
+)
+from mcp_server.utils.embedding_providers import (  # noqa: E402
+    LocalEmbeddingProvider,
+    create_embedding_provider,
+)
+from mcp_server.utils.local_embedding_model import LocalEmbeddingModel  # noqa: E402
+
+WORDS = ["[UNK]", "def", "class", "return", "parse", "file", "index", "query", "search"]
+DIM = 8
+
+
+def _write_tokenizer(model_dir):
+    tokenizer = Tokenizer(
+        models.WordLevel({word: i for i, word in enumerate(WORDS)}, unk_token="[UNK]")
+    )
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(model_dir / "tokenizer.json"))
+
+
+def _table():
+    return np.random.default_rng(7).normal(size=(len(WORDS), DIM)).astype(np.float32)
+
+
+def _expected(table, text):
+    ids = [WORDS.index(w) if w in WORDS else 0 for w in text.split()]
+    vector = table[ids].mean(axis=0)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    _write_tokenizer(tmp_path)
+    np.save(tmp_path / "embeddings.npy", _table())
+    return tmp_path
+
+
+# Minimal protobuf writer: enough to emit a one-node ONNX Gather graph without
+# the onnx package.
+def _varint(n):
+    out = bytearray()
+    while True:
+        low, n = n & 0x7F, n >> 7
+        out.append(low | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _field(num, value):
+    if isinstance(value, int):
+        return _varint(num << 3) + _varint(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return _varint(num << 3 | 2) + _varint(len(value)) + value
+
+
+def _value_info(name, elem_type, dims):
+    shape = b"".join(_field(1, _field(2, d) if isinstance(d, str) else _field(1, d)) for d in dims)
+    return _field(1, name) + _field(2, _field(1, _field(1, elem_type) + _field(2, shape)))
+
+
+def _gather_model(table):
+    """``hidden = table[input_ids]``: a per-token "encoder" for pooling tests."""
+    vocab, dim = table.shape
+    weights = (
+        _field(1, vocab)
+        + _field(1, dim)
+        + _field(2, 1)
+        + _field(8, "W")
+        + _field(9, table.astype("<f4").tobytes())
+    )
+    node = _field(1, "W") + _field(1, "input_ids") + _field(2, "hidden") + _field(4, "Gather")
+    graph = (
+        _field(1, node)
+        + _field(2, "encoder")
+        + _field(5, weights)
+        + _field(11, _value_info("input_ids", 7, ["batch", "tokens"]))
+        + _field(12, _value_info("hidden", 1, ["batch", "tokens", dim]))
+    )
+    return _field(1, 8) + _field(7, graph) + _field(8, _field(1, "") + _field(2, 13))
+
+
+@pytest.fixture
+def onnx_dir(tmp_path):
+    pytest.importorskip("onnxruntime")
+    _write_tokenizer(tmp_path)
+    (tmp_path / "model_quantized.onnx").write_bytes(_gather_model(_table()))
+    (tmp_path / "config.json").write_text(json.dumps({"model_id": "toy-encoder"}))
+    return tmp_path
+
+
+TEXTS = [
+    "def parse file",
+    "",
+    "class",
+    "return index query def parse file class",
+    "search query",
+    "unknown words only",
+    "index index index",
+]
+
+
+def test_static_table_mean_pools_token_rows(static_dir):
+    model = LocalEmbeddingModel(static_dir, num_threads=3, batch_size=2)
+    vectors = model.embed(TEXTS)
+    assert model.format == "static" and vectors.shape == (len(TEXTS), DIM)
+    for text, vector in zip(TEXTS, vectors):
+        if text:
+            np.testing.assert_allclose(vector, _expected(_table(), text), rtol=1e-5)
+        else:
+            assert not vector.any()
+
+
+def test_int8_table_is_dequantized_per_row(static_dir):
+    table = _table()
+    scales = np.abs(table).max(axis=1) / 127.0
+    np.save(static_dir / "embeddings.npy", np.round(table / scales[:, None]).astype(np.int8))
+    np.save(static_dir / "embeddings_scales.npy", scales.astype(np.float32))
+
+    vectors = LocalEmbeddingModel(static_dir).embed(["def parse file", "index query"])
+    np.testing.assert_allclose(vectors[0], _expected(table, "def parse file"), atol=0.02)
+    np.testing.assert_allclose(vectors[1], _expected(table, "index query"), atol=0.02)
+
+
+def test_onnx_batches_are_bucketed_without_changing_results(onnx_dir):
+    model = LocalEmbeddingModel(onnx_dir, num_threads=2, batch_size=3)
+    assert model.format == "onnx"
+    batched = model.embed([t for t in TEXTS if t])
+    one_by_one = np.vstack([model.embed([t]) for t in TEXTS if t])
+    np.testing.assert_allclose(batched, one_by_one, rtol=1e-5)
+    # Padding is masked out of the mean.
+    np.testing.assert_allclose(batched[0], _expected(_table(), "def parse file"), rtol=1e-5)
+
+
+def test_provider_reports_artifact_provenance(onnx_dir):
+    provider = LocalEmbeddingProvider("toy", DIM, model_path=str(onnx_dir))
+    response = provider.embed_with_provenance(["def parse", "class"], "query")
+
+    assert provider.provider_name == "local"
+    assert [item.index for item in response.items] == [0, 1]
+    assert len(response.items[0].vector) == DIM
+    assert response.served_model_id.value == "toy-encoder"
+    assert response.model_revision.authority is ProvenanceAuthority.REPORTED
+    assert response.processor_id.value.startswith("tokenizer:")
+    assert response.dimension.authority is ProvenanceAuthority.REPORTED
+    assert response.role.authority is ProvenanceAuthority.DECLARED
+    capability = provider.capability()
+    assert capability.supports_role(EmbeddingRole.QUERY)
+    assert capability.can_report("model_revision") and not capability.can_report("role")
+    assert provider.embed(["class"]) == [response.items[1].vector]
+
+
+def test_role_prefixes_reach_the_model(static_dir):
+    (static_dir / "config.json").write_text(json.dumps({"query_prefix": "search "}))
+    provider = LocalEmbeddingProvider("toy", DIM, model_path=str(static_dir))
+    query = provider.embed_with_provenance(["index"], "query")
+    document = provider.embed_with_provenance(["index"], "document")
+    assert query.items[0].vector != document.items[0].vector
+    assert query.role.authority is ProvenanceAuthority.REPORTED
+    assert provider.capability().can_report("role")
+
+
+def test_factory_resolves_local_models(static_dir, monkeypatch):
+    provider = create_embedding_provider("local", "toy", DIM, model_path=str(static_dir))
+    assert isinstance(provider, LocalEmbeddingProvider)
+
+    monkeypatch.setenv("MCP_LOCAL_EMBEDDING_MODEL_DIR", str(static_dir))
+    assert create_embedding_provider("onnx", "toy", DIM).model.format == "static"
+
+    with pytest.raises(RuntimeError, match="dimension mismatch"):
+        create_embedding_provider("local", "toy", DIM * 2)
+
+    monkeypatch.delenv("MCP_LOCAL_EMBEDDING_MODEL_DIR")
+    with pytest.raises(RuntimeError, match="model directory"):
+        create_embedding_provider("local", "toy", DIM)
@@ -196,6 +196,47 @@ class TestPrometheusMetricsCollector:
         final_value = self.collector.get_metric_value("thread_test")
         assert final_value == 500.0  # 5 threads * 100 increments
 
+    def test_histogram_quantiles_merge_across_threads(self):
+        """Per-thread shards merge into one histogram with quantile estimates."""
+        import threading
+
+        def observe_worker(offset):
+            for i in range(1, 1001):
+                self.collector.observe_histogram("latency", (i + offset) / 1000.0)
+
+        threads = [threading.Thread(target=observe_worker, args=(k,)) for k in (0, 1000)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.collector.observe_histogram("latency", 0.0005)
+
+        assert self.collector.get_metric_value("latency") == 2001.0
+        quantiles = self.collector.get_quantiles("latency")
+        for q, expected in ((0.5, 1.0), (0.95, 1.9), (0.99, 1.98)):
+            assert quantiles[q] == pytest.approx(expected, rel=0.02)
+        assert self.collector.get_quantiles("missing") is None
+
+        family = next(
+            f for f in self.collector.get_metric_families() if f["name"] == "test_latency"
+        )
+        buckets = family["samples"][0]["buckets"]
+        assert (buckets[0.005], buckets[1.0], buckets[float("inf")]) == (6, 1001, 2001)
+        # Shards of finished threads are folded away at merge time.
+        assert self.collector.get_stats()["shards"] == 1
+
+    def test_exposition_is_cached_until_something_is_recorded(self):
+        """The text exposition is rendered once per change, not per scrape."""
+        self.collector.observe_histogram("request_duration", 0.2)
+        first = self.collector.get_metrics()
+        assert self.collector.get_metrics() is first
+        assert 'test_request_duration_quantile{quantile="0.99"}' in first
+
+        self.collector.increment_counter("requests_total")
+        second = self.collector.get_metrics()
+        assert second is not first
+        assert "test_requests_total 1.0" in second
+
 
 class TestComponentHealthChecker:
     """Test the health checker implementation."""
@@ -411,11 +411,9 @@ class TestMultiRepositoryManager:
     def test_connection_caching(self, manager, mock_repo_info):
         """Test connection caching.
 
-        Post-refactor, ``StoreRegistry.get`` eagerly constructs a
-        ``ConnectionPool`` which pre-opens ``sqlite3.connect`` handles at
-        construction time.  The test's mock index path does not exist on disk,
-        so we also stub ``sqlite3.connect`` and ``ConnectionPool`` to prevent
-        that pre-open from raising ``OperationalError: unable to open database``.
+        ``StoreRegistry.get`` constructs ``ReadWriteConnections`` for each
+        store.  The test's mock index path does not exist on disk, so we stub
+        it alongside ``SQLiteStore`` to keep the test free of real handles.
         """
         repo_path = manager.central_index_path.parent / "connection-cache-repo"
         repo_path.mkdir()
@@ -425,7 +423,7 @@ class TestMultiRepositoryManager:
 
         with (
             patch("mcp_server.storage.store_registry.SQLiteStore") as mock_store_class,
-            patch("mcp_server.storage.store_registry.ConnectionPool") as mock_pool_class,
+            patch("mcp_server.storage.store_registry.ReadWriteConnections") as mock_pool_class,
         ):
             mock_store = Mock()
             mock_store_class.return_value = mock_store
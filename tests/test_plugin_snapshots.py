@@ -0,0 +1,275 @@
+"""Plugin warm-state snapshots, cost-aware eviction and deferred GC."""
+
+from __future__ import annotations
+
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from mcp_server.plugin_base import IPlugin, preindex_enabled, suppress_preindex
+from mcp_server.plugins.memory_aware_manager import (
+    MemoryAwarePluginManager,
+    _snapshot_store_from_env,
+)
+from mcp_server.plugins.plugin_snapshots import PluginSnapshotStore
+from mcp_server.utils.fuzzy_indexer import FuzzyIndexer
+
+
+class _WarmPlugin(IPlugin):
+    lang = "toy"
+    preindexed = 0
+
+    def __init__(self):
+        self._indexer = FuzzyIndexer()
+        if preindex_enabled():
+            type(self).preindexed += 1
+            for i in range(50):
+                self._indexer.add_file(f"src/m{i}.toy", f"def handler_{i}():\n    return {i}\n")
+            self._indexer.add_symbol("handler_7", "src/m7.toy", 1, {"kind": "function"})
+
+    def supports(self, path):
+        return str(path).endswith(".toy")
+
+    def indexFile(self, path, content):
+        return {"file": str(path), "symbols": [], "language": self.lang}
+
+    def getDefinition(self, symbol):
+        return None
+
+    def findReferences(self, symbol):
+        return []
+
+    def search(self, query, opts=None):
+        return self._indexer.search(query)
+
+
+def _ctx(repo_id: str, commit: str, workspace_root):
+    db_path = workspace_root / "code_index.db" if workspace_root else None
+    return SimpleNamespace(
+        repo_id=repo_id,
+        workspace_root=workspace_root,
+        sqlite_store=SimpleNamespace(db_path=db_path),
+        registry_entry=SimpleNamespace(last_indexed_commit=commit),
+    )
+
+
+def _workspace(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "code_index.db").write_bytes(b"index")
+    return root
+
+
+def _write_index(workspace):
+    db = workspace / "code_index.db"
+    stat = db.stat()
+    db.write_bytes(b"index, updated")
+    os.utime(db, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_store_round_trip_is_keyed_by_generation(tmp_path):
+    store = PluginSnapshotStore(tmp_path)
+    store.put("repo", "python", "abc", {"fuzzy_index": {"n": 1}})
+    # Readable before the background write lands.
+    assert store.get("repo", "python", "abc") == {"fuzzy_index": {"n": 1}}
+    store.flush()
+
+    reopened = PluginSnapshotStore(tmp_path)
+    assert reopened.get("repo", "python", "abc") == {"fuzzy_index": {"n": 1}}
+    assert reopened.get("repo", "python", "def") is None
+    assert reopened.get("other", "python", "abc") is None
+
+    reopened.put("repo", "python", "def", {"fuzzy_index": {"n": 2}})
+    reopened.flush()
+    assert len(list(tmp_path.glob("*.snap"))) == 1
+    assert reopened.get("repo", "python", "abc") is None
+
+
+def test_store_discards_corrupt_snapshots(tmp_path):
+    store = PluginSnapshotStore(tmp_path)
+    store.put("repo", "go", "g1", {"k": "v"})
+    store.flush()
+    (path,) = tmp_path.glob("*.snap")
+    path.write_bytes(path.read_bytes()[:20])
+
+    fresh = PluginSnapshotStore(tmp_path)
+    assert fresh.get("repo", "go", "g1") is None
+    assert not path.exists() and fresh.stats()["corrupt"] == 1
+
+
+def test_store_is_bounded_in_bytes(tmp_path):
+    store = PluginSnapshotStore(tmp_path, max_bytes=4000)
+    filler = " ".join(str(i * 7919) for i in range(400))
+    for i in range(10):
+        store.put(f"repo{i}", "c", "g", {"blob": filler + str(i)})
+        store.flush()
+    stats = store.stats()
+    assert stats["bytes"] <= 4000 and stats["evicted"] > 0
+    assert store.get("repo9", "c", "g") is not None
+    assert store.get("repo0", "c", "g") is None
+
+
+def test_fuzzy_index_state_round_trips(monkeypatch):
+    monkeypatch.delenv("MCP_SKIP_PLUGIN_PREINDEX", raising=False)
+    warm = _WarmPlugin()
+    cold = FuzzyIndexer()
+    assert cold.restore_state(warm.snapshot_state()["fuzzy_index"])
+    assert cold.index == warm._indexer.index
+    assert cold.search_symbols("handler_7")[0]["file_path"] == "src/m7.toy"
+    assert not cold.restore_state({"version": 99})
+
+
+def test_suppress_preindex_is_scoped(monkeypatch):
+    monkeypatch.delenv("MCP_SKIP_PLUGIN_PREINDEX", raising=False)
+    assert preindex_enabled()
+    with suppress_preindex():
+        assert not preindex_enabled()
+    assert preindex_enabled()
+    monkeypatch.setenv("MCP_SKIP_PLUGIN_PREINDEX", "true")
+    assert not preindex_enabled()
+
+
+def test_reload_after_eviction_restores_instead_of_preindexing(tmp_path, monkeypatch):
+    monkeypatch.delenv("MCP_SKIP_PLUGIN_PREINDEX", raising=False)
+    _WarmPlugin.preindexed = 0
+    manager = MemoryAwarePluginManager(
+        max_memory_mb=4096, snapshot_store=PluginSnapshotStore(tmp_path / "snaps")
+    )
+    workspace = _workspace(tmp_path)
+    ctx = _ctx("repo-a", "c1", workspace)
+    with patch.object(manager._factory, "get_plugin", side_effect=lambda lang: _WarmPlugin()):
+        first = manager.get_plugin("toy", ctx)
+        expected = list(first.search("handler_3"))
+        manager.clear_cache(keep_high_priority=False)
+
+        again = manager.get_plugin("toy", ctx)
+        assert again is not first
+        assert list(again.search("handler_3")) == expected
+        assert _WarmPlugin.preindexed == 1
+        assert manager._plugins[("repo-a", "toy")].metadata["restored"] is True
+
+        # A new index generation never sees the old snapshot.
+        manager.clear_cache(keep_high_priority=False)
+        manager.get_plugin("toy", _ctx("repo-a", "c2", workspace))
+        assert _WarmPlugin.preindexed == 2
+
+        # Nor does an index written to since, at the same commit.
+        manager.clear_cache(keep_high_priority=False)
+        _write_index(workspace)
+        manager.get_plugin("toy", _ctx("repo-a", "c2", workspace))
+        assert _WarmPlugin.preindexed == 3
+
+    status = manager.get_memory_status()
+    assert status["snapshots"]["restored"] == 1
+    manager.shutdown()
+
+
+def test_snapshots_need_a_repo_generation_and_an_eviction_in_this_process(tmp_path, monkeypatch):
+    monkeypatch.delenv("MCP_SKIP_PLUGIN_PREINDEX", raising=False)
+    _WarmPlugin.preindexed = 0
+    snaps = tmp_path / "snaps"
+    store = PluginSnapshotStore(snaps)
+    manager = MemoryAwarePluginManager(max_memory_mb=4096, snapshot_store=store)
+    workspace = _workspace(tmp_path)
+    with patch.object(manager._factory, "get_plugin", side_effect=lambda lang: _WarmPlugin()):
+        # No context, no indexed commit, or no workspace: nothing to key on.
+        manager.get_plugin("toy")
+        manager.get_plugin("toy", _ctx("repo-b", None, workspace))
+        manager.get_plugin("toy", _ctx("repo-c", "c1", None))
+        manager.clear_cache(keep_high_priority=False)
+        store.flush()
+        assert list(snaps.glob("*.snap")) == []
+
+        # Shutdown closes plugins without snapshotting them.
+        manager.get_plugin("toy", _ctx("repo-a", "c1", workspace))
+        manager.shutdown()
+        assert list(snaps.glob("*.snap")) == []
+
+        # A cold load never reads index state: there is nothing to restore.
+        with patch.object(
+            MemoryAwarePluginManager, "_index_generation", return_value="g"
+        ) as generation:
+            manager.get_plugin("toy", _ctx("repo-d", "c1", workspace))
+            generation.assert_not_called()
+            manager.clear_cache(keep_high_priority=False)
+            generation.reset_mock()
+            manager.get_plugin("toy", _ctx("repo-d", "c1", workspace))
+            generation.assert_called_once()
+        manager.evict_repo("repo-d")
+
+        manager.get_plugin("toy", _ctx("repo-a", "c1", workspace))
+        manager.clear_cache(keep_high_priority=False)
+        store.flush()
+        assert len(list(snaps.glob("*.snap"))) == 1
+
+    # A new process never trusts a snapshot it did not write itself.
+    fresh = MemoryAwarePluginManager(max_memory_mb=4096, snapshot_store=PluginSnapshotStore(snaps))
+    preindexed = _WarmPlugin.preindexed
+    with patch.object(fresh._factory, "get_plugin", side_effect=lambda lang: _WarmPlugin()):
+        fresh.get_plugin("toy", _ctx("repo-a", "c1", workspace))
+    assert _WarmPlugin.preindexed == preindexed + 1
+    assert fresh._plugins[("repo-a", "toy")].metadata["restored"] is False
+    fresh.shutdown()
+
+
+def test_sandboxed_plugins_get_no_snapshot_store(monkeypatch):
+    monkeypatch.delenv("MCP_PLUGIN_SANDBOX_DISABLE", raising=False)
+    assert _snapshot_store_from_env() is None
+
+
+def test_evict_repo_drops_snapshots(tmp_path):
+    snaps = tmp_path / "snaps"
+    store = PluginSnapshotStore(snaps)
+    manager = MemoryAwarePluginManager(max_memory_mb=4096, snapshot_store=store)
+    ctx = _ctx("repo-a", "c1", _workspace(tmp_path))
+    with patch.object(manager._factory, "get_plugin", side_effect=lambda lang: _WarmPlugin()):
+        manager.get_plugin("toy", ctx)
+        manager.clear_cache(keep_high_priority=False)
+        store.flush()
+        manager.get_plugin("toy", ctx)
+        manager.evict_repo("repo-a")
+    store.flush()
+    assert list(snaps.glob("*.snap")) == []
+
+
+def test_rss_pressure_evicts_cheapest_reload_per_byte_first():
+    manager = MemoryAwarePluginManager(max_memory_mb=4096)
+    plugins = {lang: Mock() for lang in ("costly", "cheap", "idle")}
+    with patch.object(manager._factory, "get_plugin", side_effect=lambda lang: plugins[lang]):
+        for lang in plugins:
+            manager.get_plugin(lang)
+
+    now = time.monotonic()
+    costly, cheap, idle = (manager._plugin_info[(None, lang)] for lang in plugins)
+    costly.load_time, costly.usage_count, costly.memory_bytes = 5.0, 20, 10 * 1024 * 1024
+    cheap.load_time, cheap.usage_count, cheap.memory_bytes = 0.05, 20, 200 * 1024 * 1024
+    idle.load_time, idle.usage_count, idle.memory_bytes = 5.0, 20, 10 * 1024 * 1024
+    costly.last_used_monotonic = cheap.last_used_monotonic = now
+    idle.last_used_monotonic = now - 3600
+
+    order = manager._get_cost_ordered_candidates(include_high_priority=True)
+    assert order == [(None, "idle"), (None, "cheap"), (None, "costly")]
+    # The worker-slot path keeps its LRU contract.
+    assert manager._get_eviction_candidates(include_high_priority=True)[0] == (None, "costly")
+
+
+def test_eviction_defers_and_coalesces_gc():
+    manager = MemoryAwarePluginManager(max_memory_mb=4096, gc_delay_seconds=60, gc_full_interval=3)
+    with patch.object(manager._factory, "get_plugin", side_effect=lambda lang: Mock()):
+        for lang in ("a", "b", "c", "d"):
+            manager.get_plugin(lang)
+
+    with patch("mcp_server.plugins.memory_aware_manager.gc.collect") as collect:
+        manager._evict_plugin((None, "a"))
+        manager._evict_plugin((None, "b"))
+        collect.assert_not_called()
+        assert manager._gc_stats["scheduled"] == 1 and manager._gc_generation == 1
+
+        manager._evict_plugin((None, "c"))
+        manager._gc_timer.cancel()
+        manager._run_deferred_gc()
+        collect.assert_called_once_with(2)
+
+        manager.shutdown()
+        assert manager._gc_timer is None
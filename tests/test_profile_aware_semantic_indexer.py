@@ -107,8 +107,9 @@ def _patch_indexer_runtime(monkeypatch, tmp_path) -> None:
         vector_dimension: int,
         api_key=None,
         base_url=None,
+        model_path=None,
     ):
-        del model_name, api_key, base_url
+        del model_name, api_key, base_url, model_path
         normalized = provider_name.strip().lower()
         if normalized in {"voyage", "voyageai"}:
             return _FakeEmbeddingProvider("voyage", vector_dimension)
@@ -476,3 +477,47 @@ def test_reconcile_compatible_probe_matching_shape_still_reconciles():
     assert result["status"] == "reconciled"
     assert writes == [{"attested": True, "model_dimension": 8}]
     assert indexer._writes_prepared is True
+
+
+class _FixedCountTokenizer:
+    exact = True
+
+    def __init__(self, models):
+        self.models = set(models)
+
+    def count(self, text):
+        return 55_000
+
+    def matches_model(self, model):
+        return model in self.models
+
+
+def test_embedding_batches_pack_tight_only_for_the_tokenizers_own_model(monkeypatch, tmp_path):
+    _patch_indexer_runtime(monkeypatch, tmp_path)
+    _patch_chunk_file(monkeypatch)
+    registry = SemanticProfileRegistry.from_raw(_sample_profiles(), "commercial-high")
+    source = tmp_path / "sample.py"
+    source.write_text("def alpha(x):\n    return x + 1\n", encoding="utf-8")
+
+    def batch_sizes(tokenizer):
+        monkeypatch.setattr(semantic_indexer_module, "get_tokenizer", lambda: tokenizer)
+        indexer = SemanticIndexer(
+            collection="code-index",
+            qdrant_path=":memory:",
+            profile_registry=registry,
+            semantic_profile="commercial-high",
+            sqlite_store=_FakeSQLiteStore(summary_text="Summarizes alpha"),
+        )
+        sizes = []
+
+        def embed(batches, input_type="document"):
+            sizes.extend(len(batch) for batch in batches)
+            return [[0.0] * 1024 for batch in batches for _ in batch]
+
+        monkeypatch.setattr(indexer, "_embed_text_batches", embed)
+        indexer.index_files_batch([source])
+        return sizes
+
+    # Exact counts from some other model's vocabulary keep the 100k margin.
+    assert batch_sizes(_FixedCountTokenizer({"text-embedding-3-small"})) == [1, 1]
+    assert batch_sizes(_FixedCountTokenizer({"voyage-code-3"})) == [2]
@@ -135,14 +135,12 @@ class TestRenameRollbackOnSemanticFailure:
         ctx = _make_ctx(store, workspace_root=repo_root)
         dispatcher = _make_dispatcher(store)
 
-        # move_file wraps the SQLite path-update (primary) and the semantic re-embed
-        # (shadow) in two_phase_commit; a shadow failure must roll the SQLite move
+        # move_file wraps the SQLite path-update (primary) and the semantic vector
+        # move (shadow) in two_phase_commit; a shadow failure must roll the SQLite move
         # back. Drive that by failing the semantic indexer's shadow op.
         failing_sem = Mock()
         failing_sem.semantic_profile.profile_id = "oss-high"
-        failing_sem.cleanup_stale_semantic_artifacts = Mock(
-            side_effect=RuntimeError("semantic failure")
-        )
+        failing_sem.move_semantic_artifacts = Mock(side_effect=RuntimeError("semantic failure"))
 
         bar_abs = repo_root / "bar.py"
 
@@ -205,7 +203,7 @@ class TestRenameRollbackOnSemanticFailure:
         # via record_handled_error before re-raising.
         failing_sem = Mock()
         failing_sem.semantic_profile.profile_id = "oss-high"
-        failing_sem.cleanup_stale_semantic_artifacts = Mock(side_effect=RuntimeError("boom"))
+        failing_sem.move_semantic_artifacts = Mock(side_effect=RuntimeError("boom"))
 
         bar_abs = repo_root / "bar.py"
 
@@ -0,0 +1,129 @@
+"""Synthetic corpus generation and the scaling benchmark comparator."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+
+import pytest
+
+from mcp_server.benchmarks.scaling_benchmark import (
+    ScalingBenchmark,
+    compare_results,
+    flatten_tier,
+    scaling_exponents,
+)
+from mcp_server.benchmarks.synthetic_corpus import EXTENSIONS, CorpusSpec, SyntheticCorpus
+
+
+def _digest(root):
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            digest.update(str(path.relative_to(root)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def test_corpus_is_deterministic(tmp_path):
+    spec = CorpusSpec(files=120, seed=7)
+    first = SyntheticCorpus(spec).write(tmp_path / "a")
+    second = SyntheticCorpus(spec).write(tmp_path / "b")
+    SyntheticCorpus(CorpusSpec(files=120, seed=8)).write(tmp_path / "c")
+
+    assert first == second
+    assert _digest(tmp_path / "a") == _digest(tmp_path / "b")
+    assert _digest(tmp_path / "a") != _digest(tmp_path / "c")
+
+
+def test_corpus_shape_follows_the_spec():
+    corpus = SyntheticCorpus(CorpusSpec(files=2000, duplicate_ratio=0.2, symbol_density=5))
+    rendered = [corpus.render(i) for i in range(2000)]
+
+    duplicates = [r for r in rendered if r.duplicate_of is not None]
+    assert 0.15 < len(duplicates) / len(rendered) < 0.25
+    for dup in duplicates[:20]:
+        assert dup.text == corpus.render(dup.duplicate_of).text
+    # A copy keeps its original's language, so the extension matches the content.
+    assert all(r.path.endswith(EXTENSIONS[r.language]) for r in rendered)
+
+    lines = sum(r.text.count("\n") for r in rendered)
+    symbols = sum(len(r.symbols) for r in rendered)
+    assert 3 < symbols * 100 / lines < 7
+    assert len({r.language for r in rendered}) == len(EXTENSIONS)
+
+
+def test_mutate_touches_about_the_requested_fraction(tmp_path):
+    corpus = SyntheticCorpus(CorpusSpec(files=500))
+    corpus.write(tmp_path)
+    changes = corpus.mutate(tmp_path, fraction=0.04)
+
+    kinds = [c.change_type for c in changes]
+    assert len(changes) == 20
+    assert kinds.count("added") == kinds.count("deleted") == 2
+    for change in changes:
+        assert (tmp_path / change.path).exists() == (change.change_type != "deleted")
+
+
+def _tier(files, cold, lookup_p95):
+    return {
+        "files": files,
+        "cold_index": {"elapsed_seconds": cold},
+        "incremental": {"per_file_ms": 20.0},
+        "memory": {"rss_mb": 200.0},
+        "db": {"per_file_bytes": 5000.0},
+        "latency": {"lookup": {"p50_ms": lookup_p95 / 2, "p95_ms": lookup_p95, "p99_ms": 50.0}},
+    }
+
+
+def test_comparator_flags_regressions_but_not_noise():
+    baseline = {
+        "tiers": {"1k": _tier(1_000, 10.0, 4.0), "10k": _tier(10_000, 100.0, 5.0)},
+    }
+    baseline["scaling"] = scaling_exponents(baseline["tiers"])
+    assert baseline["scaling"]["cold_index.elapsed_seconds"] == pytest.approx(1.0)
+
+    noisy = copy.deepcopy(baseline)
+    noisy["tiers"]["1k"]["latency"]["lookup"]["p95_ms"] = 4.9  # +22%, under tolerance
+    noisy["tiers"]["1k"]["incremental"]["per_file_ms"] = 20.9  # +4.5%
+    assert compare_results(noisy, baseline)["status"] == "ok"
+
+    # Lookup that now grows linearly with the repository.
+    linear = copy.deepcopy(baseline)
+    linear["tiers"]["10k"]["latency"]["lookup"]["p95_ms"] = 40.0
+    report = compare_results(linear, baseline)
+    flagged = {(r["tier"], r["metric"]) for r in report["regressions"]}
+    assert report["status"] == "regressed"
+    assert ("10k", "latency.lookup.p95_ms") in flagged
+    assert ("scaling", "latency.lookup.p95_ms") in flagged
+
+
+def test_exponent_check_ignores_a_uniformly_slower_machine():
+    baseline = {"tiers": {"1k": _tier(1_000, 10.0, 4.0), "10k": _tier(10_000, 100.0, 40.0)}}
+    slower = copy.deepcopy(baseline)
+    for tier in slower["tiers"].values():
+        tier["cold_index"]["elapsed_seconds"] *= 2
+
+    report = compare_results(slower, baseline)
+    assert {r["tier"] for r in report["regressions"]} == {"1k", "10k"}
+
+
+def test_scaling_benchmark_measures_a_small_tier(tmp_path):
+    logging.getLogger("mcp_server").setLevel(logging.WARNING)
+    benchmark = ScalingBenchmark(tmp_path, queries=8, warmup=2, incremental_fraction=0.05)
+    results = benchmark.run({"tiny": CorpusSpec(files=40, median_lines=30)})
+
+    tier = results["tiers"]["tiny"]
+    assert tier["cold_index"]["indexed_files"] == 40
+    assert tier["incremental"]["changed_files"] == 2 and tier["incremental"]["errors"] == 0
+    assert tier["latency"]["lookup"]["hit_rate"] > 0.5
+    memory = tier["memory"]
+    assert 0 <= memory["rss_mb"] <= memory["peak_rss_mb"] < memory["process_rss_mb"]
+    assert tier["db"]["size_bytes"] > 0
+    assert set(flatten_tier(tier)) >= {
+        "cold_index.elapsed_seconds",
+        "latency.search.p95_ms",
+        "latency.fuzzy.p95_ms",
+    }
+    assert not (tmp_path / "tiny").exists()
@@ -0,0 +1,163 @@
+"""Cursor pagination, continuation cache and streamed partial results for search_code."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server.cli import search_pagination
+from mcp_server.cli.search_pagination import SearchCursor
+from mcp_server.cli.tool_handlers import _run_search_with_deadline, handle_search_code
+from mcp_server.client import build_search_options
+from mcp_server.health.repository_readiness import RepositoryReadiness, RepositoryReadinessState
+
+
+class _Resolver:
+    def __init__(self, ctx):
+        self._ctx = ctx
+
+    def classify(self, _path):
+        return RepositoryReadiness(
+            state=RepositoryReadinessState.READY,
+            repository_id="repo-1",
+            repository_name="repo",
+            requested_path="/repo",
+        )
+
+    def resolve(self, _path):
+        return self._ctx
+
+
+class _Dispatcher:
+    def __init__(self, total, delay_after=None, delay=0.0):
+        self.total = total
+        self.delay_after = delay_after
+        self.delay = delay
+        self.limits = []
+
+    def search(self, _ctx, query, *, limit, **_kwargs):
+        self.limits.append(limit)
+        for i in range(min(limit, self.total)):
+            if self.delay_after is not None and i == self.delay_after:
+                time.sleep(self.delay)
+            yield {"file": f"/repo/f{i:03d}.py", "line": i + 1, "snippet": query}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    search_pagination._reset_continuation_cache()
+    yield
+    search_pagination._reset_continuation_cache()
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    db = tmp_path / "current.db"
+    db.write_bytes(b"\0" * 128)
+    ctx = SimpleNamespace(registry_entry=None, sqlite_store=SimpleNamespace(db_path=str(db)))
+    return _Resolver(ctx), db
+
+
+def _search(dispatcher, resolver, **arguments):
+    result = asyncio.run(
+        handle_search_code(arguments=arguments, dispatcher=dispatcher, repo_resolver=resolver)
+    )
+    return json.loads(result[0].text)
+
+
+def test_pages_walk_all_results_and_reuse_the_cached_window(resolver):
+    repo_resolver, _db = resolver
+    dispatcher = _Dispatcher(total=45)
+
+    page = _search(dispatcher, repo_resolver, query="q", limit=10, paginate=True)
+    seen = [r["file"] for r in page["results"]]
+    while page["next_cursor"]:
+        page = _search(dispatcher, repo_resolver, query="q", limit=10, cursor=page["next_cursor"])
+        seen.extend(r["file"] for r in page["results"])
+
+    assert seen == [f"/repo/f{i:03d}.py" for i in range(45)]
+    # Pages 2-4 come from the first window; only page 5 re-runs the search.
+    assert dispatcher.limits == [40, 80]
+
+
+def test_unpaginated_response_shape_is_unchanged(resolver):
+    repo_resolver, _db = resolver
+    data = _search(_Dispatcher(total=3), repo_resolver, query="q")
+    assert isinstance(data, list) and len(data) == 3
+
+
+def test_cursor_is_rejected_for_other_queries_and_changed_index(resolver):
+    repo_resolver, db = resolver
+    dispatcher = _Dispatcher(total=200)
+    first = _search(dispatcher, repo_resolver, query="q", limit=10, paginate=True)
+
+    other = _search(dispatcher, repo_resolver, query="other", cursor=first["next_cursor"])
+    assert other["code"] == "invalid_cursor"
+    assert _search(dispatcher, repo_resolver, query="q", cursor="%%%")["code"] == "invalid_cursor"
+
+    # Cached windows keep serving the snapshot they were taken from ...
+    db.write_bytes(b"\0" * 256)
+    cached = _search(dispatcher, repo_resolver, query="q", limit=10, cursor=first["next_cursor"])
+    assert len(cached["results"]) == 10
+
+    # ... but a re-run against a changed index refuses to splice generations.
+    search_pagination.get_continuation_cache().clear()
+    stale = _search(dispatcher, repo_resolver, query="q", cursor=first["next_cursor"])
+    assert stale["code"] == "cursor_stale"
+
+
+def test_rerun_resumes_after_the_watermark_result(resolver):
+    repo_resolver, db = resolver
+    cursor = SearchCursor(
+        fingerprint=search_pagination.query_fingerprint(build_search_options(query="q")),
+        generation=search_pagination.index_generation(db),
+        offset=3,
+        last_key="/repo/f004.py:5:",
+    )
+    data = _search(_Dispatcher(total=20), repo_resolver, query="q", limit=2, cursor=cursor.encode())
+    assert [r["file"] for r in data["results"]] == ["/repo/f005.py", "/repo/f006.py"]
+    assert data["offset"] == 5
+
+
+def test_deadline_returns_streamed_hits_as_partial_result(resolver):
+    repo_resolver, _db = resolver
+    dispatcher = _Dispatcher(total=10, delay_after=3, delay=0.5)
+    notifications = []
+
+    async def progress(done, total, message):
+        notifications.append((done, total, json.loads(message)))
+
+    async def run():
+        return await _run_search_with_deadline(
+            dispatcher=dispatcher,
+            repo_resolver=repo_resolver,
+            options=build_search_options(query="q", limit=10),
+            progress=progress,
+            timeout=0.2,
+        )
+
+    result, timed_out = asyncio.run(run())
+    assert timed_out and result.partial
+    assert [m.file for m in result.results] == [f"/repo/f{i:03d}.py" for i in range(3)]
+    streamed = [r["file"] for _, _, msg in notifications for r in msg["partial_results"]]
+    assert streamed == [m.file for m in result.results]
+    assert notifications[-1][:2] == (3.0, 10.0)
+
+
+def test_deadline_without_hits_still_times_out(resolver):
+    repo_resolver, _db = resolver
+    dispatcher = _Dispatcher(total=10, delay_after=0, delay=0.5)
+
+    async def run():
+        return await _run_search_with_deadline(
+            dispatcher=dispatcher,
+            repo_resolver=repo_resolver,
+            options=build_search_options(query="q"),
+            progress=None,
+            timeout=0.1,
+        )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
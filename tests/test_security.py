@@ -1,7 +1,6 @@
 """Comprehensive tests for the security layer."""
 
 import asyncio
-from datetime import datetime, timedelta
 
 import jwt
 import pytest
@@ -228,19 +227,86 @@ class TestRateLimiter:
 
     def test_rate_limit_window_reset(self):
         """Test rate limit window reset."""
-        rate_limiter = RateLimiter(max_requests=2, window_minutes=1)
+        clock = [1000.0]
+        rate_limiter = RateLimiter(max_requests=2, window_minutes=1, clock=lambda: clock[0])
 
         # Use up the rate limit
         assert not rate_limiter.is_rate_limited("test_client")
         assert not rate_limiter.is_rate_limited("test_client")
         assert rate_limiter.is_rate_limited("test_client")
 
-        # Manually reset the window by updating the start time
-        rate_limit_info = rate_limiter.rate_limits["test_client"]
-        rate_limit_info.window_start = datetime.utcnow() - timedelta(minutes=2)
+        # Half a window refills one request
+        clock[0] += 30
+        assert not rate_limiter.is_rate_limited("test_client")
+        assert rate_limiter.is_rate_limited("test_client")
 
-        # Should work again
+        # A full window refills the bucket
+        clock[0] += 120
         assert not rate_limiter.is_rate_limited("test_client")
+        assert not rate_limiter.is_rate_limited("test_client")
+        assert rate_limiter.is_rate_limited("test_client")
+
+    def test_retry_after_and_route_costs(self):
+        """Rejections report when enough tokens will be available."""
+        clock = [0.0]
+        rate_limiter = RateLimiter(max_requests=10, window_minutes=1, clock=lambda: clock[0])
+        costs = rate_limiter.route_costs
+
+        assert costs.cost("/health") < costs.cost("/search")
+        assert costs.cost("/search", semantic=True) > costs.cost("/search")
+        assert costs.cost("/unknown") == 1.0
+
+        assert rate_limiter.check("client", 8).allowed
+        decision = rate_limiter.check("client", 4)
+        assert not decision.allowed
+        assert decision.retry_after == pytest.approx(12.0)
+        # Cheap requests still fit in what is left
+        assert rate_limiter.check("client", costs.cost("/health")).allowed
+
+    def test_tracked_keys_are_bounded(self):
+        """Idle buckets expire and the key count never exceeds max_keys."""
+        clock = [0.0]
+        rate_limiter = RateLimiter(
+            max_requests=5, window_minutes=1, max_keys=64, clock=lambda: clock[0]
+        )
+        for i in range(10_000):
+            rate_limiter.is_rate_limited(f"10.0.{i // 256}.{i % 256}")
+        assert len(rate_limiter.buckets) <= 64
+        assert rate_limiter.buckets.evictions > 0
+
+        # A full refill makes every bucket disposable
+        clock[0] += 61
+        rate_limiter.is_rate_limited("fresh")
+        rate_limiter.is_rate_limited("fresh")
+        assert len(rate_limiter.buckets) < 64
+
+    def test_zero_minute_window_is_rejected(self):
+        with pytest.raises(ValueError, match="at least 1 minute"):
+            RateLimiter(max_requests=10, window_minutes=0)
+        with pytest.raises(ValueError, match="at least 1 minute"):
+            SecurityConfig(
+                jwt_secret_key="test-secret-key-at-least-32-characters-long",
+                rate_limit_window_minutes=0,
+            )
+
+    def test_concurrent_clients_share_budget_exactly(self):
+        """Lock striping keeps per-key accounting exact across threads."""
+        import threading
+
+        rate_limiter = RateLimiter(max_requests=1000, window_minutes=10_000)
+        allowed = []
+
+        def worker():
+            allowed.append(
+                sum(not rate_limiter.is_rate_limited(f"client-{i % 4}") for i in range(1000))
+            )
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(allowed) == 4 * 1000
 
 
 class TestAuthManager:
@@ -0,0 +1,228 @@
+"""Payload-only path maintenance for SemanticIndexer over an in-memory Qdrant."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from qdrant_client import QdrantClient, models
+
+from mcp_server.core.path_resolver import PathResolver
+from mcp_server.utils.semantic_indexer import SemanticIndexer
+from mcp_server.utils.semantic_path_metadata import PathMove, sequence_moves
+
+COLLECTION = "code-chunks"
+BIG_FILE_CHUNKS = 1500
+
+
+class RecordingClient:
+    """Delegates to a real client and records which API methods were called."""
+
+    def __init__(self, client: QdrantClient):
+        self._client = client
+        self.calls: list = []
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            self.calls.append((name, kwargs))
+            return attr(*args, **kwargs)
+
+        return wrapper
+
+
+def _seed(client: QdrantClient, files: dict) -> None:
+    points, next_id = [], 1
+    for relative_path, chunks in files.items():
+        for i in range(chunks):
+            points.append(
+                models.PointStruct(
+                    id=next_id,
+                    vector=[0.1, 0.2, 0.3, float(next_id % 7)],
+                    payload={
+                        "relative_path": relative_path,
+                        "file": f"/repo/{relative_path}",
+                        "content_hash": f"hash-{relative_path}",
+                        "chunk": i,
+                    },
+                )
+            )
+            next_id += 1
+    client.upsert(collection_name=COLLECTION, points=points)
+
+
+@pytest.fixture
+def indexer():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        COLLECTION,
+        vectors_config=models.VectorParams(size=4, distance=models.Distance.COSINE),
+    )
+    _seed(client, {"src/big.py": BIG_FILE_CHUNKS, "src/a.py": 3, "src/b.py": 2, "keep.py": 4})
+
+    ix = SemanticIndexer.__new__(SemanticIndexer)
+    ix.qdrant = RecordingClient(client)
+    ix.collection = COLLECTION
+    ix._qdrant_available = True
+    ix.path_resolver = PathResolver(repository_root=Path("/repo"))
+    return ix
+
+
+def _paths(client) -> dict:
+    counts: dict = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=COLLECTION, limit=1000, offset=offset, with_payload=True
+        )
+        for point in points:
+            key = (point.payload["relative_path"], point.payload["file"])
+            counts[key] = counts.get(key, 0) + 1
+        if offset is None:
+            return counts
+
+
+def _used_vectors(calls) -> bool:
+    return any(
+        name in ("retrieve", "upsert", "search") or kwargs.get("with_vectors")
+        for name, kwargs in calls
+    )
+
+
+def test_move_file_moves_every_chunk_of_a_large_file(indexer):
+    moved = indexer.move_file("/repo/src/big.py", "/repo/lib/big.py")
+
+    assert moved == BIG_FILE_CHUNKS
+    paths = _paths(indexer.qdrant._client)
+    assert paths[("lib/big.py", "/repo/lib/big.py")] == BIG_FILE_CHUNKS
+    assert not any(path == "src/big.py" for path, _ in paths)
+    assert not _used_vectors(indexer.qdrant.calls)
+    assert [name for name, _ in indexer.qdrant.calls].count("batch_update_points") == 1
+
+
+def test_move_files_applies_rename_map_with_chain_and_swap_in_one_call(indexer):
+    moved = indexer.move_files(
+        {
+            "/repo/src/big.py": "/repo/src/a.py",  # chain: a.py is itself moving
+            "/repo/src/a.py": "/repo/src/b.py",
+            "/repo/src/b.py": "/repo/src/a_old.py",
+        }
+    )
+
+    assert moved == {"src/big.py": BIG_FILE_CHUNKS, "src/a.py": 3, "src/b.py": 2}
+    by_path = {path: n for (path, _file), n in _paths(indexer.qdrant._client).items()}
+    assert by_path == {
+        "src/a.py": BIG_FILE_CHUNKS,
+        "src/b.py": 3,
+        "src/a_old.py": 2,
+        "keep.py": 4,
+    }
+    names = [name for name, _ in indexer.qdrant.calls]
+    assert names.count("batch_update_points") == 1
+    assert not _used_vectors(indexer.qdrant.calls)
+
+
+def test_move_with_content_hash_only_moves_matching_points(indexer):
+    assert indexer.move_file("/repo/src/a.py", "/repo/src/c.py", content_hash="other") == 0
+    assert indexer.move_file("/repo/src/a.py", "/repo/src/c.py", content_hash="hash-src/a.py") == 3
+
+
+class _MappingStore:
+    def __init__(self, mappings: dict):
+        self.mappings = dict(mappings)
+
+    def get_semantic_point_ids(self, profile_id, chunk_ids):
+        return [self.mappings[c] for c in chunk_ids if c in self.mappings]
+
+    def delete_semantic_point_mappings(self, profile_id, chunk_ids):
+        return sum(self.mappings.pop(c, None) is not None for c in chunk_ids)
+
+    def delete_chunk_summaries(self, chunk_ids):
+        return 0
+
+
+def test_move_semantic_artifacts_keeps_chunk_vectors_and_drops_the_file_summary(indexer):
+    # src/a.py holds points 1501-1503; treat the last one as its file summary.
+    indexer.semantic_profile = type("Profile", (), {"profile_id": "p"})()
+    store = _MappingStore({"a-1": 1501, "a-2": 1502, "src/a.py:file-summary": 1503})
+    invalidation = {
+        "vector_chunk_ids": ["a-1", "a-2", "src/a.py:file-summary"],
+        "file_summary_chunk_id": "src/a.py:file-summary",
+        "summary_chunk_ids_to_delete": [],
+        "summary_chunk_ids_preserved": [],
+    }
+
+    stats = indexer.move_semantic_artifacts(
+        "/repo/src/a.py", "/repo/src/c.py", invalidation, sqlite_store=store
+    )
+
+    assert stats["vectors_moved"] == 3 and stats["vectors_deleted"] == 1
+    assert store.mappings == {"a-1": 1501, "a-2": 1502}
+    by_path = {path: n for (path, _file), n in _paths(indexer.qdrant._client).items()}
+    assert by_path["src/c.py"] == 2 and "src/a.py" not in by_path
+    assert not _used_vectors(indexer.qdrant.calls)
+
+
+def test_update_chunk_payloads_repositions_points_without_vectors(indexer):
+    client = indexer.qdrant._client
+    client.upsert(
+        collection_name=COLLECTION,
+        points=[
+            models.PointStruct(
+                id=9000 + i,
+                vector=[0.3, 0.2, 0.1, float(i)],
+                payload={"chunk_id": f"doc.md:chunk:{i}", "line": i, "span": [i, i + 1]},
+            )
+            for i in range(3)
+        ],
+    )
+    indexer.qdrant.calls.clear()
+
+    updated = indexer.update_chunk_payloads(
+        {"doc.md:chunk:0": {"line": 10, "span": [10, 11]}, "doc.md:chunk:2": {"line": 12}}
+    )
+
+    assert updated == 2
+    points = client.retrieve(COLLECTION, ids=[9000, 9001, 9002], with_payload=True)
+    assert [(p.payload["line"], p.payload["span"]) for p in points] == [
+        (10, [10, 11]),
+        (1, [1, 2]),
+        (12, [2, 3]),
+    ]
+    assert [name for name, _ in indexer.qdrant.calls] == ["batch_update_points"]
+
+
+def test_mark_deleted_and_remove_cover_more_than_1000_points(indexer):
+    assert indexer.mark_file_deleted("/repo/src/big.py") == BIG_FILE_CHUNKS
+    client = indexer.qdrant._client
+    deleted = client.count(
+        COLLECTION,
+        count_filter=models.Filter(
+            must=[models.FieldCondition(key="is_deleted", match=models.MatchValue(value=True))]
+        ),
+        exact=True,
+    ).count
+    assert deleted == BIG_FILE_CHUNKS
+
+    assert indexer.remove_file("/repo/src/big.py") == BIG_FILE_CHUNKS
+    assert client.count(COLLECTION, exact=True).count == 9
+    assert not _used_vectors(indexer.qdrant.calls)
+
+
+def test_content_hash_lookup_pages_past_1000_points(indexer):
+    assert len(indexer.get_embeddings_by_content_hash("hash-src/big.py")) == BIG_FILE_CHUNKS
+
+
+def test_sequence_moves_breaks_cycles_through_a_temporary_path():
+    swap = [PathMove("a", "b", "/b"), PathMove("b", "a", "/a")]
+    ordered = sequence_moves(swap)
+
+    state = {"a": "A", "b": "B"}
+    for move, payload in ordered:
+        holders = [k for k, v in state.items() if k == move.old_relative]
+        for key in holders:
+            state[payload["relative_path"]] = state.pop(key)
+    assert state == {"b": "A", "a": "B"}
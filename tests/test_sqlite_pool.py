@@ -6,6 +6,8 @@ Covers:
 - close_all() is idempotent
 - close_all() closes every connection; post-call acquire raises RuntimeError
 - Write path round trip works with a pool-backed store
+- ReadWriteConnections: read-only tuned readers, single nested-safe writer
+- Schema capability snapshot replaces per-search catalog queries
 """
 
 import concurrent.futures
@@ -15,7 +17,11 @@ import threading
 
 import pytest
 
-from mcp_server.storage.connection_pool import ConnectionPool
+from mcp_server.storage.connection_pool import (
+    ConnectionPool,
+    ConnectionTuning,
+    ReadWriteConnections,
+)
 from mcp_server.storage.sqlite_store import SQLiteStore
 
 # ---------------------------------------------------------------------------
@@ -123,3 +129,169 @@ class TestWritePathWithPool:
         assert row["language"] == "python"
 
         pool.close_all()
+
+
+# ---------------------------------------------------------------------------
+# Read/write split
+# ---------------------------------------------------------------------------
+
+
+def _make_split_store(tmp_path, reader_pool_size: int = 2):
+    db_path = str(tmp_path / "split_test.db")
+    connections = ReadWriteConnections(
+        db_path,
+        tuning=ConnectionTuning(mmap_size=8 * 1024 * 1024, cache_size_kib=2048),
+        reader_pool_size=reader_pool_size,
+    )
+    return SQLiteStore(db_path, connections=connections), connections
+
+
+class TestReadWriteConnections:
+    def test_readers_are_read_only(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        with store._get_read_connection() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO repositories (path, name) VALUES ('x', 'x')")
+        store.close()
+
+    def test_reader_connections_are_tuned(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        with store._get_read_connection() as conn:
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2048
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+        store.close()
+
+    def test_readers_see_committed_writes(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        repo_id = store.create_repository(str(tmp_path), "split-repo")
+        store.store_file(repository_id=repo_id, relative_path="a.py", language="python")
+        assert store.get_file("a.py", repository_id=repo_id)["language"] == "python"
+        store.close()
+
+    def test_nested_writer_scope_commits_once(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        with pytest.raises(RuntimeError):
+            with store._get_connection() as outer:
+                outer.execute("INSERT INTO repositories (path, name) VALUES ('p1', 'n1')")
+                with store._get_connection() as inner:
+                    assert inner is outer
+                    inner.execute("INSERT INTO repositories (path, name) VALUES ('p2', 'n2')")
+                # Same-thread reads inside the writer observe uncommitted rows.
+                with store._get_read_connection() as reader:
+                    assert reader is outer
+                    assert reader.execute("SELECT COUNT(*) FROM repositories").fetchone()[0] == 2
+                raise RuntimeError("abort outer transaction")
+        with store._get_read_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM repositories").fetchone()[0] == 0
+        store.close()
+
+    def test_concurrent_readers_do_not_wait_for_writer(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        repo_id = store.create_repository(str(tmp_path), "split-repo")
+        store.store_file(repository_id=repo_id, relative_path="a.py", language="python")
+
+        writer_entered = threading.Event()
+        release_writer = threading.Event()
+
+        def hold_writer():
+            with store._get_connection() as conn:
+                conn.execute("INSERT INTO repositories (path, name) VALUES ('p', 'n')")
+                writer_entered.set()
+                release_writer.wait(timeout=5)
+
+        thread = threading.Thread(target=hold_writer)
+        thread.start()
+        try:
+            assert writer_entered.wait(timeout=5)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                rows = list(executor.map(lambda _: store.get_all_files(repo_id), range(4)))
+            assert all(len(r) == 1 for r in rows)
+        finally:
+            release_writer.set()
+            thread.join()
+        store.close()
+
+    def test_close_all_blocks_further_use(self, tmp_path):
+        store, connections = _make_split_store(tmp_path)
+        store.close()
+        store.close()
+        with pytest.raises(RuntimeError):
+            with connections.reader():
+                pass
+
+
+class TestWriteBatch:
+    def test_plain_store_batch_commits_once(self, tmp_path):
+        db_path = str(tmp_path / "plain.db")
+        store = SQLiteStore(db_path)
+        repo_id = store.create_repository(str(tmp_path), "plain-repo")
+        observer = sqlite3.connect(db_path)
+        with store.write_batch():
+            for name in ("a.py", "b.py", "c.py"):
+                store.store_file(repository_id=repo_id, relative_path=name, language="python")
+            # Visible on the batch connection, not yet committed for others.
+            assert store.get_file("b.py", repository_id=repo_id) is not None
+            assert observer.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+        assert observer.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 3
+        observer.close()
+
+    def test_plain_store_batch_rolls_back_on_error(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "plain.db"))
+        repo_id = store.create_repository(str(tmp_path), "plain-repo")
+        with pytest.raises(RuntimeError):
+            with store.write_batch():
+                store.store_file(repository_id=repo_id, relative_path="a.py", language="python")
+                raise RuntimeError("abort batch")
+        assert store.get_file("a.py", repository_id=repo_id) is None
+
+    @pytest.mark.parametrize("split", [False, True])
+    def test_failed_operation_rolls_back_alone(self, tmp_path, split):
+        if split:
+            store, _ = _make_split_store(tmp_path)
+        else:
+            store = SQLiteStore(str(tmp_path / "plain.db"))
+        repo_id = store.create_repository(str(tmp_path), "batch-repo")
+        with store.write_batch():
+            with store.batch_operation():
+                store.store_file(repository_id=repo_id, relative_path="a.py", language="python")
+            with pytest.raises(RuntimeError):
+                with store.batch_operation():
+                    store.store_file(repository_id=repo_id, relative_path="b.py", language="python")
+                    raise RuntimeError("abort operation")
+            with store.batch_operation():
+                store.store_file(repository_id=repo_id, relative_path="c.py", language="python")
+        assert store.get_file("a.py", repository_id=repo_id) is not None
+        assert store.get_file("b.py", repository_id=repo_id) is None
+        assert store.get_file("c.py", repository_id=repo_id) is not None
+        store.close()
+
+
+class TestSchemaCapabilities:
+    def test_snapshot_reflects_schema(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "caps.db"))
+        caps = store.schema_capabilities
+        assert caps.has_table("files")
+        assert caps.has_column("fts_code", "file_id")
+        assert not caps.has_table("bm25_content")
+
+    def test_search_bm25_skips_catalog_queries(self, tmp_path):
+        store, connections = _make_split_store(tmp_path, reader_pool_size=1)
+        statements = []
+        with connections.reader() as conn:
+            conn.set_trace_callback(statements.append)
+        store.search_bm25("hello", table="fts_code")
+        assert statements
+        assert not any("sqlite_master" in s or "table_info" in s for s in statements)
+        store.close()
+
+    def test_table_created_after_snapshot_is_discovered(self, tmp_path):
+        store = SQLiteStore(str(tmp_path / "late.db"))
+        assert store.search_bm25("hello", table="late_fts") == []
+        with store._get_connection() as conn:
+            conn.execute("CREATE VIRTUAL TABLE late_fts USING fts5(content)")
+            conn.execute("INSERT INTO late_fts (content) VALUES ('hello world')")
+        results = store.search_bm25("hello", table="late_fts")
+        assert len(results) == 1
+        assert store.schema_capabilities.has_table("late_fts")
@@ -0,0 +1,183 @@
+"""Tests for stdio startup costs: lazy imports, O(1) index validation, profiler."""
+
+import io
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mcp_server.cli.bootstrap import validate_index
+from mcp_server.core.path_resolver import PathResolver
+from mcp_server.core.startup_profiler import StartupProfiler
+from mcp_server.storage.sqlite_store import (
+    INDEX_COUNTERS_STAMP_KEY,
+    SQLiteStore,
+    fts5_row_count,
+)
+
+
+def _store_with_files(tmp_path: Path, count: int) -> SQLiteStore:
+    store = SQLiteStore(str(tmp_path / "code_index.db"), path_resolver=PathResolver(tmp_path))
+    repo_id = store.create_repository(str(tmp_path), "repo")
+    for i in range(count):
+        (tmp_path / f"f{i}.py").write_text(f"x = {i}\n")
+        store.store_file(repo_id, tmp_path / f"f{i}.py", language="python")
+    return store
+
+
+def _add_bm25(db_path: str, names) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS bm25_content USING fts5(filepath, content)")
+    conn.executemany(
+        "INSERT INTO bm25_content (filepath, content) VALUES (?, ?)",
+        [(name, "x = 1") for name in names],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_file_counter_tracks_inserts_and_deletes(tmp_path):
+    store = _store_with_files(tmp_path, 5)
+    assert store.get_index_counts()["total_files"] == 5
+
+    with store._get_connection() as conn:
+        conn.execute("DELETE FROM files WHERE relative_path = 'f0.py'")
+    assert store.get_index_counts()["total_files"] == 4
+
+    # Re-indexing an existing path is an upsert, not a new row.
+    store.store_file(store.get_repository(str(tmp_path))["id"], tmp_path / "f1.py")
+    assert store.get_index_counts()["total_files"] == 4
+
+
+def test_counter_is_reseeded_when_stamp_or_triggers_missing(tmp_path):
+    store = _store_with_files(tmp_path, 3)
+    db_path = store.db_path
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TRIGGER files_count_ai")
+    conn.execute("UPDATE index_counters SET value = 999")
+    conn.commit()
+    conn.close()
+    assert SQLiteStore(db_path).get_index_counts()["total_files"] == 3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE index_counters SET value = 999")
+    conn.execute("DELETE FROM index_config WHERE config_key = ?", (INDEX_COUNTERS_STAMP_KEY,))
+    conn.commit()
+    conn.close()
+    reopened = SQLiteStore(db_path)
+    assert reopened.get_index_counts()["total_files"] == 3
+
+
+def test_fts5_row_count_reads_averages_record():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE VIRTUAL TABLE docs USING fts5(body)")
+    assert fts5_row_count(conn, "docs") == 0
+    conn.executemany("INSERT INTO docs (body) VALUES (?)", [(f"w{i}",) for i in range(300)])
+    conn.execute("DELETE FROM docs WHERE rowid <= 10")
+    assert fts5_row_count(conn, "docs") == 290
+    assert fts5_row_count(conn, "missing") is None
+
+
+def test_validate_index_uses_stored_counts_without_table_scans(tmp_path):
+    store = _store_with_files(tmp_path, 4)
+    _add_bm25(store.db_path, [f"f{i}.py" for i in range(4)])
+
+    statements = []
+    real_connect = sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    sqlite3.connect = tracing_connect
+    try:
+        result = validate_index(store, tmp_path)
+    finally:
+        sqlite3.connect = real_connect
+
+    assert result == {
+        "valid": True,
+        "issues": [],
+        "stats": {"total_files": 4, "bm25_documents": 4},
+    }
+    assert not [s for s in statements if "COUNT(" in s.upper() or " LIKE " in s.upper()]
+
+
+def test_validate_index_reports_empty_bm25(tmp_path):
+    store = _store_with_files(tmp_path, 2)
+    _add_bm25(store.db_path, [])
+
+    result = validate_index(store, tmp_path)
+
+    assert result["stats"] == {"total_files": 2, "bm25_documents": 0}
+    assert result["issues"] == ["No BM25 documents in index"]
+
+
+def test_profiler_nests_imports_under_spans(tmp_path, monkeypatch):
+    (tmp_path / "profiled_outer.py").write_text("import profiled_inner\n")
+    (tmp_path / "profiled_inner.py").write_text("import time\ntime.sleep(0.002)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler(min_ms=0.0)
+    profiler.install_import_hook()
+    try:
+        with profiler.span("boot"):
+            import profiled_outer  # noqa: F401
+    finally:
+        profiler.uninstall_import_hook()
+        sys.modules.pop("profiled_outer", None)
+        sys.modules.pop("profiled_inner", None)
+
+    (boot,) = profiler.root.children
+    (outer,) = boot.children
+    assert (outer.name, outer.kind) == ("profiled_outer", "import")
+    assert [c.name for c in outer.children] == ["profiled_inner"]
+    assert outer.elapsed >= outer.children[0].elapsed >= 0.002
+
+    out = io.StringIO()
+    profiler.finish(out)
+    profiler.finish(out)
+    text = out.getvalue()
+    assert text.count("timing tree") == 1
+    assert "import profiled_inner" in text
+    assert profiler._finder is None
+
+
+def test_profiler_folds_short_siblings():
+    profiler = StartupProfiler(min_ms=50.0)
+    with profiler.span("fast"):
+        pass
+    assert "(1 more under 50 ms)" in profiler.render()
+
+
+def test_stdio_runner_import_defers_heavy_subsystems():
+    code = (
+        "import sys, mcp_server.cli.stdio_runner\n"
+        "heavy = ['qdrant_client', 'mcp_server.graph', 'mcp_server.utils.semantic_indexer',"
+        " 'mcp_server.indexing.summarization', 'mcp_server.cli.artifact_commands']\n"
+        "print(','.join(m for m in heavy if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+@pytest.mark.parametrize("flag", ["1", "true"])
+def test_env_flag_dumps_tree_to_stderr(flag):
+    result = subprocess.run(
+        [sys.executable, "-c", "import mcp_server.cli.handshake"],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        env={**os.environ, "MCP_STARTUP_PROFILE": flag},
+    )
+    assert result.returncode == 0, result.stderr
+    assert "MCP_STARTUP_PROFILE timing tree" in result.stderr
+    assert "import mcp_server.cli" in result.stderr
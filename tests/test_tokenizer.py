@@ -0,0 +1,236 @@
+"""Exact BPE token counting, vocabulary loading and the heuristic fallback."""
+
+from __future__ import annotations
+
+import base64
+import collections
+import json
+from pathlib import Path
+
+import pytest
+
+from mcp_server.document_processing.chunk_optimizer import TokenEstimator
+from mcp_server.utils import tokenizer as tokenizer_module
+from mcp_server.utils.token_counter import TokenCounter
+from mcp_server.utils.tokenizer import (
+    CL100K_PATTERN,
+    BPETokenizer,
+    HeuristicTokenizer,
+    get_tokenizer,
+    heuristic_token_count,
+    load_tokenizer,
+)
+
+regex = pytest.importorskip("regex")
+
+SAMPLE = Path(__file__).read_text(encoding="utf-8")
+TEXT = 'def résumé(value):\n    return {"naïve": value + 10_000}  # 日本語 🚀\r\n\t\n'
+
+
+def _train(text: str, merges: int):
+    """Tiny byte-level BPE trainer; ranks in the tiktoken convention."""
+    ranks = {bytes([b]): b for b in range(256)}
+    words = collections.Counter(p.encode() for p in regex.findall(CL100K_PATTERN, text))
+    seqs = {w: [bytes([c]) for c in w] for w in words}
+    for _ in range(merges):
+        pairs = collections.Counter()
+        for word, count in words.items():
+            seq = seqs[word]
+            for pair in zip(seq, seq[1:]):
+                pairs[pair] += count
+        if not pairs:
+            break
+        (a, b), _ = pairs.most_common(1)[0]
+        ranks.setdefault(a + b, len(ranks))
+        for word in words:
+            seq, out, i = seqs[word], [], 0
+            while i < len(seq):
+                if i + 1 < len(seq) and seq[i] == a and seq[i + 1] == b:
+                    out.append(a + b)
+                    i += 2
+                else:
+                    out.append(seq[i])
+                    i += 1
+            seqs[word] = out
+    return ranks
+
+
+def _reference_encode(ranks, text):
+    """Textbook BPE: repeatedly merge the lowest-ranked adjacent pair."""
+    tokens = []
+    for piece in regex.findall(CL100K_PATTERN, text):
+        parts = [bytes([b]) for b in piece.encode()]
+        while len(parts) > 1:
+            candidates = [
+                (ranks[parts[i] + parts[i + 1]], i)
+                for i in range(len(parts) - 1)
+                if parts[i] + parts[i + 1] in ranks
+            ]
+            if not candidates:
+                break
+            _, i = min(candidates)
+            parts[i : i + 2] = [parts[i] + parts[i + 1]]
+        tokens.extend(ranks[p] for p in parts)
+    return tokens
+
+
+@pytest.fixture(scope="module")
+def ranks():
+    return _train(SAMPLE, 300)
+
+
+@pytest.fixture
+def vocab_file(tmp_path, ranks):
+    path = tmp_path / "cl100k_base.tiktoken"
+    lines = [f"{base64.b64encode(tok).decode()} {rank}" for tok, rank in ranks.items()]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def configured(monkeypatch, vocab_file):
+    monkeypatch.setenv("MCP_TOKENIZER_VOCAB", str(vocab_file))
+    tokenizer_module._reset_tokenizer()
+    yield get_tokenizer()
+    tokenizer_module._reset_tokenizer()
+
+
+def test_encoding_matches_reference_bpe(ranks):
+    tok = BPETokenizer(ranks, CL100K_PATTERN)
+    for text in (SAMPLE, TEXT, "", "a", "    \n\n  "):
+        assert tok.encode(text) == _reference_encode(ranks, text)
+        assert tok.count(text) == len(tok.encode(text))
+    # The trained merges actually compress source code.
+    assert tok.count(SAMPLE) < len(SAMPLE.encode()) / 2
+
+
+def test_encoding_matches_tiktoken(ranks):
+    tiktoken = pytest.importorskip("tiktoken")
+    reference = tiktoken.Encoding(
+        "toy", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={}
+    )
+    tok = BPETokenizer(ranks, CL100K_PATTERN)
+    assert tok.encode(SAMPLE + TEXT) == reference.encode_ordinary(SAMPLE + TEXT)
+
+
+def test_counts_are_cached_by_content(ranks):
+    tok = BPETokenizer(ranks, CL100K_PATTERN)
+    first = tok.count(SAMPLE)
+    assert tok.count(SAMPLE) == first
+    assert tok.stats()["count_cache"] == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_truncate_stays_within_budget(ranks):
+    tok = BPETokenizer(ranks, CL100K_PATTERN)
+    prefix = tok.truncate(SAMPLE, 200)
+    assert SAMPLE.startswith(prefix)
+    assert 190 <= tok.count(prefix) <= 200
+    assert tok.truncate(TEXT, 10_000) == TEXT
+
+
+def test_vocabulary_must_be_byte_level():
+    with pytest.raises(ValueError, match="not byte-level"):
+        BPETokenizer({b"a": 0}, CL100K_PATTERN)
+
+
+def test_hf_tokenizer_json_matches_equivalent_rank_file(tmp_path, ranks, vocab_file):
+    # GPT-2 style byte-to-printable mapping used by byte-level tokenizer.json files.
+    to_char = {b: c for c, b in tokenizer_module._byte_unicode_table().items()}
+
+    def encode(token: bytes) -> str:
+        return "".join(to_char[b] for b in token)
+
+    merges = []
+    for token, rank in sorted(ranks.items(), key=lambda item: item[1]):
+        if len(token) < 2:
+            continue
+        # Any split into two existing tokens reproduces the merge.
+        for cut in range(1, len(token)):
+            left, right = token[:cut], token[cut:]
+            if ranks.get(left, 1 << 30) < rank and ranks.get(right, 1 << 30) < rank:
+                merges.append(f"{encode(left)} {encode(right)}")
+                break
+    spec = {
+        "model": {"type": "BPE", "vocab": {}, "merges": merges},
+        "pre_tokenizer": {
+            "type": "Sequence",
+            "pretokenizers": [
+                {"type": "Split", "pattern": {"Regex": CL100K_PATTERN}},
+                {"type": "ByteLevel", "use_regex": False},
+            ],
+        },
+    }
+    hf_path = tmp_path / "toy" / "tokenizer.json"
+    hf_path.parent.mkdir()
+    hf_path.write_text(json.dumps(spec))
+
+    from_json = load_tokenizer(hf_path)
+    from_ranks = load_tokenizer(vocab_file)
+    assert from_json.name == "toy"
+    assert from_json.count(SAMPLE) == from_ranks.count(SAMPLE)
+
+
+def test_without_vocabulary_counts_fall_back_to_heuristic(monkeypatch):
+    monkeypatch.delenv("MCP_TOKENIZER_VOCAB", raising=False)
+    tokenizer_module._reset_tokenizer()
+    try:
+        tok = get_tokenizer()
+        assert isinstance(tok, HeuristicTokenizer) and not tok.exact
+        assert TokenCounter.count_tokens(SAMPLE) == heuristic_token_count(SAMPLE)
+        assert TokenCounter.count_tokens("") == 0
+    finally:
+        tokenizer_module._reset_tokenizer()
+
+
+def test_unloadable_vocabulary_falls_back_to_heuristic(monkeypatch, tmp_path):
+    bad = tmp_path / "broken.tiktoken"
+    bad.write_text("not a rank line at all\n")
+    monkeypatch.setenv("MCP_TOKENIZER_VOCAB", str(bad))
+    tokenizer_module._reset_tokenizer()
+    try:
+        tok = get_tokenizer()
+        assert not tok.exact
+        assert "broken.tiktoken" in tok.stats()["reason"]
+    finally:
+        tokenizer_module._reset_tokenizer()
+
+
+def test_configured_vocabulary_drives_counters(configured, ranks):
+    assert configured.exact and configured.name == "cl100k_base"
+    exact = len(_reference_encode(ranks, SAMPLE))
+    assert TokenCounter.count_tokens(SAMPLE) == exact
+    assert TokenEstimator().estimate_tokens(SAMPLE) == exact
+
+
+def test_tight_batch_budget_needs_the_model_declared(monkeypatch, vocab_file):
+    assert not HeuristicTokenizer().matches_model("voyage-code-3")
+
+    undeclared = load_tokenizer(vocab_file)
+    assert undeclared.exact and not undeclared.matches_model("voyage-code-3")
+
+    monkeypatch.setenv("MCP_TOKENIZER_VOCAB", str(vocab_file))
+    monkeypatch.setenv("MCP_TOKENIZER_MODELS", "voyage-code-3, voyage-3")
+    tokenizer_module._reset_tokenizer()
+    try:
+        tok = get_tokenizer()
+        assert tok.matches_model("voyage-code-3") and tok.matches_model("voyage-3")
+        assert not tok.matches_model("text-embedding-3-small")
+        assert tok.stats()["models"] == ["voyage-3", "voyage-code-3"]
+    finally:
+        tokenizer_module._reset_tokenizer()
+
+
+def test_summary_file_context_is_trimmed_in_tokens(configured):
+    from mcp_server.indexing import summarization
+    from mcp_server.indexing.summarization import ChunkWriter
+
+    writer = ChunkWriter(db_path="/tmp/test.db", qdrant_client=None)
+    file_content = SAMPLE * 40
+    context = writer._build_api_file_context(
+        language="markdown", file_content=file_content, chunk_content="small chunk"
+    )
+    assert "... [file truncated for context window]" in context
+    body = context.split("```markdown\n", 1)[1].split("\n... [file truncated", 1)[0]
+    assert file_content.startswith(body)
+    budget = summarization._DOC_FILE_CONTEXT_TOKENS
+    assert budget - 20 <= configured.count(body) <= budget
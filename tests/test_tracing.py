@@ -0,0 +1,196 @@
+"""Per-stage tracing: span nesting, propagation, slow-trace buffer and OTLP export."""
+
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from mcp_server.cli.admission import INTERACTIVE, AdmissionController, ToolPolicy
+from mcp_server.core import tracing
+from mcp_server.core.repo_context import RepoContext
+from mcp_server.core.tracing import Tracer, propagate, traced
+from mcp_server.dispatcher import EnhancedDispatcher
+from mcp_server.metrics.prometheus_exporter import _EXPORTER_REGISTRY
+from mcp_server.storage.sqlite_store import SQLiteStore
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = Tracer(enabled=True, slow_threshold_ms=0, buffer_size=3, otlp_path="")
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    return tracer
+
+
+def _stage_count(stage):
+    value = _EXPORTER_REGISTRY.get_sample_value("mcp_trace_stage_seconds_count", {"stage": stage})
+    return value or 0.0
+
+
+def test_spans_nest_under_the_current_span(tracer):
+    with tracer.span("request") as root:
+        with tracer.span("stage.a") as stage_a:
+            with tracer.span("stage.a.inner"):
+                time.sleep(0.001)
+        started = time.perf_counter()
+        tracer.record("stage.b", started)
+
+    [trace] = tracer.slow_traces()
+    spans = {span["name"]: span for span in trace["spans"]}
+    assert trace["name"] == "request"
+    assert spans["request"]["parent_id"] is None
+    assert spans["stage.a"]["parent_id"] == root.span_id
+    assert spans["stage.a.inner"]["parent_id"] == stage_a.span_id
+    assert spans["stage.b"]["parent_id"] == root.span_id
+    assert spans["stage.a.inner"]["duration_ms"] <= spans["stage.a"]["duration_ms"]
+
+
+def test_traced_generators_hold_their_span_only_while_pulling(tracer):
+    @traced("gen")
+    def gen():
+        for n in range(2):
+            with tracing.span("gen.stage"):
+                pass
+            yield n
+
+    with tracer.span("request") as root:
+        for _ in gen():
+            with tracing.span("consumer"):
+                pass
+        assert tracing.current_span() is root
+
+    [trace] = tracer.slow_traces()
+    spans = trace["spans"]
+    [gen_span] = [s for s in spans if s["name"] == "gen"]
+    assert gen_span["parent_id"] == root.span_id
+    assert [s["parent_id"] for s in spans if s["name"] == "gen.stage"] == [gen_span["span_id"]] * 2
+    assert [s["parent_id"] for s in spans if s["name"] == "consumer"] == [root.span_id] * 2
+
+
+def test_dispatcher_stages_nest_under_lookup_and_search(tracer, tmp_path):
+    store = SQLiteStore(str(tmp_path / "index.db"))
+    ctx = RepoContext(
+        repo_id="trace-repo",
+        sqlite_store=store,
+        workspace_root=tmp_path,
+        tracked_branch="main",
+        registry_entry=None,
+    )
+    dispatcher = EnhancedDispatcher(
+        [], use_plugin_factory=False, semantic_search_enabled=False, multi_repo_enabled=False
+    )
+
+    with tracer.span("request") as root:
+        list(dispatcher.search(ctx, "anything", semantic=False))
+        dispatcher.lookup(ctx, "anything")
+
+    spans = tracer.slow_traces()[0]["spans"]
+    by_id = {s["span_id"]: s for s in spans}
+    [search] = [s for s in spans if s["name"] == "dispatcher.search"]
+    [lookup] = [s for s in spans if s["name"] == "dispatcher.lookup"]
+    assert search["parent_id"] == lookup["parent_id"] == root.span_id
+    bm25 = [s for s in spans if s["name"] == "sqlite.search_bm25"]
+    assert bm25
+    # Each BM25 query is a descendant of the search span, not a sibling of it.
+    for span in bm25:
+        while span["parent_id"] != search["span_id"]:
+            assert span["parent_id"] != root.span_id
+            span = by_id[span["parent_id"]]
+
+
+def test_worker_spans_attach_to_the_submitting_request(tracer):
+    def work():
+        with tracing.span("worker.stage"):
+            return tracing.current_span()
+
+    with tracer.span("request") as root:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            spans = [f.result() for f in [pool.submit(propagate(work)) for _ in range(3)]]
+
+    assert all(span.parent_id == root.span_id for span in spans)
+    assert all(span.trace is root.trace for span in spans)
+    # Outside the request nothing is current.
+    assert tracing.current_span() is None
+
+
+def test_slow_buffer_threshold_and_ring():
+    tracer = Tracer(enabled=True, slow_threshold_ms=5, buffer_size=2, otlp_path="")
+    with tracer.span("fast"):
+        pass
+    for name in ("slow1", "slow2", "slow3"):
+        with tracer.span(name):
+            time.sleep(0.006)
+
+    assert [t["name"] for t in tracer.slow_traces()] == ["slow3", "slow2"]
+    assert tracer.stats()["traces_finished"] == 4
+
+
+def test_errors_are_recorded_on_the_span(tracer):
+    with pytest.raises(KeyError):
+        with tracer.span("request"):
+            with tracer.span("stage"):
+                raise KeyError("boom")
+    spans = {s["name"]: s for s in tracer.slow_traces()[0]["spans"]}
+    assert spans["stage"]["error"] == "KeyError"
+
+
+def test_disabled_tracer_is_a_no_op():
+    tracer = Tracer(enabled=False, otlp_path="")
+    with tracer.span("anything") as span:
+        assert span is None
+    tracer.record("stage", time.perf_counter())
+    assert tracer.slow_traces() == []
+
+
+def test_otlp_file_export(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(enabled=True, slow_threshold_ms=1e9, otlp_path=str(path))
+    with tracer.span("request", repo="r1"):
+        with tracer.span("stage", hits=3):
+            pass
+
+    [line] = path.read_text().splitlines()
+    document = json.loads(line)
+    spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root = next(s for s in spans if s["name"] == "request")
+    child = next(s for s in spans if s["name"] == "stage")
+    assert len(root["traceId"]) == 32 and child["traceId"] == root["traceId"]
+    assert child["parentSpanId"] == root["spanId"]
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+    assert {"key": "hits", "value": {"intValue": "3"}} in child["attributes"]
+    # Below the slow threshold: exported but not buffered.
+    assert tracer.slow_traces() == []
+
+
+def test_store_queries_feed_stage_histogram(tracer, tmp_path):
+    store = SQLiteStore(str(tmp_path / "index.db"))
+    before = _stage_count("sqlite.search_bm25")
+    with tracer.span("request"):
+        store.search_bm25("anything", table="fts_code", limit=5)
+
+    assert _stage_count("sqlite.search_bm25") == before + 1
+    names = [s["name"] for s in tracer.slow_traces()[0]["spans"]]
+    assert "sqlite.search_bm25" in names
+
+
+@pytest.mark.asyncio
+async def test_admitted_tool_calls_root_their_trace(tracer):
+    controller = AdmissionController(
+        {"search_code": ToolPolicy(INTERACTIVE, deadline_seconds=5.0)},
+        interactive_workers=1,
+        heavy_workers=1,
+    )
+
+    def work():
+        with tracing.span("dispatcher.stage"):
+            pass
+
+    async with controller.admit("search_code"):
+        await controller.run(work)
+    controller.shutdown(wait=True)
+
+    [trace] = tracer.slow_traces()
+    assert trace["name"] == "tool.search_code"
+    assert [s["name"] for s in trace["spans"]] == ["tool.search_code", "dispatcher.stage"]
@@ -629,3 +629,65 @@ class TestArtifactPublishTriggers:
             assert "repo-2" not in watcher.observers
         finally:
             watcher.stop_watching_all()
+
+    def test_job_pool_queues_commit_sync_and_publishes_on_completion(self, tmp_path):
+        from mcp_server.storage.index_job_queue import IndexJobQueue
+
+        watcher, registry, artifact_manager = self._watcher_for_sync(tmp_path, "full_index")
+        pool = Mock()
+        pool.queue = IndexJobQueue(tmp_path / "index_jobs.db")
+        watcher.job_pool = pool
+
+        watcher.on_git_commit("repo-1", "callback123")
+        watcher.on_git_commit("repo-1", "callback123")
+
+        assert pool.queue.stats() == {"queued": 1}
+        watcher.index_manager.sync_repository_index.assert_not_called()
+
+        job = pool.queue.claim("worker")
+        pool.queue.complete(
+            job.id,
+            "worker",
+            {
+                "action": "full_index",
+                "files_processed": 3,
+                "duration_seconds": 0.1,
+                "commit": "synced123",
+                "from_commit": "prev123",
+            },
+        )
+        for finished in pool.queue.take_finished():
+            watcher.handle_finished_job(finished)
+
+        # The worker synced lexically; the parent embeds the same commit range.
+        watcher.index_manager.catch_up_semantic.assert_called_once_with(
+            "repo-1", "prev123", "synced123"
+        )
+        artifact_manager.create_commit_artifact.assert_called_once()
+        watcher._artifact_publisher.publish_on_reindex.assert_called_once()
+
+    def test_sync_job_worker_runs_without_semantic_indexing(self, tmp_path):
+        from mcp_server import watcher_multi_repo
+        from mcp_server.storage.index_job_queue import IndexJob
+
+        index_manager = Mock()
+        index_manager.registry.get_repository.return_value = Mock(last_indexed_commit="prev123")
+        index_manager.sync_repository_index.return_value = Mock(
+            action="incremental_update", commit="new456", files_processed=2, duration_seconds=0.1
+        )
+        job = Mock(spec=IndexJob, repo_id="repo-1", kind="sync", commit="new456")
+        registry_path = str(tmp_path / "registry.json")
+
+        with patch(
+            "mcp_server.cli.bootstrap.initialize_stateless_services",
+            return_value=(None, None, None, None, index_manager),
+        ) as init:
+            try:
+                result = watcher_multi_repo.run_repository_sync_job(
+                    job, lambda progress: None, registry_path=registry_path
+                )
+            finally:
+                watcher_multi_repo._job_index_managers.pop(registry_path, None)
+
+        assert init.call_args.kwargs["semantic_search_enabled"] is False
+        assert result["from_commit"] == "prev123" and result["commit"] == "new456"
@@ -0,0 +1,251 @@
+"""Tests for the file watcher's event-storm bulk mode."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileMovedEvent
+
+from mcp_server.core.path_resolver import PathResolver
+from mcp_server.core.repo_context import RepoContext
+from mcp_server.watcher import _Handler
+
+
+class BulkDispatcher:
+    """Records bulk calls; reports every indexed/moved path as embeddable."""
+
+    def __init__(self):
+        self.bulk_calls = []
+        self.semantic_calls = []
+
+    def index_changes(self, ctx, indexed=(), removed=(), moved=(), do_semantic=True):
+        call = {
+            "indexed": sorted(Path(p).name for p in indexed),
+            "removed": sorted(Path(p).name for p in removed),
+            "moved": sorted((Path(a).name, Path(b).name) for a, b, _ in moved),
+            "do_semantic": do_semantic,
+        }
+        self.bulk_calls.append(call)
+        return {"semantic_paths": list(indexed) + [b for _, b, _ in moved]}
+
+    def rebuild_semantic_for_paths(self, ctx, paths):
+        self.semantic_calls.append(sorted(Path(p).name for p in paths))
+        return {}
+
+    def remove_file(self, ctx, path):
+        raise AssertionError("storm mode must not remove files one by one")
+
+    def index_file_guarded(self, ctx, path, observed_hash):
+        raise AssertionError("storm mode must not index files one by one")
+
+
+def _ctx(root: Path, store=None) -> RepoContext:
+    return RepoContext(
+        repo_id="storm",
+        sqlite_store=store,
+        workspace_root=root,
+        tracked_branch="main",
+        registry_entry=SimpleNamespace(repository_id="storm", path=root, name=root.name),
+    )
+
+
+@pytest.fixture
+def make_handler(tmp_path):
+    handlers = []
+
+    def _make(dispatcher, threshold=5, batch_size=10_000, defer_semantic=True):
+        handler = _Handler(
+            dispatcher, path_resolver=PathResolver(repository_root=tmp_path), ctx=_ctx(tmp_path)
+        )
+        # Keep the background drain loop from racing the explicit flush() calls.
+        handler.stop()
+        handler.storm_threshold = threshold
+        handler.storm_batch_size = batch_size
+        handler.defer_semantic = defer_semantic
+        handlers.append(handler)
+        return handler
+
+    yield _make
+    for handler in handlers:
+        handler.stop()
+
+
+def _create(tmp_path: Path, name: str) -> FileCreatedEvent:
+    path = tmp_path / name
+    path.write_text(f"# {name}\n")
+    return FileCreatedEvent(str(path))
+
+
+def test_burst_below_threshold_stays_per_path(tmp_path, make_handler):
+    handler = make_handler(BulkDispatcher(), threshold=50)
+
+    for i in range(10):
+        handler.on_any_event(_create(tmp_path, f"f{i}.py"))
+
+    assert not handler.in_storm
+    assert len(handler._pending) == 10
+
+
+def test_storm_collects_deduplicated_set_and_applies_one_batch(tmp_path, make_handler):
+    dispatcher = BulkDispatcher()
+    handler = make_handler(dispatcher, threshold=5)
+
+    for i in range(8):
+        handler.on_any_event(_create(tmp_path, f"f{i}.py"))
+    # Repeated events for the same path collapse into one entry.
+    for _ in range(20):
+        handler.on_any_event(_create(tmp_path, "f0.py"))
+    handler.on_any_event(FileDeletedEvent(str(tmp_path / "gone.py")))
+
+    assert handler.in_storm
+    assert handler._pending == {}
+
+    handler.flush()
+
+    assert not handler.in_storm
+    assert dispatcher.bulk_calls == [
+        {
+            "indexed": [f"f{i}.py" for i in range(8)],
+            "removed": ["gone.py"],
+            "moved": [],
+            "do_semantic": False,
+        }
+    ]
+    assert dispatcher.semantic_calls == [[f"f{i}.py" for i in range(8)]]
+
+
+def test_storm_collapses_move_chains(tmp_path, make_handler):
+    dispatcher = BulkDispatcher()
+    handler = make_handler(dispatcher, threshold=1)
+    (tmp_path / "c.py").write_text("c = 1\n")
+    (tmp_path / "final.py").write_text("x = 1\n")
+
+    handler.on_any_event(FileMovedEvent(str(tmp_path / "a.py"), str(tmp_path / "b.py")))
+    handler.on_any_event(FileMovedEvent(str(tmp_path / "b.py"), str(tmp_path / "c.py")))
+    # Created then renamed during the storm: index the destination only.
+    handler.on_any_event(_create(tmp_path, "tmp.py"))
+    handler.on_any_event(FileMovedEvent(str(tmp_path / "tmp.py"), str(tmp_path / "final.py")))
+    (tmp_path / "tmp.py").unlink()
+    handler.flush()
+
+    (call,) = dispatcher.bulk_calls
+    assert call["moved"] == [("a.py", "c.py")]
+    assert call["removed"] == ["tmp.py"]
+    assert call["indexed"] == ["final.py"]
+
+
+def test_oversized_storm_flushes_lexically_and_defers_semantic(tmp_path, make_handler):
+    dispatcher = BulkDispatcher()
+    handler = make_handler(dispatcher, threshold=2, batch_size=3)
+
+    for i in range(4):
+        handler.on_any_event(_create(tmp_path, f"f{i}.py"))
+    handler._apply_storm_batch(*handler._take_storm_batch(now=0.0))
+    assert handler.in_storm
+    assert dispatcher.semantic_calls == []
+
+    handler.on_any_event(_create(tmp_path, "late.py"))
+    handler.flush()
+
+    assert [c["do_semantic"] for c in dispatcher.bulk_calls] == [False, False]
+    assert dispatcher.semantic_calls == [["f0.py", "f1.py", "f2.py", "f3.py", "late.py"]]
+
+
+def test_semantic_runs_per_batch_when_not_deferred(tmp_path, make_handler):
+    dispatcher = BulkDispatcher()
+    handler = make_handler(dispatcher, threshold=2, defer_semantic=False)
+
+    for i in range(3):
+        handler.on_any_event(_create(tmp_path, f"f{i}.py"))
+    handler.flush()
+
+    assert [c["do_semantic"] for c in dispatcher.bulk_calls] == [True]
+    assert dispatcher.semantic_calls == []
+
+
+def test_legacy_dispatcher_falls_back_to_per_file_calls(tmp_path, make_handler):
+    dispatcher = Mock()
+    handler = make_handler(dispatcher, threshold=2)
+
+    for i in range(3):
+        handler.on_any_event(_create(tmp_path, f"f{i}.py"))
+    handler.flush()
+
+    assert dispatcher.index_file.call_count == 3
+
+
+@pytest.mark.integration
+def test_dispatcher_index_changes_applies_batch(tmp_path, monkeypatch):
+    from mcp_server.dispatcher import EnhancedDispatcher
+    from mcp_server.plugins.python_plugin.plugin import Plugin as PythonPlugin
+    from mcp_server.storage.connection_pool import ReadWriteConnections
+    from mcp_server.storage.sqlite_store import SQLiteStore
+
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "index.db")
+    store = SQLiteStore(db_path, connections=ReadWriteConnections(db_path))
+    dispatcher = EnhancedDispatcher(
+        [PythonPlugin(sqlite_store=None)], semantic_search_enabled=False
+    )
+    ctx = _ctx(tmp_path, store)
+
+    for name in ("keep.py", "drop.py", "old.py"):
+        (tmp_path / name).write_text(f"def {name[:-3]}():\n    return 1\n")
+        dispatcher.index_file(ctx, tmp_path / name)
+    (tmp_path / "drop.py").unlink()
+    (tmp_path / "old.py").rename(tmp_path / "new.py")
+    (tmp_path / "added.py").write_text("def added():\n    return 2\n")
+
+    stats = dispatcher.index_changes(
+        ctx,
+        indexed=[tmp_path / "keep.py", tmp_path / "added.py"],
+        removed=[tmp_path / "drop.py"],
+        moved=[(tmp_path / "old.py", tmp_path / "new.py", "moved-hash")],
+    )
+
+    assert (stats["moved"], stats["removed"], stats["indexed"], stats["skipped"]) == (1, 1, 1, 1)
+    assert stats["failed"] == 0
+    assert store.get_file_id_by_path("drop.py") is None
+    assert store.get_file_id_by_path("old.py") is None
+    assert store.get_file_id_by_path("new.py") is not None
+    assert store.get_file_id_by_path("added.py") is not None
+    store.close()
+
+
+@pytest.mark.integration
+def test_dispatcher_index_changes_rolls_back_a_failed_operation(tmp_path, monkeypatch):
+    from mcp_server.dispatcher import EnhancedDispatcher
+    from mcp_server.dispatcher.dispatcher_enhanced import IndexResult, IndexResultStatus
+    from mcp_server.plugins.python_plugin.plugin import Plugin as PythonPlugin
+    from mcp_server.storage.sqlite_store import SQLiteStore
+
+    monkeypatch.chdir(tmp_path)
+    store = SQLiteStore(str(tmp_path / "index.db"))
+    dispatcher = EnhancedDispatcher(
+        [PythonPlugin(sqlite_store=None)], semantic_search_enabled=False
+    )
+    ctx = _ctx(tmp_path, store)
+    for name in ("good.py", "bad.py"):
+        (tmp_path / name).write_text(f"def {name[:-3]}():\n    return 1\n")
+    real_index_file = dispatcher.index_file
+
+    def half_written(ctx, path, **kwargs):
+        if Path(path).name != "bad.py":
+            return real_index_file(ctx, path, **kwargs)
+        repo_id = store.create_repository(str(tmp_path), "repo")
+        store.store_file(repository_id=repo_id, relative_path="bad.py", language="python")
+        return IndexResult(
+            status=IndexResultStatus.ERROR,
+            path=Path(path),
+            observed_hash=None,
+            actual_hash=None,
+            error="parse failed",
+        )
+
+    monkeypatch.setattr(dispatcher, "index_file", half_written)
+    stats = dispatcher.index_changes(ctx, indexed=[tmp_path / "good.py", tmp_path / "bad.py"])
+
+    assert (stats["indexed"], stats["failed"]) == (1, 1)
+    assert store.get_file_id_by_path("good.py") is not None
+    assert store.get_file_id_by_path("bad.py") is None